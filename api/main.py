@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -20,8 +23,22 @@ from api.routes import (
     trade,
     risk,
 )
+from evolution import repository as evolution_repository
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build indexes up front so request handlers never pay for create_index round trips.
+    try:
+        evolution_repository.ensure_indexes()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Index bootstrap failed; repositories will retry on first use: %s", exc)
+    yield
+
 
-app = FastAPI(title="CryptoTrader Core API")
+app = FastAPI(title="CryptoTrader Core API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -161,7 +161,7 @@ def bootstrap_data(payload: BootstrapRequest) -> Dict[str, Any]:
             )
             results["ingested"].append({"symbol": symbol, "interval": interval, "rows": ingested})
 
-            feature_rows = generate_for_symbol(symbol, interval)
+            feature_rows = generate_for_symbol(symbol, interval, refresh_forecasts=True)
             results["features"].append({"symbol": symbol, "interval": interval, "rows": feature_rows})
 
     primary_symbol = symbols[0]
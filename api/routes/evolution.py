@@ -12,6 +12,7 @@ from evolution.promoter import apply_decision, decide_promotion
 from evolution.repository import append_note, get_scheduler_states, list_experiments, load_experiment, update_experiment
 from evolution.schemas import PromotionPolicy
 from knowledge.base import KnowledgeBaseService
+from strategy_genome.fitness_cache import cache_stats
 from strategy_genome.repository import archive_strategy, promote_strategy
 
 router = APIRouter()
@@ -22,7 +23,7 @@ engine = EvolutionEngine(knowledge_service=knowledge_service)
 
 class ExperimentUpdatePayload(BaseModel):
     status: Optional[str] = Field(
-        default=None, pattern="^(pending|running|completed|promoted|archived|rejected|failed)$"
+        default=None, pattern="^(pending|running|completed|pruned|promoted|archived|rejected|failed)$"
     )
     note: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
@@ -34,6 +35,7 @@ class PromotePayload(BaseModel):
     min_sharpe: Optional[float] = None
     max_drawdown: Optional[float] = None
     min_score_gain: Optional[float] = None
+    min_positive_fold_ratio: Optional[float] = None
 
 
 class RollbackPayload(BaseModel):
@@ -105,6 +107,11 @@ def post_promote(payload: PromotePayload) -> Dict[str, Any]:
         min_sharpe=payload.min_sharpe or engine.promotion_policy.min_sharpe,
         max_drawdown=payload.max_drawdown or engine.promotion_policy.max_drawdown,
         min_score_gain=payload.min_score_gain or engine.promotion_policy.min_score_gain,
+        min_positive_fold_ratio=(
+            payload.min_positive_fold_ratio
+            if payload.min_positive_fold_ratio is not None
+            else engine.promotion_policy.min_positive_fold_ratio
+        ),
     )
     decision = decide_promotion(payload.experiment_id, policy)
     if not decision:
@@ -135,6 +142,11 @@ def get_schedulers() -> Dict[str, Any]:
     return {"schedulers": states}
 
 
+@router.get("/fitness-cache")
+def get_fitness_cache_stats() -> Dict[str, Any]:
+    return {"fitness_cache": cache_stats()}
+
+
 @router.post("/schedulers/toggle")
 def post_scheduler_toggle(payload: SchedulerTogglePayload) -> Dict[str, Any]:
     state = toggle_scheduler(payload.enabled)
@@ -22,7 +22,8 @@ from manager.experiment_runner import (
 )
 from manager.tasks import celery_app, run_experiment_cycle_task
 from monitor.metrics import observe_cohort_api_latency
-from strategy_genome.repository import fetch_queue, reprioritize_queue
+from strategy_genome.queue_scheduler import queue_pressure, reprioritize
+from strategy_genome.repository import fetch_queue
 
 router = APIRouter()
 
@@ -38,6 +39,7 @@ class ExperimentPayload(BaseModel):
     champion_limit: Optional[int] = Field(5, ge=1, le=20)
     queue_only: bool = False
     families: Optional[List[str]] = Field(default=None)
+    priority_class: str = Field("manual", pattern="^(manual|scheduled|background)$")
 
     @validator("families", pre=True)
     def sanitize_families(cls, value: Optional[List[str]]) -> Optional[List[str]]:  # noqa: D401 - simple sanitizer
@@ -135,11 +137,24 @@ class ReprioritizePayload(BaseModel):
     queue_ids: List[str] = Field(..., min_items=1)
 
 
+def _queue_saturated(retry_after: Optional[int], detail: Dict[str, Any]) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={"message": "Experiment queue is at capacity.", **detail},
+        headers={"Retry-After": str(retry_after or 1)},
+    )
+
+
 @router.get("/queue")
 def get_queue(status: Optional[str] = None) -> Dict[str, Any]:
     return {"queue": fetch_queue(status=status)}
 
 
+@router.get("/queue/pressure")
+def get_queue_pressure() -> Dict[str, Any]:
+    return queue_pressure()
+
+
 @router.post("/run")
 def post_run_experiments(payload: ExperimentPayload) -> Dict[str, Any]:
     request = ExperimentRequest(
@@ -151,11 +166,17 @@ def post_run_experiments(payload: ExperimentPayload) -> Dict[str, Any]:
         champion_limit=payload.champion_limit or 5,
         queue_only=payload.queue_only,
         families=payload.families or ["ema-cross"],
+        priority_class=payload.priority_class,
     )
     if payload.queue_only:
         summary = run_experiment_cycle(request)
+        if not summary.get("queued") and summary.get("rejected"):
+            raise _queue_saturated(None, {"summary": summary})
         return {"summary": summary, "mode": "queue_only"}
 
+    pressure = queue_pressure()
+    if not pressure["accepting"][payload.priority_class]:
+        raise _queue_saturated(pressure["retry_after"], {"pressure": pressure})
     task = run_experiment_cycle_task.delay(request.to_dict())
     status = (task.status or "PENDING").lower()
     return {"task_id": task.id, "status": status}
@@ -163,7 +184,7 @@ def post_run_experiments(payload: ExperimentPayload) -> Dict[str, Any]:
 
 @router.post("/reprioritize")
 def post_reprioritize(payload: ReprioritizePayload) -> Dict[str, Any]:
-    reordered = reprioritize_queue(payload.queue_ids)
+    reordered = reprioritize(payload.queue_ids)
     if not reordered:
         raise HTTPException(status_code=404, detail="No queue items were reprioritized.")
     return {"queue": reordered}
@@ -171,11 +192,30 @@ def post_reprioritize(payload: ReprioritizePayload) -> Dict[str, Any]:
 
 @router.get("/tasks/{task_id}")
 def get_experiment_task(task_id: str) -> Dict[str, Any]:
+    """Task status; a cycle task that fanned out a chord reports the chord callback instead.
+
+    ``run_experiment_cycle_task`` returns as soon as its chord is dispatched, so until
+    ``finalize_experiment_cycle_task`` finishes the cycle is reported as ``started``.
+    """
     result = AsyncResult(task_id, app=celery_app)
     status = (result.status or "PENDING").lower()
     response: Dict[str, Any] = {"task_id": task_id, "status": status}
     if result.successful():
         response["result"] = result.result
+        chord_id = result.result.get("chord_id") if isinstance(result.result, dict) else None
+        if chord_id:
+            response["dispatch"] = result.result
+            callback = AsyncResult(chord_id, app=celery_app)
+            response["chord_id"] = chord_id
+            if callback.successful():
+                response["result"] = callback.result
+            elif callback.failed():
+                response["status"] = "failure"
+                response["error"] = str(callback.result)
+                response.pop("result")
+            else:
+                response["status"] = "started"
+                response.pop("result")
     elif result.failed():
         response["error"] = str(result.result)
     return response
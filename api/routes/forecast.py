@@ -9,7 +9,8 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from models.ensemble import EnsembleError, ensemble_predict
+from models.ensemble import EnsembleError
+from models.forecast_store import get_forecast
 
 router = APIRouter()
 
@@ -33,9 +34,8 @@ def _serialize_result(result: Dict[str, Any]) -> Dict[str, Any]:
 
 @router.post("/")
 def forecast(payload: ForecastRequest) -> Dict[str, Any]:
-    ts = payload.timestamp or datetime.utcnow()
     try:
-        result = ensemble_predict(payload.symbol, payload.horizon, ts)
+        result = get_forecast(payload.symbol, payload.horizon, payload.timestamp)
     except EnsembleError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     return _serialize_result(result)
@@ -54,7 +54,7 @@ def forecast_batch(
         if not symbol:
             continue
         try:
-            result = ensemble_predict(symbol, horizon, ts)
+            result = get_forecast(symbol, horizon, timestamp)
             outputs.append(_serialize_result(result))
         except EnsembleError as exc:
             outputs.append(
@@ -81,7 +81,7 @@ def forecast_export(
         if not symbol:
             continue
         try:
-            result = ensemble_predict(symbol, horizon, ts)
+            result = get_forecast(symbol, horizon, timestamp)
             serialized = _serialize_result(result)
         except EnsembleError as exc:
             serialized = {
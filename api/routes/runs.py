@@ -5,8 +5,8 @@ from typing import Any, Dict
 
 from fastapi import APIRouter, HTTPException
 
-from db.client import get_database_name, mongo_client
-from simulator.runner import run_simulation
+from simulator.run_store import SUMMARY_PROJECTION, list_run_summaries, load_run
+from simulator.runner import run_portfolio_simulation, run_simulation
 
 router = APIRouter()
 
@@ -25,26 +25,31 @@ def start_simulation(payload: Dict[str, Any]) -> Dict[str, str]:
     return {"run_id": run_id}
 
 
+@router.post("/sim/portfolio")
+def start_portfolio_simulation(payload: Dict[str, Any]) -> Dict[str, str]:
+    symbols = payload.get("symbols") or []
+    interval = payload.get("interval", "1h")
+    strategy = payload.get("strategy", "baseline")
+    if not symbols:
+        raise HTTPException(status_code=400, detail="symbols is required")
+
+    run_id = run_portfolio_simulation(symbols, interval, strategy, strategy_config=payload.get("strategy_config"))
+    if not run_id:
+        raise HTTPException(status_code=500, detail="Failed to run portfolio simulation")
+    return {"run_id": run_id}
+
+
 @router.get("/sim/{run_id}")
 def get_run(run_id: str) -> Dict[str, Any]:
-    with mongo_client() as client:
-        db = client[get_database_name()]
-        record = db["sim_runs"].find_one({"run_id": run_id}, {"_id": 0})
+    record = load_run(run_id)
     if not record:
         raise HTTPException(status_code=404, detail="Run not found")
+    record.pop("equity_full", None)
     return record
 
 
 @router.get("/sim")
 def list_runs(limit: int = 10) -> Dict[str, Any]:
-    with mongo_client() as client:
-        db = client[get_database_name()]
-        cursor = (
-            db["sim_runs"]
-            .find({}, {"_id": 0})
-            .sort("created_at", -1)
-            .limit(limit)
-        )
-        runs = list(cursor)
+    runs = list_run_summaries(projection={"_id": 0, **SUMMARY_PROJECTION}, limit=limit)
     return {"runs": runs}
 
@@ -85,6 +85,8 @@ class ExperimentSettingsPayload(BaseModel):
     min_confidence: float = Field(..., ge=0.0, le=1.0)
     min_return: float = Field(..., ge=0.0, le=0.5)
     max_queue: int = Field(..., ge=1, le=500)
+    manual_headroom: int = Field(10, ge=0, le=200)
+    max_pending_per_family: int = Field(0, ge=0, le=500)
 
     @validator("families")
     def validate_families(cls, value: List[str]) -> List[str]:
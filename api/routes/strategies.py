@@ -6,11 +6,14 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
 from db.client import get_database_name, mongo_client
+from simulator.run_store import SUMMARY_PROJECTION
+from strategy_genome import lineage
 from strategy_genome.repository import (
     archive_strategy,
     get_genome,
     list_genomes,
     promote_strategy,
+    rebuild_lineage_index,
 )
 
 router = APIRouter()
@@ -47,7 +50,7 @@ def _recent_runs(strategy_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         db = client[get_database_name()]
         cursor = (
             db["sim_runs"]
-            .find({"strategy": strategy_id})
+            .find({"strategy": strategy_id}, SUMMARY_PROJECTION)
             .sort("created_at", -1)
             .limit(limit)
         )
@@ -58,6 +61,59 @@ def _recent_runs(strategy_id: str, limit: int = 5) -> List[Dict[str, Any]]:
     return runs
 
 
+@router.get("/lineage")
+def get_lineage(limit: int = Query(default=100, ge=1, le=500)) -> Dict[str, Any]:
+    docs = list_genomes(limit=limit)
+    nodes = []
+    links = []
+    for doc in docs:
+        parent = doc.get("mutation_parent")
+        nodes.append(
+            {
+                "strategy_id": doc.get("strategy_id"),
+                "generation": doc.get("generation"),
+                "status": doc.get("status"),
+                "composite": doc.get("fitness", {}).get("composite"),
+                "parent": parent,
+            }
+        )
+        if parent:
+            links.append({"source": parent, "target": doc.get("strategy_id")})
+    return {"nodes": nodes, "links": links}
+
+
+def _serialize_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {"strategy_id": node.get("_id"), **{key: value for key, value in node.items() if key != "_id"}}
+
+
+@router.get("/lineage/{strategy_id}/ancestors")
+def get_ancestors(strategy_id: str) -> Dict[str, Any]:
+    return {"strategy_id": strategy_id, "ancestors": [_serialize_node(node) for node in lineage.ancestors(strategy_id)]}
+
+
+@router.get("/lineage/{strategy_id}/descendants")
+def get_descendants(
+    strategy_id: str,
+    limit: int = Query(default=500, ge=1, le=5000),
+    max_generation: Optional[int] = Query(default=None, ge=0),
+) -> Dict[str, Any]:
+    nodes = lineage.descendants(strategy_id, limit=limit, max_generation=max_generation)
+    return {"strategy_id": strategy_id, "descendants": [_serialize_node(node) for node in nodes]}
+
+
+@router.get("/lineage/{strategy_id}/subtree")
+def get_subtree(strategy_id: str) -> Dict[str, Any]:
+    summary = lineage.subtree_fitness(strategy_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail=f"Strategy '{strategy_id}' has no lineage node.")
+    return summary
+
+
+@router.post("/lineage/rebuild")
+def post_rebuild_lineage() -> Dict[str, Any]:
+    return {"nodes": rebuild_lineage_index()}
+
+
 @router.get("/{strategy_id}")
 def get_strategy(strategy_id: str) -> Dict[str, Any]:
     doc = get_genome(strategy_id)
@@ -87,26 +143,3 @@ def post_archive_strategy(payload: StrategyActionPayload) -> Dict[str, Any]:
     if not updated:
         raise HTTPException(status_code=404, detail=f"Strategy '{payload.strategy_id}' not found.")
     return {"strategy": _serialize_doc(updated)}
-
-
-@router.get("/lineage")
-def get_lineage(limit: int = Query(default=100, ge=1, le=500)) -> Dict[str, Any]:
-    docs = list_genomes(limit=limit)
-    nodes = []
-    links = []
-    for doc in docs:
-        parent = doc.get("mutation_parent")
-        nodes.append(
-            {
-                "strategy_id": doc.get("strategy_id"),
-                "generation": doc.get("generation"),
-                "status": doc.get("status"),
-                "composite": doc.get("fitness", {}).get("composite"),
-                "parent": parent,
-            }
-        )
-        if parent:
-            links.append({"source": parent, "target": doc.get("strategy_id")})
-    return {"nodes": nodes, "links": links}
-
-
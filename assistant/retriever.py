@@ -6,6 +6,7 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 from bson import ObjectId
 
 from db.client import get_database_name, mongo_client
+from simulator.run_store import SUMMARY_PROJECTION, trade_count
 
 from .schemas import AssistantQueryContext, EvidenceItem
 
@@ -54,7 +55,7 @@ class AssistantRetriever:
             db = client[get_database_name()]
             cursor = (
                 db["sim_runs"]
-                .find(query)
+                .find(query, SUMMARY_PROJECTION)
                 .sort("created_at", -1)
                 .limit(self.max_evidence * 2)
             )
@@ -279,7 +280,9 @@ def fetch_evidence_by_reference(reference: str) -> Optional[Dict[str, Any]]:
     with mongo_client() as client:
         db = client[get_database_name()]
         if namespace == "sim_runs":
-            doc = db["sim_runs"].find_one({"run_id": identifier}) or db["sim_runs"].find_one({"_id": identifier})
+            doc = db["sim_runs"].find_one({"run_id": identifier}, SUMMARY_PROJECTION) or db["sim_runs"].find_one(
+                {"_id": identifier}, SUMMARY_PROJECTION
+            )
             return _normalise_doc(doc)
         if namespace == "daily_reports":
             doc = db["daily_reports"].find_one({"date": identifier})
@@ -310,7 +313,7 @@ def _summarise_sim_run(doc: Dict[str, Any]) -> str:
     pnl = results.get("pnl")
     roi = results.get("roi")
     sharpe = results.get("sharpe")
-    trades = len(doc.get("trades") or [])
+    trades = trade_count(doc)
     parts: List[str] = []
     if isinstance(pnl, (int, float)):
         parts.append(f"PnL {pnl:.2f}")
@@ -1,19 +1,23 @@
 """Event-driven backtesting engine."""
 from __future__ import annotations
 
+from array import array
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backtester.execution_model import ExecutionModel
-from evaluation.metrics import compute_experiment_metrics
+from evaluation.accumulators import StreamingMetrics
 
 
 @dataclass
 class Position:
     entry_price: float
     quantity: float
+    realized_pnl: float = 0.0
 
 
 @dataclass
@@ -27,6 +31,7 @@ class Trade:
     predicted_return: Optional[float] = None
     confidence: Optional[float] = None
     realized_return: Optional[float] = None
+    symbol: Optional[str] = None
 
 
 @dataclass
@@ -34,9 +39,25 @@ class BacktestResult:
     trades: List[Trade] = field(default_factory=list)
     equity_curve: List[Dict[str, float]] = field(default_factory=list)
     metrics: Dict[str, float] = field(default_factory=dict)
+    # Full-resolution curve, only when the backtester was built with ``record_full_equity``.
+    full_equity: Optional[np.ndarray] = None
+    full_timestamps: Optional[np.ndarray] = None
 
 
 class Backtester:
+    """Single-asset event-driven backtester.
+
+    Metrics are accumulated online. ``equity_curve`` keeps every ``equity_sample_every``-th
+    bar (plus the final one) as dicts. ``record_full_equity`` additionally keeps every bar
+    in compact float arrays.
+
+    Bar ``volume``/``high``/``low`` passed to ``on_signal`` feed the execution model's
+    spread, impact and partial-fill estimates. A partially filled exit leaves the remainder
+    open until later sells or exits clear it. With ``latency_bars`` set, buy/sell signals
+    fill that many bars later at the then-current price; take-profit/stop-loss exits stay
+    immediate.
+    """
+
     def __init__(
         self,
         initial_capital: float = 10_000.0,
@@ -44,6 +65,8 @@ class Backtester:
         execution_model: Optional[ExecutionModel] = None,
         take_profit_pct: Optional[float] = None,
         stop_loss_pct: Optional[float] = None,
+        equity_sample_every: int = 1,
+        record_full_equity: bool = False,
     ) -> None:
         self.initial_capital = initial_capital
         self.cash = initial_capital
@@ -55,6 +78,15 @@ class Backtester:
         self.last_prediction: Dict[str, Optional[float]] = {"predicted_return": None, "confidence": None}
         self.take_profit_pct = take_profit_pct
         self.stop_loss_pct = stop_loss_pct
+        self.equity_sample_every = max(int(equity_sample_every), 1)
+        self.record_full_equity = record_full_equity
+        self._metrics = StreamingMetrics(initial_capital)
+        self._bars = 0
+        self._last_point: Optional[Dict[str, float]] = None
+        self._full_equity = array("d")
+        self._full_timestamps = array("q")
+        self._bar: Dict[str, Optional[float]] = {}
+        self._pending: Deque[Tuple[int, str, Dict[str, Optional[float]]]] = deque()
 
     def on_signal(
         self,
@@ -63,21 +95,41 @@ class Backtester:
         signal: str,
         predicted_return: Optional[float] = None,
         confidence: Optional[float] = None,
+        *,
+        volume: Optional[float] = None,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
     ) -> None:
         self.last_prediction = {"predicted_return": predicted_return, "confidence": confidence}
+        self._bar = {"volume": volume, "high": high, "low": low}
         signal = signal.lower()
         self._apply_risk_management(ts, price)
+        latency = self.execution.latency_bars
+        if not latency:
+            self._execute(ts, price, signal, self.last_prediction)
+        else:
+            if signal in {"buy", "sell"}:
+                self._pending.append((self._bars + latency, signal, self.last_prediction))
+            while self._pending and self._pending[0][0] <= self._bars:
+                _, pending_signal, prediction = self._pending.popleft()
+                self._execute(ts, price, pending_signal, prediction)
+        self._mark_equity(ts, price)
+
+    def _execute(self, ts: pd.Timestamp, price: float, signal: str, prediction: Dict[str, Optional[float]]) -> None:
         if signal == "buy":
-            self._handle_buy(ts, price)
+            self._handle_buy(ts, price, prediction)
         elif signal == "sell":
             self._handle_sell(ts, price)
-        self._mark_equity(ts, price)
 
-    def _handle_buy(self, ts: pd.Timestamp, price: float) -> None:
+    def _handle_buy(
+        self, ts: pd.Timestamp, price: float, prediction: Optional[Dict[str, Optional[float]]] = None
+    ) -> None:
         if self.position:
             return
-        exec_price = self.execution.apply_slippage(price, "buy")
+        prediction = prediction or self.last_prediction
         notional = self.cash * self.position_size_pct
+        exec_price, fill_ratio = self.execution.fill(price, "buy", notional / price, **self._bar)
+        notional *= fill_ratio
         net_notional = self.execution.apply_fees(notional)
         qty = net_notional / exec_price
         self.position = Position(entry_price=exec_price, quantity=qty)
@@ -90,25 +142,30 @@ class Backtester:
                 exit_price=None,
                 quantity=qty,
                 pnl=None,
-                predicted_return=self.last_prediction.get("predicted_return"),
-                confidence=self.last_prediction.get("confidence"),
+                predicted_return=prediction.get("predicted_return"),
+                confidence=prediction.get("confidence"),
             )
         )
 
     def _handle_sell(self, ts: pd.Timestamp, price: float) -> None:
         if not self.position:
             return
-        exec_price = self.execution.apply_slippage(price, "sell")
-        gross = exec_price * self.position.quantity
+        exec_price, fill_ratio = self.execution.fill(price, "sell", self.position.quantity, **self._bar)
+        quantity = self.position.quantity * fill_ratio
+        gross = exec_price * quantity
         net = self.execution.apply_fees(gross)
         self.cash += net
-        pnl = (exec_price - self.position.entry_price) * self.position.quantity
+        self.position.realized_pnl += (exec_price - self.position.entry_price) * quantity
+        if fill_ratio < 1.0:
+            self.position.quantity -= quantity
+            return
         last_trade = self.trades[-1]
         last_trade.exit_ts = ts
         last_trade.exit_price = exec_price
-        last_trade.pnl = pnl
+        last_trade.pnl = self.position.realized_pnl
         if last_trade.entry_price:
             last_trade.realized_return = (exec_price - last_trade.entry_price) / last_trade.entry_price
+        self._metrics.record_trade(last_trade.predicted_return, last_trade.realized_return)
         self.position = None
 
     def _apply_risk_management(self, ts: pd.Timestamp, price: float) -> None:
@@ -125,19 +182,34 @@ class Backtester:
         if self.position:
             position_value = price * self.position.quantity
         equity = self.cash + position_value
-        self.equity_curve.append(
-            {
-                "timestamp": ts,
-                "equity": equity,
-                "predicted_return": self.last_prediction.get("predicted_return"),
-                "confidence": self.last_prediction.get("confidence"),
-            }
-        )
+        self._metrics.update(equity)
+        if self.record_full_equity:
+            self._full_equity.append(equity)
+            self._full_timestamps.append(pd.Timestamp(ts).value)
+        point = {
+            "timestamp": ts,
+            "equity": equity,
+            "predicted_return": self.last_prediction.get("predicted_return"),
+            "confidence": self.last_prediction.get("confidence"),
+        }
+        if self._bars % self.equity_sample_every == 0:
+            self.equity_curve.append(point)
+            self._last_point = None
+        else:
+            self._last_point = point
+        self._bars += 1
 
     def finalize(self) -> BacktestResult:
         metrics: Dict[str, float] = {}
-        if self.equity_curve:
-            series = pd.Series([point["equity"] for point in self.equity_curve])
-            metrics = compute_experiment_metrics(series, self.trades, self.initial_capital)
-        return BacktestResult(trades=self.trades, equity_curve=self.equity_curve, metrics=metrics)
+        if self._last_point is not None:
+            # Always end the sampled curve on the final bar so ending equity is exact.
+            self.equity_curve.append(self._last_point)
+            self._last_point = None
+        if self._bars:
+            metrics = self._metrics.summary()
+        result = BacktestResult(trades=self.trades, equity_curve=self.equity_curve, metrics=metrics)
+        if self.record_full_equity:
+            result.full_equity = np.frombuffer(self._full_equity, dtype=np.float64).copy()
+            result.full_timestamps = np.frombuffer(self._full_timestamps, dtype=np.int64).astype("datetime64[ns]")
+        return result
 
@@ -1,19 +1,64 @@
-"""Execution model with fixed slippage and fees."""
+"""Execution model: fixed slippage and fees plus optional bar-aware market impact.
+
+With the default config only ``slippage_bps`` and ``fee_bps`` apply, exactly as before.
+Setting the other knobs adds, per fill:
+
+* a half-spread estimated from the bar range, ``range_spread_factor * (high - low) / price / 2``;
+* volume-participation impact, ``impact_bps * (quantity / volume) ** impact_exponent``;
+* partial fills, capping each fill at ``max_participation * volume``;
+* ``latency_bars`` between a signal and its fill (applied by the backtesters).
+"""
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
 
 
 @dataclass
 class ExecutionConfig:
     slippage_bps: float = 5.0
     fee_bps: float = 10.0
+    range_spread_factor: float = 0.0
+    impact_bps: float = 0.0
+    impact_exponent: float = 0.5
+    max_participation: Optional[float] = None
+    latency_bars: int = 0
+
+
+@dataclass
+class FillEstimate:
+    """Per-fill results of ``ExecutionModel.estimate_costs``; all arrays share one shape."""
+
+    price: np.ndarray
+    fill_ratio: np.ndarray
+    cost_bps: np.ndarray
+
+
+def _side_sign(side) -> np.ndarray:
+    if isinstance(side, str):
+        return np.asarray(1.0 if side.lower() == "buy" else -1.0)
+    side = np.asarray(side)
+    if side.dtype.kind in {"U", "S", "O"}:
+        return np.where(np.char.lower(side.astype(str)) == "buy", 1.0, -1.0)
+    return np.where(side > 0, 1.0, -1.0)
 
 
 class ExecutionModel:
     def __init__(self, config: ExecutionConfig | None = None) -> None:
         self.config = config or ExecutionConfig()
 
+    @property
+    def latency_bars(self) -> int:
+        return max(int(self.config.latency_bars), 0)
+
+    @property
+    def uses_bar_data(self) -> bool:
+        """Whether fills depend on bar high/low/volume rather than price alone."""
+        config = self.config
+        return bool(config.range_spread_factor or config.impact_bps or config.max_participation is not None)
+
     def apply_slippage(self, price: float, side: str) -> float:
         adjustment = self.config.slippage_bps / 10_000
         if side.lower() == "buy":
@@ -24,3 +69,69 @@ class ExecutionModel:
         fee = notional * (self.config.fee_bps / 10_000)
         return notional - fee
 
+    def estimate_costs(
+        self,
+        price,
+        side,
+        quantity=None,
+        *,
+        volume=None,
+        high=None,
+        low=None,
+    ) -> FillEstimate:
+        """Execution price and filled fraction for a batch of fills.
+
+        ``side`` is ``"buy"``/``"sell"`` or +1/-1; ``quantity`` is the requested size in
+        base units at ``price``. Inputs broadcast against each other. Bar fields left as
+        ``None`` (or NaN/non-positive volume) disable the corresponding cost term, so the
+        estimate falls back to fixed slippage.
+        """
+        config = self.config
+        price = np.asarray(price, dtype=np.float64)
+        sign = _side_sign(side)
+        shape = np.broadcast_shapes(
+            *(np.shape(value) for value in (price, sign, quantity, volume, high, low) if value is not None)
+        )
+        cost = np.full(shape, config.slippage_bps / 10_000)
+        fill_ratio = np.ones(shape)
+
+        if config.range_spread_factor and high is not None and low is not None:
+            bar_range = np.asarray(high, dtype=np.float64) - np.asarray(low, dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                half_spread = 0.5 * config.range_spread_factor * bar_range / price
+            cost = cost + np.nan_to_num(np.clip(half_spread, 0.0, None))
+
+        if volume is not None and quantity is not None and (config.impact_bps or config.max_participation is not None):
+            volume = np.asarray(volume, dtype=np.float64)
+            quantity = np.asarray(quantity, dtype=np.float64)
+            known = np.isfinite(volume) & (volume > 0) & (quantity > 0)
+            safe_volume = np.where(known, volume, 1.0)
+            if config.max_participation is not None:
+                capacity = config.max_participation * safe_volume
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    fill_ratio = np.where(known, np.minimum(1.0, capacity / quantity), 1.0)
+            if config.impact_bps:
+                participation = np.where(known, quantity * fill_ratio / safe_volume, 0.0)
+                cost = cost + config.impact_bps / 10_000 * participation ** config.impact_exponent
+
+        return FillEstimate(
+            price=np.broadcast_to(price * (1 + sign * cost), shape),
+            fill_ratio=np.broadcast_to(fill_ratio, shape),
+            cost_bps=np.broadcast_to(cost * 10_000, shape),
+        )
+
+    def fill(
+        self,
+        price: float,
+        side: str,
+        quantity: float,
+        *,
+        volume: Optional[float] = None,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
+    ) -> tuple[float, float]:
+        """Scalar ``estimate_costs``: ``(execution_price, fill_ratio)`` for one order."""
+        if not self.uses_bar_data:
+            return self.apply_slippage(price, side), 1.0
+        estimate = self.estimate_costs(price, side, quantity, volume=volume, high=high, low=low)
+        return float(estimate.price), float(estimate.fill_ratio)
@@ -0,0 +1,182 @@
+"""Vectorised backtest of many threshold-strategy parameter sets over one price path."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backtester.execution_model import ExecutionModel
+from evaluation.accumulators import StreamingMetrics
+
+
+def _column(values, size: int, default: float) -> np.ndarray:
+    if values is None:
+        return np.full(size, default, dtype=np.float64)
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 0:
+        return np.full(size, float(array))
+    return array
+
+
+@dataclass
+class PopulationParams:
+    """One entry per genome. ``take_profit_pct``/``stop_loss_pct`` use NaN for "disabled"."""
+
+    min_return_threshold: np.ndarray
+    min_confidence: np.ndarray
+    forecast_weight: np.ndarray
+    position_size_pct: np.ndarray
+    take_profit_pct: np.ndarray
+    stop_loss_pct: np.ndarray
+    uses_forecast: np.ndarray
+    initial_capital: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        size: int,
+        *,
+        min_return_threshold=None,
+        min_confidence=None,
+        forecast_weight=None,
+        position_size_pct=None,
+        take_profit_pct=None,
+        stop_loss_pct=None,
+        uses_forecast=None,
+        initial_capital=None,
+    ) -> "PopulationParams":
+        return cls(
+            min_return_threshold=_column(min_return_threshold, size, 0.001),
+            min_confidence=_column(min_confidence, size, 0.55),
+            forecast_weight=_column(forecast_weight, size, 1.0),
+            position_size_pct=_column(position_size_pct, size, 0.1),
+            take_profit_pct=_column(take_profit_pct, size, np.nan),
+            stop_loss_pct=_column(stop_loss_pct, size, np.nan),
+            uses_forecast=_column(uses_forecast, size, 1.0).astype(bool),
+            initial_capital=_column(initial_capital, size, 10_000.0),
+        )
+
+    def __len__(self) -> int:
+        return len(self.min_return_threshold)
+
+
+@dataclass
+class PopulationResult:
+    metrics: Dict[str, np.ndarray] = field(default_factory=dict)
+    trade_counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    final_equity: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    def __len__(self) -> int:
+        return len(self.final_equity)
+
+    def metrics_for(self, idx: int) -> Dict[str, float]:
+        return {name: float(values[idx]) for name, values in self.metrics.items()}
+
+    def to_records(self) -> List[Dict[str, float]]:
+        return [self.metrics_for(idx) for idx in range(len(self))]
+
+
+def simulate_population(
+    prices: np.ndarray,
+    predicted_returns: np.ndarray,
+    confidences: np.ndarray,
+    params: PopulationParams,
+    execution_model: Optional[ExecutionModel] = None,
+    *,
+    volumes: Optional[np.ndarray] = None,
+    highs: Optional[np.ndarray] = None,
+    lows: Optional[np.ndarray] = None,
+) -> PopulationResult:
+    """Run ``len(params)`` long-only threshold strategies over the same bars at once.
+
+    Bar by bar this mirrors ``Backtester.on_signal`` fed with ``simulator.runner._decide_signal``:
+    take-profit/stop-loss exits first, then buy/sell signals, then marking to market. Metrics
+    match ``compute_experiment_metrics`` on the resulting equity curves but are accumulated
+    as the bars stream past, so no ``N x bars`` matrix is ever held. Missing forecasts are NaN.
+
+    Fills for every genome trading on a bar are priced in one ``estimate_costs`` call, using
+    the bar's volume/high/low when given; latency shifts the forecasts by ``latency_bars``.
+    """
+    execution = execution_model or ExecutionModel()
+    fee_keep = 1.0 - execution.config.fee_bps / 10_000
+    prices = np.asarray(prices, dtype=np.float64)
+    predicted_returns = np.asarray(predicted_returns, dtype=np.float64)
+    confidences = np.asarray(confidences, dtype=np.float64)
+    latency = execution.latency_bars
+    if latency:
+        predicted_returns = np.concatenate([np.full(latency, np.nan), predicted_returns])[: len(prices)]
+        confidences = np.concatenate([np.full(latency, np.nan), confidences])[: len(prices)]
+    bar_fields = {
+        name: None if values is None else np.asarray(values, dtype=np.float64)
+        for name, values in (("volume", volumes), ("high", highs), ("low", lows))
+    }
+
+    n = len(params)
+    cash = params.initial_capital.copy()
+    quantity = np.zeros(n)
+    entry = np.zeros(n)
+    entry_pred = np.zeros(n)
+    holding = np.zeros(n, dtype=bool)
+    has_tp = ~np.isnan(params.take_profit_pct)
+    has_sl = ~np.isnan(params.stop_loss_pct)
+
+    trades = np.zeros(n, dtype=np.int64)
+    accumulator = StreamingMetrics(params.initial_capital, size=n)
+
+    def _sell(mask: np.ndarray, price: float, bar: Dict[str, Optional[float]]) -> None:
+        if not mask.any():
+            return
+        idx = np.flatnonzero(mask)
+        fill = execution.estimate_costs(price, -1, quantity[idx], **bar)
+        sold = quantity[idx] * fill.fill_ratio
+        cash[idx] += fill.price * sold * fee_keep
+        quantity[idx] -= sold
+        done = fill.fill_ratio >= 1.0
+        closed = idx[done]
+        scored = done & (entry[idx] != 0)
+        accumulator.record_trades(
+            entry_pred[idx[scored]], (fill.price[scored] - entry[idx[scored]]) / entry[idx[scored]], idx[scored]
+        )
+        quantity[closed] = 0.0
+        holding[closed] = False
+
+    for t in range(len(prices)):
+        price = prices[t]
+        bar = {name: None if values is None else values[t] for name, values in bar_fields.items()}
+
+        if holding.any():
+            change = (price - entry) / np.where(entry != 0, entry, np.nan)
+            change = np.nan_to_num(change, nan=0.0)
+            take = holding & has_tp & (change >= params.take_profit_pct)
+            stop = holding & ~take & has_sl & (change <= -params.stop_loss_pct)
+            _sell(take | stop, price, bar)
+
+        pred = predicted_returns[t]
+        conf = confidences[t]
+        if not (np.isnan(pred) or np.isnan(conf)):
+            adjusted = pred * params.forecast_weight
+            confident = params.uses_forecast & (conf >= params.min_confidence)
+            buy = confident & (adjusted > params.min_return_threshold) & ~holding
+            sell = confident & (adjusted < -params.min_return_threshold) & holding
+            if buy.any():
+                idx = np.flatnonzero(buy)
+                notional = cash[idx] * params.position_size_pct[idx]
+                fill = execution.estimate_costs(price, 1, notional / price, **bar)
+                notional = notional * fill.fill_ratio
+                quantity[idx] = notional * fee_keep / fill.price
+                cash[idx] -= notional
+                entry[idx] = fill.price
+                entry_pred[idx] = pred
+                holding[idx] = True
+                trades[idx] += 1
+            _sell(sell, price, bar)
+
+        accumulator.update(cash + price * quantity)
+
+    return PopulationResult(
+        metrics=accumulator.finalize(),
+        trade_counts=trades,
+        final_equity=accumulator.last,
+    )
+
@@ -0,0 +1,227 @@
+"""Multi-asset backtester stepping aligned price and signal matrices with shared cash."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtester.engine import Trade
+from backtester.execution_model import ExecutionModel
+from evaluation.metrics import compute_experiment_metrics
+
+SIGNAL_CODES = {"buy": 1, "sell": -1, "hold": 0}
+
+
+def encode_signals(signals: pd.DataFrame) -> np.ndarray:
+    """Map ``buy``/``sell``/``hold`` (or +1/-1/0) cells to an int8 matrix."""
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in signals.dtypes):
+        return np.sign(signals.fillna(0).to_numpy(dtype=float)).astype(np.int8)
+    codes = signals.apply(lambda col: col.astype(str).str.lower().map(SIGNAL_CODES)).fillna(0)
+    return codes.to_numpy(dtype=np.int8)
+
+
+@dataclass
+class PortfolioResult:
+    trades: List[Trade] = field(default_factory=list)
+    equity: pd.Series = field(default_factory=lambda: pd.Series(dtype=float))
+    symbol_equity: pd.DataFrame = field(default_factory=pd.DataFrame)
+    metrics: Dict[str, float] = field(default_factory=dict)
+    symbol_metrics: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+class PortfolioBacktester:
+    """Backtests one strategy across many symbols in a single pass.
+
+    Prices and signals are ``bars x symbols`` frames on a shared index. Each symbol holds at
+    most one long position, funded from a common cash balance. ``position_size_pct`` is the
+    fraction of current portfolio equity committed per entry, capped by the available cash.
+    ``symbol_equity`` holds each symbol's cumulative contribution (net cash flow plus open
+    position value); the rows plus ``initial_capital`` sum to the portfolio equity.
+
+    Optional ``volumes``/``highs``/``lows`` frames drive the execution model's bar-aware
+    costs and partial fills; ``latency_bars`` delays signals by that many rows.
+    """
+
+    def __init__(
+        self,
+        initial_capital: float = 10_000.0,
+        position_size_pct: float = 0.1,
+        execution_model: Optional[ExecutionModel] = None,
+        take_profit_pct: Optional[float] = None,
+        stop_loss_pct: Optional[float] = None,
+    ) -> None:
+        self.initial_capital = initial_capital
+        self.position_size_pct = position_size_pct
+        self.execution = execution_model or ExecutionModel()
+        self.take_profit_pct = take_profit_pct
+        self.stop_loss_pct = stop_loss_pct
+
+    def run(
+        self,
+        prices: pd.DataFrame,
+        signals: pd.DataFrame,
+        predicted_returns: Optional[pd.DataFrame] = None,
+        confidences: Optional[pd.DataFrame] = None,
+        *,
+        volumes: Optional[pd.DataFrame] = None,
+        highs: Optional[pd.DataFrame] = None,
+        lows: Optional[pd.DataFrame] = None,
+    ) -> PortfolioResult:
+        symbols = list(prices.columns)
+        signals = signals.reindex(index=prices.index, columns=symbols)
+        raw_prices = prices.to_numpy(dtype=np.float64)
+        # Symbols without a bar keep their last price for marking but cannot trade on that bar.
+        mark_prices = prices.ffill().to_numpy(dtype=np.float64)
+        latency = self.execution.latency_bars
+        codes = self._delayed(encode_signals(signals), latency, 0)
+        preds = self._delayed(self._aligned(predicted_returns, prices), latency, np.nan)
+        confs = self._delayed(self._aligned(confidences, prices), latency, np.nan)
+        bar_fields = {
+            name: self._aligned(frame, prices)
+            for name, frame in (("volume", volumes), ("high", highs), ("low", lows))
+        }
+
+        n_bars, n_symbols = raw_prices.shape
+        quantity = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        cash_flow = np.zeros(n_symbols)
+        realized = np.zeros(n_symbols)
+        open_trade: List[Optional[Trade]] = [None] * n_symbols
+        trades: List[Trade] = []
+        cash = self.initial_capital
+        equity = np.empty(n_bars)
+        symbol_equity = np.empty((n_bars, n_symbols))
+        timestamps = prices.index
+
+        for t in range(n_bars):
+            price = raw_prices[t]
+            tradable = np.isfinite(price) & (price > 0)
+            held = quantity > 0
+
+            exits = held & tradable & (codes[t] == -1)
+            if self.take_profit_pct is not None or self.stop_loss_pct is not None:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    change = np.where(held & tradable, price / entry_price - 1.0, 0.0)
+                if self.take_profit_pct is not None:
+                    exits |= held & tradable & (change >= self.take_profit_pct)
+                if self.stop_loss_pct is not None:
+                    exits |= held & tradable & (change <= -self.stop_loss_pct)
+
+            exit_idx = np.flatnonzero(exits)
+            if exit_idx.size:
+                fills = self.execution.estimate_costs(
+                    price[exit_idx], -1, quantity[exit_idx], **self._bar(bar_fields, t, exit_idx)
+                )
+            for pos, idx in enumerate(exit_idx):
+                exec_price = float(fills.price[pos])
+                sold = quantity[idx] * float(fills.fill_ratio[pos])
+                net = self.execution.apply_fees(exec_price * sold)
+                cash += net
+                cash_flow[idx] += net
+                realized[idx] += (exec_price - entry_price[idx]) * sold
+                if fills.fill_ratio[pos] < 1.0:
+                    quantity[idx] -= sold
+                    continue
+                trade = open_trade[idx]
+                trade.exit_ts = timestamps[t]
+                trade.exit_price = exec_price
+                trade.pnl = float(realized[idx])
+                realized[idx] = 0.0
+                if trade.entry_price:
+                    trade.realized_return = (exec_price - trade.entry_price) / trade.entry_price
+                quantity[idx] = 0.0
+                entry_price[idx] = 0.0
+                open_trade[idx] = None
+
+            entries = np.flatnonzero((quantity == 0) & tradable & (codes[t] == 1))
+            if entries.size:
+                budget = (cash + float(quantity @ np.nan_to_num(mark_prices[t]))) * self.position_size_pct
+                for idx in entries:
+                    notional = min(budget, cash)
+                    if notional <= 0:
+                        break
+                    exec_price, fill_ratio = self.execution.fill(
+                        float(price[idx]), "buy", notional / float(price[idx]), **self._bar(bar_fields, t, idx)
+                    )
+                    notional *= fill_ratio
+                    qty = self.execution.apply_fees(notional) / exec_price
+                    cash -= notional
+                    cash_flow[idx] -= notional
+                    quantity[idx] = qty
+                    entry_price[idx] = exec_price
+                    trade = Trade(
+                        entry_ts=timestamps[t],
+                        exit_ts=None,
+                        entry_price=exec_price,
+                        exit_price=None,
+                        quantity=qty,
+                        pnl=None,
+                        predicted_return=self._cell(preds, t, idx),
+                        confidence=self._cell(confs, t, idx),
+                        symbol=symbols[idx],
+                    )
+                    open_trade[idx] = trade
+                    trades.append(trade)
+
+            position_value = quantity * np.nan_to_num(mark_prices[t])
+            symbol_equity[t] = cash_flow + position_value
+            equity[t] = cash + position_value.sum()
+
+        return self._result(trades, timestamps, symbols, equity, symbol_equity)
+
+    @staticmethod
+    def _aligned(frame: Optional[pd.DataFrame], prices: pd.DataFrame) -> Optional[np.ndarray]:
+        if frame is None:
+            return None
+        return frame.reindex(index=prices.index, columns=prices.columns).to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _delayed(matrix: Optional[np.ndarray], rows: int, fill) -> Optional[np.ndarray]:
+        if matrix is None or not rows:
+            return matrix
+        shifted = np.full_like(matrix, fill)
+        shifted[rows:] = matrix[:-rows]
+        return shifted
+
+    @staticmethod
+    def _bar(fields: Dict[str, Optional[np.ndarray]], t: int, idx) -> Dict[str, Optional[np.ndarray]]:
+        return {name: None if matrix is None else matrix[t, idx] for name, matrix in fields.items()}
+
+    @staticmethod
+    def _cell(matrix: Optional[np.ndarray], t: int, idx: int) -> Optional[float]:
+        if matrix is None or not np.isfinite(matrix[t, idx]):
+            return None
+        return float(matrix[t, idx])
+
+    def _result(
+        self,
+        trades: List[Trade],
+        timestamps: pd.Index,
+        symbols: List[str],
+        equity: np.ndarray,
+        symbol_equity: np.ndarray,
+    ) -> PortfolioResult:
+        equity_series = pd.Series(equity, index=timestamps, name="equity")
+        symbol_frame = pd.DataFrame(symbol_equity, index=timestamps, columns=symbols)
+        metrics = compute_experiment_metrics(equity_series, trades, self.initial_capital) if len(equity) else {}
+
+        final = symbol_frame.iloc[-1] if len(symbol_frame) else pd.Series(0.0, index=symbols)
+        symbol_metrics: Dict[str, Dict[str, float]] = {}
+        for symbol in symbols:
+            closed = [trade for trade in trades if trade.symbol == symbol and trade.pnl is not None]
+            wins = sum(1 for trade in closed if trade.pnl > 0)
+            symbol_metrics[symbol] = {
+                "pnl": float(final[symbol]),
+                "roi_contribution": float(final[symbol] / self.initial_capital) if self.initial_capital else 0.0,
+                "trades": float(sum(1 for trade in trades if trade.symbol == symbol)),
+                "win_rate": float(wins / len(closed)) if closed else 0.0,
+            }
+        return PortfolioResult(
+            trades=trades,
+            equity=equity_series,
+            symbol_equity=symbol_frame,
+            metrics=metrics,
+            symbol_metrics=symbol_metrics,
+        )
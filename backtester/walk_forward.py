@@ -0,0 +1,129 @@
+"""Walk-forward evaluation: rolling train/test folds over one shared price and forecast path."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from backtester.execution_model import ExecutionModel
+from backtester.population import PopulationParams, PopulationResult, simulate_population
+from evaluation.accumulators import METRIC_NAMES
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward_splits(
+    n_bars: int,
+    n_folds: int,
+    *,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+) -> List[Fold]:
+    """Consecutive out-of-sample test windows, each preceded by its training window.
+
+    By default history is cut into ``n_folds + 1`` equal blocks: the first only ever trains,
+    and each later block is one fold's test window. ``anchored`` grows the training window
+    from bar 0 instead of rolling it. Bounds are half-open bar offsets.
+    """
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    test_bars = test_bars or n_bars // (n_folds + 1)
+    train_bars = train_bars or test_bars
+    first_test = n_bars - n_folds * test_bars
+    if test_bars < 1 or first_test < 1:
+        raise ValueError(f"{n_bars} bars cannot hold {n_folds} folds of {test_bars} test bars")
+    folds: List[Fold] = []
+    for index in range(n_folds):
+        test_start = first_test + index * test_bars
+        train_start = 0 if anchored else max(test_start - train_bars, 0)
+        folds.append(Fold(index, train_start, test_start, test_start, test_start + test_bars))
+    return folds
+
+
+@dataclass
+class WalkForwardResult:
+    folds: List[Fold]
+    test: List[PopulationResult]
+    train: List[PopulationResult]
+    metrics: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def fold_records(self, idx: int = 0, timestamps: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """Per-fold train/test metrics for genome ``idx``, optionally with window timestamps."""
+        records = []
+        for fold, test, train in zip(self.folds, self.test, self.train):
+            record: Dict[str, Any] = {
+                "fold": fold.index,
+                "metrics": {**test.metrics_for(idx), "trades": int(test.trade_counts[idx])},
+                "train_metrics": train.metrics_for(idx),
+            }
+            if timestamps is not None:
+                record.update(
+                    train_start=timestamps[fold.train_start],
+                    test_start=timestamps[fold.test_start],
+                    test_end=timestamps[fold.test_end - 1],
+                )
+            records.append(record)
+        return records
+
+    def summary(self, idx: int = 0) -> Dict[str, float]:
+        return {name: float(values[idx]) for name, values in self.metrics.items()}
+
+
+def aggregate_folds(results: Sequence[PopulationResult]) -> Dict[str, np.ndarray]:
+    """Mean test metrics across folds plus dispersion and the share of profitable folds."""
+    stacked = {name: np.vstack([result.metrics[name] for result in results]) for name in METRIC_NAMES}
+    aggregate = {name: values.mean(axis=0) for name, values in stacked.items()}
+    # Drawdown is judged on the worst fold, not the average one.
+    aggregate["max_drawdown"] = stacked["max_drawdown"].max(axis=0)
+    aggregate["roi_std"] = stacked["roi"].std(axis=0)
+    aggregate["worst_fold_roi"] = stacked["roi"].min(axis=0)
+    aggregate["positive_fold_ratio"] = (stacked["roi"] > 0).mean(axis=0)
+    aggregate["folds"] = np.full(stacked["roi"].shape[1], float(len(results)))
+    aggregate["trades"] = np.vstack([result.trade_counts for result in results]).sum(axis=0).astype(float)
+    return aggregate
+
+
+def run_walk_forward(
+    prices: np.ndarray,
+    predicted_returns: np.ndarray,
+    confidences: np.ndarray,
+    params: PopulationParams,
+    folds: Sequence[Fold],
+    execution_model: Optional[ExecutionModel] = None,
+    *,
+    bar_fields: Optional[Dict[str, Optional[np.ndarray]]] = None,
+    n_jobs: int = -1,
+) -> WalkForwardResult:
+    """Backtest every genome on each fold's train and test window in parallel.
+
+    Forecasts are computed once by the caller and sliced per fold; workers are threads, so
+    the price and forecast arrays are shared rather than copied. Each window starts flat
+    with the genome's initial capital.
+    """
+    bar_fields = {key: value for key, value in (bar_fields or {}).items() if value is not None}
+
+    def _window(start: int, end: int) -> PopulationResult:
+        window = slice(start, end)
+        return simulate_population(
+            prices[window],
+            predicted_returns[window],
+            confidences[window],
+            params,
+            execution_model,
+            **{key: value[window] for key, value in bar_fields.items()},
+        )
+
+    windows = [(fold.test_start, fold.test_end) for fold in folds] + [(fold.train_start, fold.train_end) for fold in folds]
+    results = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(_window)(start, end) for start, end in windows)
+    test, train = list(results[: len(folds)]), list(results[len(folds):])
+    return WalkForwardResult(folds=list(folds), test=test, train=train, metrics=aggregate_folds(test))
@@ -8,6 +8,9 @@ from typing import Iterator, List, Optional
 
 import pandas as pd
 from pymongo import MongoClient
+from pymongo.client_session import ClientSession
+
+from features.precision import cast_features
 
 
 def _mongo_uri() -> str:
@@ -23,17 +26,45 @@ def mongo_client() -> Iterator[MongoClient]:
         client.close()
 
 
+# Deployments where multi-document transactions are supported.
+TRANSACTIONAL_TOPOLOGIES = {"ReplicaSetWithPrimary", "Sharded"}
+
+
+@contextmanager
+def transaction(client: MongoClient) -> Iterator[Optional[ClientSession]]:
+    """Yield a session inside a transaction, or ``None`` on a standalone server.
+
+    Callers pass the result as ``session=`` so the same writes run transactionally where
+    the deployment allows it and as plain writes elsewhere.
+    """
+    topology = getattr(getattr(client, "topology_description", None), "topology_type_name", None)
+    if topology not in TRANSACTIONAL_TOPOLOGIES:
+        yield None
+        return
+    with client.start_session() as session:
+        with session.start_transaction():
+            yield session
+
+
 def get_database_name(default: str = "cryptotrader") -> str:
     uri = _mongo_uri()
     return uri.rsplit("/", 1)[-1] if "/" in uri else default
 
 
-def get_ohlcv_df(symbol: str, interval: str, limit: int | None = None) -> pd.DataFrame:
+def get_ohlcv_df(
+    symbol: str,
+    interval: str,
+    limit: int | None = None,
+    since: Optional[datetime] = None,
+) -> pd.DataFrame:
+    query: dict = {"symbol": symbol, "interval": interval}
+    if since is not None:
+        query["timestamp"] = {"$gt": since}
     with mongo_client() as client:
         db = client[get_database_name()]
         cursor = (
             db["ohlcv"]
-            .find({"symbol": symbol, "interval": interval})
+            .find(query)
             .sort("timestamp", 1)
         )
         if limit:
@@ -58,12 +89,20 @@ def write_features(symbol: str, interval: str, timestamp, feature_dict: dict) ->
         )
 
 
-def get_feature_df(symbol: str, interval: str, limit: Optional[int] = None) -> pd.DataFrame:
+def get_feature_df(
+    symbol: str,
+    interval: str,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+) -> pd.DataFrame:
+    query: dict = {"symbol": symbol, "interval": interval}
+    if since is not None:
+        query["timestamp"] = {"$gt": since}
     with mongo_client() as client:
         db = client[get_database_name()]
         cursor = (
             db["features"]
-            .find({"symbol": symbol, "interval": interval})
+            .find(query)
             .sort("timestamp", 1)
         )
         if limit:
@@ -81,7 +120,29 @@ def get_feature_df(symbol: str, interval: str, limit: Optional[int] = None) -> p
 
     df = pd.DataFrame(rows)
     df.set_index("timestamp", inplace=True)
-    return df
+    return cast_features(df)
+
+
+def get_feature_timestamp(symbol: str, interval: str, timestamp: Optional[datetime] = None) -> Optional[datetime]:
+    """Timestamp of the latest feature bar at or before ``timestamp`` (or overall)."""
+    query: dict = {"symbol": symbol, "interval": interval}
+    if timestamp is not None:
+        query["timestamp"] = {"$lte": timestamp}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db["features"].find_one(query, {"timestamp": 1}, sort=[("timestamp", -1)])
+    return doc["timestamp"] if doc else None
+
+
+def get_ohlcv_timestamp(symbol: str, interval: str, timestamp: Optional[datetime] = None) -> Optional[datetime]:
+    """Timestamp of the latest OHLCV bar at or before ``timestamp`` (or overall)."""
+    query: dict = {"symbol": symbol, "interval": interval}
+    if timestamp is not None:
+        query["timestamp"] = {"$lte": timestamp}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db["ohlcv"].find_one(query, {"timestamp": 1}, sort=[("timestamp", -1)])
+    return doc["timestamp"] if doc else None
 
 
 def get_feature_row(symbol: str, interval: str, timestamp: datetime) -> Optional[dict]:
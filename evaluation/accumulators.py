@@ -0,0 +1,83 @@
+"""Online metric accumulators that mirror ``compute_experiment_metrics`` without storing curves."""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+METRIC_NAMES = ("pnl", "roi", "max_drawdown", "sharpe", "forecast_alignment", "stability")
+
+
+class StreamingMetrics:
+    """Tracks ``size`` equity curves bar by bar.
+
+    Keeps the running peak for drawdown, Welford mean/variance of bar-to-bar returns for
+    Sharpe and stability, and closed-trade direction counters for forecast alignment. All
+    state is a handful of length-``size`` arrays, so a single backtest (``size=1``) and a
+    population of genomes share the same code path.
+    """
+
+    def __init__(self, initial_capital, size: int = 1) -> None:
+        self.size = size
+        self.initial_capital = np.broadcast_to(np.asarray(initial_capital, dtype=np.float64), (size,)).copy()
+        self.bars = 0
+        self.count = np.zeros(size)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.last = np.full(size, np.nan)
+        self.peak = np.full(size, -np.inf)
+        self.max_drawdown = np.zeros(size)
+        self.aligned = np.zeros(size)
+        self.scored = np.zeros(size)
+
+    def update(self, equity) -> None:
+        equity = np.broadcast_to(np.asarray(equity, dtype=np.float64), (self.size,))
+        if self.bars:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ret = equity / self.last - 1.0
+            self.count += 1
+            delta = ret - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (ret - self.mean)
+        self.last = equity.copy()
+        self.peak = np.maximum(self.peak, equity)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(self.peak != 0, (self.peak - equity) / self.peak, 0.0)
+        self.max_drawdown = np.maximum(self.max_drawdown, drawdown)
+        self.bars += 1
+
+    def record_trades(self, predicted, realized, index: Optional[np.ndarray] = None) -> None:
+        """Count closed trades whose realised direction matched the forecast at entry."""
+        index = np.arange(self.size) if index is None else np.asarray(index)
+        predicted = np.asarray(predicted, dtype=np.float64)
+        realized = np.asarray(realized, dtype=np.float64)
+        valid = ~(np.isnan(predicted) | np.isnan(realized))
+        np.add.at(self.scored, index[valid], 1)
+        np.add.at(self.aligned, index[valid], ((predicted >= 0) == (realized >= 0))[valid])
+
+    def record_trade(self, predicted: Optional[float], realized: Optional[float], index: int = 0) -> None:
+        if predicted is None or realized is None:
+            return
+        self.record_trades([predicted], [realized], np.array([index]))
+
+    def finalize(self) -> Dict[str, np.ndarray]:
+        if not self.bars:
+            return {name: np.zeros(self.size) for name in METRIC_NAMES}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+            std = np.sqrt(variance)
+            sharpe = np.where(std > 0, self.mean / std * (252 ** 0.5), 0.0)
+            stability = np.where(std > 0, (self.mean / std) / variance, 0.0)
+            alignment = np.where(self.scored > 0, self.aligned / self.scored, 0.0)
+            roi = np.where(self.initial_capital > 0, self.last / self.initial_capital - 1, 0.0)
+        return {
+            "pnl": self.last - self.initial_capital,
+            "roi": roi,
+            "max_drawdown": self.max_drawdown,
+            "sharpe": np.nan_to_num(sharpe),
+            "forecast_alignment": alignment,
+            "stability": np.nan_to_num(stability),
+        }
+
+    def summary(self, index: int = 0) -> Dict[str, float]:
+        return {name: float(values[index]) for name, values in self.finalize().items()}
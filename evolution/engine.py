@@ -1,24 +1,30 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from simulator.runner import load_population_inputs
 from strategy_genome.encoding import create_genome_from_dict
 from strategy_genome.repository import list_genomes
 
 from . import repository
 from .evaluator import evaluate_batch
 from .mutator import MutationConfig, generate_mutations
-from .promoter import apply_decision, decide_promotion
+from .prescreen import prescreen_candidates
+from .promoter import apply_decisions, decide_promotions
 from .schemas import (
     EvaluationConfig,
     EvaluationResult,
+    EvolutionCandidate,
     MutationGeneration,
+    PrescreenConfig,
     PromotionDecision,
     PromotionPolicy,
+    SearchConfig,
 )
+from .search import persist_front, run_search
 
 logger = logging.getLogger(__name__)
 
@@ -53,11 +59,13 @@ class EvolutionEngine:
         mutation_config: Optional[MutationConfig] = None,
         evaluation_config: Optional[EvaluationConfig] = None,
         promotion_policy: Optional[PromotionPolicy] = None,
+        prescreen_config: Optional[PrescreenConfig] = None,
         knowledge_service: Any = None,
     ) -> None:
         self.mutation_config = mutation_config or MutationConfig()
         self.evaluation_config = evaluation_config or EvaluationConfig()
         self.promotion_policy = promotion_policy or PromotionPolicy()
+        self.prescreen_config = prescreen_config or PrescreenConfig()
         self.knowledge_service = knowledge_service
 
     def _select_parents(self, limit: int = 5) -> List[Any]:
@@ -83,17 +91,22 @@ class EvolutionEngine:
     def _evaluate(self, experiment_ids: List[str]) -> List[EvaluationResult]:
         if not experiment_ids:
             return []
-        batch = experiment_ids[: self.evaluation_config.max_concurrent]
+        # With successive halving the whole batch is screened and at most max_concurrent
+        # candidates reach a full-window evaluation.
+        if self.evaluation_config.successive_halving:
+            batch = experiment_ids
+        else:
+            batch = experiment_ids[: self.evaluation_config.max_concurrent]
         results = evaluate_batch(batch, self.evaluation_config)
         return results
 
-    def _promote(self, experiment_ids: List[str]) -> List[PromotionDecision]:
-        decisions: List[PromotionDecision] = []
-        for experiment_id in experiment_ids:
-            decision = decide_promotion(experiment_id, self.promotion_policy)
-            if decision:
-                apply_decision(decision)
-                decisions.append(decision)
+    def _promote(
+        self, experiment_ids: List[str], evaluation_config: Optional[EvaluationConfig] = None
+    ) -> List[PromotionDecision]:
+        decisions = decide_promotions(
+            experiment_ids, self.promotion_policy, evaluation_config or self.evaluation_config
+        )
+        apply_decisions(decisions)
         return decisions
 
     def _record_knowledge(self, evaluations: List[EvaluationResult], decisions: List[PromotionDecision]) -> None:
@@ -107,7 +120,8 @@ class EvolutionEngine:
     def run_cycle(self) -> Dict[str, Any]:
         parents = self._select_parents()
         generations = self._generate_candidates(parents)
-        queued_docs = self._enqueue_candidates(generations)
+        screened = prescreen_candidates(generations, parents, self.prescreen_config)
+        queued_docs = self._enqueue_candidates(screened.generations)
         experiment_ids = [doc["experiment_id"] for doc in queued_docs]
         evaluations = self._evaluate(experiment_ids)
         decisions = self._promote([result.experiment_id for result in evaluations])
@@ -115,6 +129,7 @@ class EvolutionEngine:
         summary = {
             "parents_considered": len(parents),
             "candidates_generated": sum(len(gen.produced) for gen in generations),
+            "candidates_prescreened_out": screened.dropped,
             "experiments_created": len(queued_docs),
             "evaluations_completed": len(evaluations),
             "promotions": len([d for d in decisions if d.approved]),
@@ -123,6 +138,65 @@ class EvolutionEngine:
         }
         return summary
 
+    def _front_evaluation_config(self, config: SearchConfig) -> EvaluationConfig:
+        """Evaluation for search fronts: always walk-forward, on the searched symbol, no halving."""
+        folds = self.evaluation_config.walk_forward_folds or EvaluationConfig.walk_forward_folds
+        return replace(
+            self.evaluation_config,
+            symbol=config.symbol,
+            walk_forward_folds=folds,
+            successive_halving=False,
+        )
+
+    def run_search(self, config: Optional[SearchConfig] = None) -> Dict[str, Any]:
+        """Multi-generation NSGA-II search in one job; only the final Pareto front is persisted.
+
+        Front genomes were selected on a single in-sample window, so they are queued as pending
+        experiments (parented on the champion they descend from) and re-scored with walk-forward
+        evaluation before the promotion policy sees them. The search metrics are kept in the
+        candidate metadata for comparison.
+        """
+        config = config or SearchConfig(symbol=self.evaluation_config.symbol, interval=self.evaluation_config.horizon)
+        parents = self._select_parents(config.seed_limit)
+        if not parents:
+            logger.warning("No champion genomes available to seed the search.")
+            return {"parents_considered": 0, "front_size": 0}
+        horizon = config.horizon or config.interval
+        inputs = load_population_inputs(
+            config.symbol, config.interval, horizon, start_time=config.start_time, end_time=config.end_time
+        )
+        if inputs is None:
+            return {"parents_considered": len(parents), "front_size": 0}
+        result = run_search(parents, inputs, config)
+        front = persist_front(result, config)
+
+        candidates = [
+            EvolutionCandidate(
+                genome=create_genome_from_dict(member["genome"]),
+                parent_id=member["root_id"],
+                operations=["nsga2"],
+                horizon=horizon,
+                metadata={"search_id": front["search_id"], "horizon": horizon, "search_metrics": member["metrics"]},
+            )
+            for member in front["front"]
+        ]
+        created = repository.create_experiments(candidates) if candidates else []
+        experiment_ids = [doc["experiment_id"] for doc in created]
+        front_config = self._front_evaluation_config(config)
+        evaluations = evaluate_batch(experiment_ids, front_config) if experiment_ids else []
+        decisions = self._promote([result.experiment_id for result in evaluations], front_config)
+        self._record_knowledge(evaluations, decisions)
+        return {
+            "search_id": front["search_id"],
+            "parents_considered": len(parents),
+            "generations": front["generations"],
+            "evaluations": front["evaluations"],
+            "front_size": len(front["front"]),
+            "evaluations_completed": len(evaluations),
+            "promotions": len([d for d in decisions if d.approved]),
+            "experiment_ids": experiment_ids,
+        }
+
 
 def toggle_scheduler(enabled: bool) -> Dict[str, Any]:
     state = repository.upsert_scheduler_state({"enabled": enabled})
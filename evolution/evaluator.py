@@ -1,25 +1,45 @@
 from __future__ import annotations
 
 import logging
+import math
+from collections import defaultdict
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from backtester.population import simulate_population
 from db.client import get_database_name, mongo_client
-from simulator.runner import run_simulation
+from simulator.run_store import RESULTS_PROJECTION, get_run_summary
+from simulator.runner import (
+    PopulationInputs,
+    load_population_inputs,
+    population_params,
+    run_simulation,
+    run_walk_forward_simulation,
+)
 from strategy_genome.encoding import create_genome_from_dict
-from strategy_genome.repository import save_genome, update_genome_fitness
+from strategy_genome.fitness_cache import cached_evaluation, fitness_key
+from strategy_genome.repository import _composite_score, save_genome, update_genome_fitness
 
-from .repository import load_experiment, update_experiment
+from .repository import (
+    bulk_update_experiments,
+    load_experiment,
+    load_experiments,
+    set_experiments_status,
+    update_experiment,
+)
 from .schemas import EvaluationConfig, EvaluationResult
 
 logger = logging.getLogger(__name__)
 
+# Shortest prefix a halving rung will score; fewer bars say little about a strategy.
+MIN_RUNG_BARS = 50
+
 
 def _load_run_document(run_id: str) -> Dict[str, Any]:
-    with mongo_client() as client:
-        db = client[get_database_name()]
-        doc = db["sim_runs"].find_one({"run_id": run_id}) or {}
-    return doc
+    return get_run_summary(run_id, RESULTS_PROJECTION) or {}
 
 
 def _score_from_metrics(metrics: Dict[str, Any]) -> float:
@@ -48,76 +68,227 @@ def _strategy_payload(genome_doc: Dict[str, Any], candidate: Dict[str, Any], con
     return params
 
 
-def evaluate_experiment(experiment_id: str, config: EvaluationConfig) -> Optional[EvaluationResult]:
-    experiment = load_experiment(experiment_id)
-    if not experiment:
-        logger.warning("Experiment %s not found", experiment_id)
-        return None
+def evaluation_mode_for(config: EvaluationConfig) -> str:
+    return f"walk_forward:{config.walk_forward_folds}" if config.walk_forward_folds > 0 else "single"
+
+
+def config_for_mode(config: EvaluationConfig, mode: str) -> EvaluationConfig:
+    """``config`` switched to the evaluation mode named by ``evaluation_mode_for``."""
+    kind, _, folds = mode.partition(":")
+    if kind != "walk_forward":
+        return replace(config, walk_forward_folds=0)
+    return replace(config, walk_forward_folds=int(folds) if folds else EvaluationConfig.walk_forward_folds)
+
+
+def _backtest(
+    genome: Dict[str, Any], strategy_config: Dict[str, Any], config: EvaluationConfig
+) -> Tuple[str, Dict[str, Any], bool]:
+    """Run (or reuse from the fitness cache) the backtest ``config`` asks for; returns run id, metrics, hit."""
+    strategy_id = genome["strategy_id"]
+    horizon = strategy_config.get("horizon", config.horizon)
+
+    def _simulate() -> tuple[str, Dict[str, Any]]:
+        if config.walk_forward_folds > 0:
+            run_id = run_walk_forward_simulation(
+                config.symbol,
+                horizon,
+                strategy_name=strategy_id,
+                horizon=horizon,
+                strategy_config=strategy_config,
+                genome=genome,
+                n_folds=config.walk_forward_folds,
+                n_jobs=config.walk_forward_jobs,
+            )
+        else:
+            run_id = run_simulation(
+                config.symbol,
+                horizon,
+                strategy_name=strategy_id,
+                horizon=horizon,
+                strategy_config=strategy_config,
+                genome=genome,
+            )
+        if not run_id:
+            raise RuntimeError("Simulation did not produce a run identifier")
+        run_doc = _load_run_document(run_id)
+        return run_id, run_doc.get("results", {}) if run_doc else {}
+
+    if not config.use_fitness_cache:
+        run_id, metrics = _simulate()
+        return run_id, metrics, False
+    key = fitness_key(
+        strategy_config, symbol=config.symbol, interval=horizon, horizon=horizon, mode=evaluation_mode_for(config)
+    )
+    return cached_evaluation(key, _simulate)
+
+
+def rescore_genome(
+    genome_doc: Dict[str, Any], mode: str, config: EvaluationConfig, metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Metrics for a stored genome under evaluation ``mode``, leaving its fitness untouched.
+
+    Used to put a parent on the same footing as a candidate before promotion; ``metadata``
+    supplies the candidate's horizon, features and model type.
+    """
+    mode_config = config_for_mode(config, mode)
+    strategy_config = _strategy_payload(genome_doc, {"metadata": metadata or {}}, mode_config)
+    _, metrics, _ = _backtest(genome_doc, strategy_config, mode_config)
+    # Same composite ``update_genome_fitness`` gives the candidate, so the two scores line up.
+    composite = float(metrics.get("composite", 0.0) or _composite_score(metrics))
+    return {**metrics, "composite": composite, "evaluation_mode": evaluation_mode_for(mode_config)}
+
+
+def _evaluate(
+    experiment: Dict[str, Any], config: EvaluationConfig
+) -> Tuple[Optional[EvaluationResult], Dict[str, Any]]:
+    """Evaluate a loaded experiment; returns the result and the experiment update to persist."""
+    experiment_id = experiment["experiment_id"]
     candidate = experiment.get("candidate") or {}
     genome_doc = candidate.get("genome")
     if not genome_doc:
         logger.warning("Experiment %s missing genome doc", experiment_id)
-        update_experiment(experiment_id, {"status": "failed", "insights": {"reason": "missing_genome"}})
-        return None
+        return None, {"status": "failed", "insights": {"reason": "missing_genome"}}
 
     try:
         genome = create_genome_from_dict(genome_doc)
         saved = save_genome(genome)
         strategy_id = saved["strategy_id"]
         strategy_config = _strategy_payload(genome_doc, candidate, config)
-        horizon = strategy_config.get("horizon", config.horizon)
-        run_id = run_simulation(
-            config.symbol,
-            horizon,
-            strategy_name=strategy_id,
-            horizon=horizon,
-            strategy_config=strategy_config,
-            genome=saved,
-        )
-        if not run_id:
-            raise RuntimeError("Simulation did not produce a run identifier")
-        run_doc = _load_run_document(run_id)
-        metrics = run_doc.get("results", {}) if run_doc else {}
-        updated = update_genome_fitness(strategy_id, metrics, run_id=run_id)
+        run_id, metrics, cache_hit = _backtest(saved, strategy_config, config)
+        mode = evaluation_mode_for(config)
+        metrics = {**metrics, "evaluation_mode": mode}
+        updated = update_genome_fitness(strategy_id, metrics, run_id=run_id, evaluation_mode=mode)
         score = _score_from_metrics(updated.get("fitness", {}) if updated else metrics)
-        update_experiment(
-            experiment_id,
-            {
-                "status": "completed",
-                "metrics": metrics,
-                "score": score,
-                "updated_at": datetime.utcnow(),
-                "insights": {
-                    "horizon": strategy_config.get("horizon"),
-                    "model_type": strategy_config.get("model_type"),
-                },
-                "candidate": {
-                    **candidate,
-                    "genome": saved,
-                },
+        updates = {
+            "status": "completed",
+            "metrics": metrics,
+            "score": score,
+            "updated_at": datetime.utcnow(),
+            "insights": {
+                "horizon": strategy_config.get("horizon"),
+                "model_type": strategy_config.get("model_type"),
+                "fitness_cache_hit": cache_hit,
             },
-        )
-        return EvaluationResult(
+            "candidate": {
+                **candidate,
+                "genome": saved,
+            },
+        }
+        result = EvaluationResult(
             experiment_id=experiment_id,
             strategy_id=strategy_id,
             metrics=metrics,
             score=score,
             run_id=run_id,
         )
+        return result, updates
     except Exception as exc:  # noqa: BLE001
         logger.exception("Evaluation failed for experiment %s: %s", experiment_id, exc)
-        update_experiment(
-            experiment_id,
-            {"status": "failed", "insights": {"error": str(exc)}},
+        return None, {"status": "failed", "insights": {"error": str(exc)}}
+
+
+def _halving_rungs(
+    configs: Dict[str, Dict[str, Any]], inputs: PopulationInputs, horizon: str, config: EvaluationConfig
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """Successive halving over one price path; returns survivors and updates for pruned candidates."""
+    alive = list(configs)
+    pruned: Dict[str, Dict[str, Any]] = {}
+    fraction = config.halving_min_fraction
+    rung = 0
+    while len(alive) > config.max_concurrent and fraction < 1.0:
+        bars = min(len(inputs), max(int(len(inputs) * fraction), MIN_RUNG_BARS))
+        window = slice(0, bars)
+        result = simulate_population(
+            inputs.prices[window],
+            inputs.predicted[window],
+            inputs.confidence[window],
+            population_params([configs[experiment_id] for experiment_id in alive], horizon),
+            **{key: value[window] if value is not None else None for key, value in inputs.bar_fields.items()},
         )
+        scores = np.array([_score_from_metrics(result.metrics_for(idx)) for idx in range(len(alive))])
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+        keep = max(config.max_concurrent, math.ceil(len(alive) / config.halving_eta))
+        for idx in order[keep:]:
+            metrics = {**result.metrics_for(idx), "trades": int(result.trade_counts[idx])}
+            pruned[alive[idx]] = {
+                "status": "pruned",
+                "metrics": metrics,
+                "score": float(scores[idx]),
+                "insights": {
+                    "horizon": horizon,
+                    "pruned_at_rung": rung,
+                    "window_fraction": bars / len(inputs),
+                    "window_end": inputs.timestamps[bars - 1],
+                    "bars": bars,
+                },
+            }
+        alive = [alive[idx] for idx in order[:keep]]
+        if bars >= len(inputs):
+            break
+        fraction *= config.halving_eta
+        rung += 1
+    return alive, pruned
+
+
+def successive_halving(
+    experiments: Dict[str, Dict[str, Any]], config: EvaluationConfig
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """Prune a batch on growing prefixes of the window before any full evaluation.
+
+    Candidates are grouped by horizon and scored together with ``simulate_population`` on the
+    first ``halving_min_fraction`` of the window; the best ``1/halving_eta`` (never fewer than
+    ``max_concurrent``) move on to a prefix ``halving_eta`` times longer. Returns the surviving
+    experiment ids and ``pruned`` updates carrying each loser's partial-window metrics.
+    """
+    groups: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    survivors: List[str] = []
+    for experiment_id, experiment in experiments.items():
+        candidate = experiment.get("candidate") or {}
+        genome_doc = candidate.get("genome")
+        if not genome_doc:
+            survivors.append(experiment_id)
+            continue
+        strategy_config = _strategy_payload(genome_doc, candidate, config)
+        groups[strategy_config.get("horizon", config.horizon)][experiment_id] = strategy_config
+    pruned: Dict[str, Dict[str, Any]] = {}
+    for horizon, configs in groups.items():
+        inputs = load_population_inputs(config.symbol, horizon, horizon)
+        if inputs is None or len(inputs) < MIN_RUNG_BARS:
+            survivors.extend(configs)
+            continue
+        alive, dropped = _halving_rungs(configs, inputs, horizon, config)
+        survivors.extend(alive)
+        pruned.update(dropped)
+    return survivors, pruned
+
+
+def evaluate_experiment(experiment_id: str, config: EvaluationConfig) -> Optional[EvaluationResult]:
+    experiment = load_experiment(experiment_id)
+    if not experiment:
+        logger.warning("Experiment %s not found", experiment_id)
         return None
+    result, updates = _evaluate(experiment, config)
+    update_experiment(experiment_id, updates)
+    return result
 
 
 def evaluate_batch(experiment_ids: Sequence[str], config: EvaluationConfig) -> List[EvaluationResult]:
-    results: List[EvaluationResult] = []
+    """Evaluate a batch with one read and one ``running`` update; each outcome is written as
+    soon as it is known, so a worker dying mid-batch loses at most the experiment in flight."""
+    experiments = load_experiments(experiment_ids)
     for experiment_id in experiment_ids:
-        result = evaluate_experiment(experiment_id, config)
+        if experiment_id not in experiments:
+            logger.warning("Experiment %s not found", experiment_id)
+    set_experiments_status(list(experiments), "running")
+    if config.successive_halving:
+        survivors, pruned = successive_halving(experiments, config)
+        logger.info("Successive halving kept %d of %d candidates", len(survivors), len(experiments))
+        bulk_update_experiments(pruned)
+        experiments = {experiment_id: experiments[experiment_id] for experiment_id in survivors}
+    results: List[EvaluationResult] = []
+    for experiment_id, experiment in experiments.items():
+        result, updates = _evaluate(experiment, config)
+        update_experiment(experiment_id, updates)
         if result:
             results.append(result)
     return results
-
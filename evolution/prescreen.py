@@ -0,0 +1,95 @@
+"""Meta-model pre-screen: drop mutated candidates unlikely to beat their parent before simulation."""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.special import ndtr
+
+from learning.meta_model import MetaModelBundle, MetaModelNotFoundError, load_latest_meta_model, predict_roi_distribution
+from strategy_genome.encoding import StrategyGenome
+
+from .schemas import MutationGeneration, PrescreenConfig
+
+logger = logging.getLogger(__name__)
+
+def expected_improvement(mean: np.ndarray, std: np.ndarray, best: np.ndarray) -> np.ndarray:
+    """Closed-form ``E[max(Y - best, 0)]`` for ``Y ~ N(mean, std)``; reduces to the gain when ``std`` is 0."""
+    mean, std, best = (np.asarray(value, dtype=float) for value in (mean, std, best))
+    gain = mean - best
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(std > 0, gain / std, 0.0)
+    pdf = np.exp(-0.5 * z**2) / math.sqrt(2.0 * math.pi)
+    return np.where(std > 0, gain * ndtr(z) + std * pdf, np.maximum(gain, 0.0))
+
+
+@dataclass
+class PrescreenResult:
+    generations: List[MutationGeneration]
+    kept: int = 0
+    dropped: int = 0
+    skipped_reason: Optional[str] = None
+    scores: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def prescreen_candidates(
+    generations: Sequence[MutationGeneration],
+    parents: Sequence[StrategyGenome],
+    config: Optional[PrescreenConfig] = None,
+    *,
+    bundle: Optional[MetaModelBundle] = None,
+) -> PrescreenResult:
+    """Score every candidate in one meta-model pass and keep those worth simulating.
+
+    A candidate's baseline is its parent's ROI and the parent's fitness stands in for the
+    "previous run" features the meta-model was trained on. Candidates whose expected
+    improvement is below ``min_expected_improvement`` are dropped, except that the best
+    ``min_keep`` always survive. Without a trained meta-model every candidate passes.
+    """
+    config = config or PrescreenConfig()
+    generations = list(generations)
+    candidates = [candidate for generation in generations for candidate in generation.produced]
+    if not config.enabled or not candidates:
+        return PrescreenResult(generations, kept=len(candidates), skipped_reason=None if config.enabled else "disabled")
+    try:
+        bundle = bundle or load_latest_meta_model()
+    except MetaModelNotFoundError:
+        logger.info("No meta-model available; skipping candidate pre-screen.")
+        return PrescreenResult(generations, kept=len(candidates), skipped_reason="no_meta_model")
+
+    parent_fitness = {parent.strategy_id: parent.fitness.to_dict() for parent in parents}
+    previous = [parent_fitness.get(candidate.parent_id or "", {}) for candidate in candidates]
+    mean, std = predict_roi_distribution(
+        [candidate.genome.document() for candidate in candidates], previous, bundle=bundle
+    )
+    best = np.array([float(metrics.get("roi", 0.0)) for metrics in previous])
+    improvement = expected_improvement(mean, std, best)
+
+    keep = improvement >= config.min_expected_improvement
+    keep[np.argsort(-improvement, kind="stable")[: config.min_keep]] = True
+    scores: List[Dict[str, Any]] = []
+    for idx, candidate in enumerate(candidates):
+        score = {
+            "expected_roi": float(mean[idx]),
+            "uncertainty": float(std[idx]),
+            "expected_improvement": float(improvement[idx]),
+            "model_id": bundle.metadata.get("model_id"),
+        }
+        candidate.metadata = {**candidate.metadata, "prescreen": score}
+        scores.append({"strategy_id": candidate.genome.strategy_id, "kept": bool(keep[idx]), **score})
+
+    kept_ids = {id(candidate) for candidate, flag in zip(candidates, keep) if flag}
+    screened = [
+        MutationGeneration(
+            parent_id=generation.parent_id,
+            produced=[candidate for candidate in generation.produced if id(candidate) in kept_ids],
+            skipped_reason=generation.skipped_reason,
+        )
+        for generation in generations
+    ]
+    kept = int(keep.sum())
+    logger.info("Pre-screen kept %d of %d candidates", kept, len(candidates))
+    return PrescreenResult(screened, kept=kept, dropped=len(candidates) - kept, scores=scores)
@@ -2,19 +2,29 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, List
 
-from db.client import get_database_name, mongo_client
+from pymongo import UpdateOne
+
+from db.client import get_database_name, mongo_client, transaction
 from exec.risk_manager import (
     ModeSettings,
     TradingSettings,
     get_trading_settings,
     save_trading_settings,
 )
-from strategy_genome.repository import archive_strategy, get_genome, promote_strategy
+from strategy_genome import lineage
+from strategy_genome.repository import (
+    STRATEGY_COLLECTION,
+    archive_strategy,
+    get_genome,
+    get_genomes,
+    promote_strategy,
+)
 
-from .repository import load_experiment, update_experiment
-from .schemas import PromotionDecision, PromotionPolicy
+from .evaluator import rescore_genome
+from .repository import EXPERIMENT_COLLECTION, load_experiment, load_experiments, update_experiment
+from .schemas import EvaluationConfig, PromotionDecision, PromotionPolicy, evaluation_mode
 
 logger = logging.getLogger(__name__)
 
@@ -27,31 +37,58 @@ INTRADAY_SUMMARY_COLLECTION = "cohort_summaries"
 def _candidate_metrics(experiment: Dict[str, Any]) -> Dict[str, Any]:
     metrics = experiment.get("metrics") or {}
     if metrics:
+        # Raw run results carry no composite; the experiment score is the candidate's composite.
+        if "composite" not in metrics and experiment.get("score") is not None:
+            return {**metrics, "composite": experiment["score"]}
         return metrics
     candidate = experiment.get("candidate") or {}
     genome = candidate.get("genome") or {}
     return genome.get("fitness", {})
 
 
-def _parent_metrics(parent_id: Optional[str]) -> Dict[str, Any]:
-    if not parent_id:
-        return {}
-    parent_doc = get_genome(parent_id)
-    if not parent_doc:
-        return {}
-    return parent_doc.get("fitness", {})
-
+def _comparable_parent_metrics(
+    experiment: Dict[str, Any],
+    parent: Dict[str, Any],
+    policy: PromotionPolicy,
+    evaluation_config: Optional[EvaluationConfig],
+    rescored: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Parent fitness, re-scored in the candidate's evaluation mode when it was measured differently.
 
-def decide_promotion(experiment_id: str, policy: PromotionPolicy) -> Optional[PromotionDecision]:
-    experiment = load_experiment(experiment_id)
-    if not experiment:
-        return None
+    ``rescored`` memoises per parent, mode and horizon so siblings share one backtest (which
+    itself goes through the fitness cache). Without an ``evaluation_config``, or if the
+    re-score fails, the stored fitness is returned and the policy holds the candidate.
+    """
+    fitness = parent.get("fitness") or {}
+    metrics = _candidate_metrics(experiment)
+    if not fitness or not policy.require_parent_score or policy.comparable(metrics, fitness):
+        return fitness
+    if evaluation_config is None:
+        return fitness
+    mode = evaluation_mode(metrics)
+    horizon = ((experiment.get("candidate") or {}).get("metadata") or {}).get("horizon")
+    key = (parent["strategy_id"], mode, horizon)
+    if key not in rescored:
+        metadata = dict(parent.get("metadata") or {})
+        if horizon:
+            metadata["horizon"] = horizon
+        try:
+            rescored[key] = rescore_genome(parent, mode, evaluation_config, metadata)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Re-scoring parent %s under %s failed: %s", parent["strategy_id"], mode, exc)
+            rescored[key] = fitness
+    return rescored[key]
+
+
+def _decide(
+    experiment: Dict[str, Any], parent_metrics: Dict[str, Any], policy: PromotionPolicy
+) -> PromotionDecision:
+    experiment_id = experiment.get("experiment_id")
     candidate = experiment.get("candidate") or {}
     genome = (candidate.get("genome") or {}).copy()
     strategy_id = genome.get("strategy_id") or experiment.get("strategy_id")
     parent_id = candidate.get("parent_id")
     metrics = _candidate_metrics(experiment)
-    parent_metrics = _parent_metrics(parent_id)
 
     if not strategy_id:
         logger.warning("Experiment %s missing strategy identifier", experiment_id)
@@ -71,7 +108,12 @@ def decide_promotion(experiment_id: str, policy: PromotionPolicy) -> Optional[Pr
         )
 
     passed = policy.passes(metrics, parent_metrics if parent_metrics else None)
-    reason = "threshold_met" if passed else "threshold_not_met"
+    if passed:
+        reason = "threshold_met"
+    elif parent_metrics and not policy.comparable(metrics, parent_metrics) and policy.passes(metrics, None):
+        reason = "parent_not_comparable"
+    else:
+        reason = "threshold_not_met"
     return PromotionDecision(
         strategy_id=strategy_id,
         parent_id=parent_id,
@@ -80,16 +122,50 @@ def decide_promotion(experiment_id: str, policy: PromotionPolicy) -> Optional[Pr
         metadata={
             "metrics": metrics,
             "parent_metrics": parent_metrics,
+            "parent_comparable": policy.comparable(metrics, parent_metrics),
             "experiment_id": experiment_id,
             "score": experiment.get("score", 0.0),
         },
     )
 
 
-def apply_decision(decision: PromotionDecision) -> Dict[str, Any]:
-    experiment_id = decision.metadata.get("experiment_id") if decision.metadata else None
-    updates = {
-        "updated_at": datetime.utcnow(),
+def decide_promotion(
+    experiment_id: str, policy: PromotionPolicy, evaluation_config: Optional[EvaluationConfig] = None
+) -> Optional[PromotionDecision]:
+    experiment = load_experiment(experiment_id)
+    if not experiment:
+        return None
+    parent_id = (experiment.get("candidate") or {}).get("parent_id")
+    parent = (get_genome(parent_id) if parent_id else None) or {}
+    parent_metrics = _comparable_parent_metrics(experiment, parent, policy, evaluation_config, {})
+    return _decide(experiment, parent_metrics, policy)
+
+
+def decide_promotions(
+    experiment_ids: Sequence[str], policy: PromotionPolicy, evaluation_config: Optional[EvaluationConfig] = None
+) -> List[PromotionDecision]:
+    """Batch ``decide_promotion``: one query for the experiments, one for their distinct parents.
+
+    With ``evaluation_config``, a parent scored in another evaluation mode is re-scored once in
+    the candidates' mode; without it such candidates are held (``parent_not_comparable``).
+    """
+    experiments = load_experiments(experiment_ids)
+    parents = get_genomes((experiment.get("candidate") or {}).get("parent_id") for experiment in experiments.values())
+    rescored: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+    decisions: List[PromotionDecision] = []
+    for experiment_id in experiment_ids:
+        experiment = experiments.get(experiment_id)
+        if not experiment:
+            continue
+        parent = parents.get((experiment.get("candidate") or {}).get("parent_id")) or {}
+        parent_metrics = _comparable_parent_metrics(experiment, parent, policy, evaluation_config, rescored)
+        decisions.append(_decide(experiment, parent_metrics, policy))
+    return decisions
+
+
+def _promotion_update(decision: PromotionDecision, now: datetime) -> Dict[str, Any]:
+    return {
+        "updated_at": now,
         "promotion": {
             "approved": decision.approved,
             "reason": decision.reason,
@@ -97,6 +173,11 @@ def apply_decision(decision: PromotionDecision) -> Dict[str, Any]:
             "metadata": decision.metadata,
         },
     }
+
+
+def apply_decision(decision: PromotionDecision) -> Dict[str, Any]:
+    experiment_id = decision.metadata.get("experiment_id") if decision.metadata else None
+    updates = _promotion_update(decision, datetime.utcnow())
     if decision.approved:
         promoted = promote_strategy(decision.strategy_id)
         if decision.parent_id:
@@ -110,6 +191,61 @@ def apply_decision(decision: PromotionDecision) -> Dict[str, Any]:
     return updates
 
 
+def apply_decisions(decisions: Iterable[PromotionDecision]) -> Dict[str, Dict[str, Any]]:
+    """Apply many decisions with one ``bulk_write`` per collection.
+
+    Strategy status changes, their lineage nodes, the read-back of promoted genomes and the
+    experiment updates share a transaction when the deployment supports one. Returns the
+    updates per experiment.
+    """
+    decisions = list(decisions)
+    if not decisions:
+        return {}
+    now = datetime.utcnow()
+    promoted_ids = {decision.strategy_id for decision in decisions if decision.approved}
+    archived_ids = {decision.parent_id for decision in decisions if decision.approved and decision.parent_id}
+    strategy_ops = [
+        UpdateOne({"strategy_id": strategy_id}, {"$set": {"status": "archived", "updated_at": now}})
+        for strategy_id in archived_ids - promoted_ids
+    ] + [
+        UpdateOne({"strategy_id": strategy_id}, {"$set": {"status": "champion", "updated_at": now}})
+        for strategy_id in promoted_ids
+    ]
+    updates: Dict[str, Dict[str, Any]] = {}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        with transaction(client) as session:
+            promoted: Dict[str, Dict[str, Any]] = {}
+            if strategy_ops:
+                db[STRATEGY_COLLECTION].bulk_write(strategy_ops, ordered=False, session=session)
+                changed = list(
+                    db[STRATEGY_COLLECTION].find(
+                        {"strategy_id": {"$in": sorted(promoted_ids | archived_ids)}}, session=session
+                    )
+                )
+                lineage.sync_nodes(db, changed, session=session)
+                for doc in changed:
+                    if doc["strategy_id"] in promoted_ids:
+                        doc["_id"] = str(doc.get("_id", doc["strategy_id"]))
+                        promoted[doc["strategy_id"]] = doc
+            for decision in decisions:
+                experiment_id = decision.metadata.get("experiment_id") if decision.metadata else None
+                if not experiment_id:
+                    continue
+                update = _promotion_update(decision, now)
+                update["status"] = "promoted" if decision.approved else "rejected"
+                if decision.approved:
+                    update["candidate.genome"] = promoted.get(decision.strategy_id)
+                updates[experiment_id] = update
+            if updates:
+                db[EXPERIMENT_COLLECTION].bulk_write(
+                    [UpdateOne({"experiment_id": key}, {"$set": value}) for key, value in updates.items()],
+                    ordered=False,
+                    session=session,
+                )
+    return updates
+
+
 def _load_cohort_documents(cohort_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
     with mongo_client() as client:
         db = client[get_database_name()]
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
 from uuid import uuid4
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 
 from db.client import get_database_name, mongo_client
 from strategy_genome.encoding import StrategyGenome, create_genome_from_dict
@@ -14,10 +14,24 @@ from .schemas import EvolutionCandidate
 
 EXPERIMENT_COLLECTION = "evolution_experiments"
 SCHEDULER_COLLECTION = "evolution_schedulers"
+PARETO_COLLECTION = "pareto_fronts"
 AUTONOMY_SETTINGS_ID = "autonomy_settings"
+# Listing payload: the genome's params, fitness and metadata copy are only needed on detail views.
+EXPERIMENT_LIST_PROJECTION = {
+    "candidate.genome.params": 0,
+    "candidate.genome.fitness": 0,
+    "candidate.genome.metadata": 0,
+    "insights": 0,
+}
 
+_INDEXES_READY = False
 
-def _ensure_indexes() -> None:
+
+def ensure_indexes() -> None:
+    """Create the evolution indexes once per process; the API also calls this at startup."""
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
     with mongo_client() as client:
         db = client[get_database_name()]
         collection = db[EXPERIMENT_COLLECTION]
@@ -25,6 +39,9 @@ def _ensure_indexes() -> None:
         collection.create_index([("status", ASCENDING), ("score", DESCENDING)])
         collection.create_index([("candidate.genome.family", ASCENDING), ("created_at", DESCENDING)])
         db[SCHEDULER_COLLECTION].create_index("scheduler_id", unique=True)
+        db[PARETO_COLLECTION].create_index("search_id", unique=True)
+        db[PARETO_COLLECTION].create_index([("created_at", DESCENDING)])
+    _INDEXES_READY = True
 
 
 def _candidate_payload(candidate: EvolutionCandidate) -> Dict[str, Any]:
@@ -34,30 +51,31 @@ def _candidate_payload(candidate: EvolutionCandidate) -> Dict[str, Any]:
 
 
 def create_experiments(candidates: Iterable[EvolutionCandidate]) -> List[Dict[str, Any]]:
-    _ensure_indexes()
-    documents: List[Dict[str, Any]] = []
+    ensure_indexes()
     now = datetime.utcnow()
+    documents = [
+        {
+            "_id": ObjectId(),
+            "experiment_id": f"exp-{uuid4().hex[:12]}",
+            "candidate": _candidate_payload(candidate),
+            "status": "pending",
+            "score": 0.0,
+            "metrics": {},
+            "created_at": now,
+            "updated_at": now,
+            "lineage": [candidate.parent_id] if candidate.parent_id else [],
+            "insights": {},
+            "notes": [],
+        }
+        for candidate in candidates
+    ]
+    if not documents:
+        return []
     with mongo_client() as client:
         db = client[get_database_name()]
-        collection = db[EXPERIMENT_COLLECTION]
-        for candidate in candidates:
-            experiment_id = f"exp-{uuid4().hex[:12]}"
-            document = {
-                "_id": ObjectId(),
-                "experiment_id": experiment_id,
-                "candidate": _candidate_payload(candidate),
-                "status": "pending",
-                "score": 0.0,
-                "metrics": {},
-                "created_at": now,
-                "updated_at": now,
-                "lineage": [candidate.parent_id] if candidate.parent_id else [],
-                "insights": {},
-                "notes": [],
-            }
-            collection.insert_one(document)
-            document["_id"] = str(document["_id"])
-            documents.append(document)
+        db[EXPERIMENT_COLLECTION].insert_many(documents)
+    for document in documents:
+        document["_id"] = str(document["_id"])
     return documents
 
 
@@ -67,15 +85,17 @@ def list_experiments(
     limit: int = 50,
     sort_by: str = "updated_at",
     descending: bool = True,
+    projection: Optional[Dict[str, Any]] = EXPERIMENT_LIST_PROJECTION,
 ) -> List[Dict[str, Any]]:
-    _ensure_indexes()
+    """Most recently updated experiments; pass ``projection=None`` for full documents."""
+    ensure_indexes()
     query: Dict[str, Any] = {}
     if status:
         query["status"] = status
     with mongo_client() as client:
         db = client[get_database_name()]
         order = DESCENDING if descending else ASCENDING
-        cursor = db[EXPERIMENT_COLLECTION].find(query).sort(sort_by, order).limit(limit)
+        cursor = db[EXPERIMENT_COLLECTION].find(query, projection).sort(sort_by, order).limit(limit)
         docs = list(cursor)
     results: List[Dict[str, Any]] = []
     for doc in docs:
@@ -94,6 +114,18 @@ def load_experiment(experiment_id: str) -> Optional[Dict[str, Any]]:
     return doc
 
 
+def load_experiments(experiment_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Experiments keyed by id, fetched in one query; missing ids are absent from the result."""
+    if not experiment_ids:
+        return {}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        docs = list(db[EXPERIMENT_COLLECTION].find({"experiment_id": {"$in": list(experiment_ids)}}))
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return {doc["experiment_id"]: doc for doc in docs}
+
+
 def update_experiment(experiment_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     updates = dict(updates)
     updates["updated_at"] = datetime.utcnow()
@@ -110,6 +142,34 @@ def update_experiment(experiment_id: str, updates: Dict[str, Any]) -> Optional[D
     return updated
 
 
+def bulk_update_experiments(updates: Mapping[str, Dict[str, Any]]) -> int:
+    """Apply ``$set`` updates for many experiments in one ``bulk_write``; returns the match count."""
+    if not updates:
+        return 0
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({"experiment_id": experiment_id}, {"$set": {**fields, "updated_at": now}})
+        for experiment_id, fields in updates.items()
+    ]
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        result = db[EXPERIMENT_COLLECTION].bulk_write(operations, ordered=False)
+    return result.matched_count
+
+
+def set_experiments_status(experiment_ids: Sequence[str], status: str, **fields: Any) -> int:
+    """Set the same status (and fields) on many experiments with a single ``update_many``."""
+    if not experiment_ids:
+        return 0
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        result = db[EXPERIMENT_COLLECTION].update_many(
+            {"experiment_id": {"$in": list(experiment_ids)}},
+            {"$set": {**fields, "status": status, "updated_at": datetime.utcnow()}},
+        )
+    return result.matched_count
+
+
 def append_note(experiment_id: str, note: str) -> Optional[Dict[str, Any]]:
     payload = {
         "updated_at": datetime.utcnow(),
@@ -131,6 +191,25 @@ def append_note(experiment_id: str, note: str) -> Optional[Dict[str, Any]]:
     return updated
 
 
+def save_pareto_front(document: Dict[str, Any]) -> Dict[str, Any]:
+    ensure_indexes()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        inserted_id = db[PARETO_COLLECTION].insert_one(dict(document)).inserted_id
+    return {**document, "_id": str(inserted_id)}
+
+
+def latest_pareto_front(search_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    query = {"search_id": search_id} if search_id else {}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db[PARETO_COLLECTION].find_one(query, sort=[("created_at", DESCENDING)])
+    if not doc:
+        return None
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
 def upsert_scheduler_state(state: Dict[str, Any]) -> Dict[str, Any]:
     scheduler_id = state.get("scheduler_id", "daily_evolution")
     payload = {**state, "scheduler_id": scheduler_id, "updated_at": datetime.utcnow()}
@@ -91,6 +91,55 @@ class EvaluationConfig:
     horizon: str = "1h"
     paper_days: int = 7
     max_concurrent: int = 4
+    # Walk-forward folds per evaluation; 0 falls back to a single full-window backtest.
+    walk_forward_folds: int = 4
+    walk_forward_jobs: int = -1
+    # Reuse stored metrics for genomes already evaluated under the same fingerprint.
+    use_fitness_cache: bool = True
+    # Successive halving: score every candidate on a prefix of the window, keep the best
+    # 1/eta and grow the prefix by eta until at most ``max_concurrent`` remain for full evaluation.
+    successive_halving: bool = False
+    halving_min_fraction: float = 0.1
+    halving_eta: int = 3
+
+
+@dataclass
+class PrescreenConfig:
+    """Meta-model pre-screen applied to mutated candidates before they are queued."""
+
+    enabled: bool = True
+    # Expected ROI gain over the parent, under the forest's per-tree spread, needed to simulate.
+    min_expected_improvement: float = 0.001
+    # Always keep this many top candidates so a pessimistic model cannot empty a cycle.
+    min_keep: int = 1
+
+
+@dataclass
+class SearchConfig:
+    """Parameters for an in-memory multi-generation NSGA-II search."""
+
+    symbol: str = "BTC/USDT"
+    interval: str = "1h"
+    horizon: Optional[str] = None
+    population_size: int = 200
+    generations: int = 50
+    crossover_fraction: float = 0.5
+    mutation_rate: float = 0.3
+    mutation_scale: float = 0.2
+    # Genomes trading less than this are ranked behind every genome that does.
+    min_trades: int = 5
+    seed_limit: int = 5
+    seed: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchConfig":
+        known = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        for key in ("start_time", "end_time"):
+            if isinstance(known.get(key), str):
+                known[key] = datetime.fromisoformat(known[key])
+        return cls(**known)
 
 
 @dataclass
@@ -117,6 +166,17 @@ class PromotionDecision:
     effective_at: datetime = field(default_factory=datetime.utcnow)
 
 
+def evaluation_mode(metrics: Dict[str, Any]) -> str:
+    """How ``metrics`` were produced: ``single`` or ``walk_forward:<folds>``.
+
+    Metrics written before the mode was recorded are inferred from their shape.
+    """
+    mode = metrics.get("evaluation_mode")
+    if mode:
+        return str(mode)
+    return "walk_forward" if "positive_fold_ratio" in metrics else "single"
+
+
 @dataclass
 class PromotionPolicy:
     """Thresholds for automated promotion."""
@@ -127,6 +187,12 @@ class PromotionPolicy:
     min_score_gain: float = 0.05
     min_paper_days: int = 10
     require_parent_score: bool = True
+    # Only applied to walk-forward metrics, which carry ``positive_fold_ratio``.
+    min_positive_fold_ratio: float = 0.6
+
+    def comparable(self, candidate_metrics: Dict[str, Any], parent_metrics: Optional[Dict[str, Any]]) -> bool:
+        """Whether the parent's score was measured the same way as the candidate's."""
+        return bool(parent_metrics) and evaluation_mode(candidate_metrics) == evaluation_mode(parent_metrics)
 
     def passes(self, candidate_metrics: Dict[str, Any], parent_metrics: Optional[Dict[str, Any]]) -> bool:
         roi = float(candidate_metrics.get("roi", 0.0))
@@ -136,8 +202,15 @@ class PromotionPolicy:
 
         if roi < self.min_roi or sharpe < self.min_sharpe or drawdown > self.max_drawdown:
             return False
+        fold_ratio = candidate_metrics.get("positive_fold_ratio")
+        if fold_ratio is not None and float(fold_ratio) < self.min_positive_fold_ratio:
+            return False
 
         if self.require_parent_score and parent_metrics:
+            # A walk-forward composite and a single-window composite are not on the same
+            # scale; hold the candidate until the parent is re-scored in its mode.
+            if not self.comparable(candidate_metrics, parent_metrics):
+                return False
             parent_score = float(
                 parent_metrics.get("composite", parent_metrics.get("score", 0.0))
             )
@@ -0,0 +1,286 @@
+"""In-memory NSGA-II search: many generations over one cached price and forecast path.
+
+Each generation is scored with ``simulate_population`` and selected by non-dominated
+sorting on (ROI, Sharpe, drawdown) with crowding distance as the tie-break. Nothing touches
+Mongo until :func:`persist_front` stores the final Pareto front and its lineage.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+from backtester.execution_model import ExecutionModel
+from backtester.population import PopulationParams, simulate_population
+from simulator.runner import MIN_CONF_THRESHOLDS, MIN_RET_THRESHOLDS, PopulationInputs
+from strategy_genome.encoding import StrategyGenome
+from strategy_genome.population import PARAM_NAMES, Population, concat
+from strategy_genome.repository import save_genome, update_genome_fitness
+
+from . import repository
+from .schemas import SearchConfig
+
+logger = logging.getLogger(__name__)
+
+# Objectives in selection order; drawdown is minimised, the others maximised.
+OBJECTIVES = ("roi", "sharpe", "max_drawdown")
+_MINIMISED = np.array([False, False, True])
+# Param defaults matching ``manager.experiment_runner._strategy_payload``.
+_PARAM_DEFAULTS = {"risk_pct": 0.1, "take_profit_pct": 0.02, "stop_loss_pct": 0.01}
+
+
+def objective_matrix(metrics: Dict[str, np.ndarray], trade_counts: np.ndarray, min_trades: int = 0) -> np.ndarray:
+    """``N x len(OBJECTIVES)`` matrix to maximise; genomes below ``min_trades`` get ``-inf``."""
+    matrix = np.column_stack([np.asarray(metrics[name], dtype=np.float64) for name in OBJECTIVES])
+    matrix[:, _MINIMISED] *= -1.0
+    matrix = np.nan_to_num(matrix, nan=-np.inf)
+    matrix[np.asarray(trade_counts) < min_trades] = -np.inf
+    return matrix
+
+
+def non_dominated_sort(objectives: np.ndarray) -> np.ndarray:
+    """Pareto rank per row (0 = non-dominated), all objectives maximised."""
+    at_least = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    better = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    dominates = at_least & better
+    dominated_by = dominates.sum(axis=0)
+    ranks = np.full(len(objectives), -1)
+    remaining = np.ones(len(objectives), dtype=bool)
+    rank = 0
+    while remaining.any():
+        front = remaining & (dominated_by == 0)
+        ranks[front] = rank
+        remaining &= ~front
+        dominated_by -= dominates[front].sum(axis=0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Per-front crowding distance; boundary points and fronts of two or fewer are infinite."""
+    distance = np.zeros(len(objectives))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        for column in objectives[members].T:
+            order = np.argsort(column, kind="stable")
+            ordered = column[order]
+            distance[members[order[[0, -1]]]] = np.inf
+            span = ordered[-1] - ordered[0]
+            if not np.isfinite(span) or span <= 0:
+                continue
+            distance[members[order[1:-1]]] += (ordered[2:] - ordered[:-2]) / span
+    return distance
+
+
+def select_survivors(objectives: np.ndarray, count: int) -> np.ndarray:
+    ranks = non_dominated_sort(objectives)
+    crowding = crowding_distance(objectives, ranks)
+    return np.lexsort((-crowding, ranks))[:count]
+
+
+def tournament(rng: np.random.Generator, ranks: np.ndarray, crowding: np.ndarray, count: int) -> np.ndarray:
+    """Binary tournament: lower rank wins, larger crowding distance breaks ties."""
+    first, second = rng.integers(0, len(ranks), size=(2, count))
+    first_wins = (ranks[first] < ranks[second]) | ((ranks[first] == ranks[second]) & (crowding[first] >= crowding[second]))
+    return np.where(first_wins, first, second)
+
+
+def population_params_for(population: Population, horizon: str) -> PopulationParams:
+    """``population_params`` without building per-genome config dicts."""
+    matrix = population.matrix
+    column = {name: matrix[:, idx] for idx, name in enumerate(PARAM_NAMES)}
+
+    def _filled(name: str, default: float) -> np.ndarray:
+        return np.where(np.isnan(column[name]), default, column[name])
+
+    return PopulationParams.build(
+        len(population),
+        min_return_threshold=_filled("min_return_threshold", MIN_RET_THRESHOLDS.get(horizon, 0.001)),
+        min_confidence=_filled("min_confidence", MIN_CONF_THRESHOLDS.get(horizon, 0.55)),
+        forecast_weight=population.forecast_weight,
+        position_size_pct=np.clip(_filled("risk_pct", _PARAM_DEFAULTS["risk_pct"]), 0.01, 0.99),
+        take_profit_pct=_filled("take_profit_pct", _PARAM_DEFAULTS["take_profit_pct"]),
+        stop_loss_pct=_filled("stop_loss_pct", _PARAM_DEFAULTS["stop_loss_pct"]),
+        uses_forecast=population.uses_forecast,
+    )
+
+
+@dataclass
+class SearchResult:
+    population: Population
+    metrics: Dict[str, np.ndarray]
+    trade_counts: np.ndarray
+    ranks: np.ndarray
+    lineage: Dict[str, List[str]] = field(default_factory=dict)
+    history: List[Dict[str, float]] = field(default_factory=list)
+    evaluations: int = 0
+
+    @property
+    def front(self) -> np.ndarray:
+        return np.flatnonzero(self.ranks == 0)
+
+    def metrics_for(self, idx: int) -> Dict[str, float]:
+        metrics = {name: float(values[idx]) for name, values in self.metrics.items()}
+        metrics["trades"] = int(self.trade_counts[idx])
+        return metrics
+
+    def ancestry(self, strategy_id: str) -> Dict[str, List[str]]:
+        """Parent edges from ``strategy_id`` back to the seed genomes."""
+        edges: Dict[str, List[str]] = {}
+        pending = deque([strategy_id])
+        while pending:
+            child = pending.popleft()
+            parents = self.lineage.get(child)
+            if not parents or child in edges:
+                continue
+            edges[child] = parents
+            pending.extend(parents)
+        return edges
+
+
+def _record_lineage(lineage: Dict[str, List[str]], children: Population, mates: Optional[np.ndarray] = None) -> None:
+    if mates is None:
+        for child, parent in zip(children.strategy_ids, children.parent_ids):
+            lineage[child] = [parent]
+    else:
+        for child, parent, mate in zip(children.strategy_ids, children.parent_ids, mates):
+            lineage[child] = [parent, mate]
+
+
+def run_search(
+    seeds: Sequence[StrategyGenome],
+    inputs: PopulationInputs,
+    config: SearchConfig,
+    execution_model: Optional[ExecutionModel] = None,
+) -> SearchResult:
+    """Evolve ``config.population_size`` genomes for ``config.generations`` generations."""
+    if not seeds:
+        raise ValueError("run_search needs at least one seed genome")
+    rng = np.random.default_rng(config.seed)
+    horizon = config.horizon or config.interval
+    size = config.population_size
+
+    def _evaluate(population: Population) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        result = simulate_population(
+            inputs.prices,
+            inputs.predicted,
+            inputs.confidence,
+            population_params_for(population, horizon),
+            execution_model,
+            **inputs.bar_fields,
+        )
+        return result.metrics, result.trade_counts
+
+    lineage: Dict[str, List[str]] = {}
+    base = Population.from_genomes(seeds)
+    population = base.mutate(rng, config.mutation_rate, config.mutation_scale, parents=rng.integers(0, len(base), size))
+    _record_lineage(lineage, population)
+    metrics, trades = _evaluate(population)
+    evaluations = len(population)
+    history: List[Dict[str, float]] = []
+
+    for generation in range(config.generations):
+        objectives = objective_matrix(metrics, trades, config.min_trades)
+        ranks = non_dominated_sort(objectives)
+        crowding = crowding_distance(objectives, ranks)
+
+        n_cross = int(size * config.crossover_fraction)
+        mates = tournament(rng, ranks, crowding, n_cross)
+        crossed = population.crossover(rng, tournament(rng, ranks, crowding, n_cross), mates)
+        _record_lineage(lineage, crossed, population.strategy_ids[mates])
+        mutated = population.mutate(
+            rng, config.mutation_rate, config.mutation_scale, parents=tournament(rng, ranks, crowding, size - n_cross)
+        )
+        _record_lineage(lineage, mutated)
+        offspring = concat([crossed, mutated])
+        offspring_metrics, offspring_trades = _evaluate(offspring)
+        evaluations += len(offspring)
+
+        merged = concat([population, offspring])
+        merged_metrics = {name: np.concatenate([metrics[name], offspring_metrics[name]]) for name in metrics}
+        merged_trades = np.concatenate([trades, offspring_trades])
+        keep = select_survivors(objective_matrix(merged_metrics, merged_trades, config.min_trades), size)
+        population = merged.take(keep)
+        metrics = {name: values[keep] for name, values in merged_metrics.items()}
+        trades = merged_trades[keep]
+        history.append(
+            {
+                "generation": generation + 1,
+                "best_roi": float(np.max(metrics["roi"])),
+                "best_sharpe": float(np.max(metrics["sharpe"])),
+                "min_drawdown": float(np.min(metrics["max_drawdown"])),
+            }
+        )
+
+    ranks = non_dominated_sort(objective_matrix(metrics, trades, config.min_trades))
+    return SearchResult(
+        population=population,
+        metrics=metrics,
+        trade_counts=trades,
+        ranks=ranks,
+        lineage=lineage,
+        history=history,
+        evaluations=evaluations,
+    )
+
+
+def persist_front(result: SearchResult, config: SearchConfig, *, search_id: Optional[str] = None) -> Dict[str, Any]:
+    """Save the Pareto-front genomes with their fitness and a ``pareto_fronts`` summary document.
+
+    Intermediate offspring are never saved, so each front genome is parented on the seed it
+    descends from; its in-search parent is kept as ``metadata.search_parent`` and the full
+    ancestry in the summary's ``lineage``.
+    """
+    search_id = search_id or f"search-{uuid4().hex[:12]}"
+    front = result.front
+    genomes = result.population.take(front).to_genomes()
+    members: List[Dict[str, Any]] = []
+    lineage: Dict[str, List[str]] = {}
+    for idx, genome in zip(front, genomes):
+        ancestry = result.ancestry(genome.strategy_id)
+        lineage.update(ancestry)
+        root_id = _root(genome.strategy_id, ancestry)
+        genome.tags = sorted({*genome.tags, "pareto"})
+        genome.metadata = {**genome.metadata, "search_id": search_id}
+        if root_id != genome.strategy_id:
+            genome.metadata["search_parent"] = genome.mutation_parent
+            genome.mutation_parent = root_id
+        metrics = result.metrics_for(idx)
+        saved = save_genome(genome)
+        saved = update_genome_fitness(genome.strategy_id, metrics) or saved
+        members.append(
+            {
+                "strategy_id": genome.strategy_id,
+                "genome": saved,
+                "metrics": metrics,
+                "root_id": root_id,
+            }
+        )
+    document = {
+        "search_id": search_id,
+        "created_at": datetime.utcnow(),
+        "config": asdict(config),
+        "generations": len(result.history),
+        "evaluations": result.evaluations,
+        "front": members,
+        "lineage": lineage,
+        "history": result.history,
+    }
+    repository.save_pareto_front(document)
+    logger.info("Stored Pareto front %s with %d genomes", search_id, len(members))
+    return document
+
+
+def _root(strategy_id: str, ancestry: Dict[str, List[str]]) -> str:
+    current = strategy_id
+    while ancestry.get(current):
+        current = ancestry[current][0]
+    return current
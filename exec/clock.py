@@ -0,0 +1,29 @@
+"""Clock shared by the execution layer; replay swaps it for simulated time."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+
+def system_utcnow() -> datetime:
+    return datetime.utcnow().replace(tzinfo=timezone.utc)
+
+
+_CLOCK: Callable[[], datetime] = system_utcnow
+
+
+def utcnow() -> datetime:
+    return _CLOCK()
+
+
+@contextmanager
+def use_clock(clock: Callable[[], datetime]) -> Iterator[None]:
+    """Route every execution-layer timestamp through ``clock`` for the duration of the block."""
+    global _CLOCK
+    previous = _CLOCK
+    _CLOCK = clock
+    try:
+        yield
+    finally:
+        _CLOCK = previous
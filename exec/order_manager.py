@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field, validator
 from db import client as db_client
 from monitor.trade_alerts import TradeAlertClient
 
+from . import clock
 from .connector import CCXTConnector, ExchangeConnector, OrderPayload, PaperConnector
 from .risk_manager import RiskManager, RiskViolation, TradingSettings, get_trading_settings
 from .settlement import FILLS_COLLECTION, LEDGER_COLLECTION, SettlementEngine
@@ -24,7 +25,7 @@ LOGGER = logging.getLogger(__name__)
 
 
 def _utcnow() -> datetime:
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+    return clock.utcnow()
 
 
 class OrderStatus(str, Enum):
@@ -357,6 +358,10 @@ class OrderManager:
                 self.logger.warning("Failed to cancel order %s: %s", order["order_id"], exc)
         return cancelled
 
+    def register_connector(self, mode: str, connector: ExchangeConnector) -> None:
+        """Route orders for ``mode`` through ``connector`` (e.g. a replay connector)."""
+        self._connector_cache[mode] = connector
+
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field, validator
 
 from db import client as db_client
 
+from . import clock
 from .settlement import FILLS_COLLECTION, POSITIONS_COLLECTION, WALLETS_COLLECTION
 
 LOGGER = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ METRICS_COLLECTION = "trading_metrics"
 
 
 def _utcnow() -> datetime:
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+    return clock.utcnow()
 
 
 class ModeCredentials(BaseModel):
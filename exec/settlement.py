@@ -4,13 +4,15 @@ from __future__ import annotations
 import hashlib
 import logging
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from bson import ObjectId
 
 from db.client import get_database_name, get_ohlcv_df, mongo_client
 
+from . import clock
+
 LOGGER = logging.getLogger(__name__)
 
 WALLETS_COLLECTION = "trading_wallets"
@@ -20,7 +22,7 @@ LEDGER_COLLECTION = "trading_ledgers"
 
 
 def _utcnow() -> datetime:
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+    return clock.utcnow()
 
 
 @dataclass
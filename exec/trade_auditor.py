@@ -4,20 +4,22 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 from bson import ObjectId
 
 from db.client import get_database_name, mongo_client
 
+from . import clock
+
 LOGGER = logging.getLogger(__name__)
 
 AUDIT_COLLECTION = "trading_audit"
 
 
 def _utcnow() -> datetime:
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+    return clock.utcnow()
 
 
 class TradeAuditor:
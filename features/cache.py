@@ -11,6 +11,8 @@ import pandas as pd
 from redis import Redis
 from redis.exceptions import RedisError
 
+from features.precision import cast_features
+
 
 def _redis_url() -> str:
     return os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -56,7 +58,7 @@ class FeatureCache:
         if client is None:
             return
         try:
-            payload = zlib.compress(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+            payload = zlib.compress(pickle.dumps(cast_features(frame), protocol=pickle.HIGHEST_PROTOCOL))
             client.set(self._key(symbol, interval), payload, ex=self.ttl_seconds)
         except RedisError:
             return
@@ -13,7 +13,26 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 
-def generate_for_symbol(symbol: str, interval: str, limit: Optional[int] = None) -> int:
+def _refresh_forecasts(symbol: str, interval: str) -> None:
+    # Imported lazily: forecasting pulls in the model stack, which plain feature jobs do not need.
+    from models.forecast_store import materialise_forecasts
+
+    try:
+        stored = materialise_forecasts(symbol, interval)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Forecast refresh failed for %s %s: %s", symbol, interval, exc)
+        return
+    if stored:
+        logger.info("Materialised %s forecasts for %s %s", len(stored), symbol, interval)
+
+
+def generate_for_symbol(
+    symbol: str,
+    interval: str,
+    limit: Optional[int] = None,
+    *,
+    refresh_forecasts: bool = False,
+) -> int:
     df = get_ohlcv_df(symbol, interval, limit=limit)
     if df.empty:
         logger.warning("No OHLCV data for %s %s. Skipping.", symbol, interval)
@@ -23,17 +42,20 @@ def generate_for_symbol(symbol: str, interval: str, limit: Optional[int] = None)
     clean_df = clean_feature_frame(df)
     count = 0
     for ts, row in clean_df.iterrows():
-        write_features(symbol, interval, ts, row.to_dict())
+        # BSON has no float32 type, so values are widened back to Python floats for storage.
+        write_features(symbol, interval, ts, {key: float(value) for key, value in row.items()})
         count += 1
     logger.info("Wrote %s feature rows for %s %s", count, symbol, interval)
+    if refresh_forecasts and count:
+        _refresh_forecasts(symbol, interval)
     return count
 
 
-def generate_bulk(symbols: list[str], intervals: list[str]) -> int:
+def generate_bulk(symbols: list[str], intervals: list[str], *, refresh_forecasts: bool = False) -> int:
     total = 0
     for symbol in symbols:
         for interval in intervals:
-            total += generate_for_symbol(symbol, interval)
+            total += generate_for_symbol(symbol, interval, refresh_forecasts=refresh_forecasts)
     return total
 
 
@@ -42,6 +64,10 @@ if __name__ == "__main__":
 
     symbols = os.getenv("DEFAULT_SYMBOLS", "BTC/USDT").split(",")
     intervals = os.getenv("FEATURE_INTERVALS", "1m").split(",")
-    count = generate_bulk([s.strip() for s in symbols if s.strip()], [i.strip() for i in intervals if i.strip()])
+    count = generate_bulk(
+        [s.strip() for s in symbols if s.strip()],
+        [i.strip() for i in intervals if i.strip()],
+        refresh_forecasts=True,
+    )
     logger.info("Generated %s feature rows total", count)
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import pandas as pd
 
+from features.precision import cast_features
+
 
 def add_basic_indicators(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
@@ -42,5 +44,5 @@ def clean_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
         "macd_hist",
         "volatility_1h",
     ]
-    return df[feature_cols]
+    return cast_features(df[feature_cols])
 
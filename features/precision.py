@@ -0,0 +1,52 @@
+"""Floating-point precision settings shared by the feature, training, and inference paths."""
+from __future__ import annotations
+
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+FEATURE_DTYPE_ENV = "FEATURE_FLOAT_DTYPE"
+SUPPORTED_DTYPES = {"float32": np.float32, "float64": np.float64}
+# Price columns keep float64 so fills and PnL are not rounded to ~7 significant digits.
+PRICE_COLUMNS = ("open", "high", "low", "close", "price", "volume")
+
+
+def feature_dtype() -> np.dtype:
+    name = os.getenv(FEATURE_DTYPE_ENV, "float64").strip().lower()
+    if name not in SUPPORTED_DTYPES:
+        raise ValueError(f"{FEATURE_DTYPE_ENV} must be one of {', '.join(SUPPORTED_DTYPES)}; got {name!r}")
+    return np.dtype(SUPPORTED_DTYPES[name])
+
+
+def use_float32() -> bool:
+    return feature_dtype() == np.float32
+
+
+def cast_features(
+    frame: pd.DataFrame,
+    dtype: Optional[np.dtype] = None,
+    *,
+    exclude: Iterable[str] = PRICE_COLUMNS,
+) -> pd.DataFrame:
+    """Cast float feature columns to the configured dtype, leaving price columns untouched."""
+    target = np.dtype(dtype) if dtype is not None else feature_dtype()
+    skip = set(exclude)
+    columns = [
+        col
+        for col in frame.columns
+        if col not in skip and pd.api.types.is_float_dtype(frame[col]) and frame[col].dtype != target
+    ]
+    if not columns:
+        return frame
+    return frame.astype({col: target for col in columns})
+
+
+def max_prediction_deviation(model: object, frame: pd.DataFrame) -> float:
+    """Largest absolute gap between predictions on float64 and float32 copies of ``frame``."""
+    wide = model.predict(frame.astype(np.float64))
+    narrow = model.predict(frame.astype(np.float32))
+    if len(wide) == 0:
+        return 0.0
+    return float(np.max(np.abs(np.asarray(wide, dtype=np.float64) - np.asarray(narrow, dtype=np.float64))))
@@ -35,7 +35,7 @@ def _load_returns(strategy_id: str, limit: int = 30) -> List[float]:
         db = client[get_database_name()]
         cursor = (
             db["sim_runs"]
-            .find({"strategy": strategy_id, "results.roi": {"$exists": True}})
+            .find({"strategy": strategy_id, "results.roi": {"$exists": True}}, {"_id": 0, "results.roi": 1})
             .sort("created_at", -1)
             .limit(limit)
         )
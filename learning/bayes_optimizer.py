@@ -19,7 +19,8 @@ from strategy_genome.encoding import (
     create_genome_from_dict,
     normalize_params,
 )
-from strategy_genome.repository import list_genomes, record_queue_items, save_genome
+from strategy_genome.queue_scheduler import enqueue
+from strategy_genome.repository import list_genomes, save_genome
 
 
 @dataclass
@@ -144,6 +145,6 @@ def queue_optimised_genomes(candidates: Sequence[OptimizedGenome]) -> List[Dict[
     genomes = [candidate.genome for candidate in candidates]
     for genome in genomes:
         save_genome(genome)
-    queued_docs = record_queue_items(genomes, max_queue=None)
-    return queued_docs
+    admission = enqueue(genomes, priority_class="background")
+    return admission.queued
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
@@ -49,12 +49,13 @@ class MetaModelTrainingResult:
 
 NUMERIC_KEYS = {"pnl", "roi", "sharpe", "max_drawdown", "forecast_alignment", "stability"}
 FITNESS_NUMERIC_KEYS = {"roi", "sharpe", "max_drawdown", "forecast_alignment", "stability", "composite"}
+META_MODEL_PROJECTION = {"_id": 0, "strategy": 1, "results": 1, "genome": 1, "created_at": 1}
 
 
 def _fetch_sim_runs(limit: Optional[int] = None) -> List[Dict[str, Any]]:
     with mongo_client() as client:
         db = client[get_database_name()]
-        cursor = db["sim_runs"].find({"results.roi": {"$exists": True}}).sort("created_at", 1)
+        cursor = db["sim_runs"].find({"results.roi": {"$exists": True}}, META_MODEL_PROJECTION).sort("created_at", 1)
         if limit:
             cursor = cursor.limit(limit)
         runs = list(cursor)
@@ -291,6 +292,43 @@ def build_feature_vector(
     return features
 
 
+def feature_matrix(
+    genomes: Sequence[Dict[str, Any]],
+    previous_metrics: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    *,
+    feature_columns: Sequence[str],
+) -> np.ndarray:
+    """``len(genomes) x len(feature_columns)`` matrix of ``build_feature_vector`` rows."""
+    previous_metrics = previous_metrics or [None] * len(genomes)
+    matrix = np.zeros((len(genomes), len(feature_columns)), dtype=float)
+    for row, (genome, previous) in enumerate(zip(genomes, previous_metrics)):
+        vector = build_feature_vector(genome, previous)
+        matrix[row] = [vector.get(col, 0.0) for col in feature_columns]
+    return matrix
+
+
+def predict_roi_distribution(
+    genomes: Sequence[Dict[str, Any]],
+    previous_metrics: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    *,
+    bundle: Optional[MetaModelBundle] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicted ROI mean and spread for many genomes from one feature matrix.
+
+    For forests the spread is the standard deviation of the per-tree predictions; models
+    without ``estimators_`` report zero spread.
+    """
+    bundle = bundle or load_latest_meta_model()
+    if not genomes:
+        return np.zeros(0), np.zeros(0)
+    X = feature_matrix(genomes, previous_metrics, feature_columns=bundle.feature_columns)
+    estimators = getattr(bundle.model, "estimators_", None)
+    if not estimators:
+        return np.asarray(bundle.model.predict(X), dtype=float), np.zeros(len(X))
+    per_tree = np.stack([tree.predict(X) for tree in estimators])
+    return per_tree.mean(axis=0), per_tree.std(axis=0)
+
+
 def predict_expected_roi(
     genome: Dict[str, Any],
     previous_metrics: Optional[Dict[str, Any]] = None,
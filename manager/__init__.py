@@ -1,7 +1,10 @@
 """Experiment orchestration utilities for Phase 2."""
 
-from .experiment_runner import ExperimentRequest, run_experiment_cycle
-
-__all__ = ["ExperimentRequest", "run_experiment_cycle"]
-
-
+from .experiment_runner import (
+    ExperimentRequest,
+    queue_experiment_cycle,
+    run_claimed_experiment,
+    run_experiment_cycle,
+)
+
+__all__ = ["ExperimentRequest", "queue_experiment_cycle", "run_claimed_experiment", "run_experiment_cycle"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
@@ -13,14 +14,20 @@ from exec.risk_manager import AlertSettings, get_trading_settings
 from features.cache import GLOBAL_FEATURE_CACHE
 from reports.leaderboard import generate_leaderboard
 from simulator.account import AccountEvent, ParentWallet, VirtualAccount
+from simulator.run_store import RESULTS_PROJECTION, get_run_summary, load_run
 from simulator.runner import run_simulation
 from strategy_genome.encoding import StrategyGenome, create_genome_from_dict
 from strategy_genome.evolver import spawn_variants
+from strategy_genome.fitness_cache import cached_evaluation, fitness_key
+from strategy_genome.queue_scheduler import DEFAULT_PRIORITY_CLASS, QueueAdmission, enqueue
 from strategy_genome.repository import (
+    DEFAULT_LEASE_SECONDS,
+    claim_queue_item,
     ensure_seed_genomes,
+    finish_queue_item,
     get_experiment_settings,
+    heartbeat_queue_item,
     list_genomes,
-    record_queue_items,
     save_genome,
     update_genome_fitness,
     update_queue_item,
@@ -31,6 +38,28 @@ from monitor.trade_alerts import TradeAlertClient
 
 logger = logging.getLogger(__name__)
 
+# Bookkeeping keys a queue item carries on top of the genome document.
+QUEUE_ITEM_FIELDS = {
+    "_id",
+    "priority",
+    "status",
+    "created_at",
+    "updated_at",
+    "started_at",
+    "finished_at",
+    "worker_id",
+    "claimed_at",
+    "heartbeat_at",
+    "lease_expires_at",
+    "attempts",
+    "priority_class",
+    "pinned_rank",
+    "estimated_cost",
+    "symbol",
+    "interval",
+    "horizon",
+}
+
 def _build_alert_client() -> TradeAlertClient:
     try:
         settings = get_trading_settings()
@@ -69,6 +98,7 @@ class ExperimentRequest:
     champion_limit: int = 5
     queue_only: bool = False
     families: List[str] = field(default_factory=lambda: ["ema-cross"])
+    priority_class: str = DEFAULT_PRIORITY_CLASS
 
     def to_dict(self) -> Dict[str, Any]:
         payload = asdict(self)
@@ -87,6 +117,7 @@ class ExperimentRequest:
             champion_limit=data.get("champion_limit", 5),
             queue_only=data.get("queue_only", False),
             families=data.get("families") or ["ema-cross"],
+            priority_class=data.get("priority_class") or DEFAULT_PRIORITY_CLASS,
         )
 
 
@@ -101,22 +132,49 @@ def _strategy_payload(genome: StrategyGenome) -> Dict[str, Any]:
     return params
 
 
-def _load_run_document(run_id: str) -> Optional[Dict[str, Any]]:
-    with mongo_client() as client:
-        db = client[get_database_name()]
-        return db["sim_runs"].find_one({"run_id": run_id})
+def _load_run_document(run_id: str, *, include_artifacts: bool = False) -> Optional[Dict[str, Any]]:
+    if include_artifacts:
+        return load_run(run_id)
+    return get_run_summary(run_id, RESULTS_PROJECTION)
 
 
-def _touch_queue_item(queue_item_id: str, status: str, **extra: Any) -> None:
-    updates = {"status": status, "updated_at": datetime.utcnow(), **extra}
-    if status == "running":
-        updates.setdefault("started_at", datetime.utcnow())
-    if status in {"completed", "failed"}:
-        updates.setdefault("finished_at", datetime.utcnow())
-    update_queue_item(queue_item_id, updates)
+class _LeaseHeartbeat:
+    """Renews a queue item's lease from a daemon thread while a simulation runs."""
 
+    def __init__(self, queue_id: str, worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> None:
+        self.queue_id = queue_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"lease-{queue_id}", daemon=True)
 
-def run_experiment_cycle(request: ExperimentRequest) -> Dict[str, Any]:
+    def _beat(self) -> None:
+        while not self._stop.wait(max(self.lease_seconds / 3, 1.0)):
+            try:
+                if not heartbeat_queue_item(self.queue_id, self.worker_id, lease_seconds=self.lease_seconds):
+                    self.lost = True
+                    return
+            except Exception:  # noqa: BLE001
+                logger.debug("Heartbeat failed for queue item %s", self.queue_id, exc_info=True)
+
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _genome_from_queue_item(item: Dict[str, Any]) -> StrategyGenome:
+    payload = {key: value for key, value in item.items() if key not in QUEUE_ITEM_FIELDS}
+    payload["status"] = "candidate"
+    return create_genome_from_dict(payload)
+
+
+def queue_experiment_cycle(request: ExperimentRequest) -> QueueAdmission:
+    """Spawn variants of the current champions and admit them to the queue in ``request.priority_class``."""
     settings = get_experiment_settings()
     ensure_seed_genomes(request.families or settings.get("families", []))
     champions_docs = list_genomes(status="champion", limit=request.champion_limit)
@@ -133,51 +191,109 @@ def run_experiment_cycle(request: ExperimentRequest) -> Dict[str, Any]:
     # trim to requested account capacity
     account_capacity = request.accounts or settings.get("accounts", 20)
     variants = variants[: max(1, account_capacity)]
+    symbol = request.symbol or settings.get("symbol", "BTC/USDT")
+    interval = request.interval or settings.get("interval", "1m")
+    return enqueue(
+        variants,
+        priority_class=request.priority_class,
+        context={"symbol": symbol, "interval": interval, "horizon": request.horizon or interval},
+    )
 
-    queue_docs = record_queue_items(variants, max_queue=settings.get("max_queue"))
+
+def _run_queue_item(
+    item: Dict[str, Any],
+    request: ExperimentRequest,
+    settings: Dict[str, Any],
+    worker_id: str,
+) -> Optional[Dict[str, Any]]:
+    """Simulate one claimed queue item and record its outcome; ``None`` when it failed."""
+    queue_id = item["_id"]
+    variant = _genome_from_queue_item(item)
+    saved = save_genome(variant)
+    update_queue_item(queue_id, {"strategy_id": saved["strategy_id"], "started_at": datetime.utcnow()})
+    try:
+        strategy_config = _strategy_payload(variant)
+        strategy_config["min_confidence"] = settings.get("min_confidence", strategy_config.get("min_confidence"))
+        strategy_config["min_return_threshold"] = settings.get("min_return", strategy_config.get("min_return_threshold"))
+        # Items carry the context they were queued with, so a worker may run another cycle's item.
+        symbol = item.get("symbol") or request.symbol or settings.get("symbol", "BTC/USDT")
+        interval = item.get("interval") or request.interval or settings.get("interval", "1m")
+        horizon = item.get("horizon") or request.horizon or interval
+
+        def _simulate() -> tuple[str, Dict[str, Any]]:
+            with _LeaseHeartbeat(queue_id, worker_id) as lease:
+                run_id = run_simulation(
+                    symbol,
+                    interval,
+                    strategy_name=saved["strategy_id"],
+                    horizon=horizon,
+                    strategy_config=strategy_config,
+                    genome=saved,
+                )
+            if lease.lost:
+                logger.warning("Lease on queue item %s was lost during simulation", queue_id)
+            run_doc = _load_run_document(run_id)
+            return run_id, run_doc.get("results", {}) if run_doc else {}
+
+        key = fitness_key(strategy_config, symbol=symbol, interval=interval, horizon=horizon)
+        run_id, metrics, cache_hit = cached_evaluation(key, _simulate)
+        updated = update_genome_fitness(saved["strategy_id"], metrics, run_id=run_id)
+        outcome = {"status": "completed", "run_id": run_id, "metrics": metrics, "fitness_cache_hit": cache_hit}
+        if finish_queue_item(queue_id, worker_id, outcome) is None:
+            logger.warning("Queue item %s was taken over by another worker", queue_id)
+        return {
+            "strategy_id": saved["strategy_id"],
+            "run_id": run_id,
+            "metrics": metrics,
+            "fitness_cache_hit": cache_hit,
+            "fitness": updated.get("fitness") if updated else {},
+        }
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Experiment failed for %s: %s", saved["strategy_id"], exc)
+        finish_queue_item(queue_id, worker_id, {"status": "failed", "error": str(exc)})
+        return None
+
+
+def run_claimed_experiment(
+    request: ExperimentRequest,
+    worker_id: str,
+    queue_id: Optional[str] = None,
+    *,
+    steal: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Claim ``queue_id`` (or, with ``steal``, the next claimable item) and run it.
+
+    Returns the completed run summary, or ``None`` when nothing could be claimed or the
+    simulation failed.
+    """
+    item = claim_queue_item(worker_id, queue_id, steal=steal)
+    if not item:
+        return None
+    return _run_queue_item(item, request, get_experiment_settings(), worker_id)
+
+
+def run_experiment_cycle(request: ExperimentRequest) -> Dict[str, Any]:
+    """Queue and run one cycle in-process; ``manager.tasks`` fans the same items out to workers."""
+    admission = queue_experiment_cycle(request)
+    queue_docs = admission.queued
     if request.queue_only:
-        return {"queued": len(queue_docs), "runs": []}
+        return {"queued": len(queue_docs), "rejected": admission.rejected, "runs": []}
     if not queue_docs:
         logger.info("Experiment queue at capacity; no new runs scheduled.")
-        return {"queued": 0, "completed": [], "message": "queue_at_capacity"}
+        return {
+            "queued": 0,
+            "completed": [],
+            "message": "queue_at_capacity",
+            "reason": admission.reason,
+            "retry_after": admission.retry_after,
+        }
 
+    worker_id = f"inline-{uuid4().hex[:8]}"
     completed_runs: List[Dict[str, Any]] = []
-    for variant, queue_doc in zip(variants, queue_docs):
-        queue_id = queue_doc["_id"]
-        saved = save_genome(variant)
-        _touch_queue_item(queue_id, "running", strategy_id=saved["strategy_id"])
-        try:
-            strategy_config = _strategy_payload(variant)
-            strategy_config["min_confidence"] = settings.get("min_confidence", strategy_config.get("min_confidence"))
-            strategy_config["min_return_threshold"] = settings.get("min_return", strategy_config.get("min_return_threshold"))
-            run_id = run_simulation(
-                request.symbol or settings.get("symbol", "BTC/USDT"),
-                request.interval or settings.get("interval", "1m"),
-                strategy_name=saved["strategy_id"],
-                horizon=request.horizon or request.interval or settings.get("interval", "1m"),
-                strategy_config=strategy_config,
-                genome=saved,
-            )
-            run_doc = _load_run_document(run_id)
-            metrics = run_doc.get("results", {}) if run_doc else {}
-            updated = update_genome_fitness(saved["strategy_id"], metrics, run_id=run_id)
-            _touch_queue_item(
-                queue_id,
-                "completed",
-                run_id=run_id,
-                metrics=metrics,
-            )
-            completed_runs.append(
-                {
-                    "strategy_id": saved["strategy_id"],
-                    "run_id": run_id,
-                    "metrics": metrics,
-                    "fitness": updated.get("fitness") if updated else {},
-                }
-            )
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Experiment failed for %s: %s", saved["strategy_id"], exc)
-            _touch_queue_item(queue_id, "failed", error=str(exc))
+    for queue_doc in queue_docs:
+        result = run_claimed_experiment(request, worker_id, queue_doc["_id"], steal=False)
+        if result:
+            completed_runs.append(result)
 
     generate_leaderboard(limit=10)
 
@@ -448,7 +564,7 @@ def launch_intraday_cohort(request: IntradayCohortRequest) -> Dict[str, Any]:
             )
             continue
 
-        run_doc = _load_run_document(run_id)
+        run_doc = _load_run_document(run_id, include_artifacts=True)
         if not run_doc:
             failed_agents += 1
             parent_wallet.settle(strategy_id, allocation, metadata={"reason": "missing_run"})
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import math
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
-from celery import Celery
+from celery import Celery, chord
 
 from evolution.engine import EvolutionEngine
+from evolution.schemas import SearchConfig
 from exec.settlement import SettlementEngine
 from knowledge.base import KnowledgeBaseService
-from manager.experiment_runner import ExperimentRequest, run_experiment_cycle
+from manager.experiment_runner import ExperimentRequest, queue_experiment_cycle, run_claimed_experiment
+from models.explainability import DEFAULT_SAMPLE_SIZE, run_shap_job
+from reports.leaderboard import generate_leaderboard
+from strategy_genome.repository import lease_seconds_remaining, release_expired_queue_items
 
 BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", BROKER_URL)
 EXPERIMENT_QUEUE = os.getenv("CELERY_EXPERIMENT_QUEUE", "experiments")
+EXPLAINABILITY_QUEUE = os.getenv("CELERY_EXPLAINABILITY_QUEUE", "explainability")
 
 celery_app = Celery(
     "cryptotrader",
@@ -22,8 +28,12 @@ celery_app = Celery(
 
 celery_app.conf.task_routes = {
     "manager.tasks.run_experiment_cycle_task": {"queue": EXPERIMENT_QUEUE},
+    "manager.tasks.run_queue_item_task": {"queue": EXPERIMENT_QUEUE},
+    "manager.tasks.finalize_experiment_cycle_task": {"queue": EXPERIMENT_QUEUE},
     "manager.tasks.run_autonomous_evolution": {"queue": EXPERIMENT_QUEUE},
+    "manager.tasks.run_evolution_search": {"queue": EXPERIMENT_QUEUE},
     "manager.tasks.run_daily_reconciliation": {"queue": EXPERIMENT_QUEUE},
+    "manager.tasks.compute_model_explainability": {"queue": EXPLAINABILITY_QUEUE},
 }
 
 _evolution_engine = EvolutionEngine(knowledge_service=KnowledgeBaseService())
@@ -31,9 +41,71 @@ _evolution_engine = EvolutionEngine(knowledge_service=KnowledgeBaseService())
 
 @celery_app.task(name="manager.tasks.run_experiment_cycle_task", bind=True)
 def run_experiment_cycle_task(self, request_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue one cycle of variants and fan out a task per queue item.
+
+    The leaderboard is rebuilt by a chord callback once every item task has returned.
+    """
+    request = ExperimentRequest.from_dict(request_payload or {})
+    admission = queue_experiment_cycle(request)
+    queue_docs = admission.queued
+    if request.queue_only:
+        return {"queued": len(queue_docs), "rejected": admission.rejected, "runs": []}
+    if not queue_docs:
+        return {
+            "queued": 0,
+            "completed": [],
+            "message": "queue_at_capacity",
+            "reason": admission.reason,
+            "retry_after": admission.retry_after,
+        }
+    payload = request.to_dict()
+    header = [run_queue_item_task.s(doc["_id"], payload) for doc in queue_docs]
+    result = chord(header)(finalize_experiment_cycle_task.s(payload))
+    return {
+        "queued": len(queue_docs),
+        "queue_ids": [doc["_id"] for doc in queue_docs],
+        "chord_id": result.id,
+    }
+
+
+# acks_late + reject_on_worker_lost redeliver the task if its worker dies mid-run. The
+# redelivery usually arrives while the dead worker's lease is still live, so the task
+# retries until the lease expires and then reclaims its own item.
+@celery_app.task(
+    name="manager.tasks.run_queue_item_task",
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=3,
+)
+def run_queue_item_task(self, queue_id: str, request_payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Claim and run the queue item this task was created for.
+
+    Tasks never steal other items, so a cycle's chord only reports its own items and no
+    item is left pending without a task. Returns ``None`` when the item already finished
+    or its lease never expired within the retry budget.
+    """
+    worker_id = f"{self.request.hostname or 'worker'}:{self.request.id}"
     request = ExperimentRequest.from_dict(request_payload or {})
-    summary = run_experiment_cycle(request)
-    return summary
+    result = run_claimed_experiment(request, worker_id, queue_id, steal=False)
+    if result is None:
+        remaining = lease_seconds_remaining(queue_id)
+        if remaining is not None and self.request.retries < self.max_retries:
+            raise self.retry(countdown=math.ceil(remaining) + 1)
+    return result
+
+
+@celery_app.task(name="manager.tasks.finalize_experiment_cycle_task", bind=True)
+def finalize_experiment_cycle_task(
+    self, results: List[Optional[Dict[str, Any]]], request_payload: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Rebuild the leaderboard and re-dispatch items whose worker died holding the lease."""
+    released = release_expired_queue_items()
+    for queue_id in released:
+        run_queue_item_task.apply_async((queue_id, request_payload or {}))
+    generate_leaderboard(limit=10)
+    completed = [result for result in results or [] if result]
+    return {"queued": len(results or []), "completed": completed, "released": len(released)}
 
 
 @celery_app.task(name="manager.tasks.run_autonomous_evolution", bind=True)
@@ -41,6 +113,13 @@ def run_autonomous_evolution(self) -> Dict[str, Any]:
     return _evolution_engine.run_cycle()
 
 
+@celery_app.task(name="manager.tasks.run_evolution_search", bind=True)
+def run_evolution_search(self, config_payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run a multi-generation NSGA-II search and persist its Pareto front."""
+    config = SearchConfig.from_dict(config_payload) if config_payload else None
+    return _evolution_engine.run_search(config)
+
+
 @celery_app.task(name="manager.tasks.run_daily_reconciliation", bind=True)
 def run_daily_reconciliation(self, modes: Any = None) -> Dict[str, Any]:
     """Run daily reconciliation report for trading settlement."""
@@ -48,3 +127,14 @@ def run_daily_reconciliation(self, modes: Any = None) -> Dict[str, Any]:
     report = settlement.reconciliation_report(modes=modes)
     return report
 
+
+
+@celery_app.task(name="manager.tasks.compute_model_explainability", bind=True)
+def compute_model_explainability(
+    self,
+    model_id: str,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    feature_perturbation: str = "tree_path_dependent",
+) -> Dict[str, Any]:
+    """Attach a SHAP summary to a registered model outside the training job."""
+    return run_shap_job(model_id, sample_size=sample_size, feature_perturbation=feature_perturbation)
@@ -0,0 +1,259 @@
+"""On-disk cache of joined feature matrices and forward-return targets for model training."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.client import get_feature_df, get_ohlcv_df
+from features.precision import feature_dtype
+
+MANIFEST_NAME = "manifest.json"
+# Trailing cached bars re-read on every refresh: ingestion upserts the still-open candle,
+# so the last stored bars can change after they were first cached.
+REFRESH_OVERLAP_BARS = 2
+
+
+def _cache_root() -> Path:
+    return Path(os.getenv("TRAINING_CACHE_DIR", "data/training_cache"))
+
+
+def _dataset_key(symbol: str, interval: str) -> str:
+    return f"{symbol.replace('/', '-')}_{interval}"
+
+
+def forward_returns(close: np.ndarray, lookaheads: Sequence[int]) -> np.ndarray:
+    """Return a ``rows x len(lookaheads)`` float32 matrix of ``close[t+k] / close[t] - 1``."""
+    close = np.asarray(close, dtype=np.float64)
+    targets = np.full((len(close), len(lookaheads)), np.nan, dtype=np.float32)
+    for col, lookahead in enumerate(lookaheads):
+        if 0 < lookahead < len(close):
+            targets[:-lookahead, col] = close[lookahead:] / close[:-lookahead] - 1.0
+    return targets
+
+
+@dataclass
+class TrainingDataset:
+    """Memory-mapped view over one cached (symbol, interval) dataset version."""
+
+    symbol: str
+    interval: str
+    timestamps: np.ndarray
+    features: np.ndarray
+    close: np.ndarray
+    targets: np.ndarray
+    columns: List[str]
+    lookaheads: List[int]
+    watermark: Optional[str] = None
+    path: Optional[Path] = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def frame(self, lookahead: int) -> Tuple[pd.DataFrame, pd.Series]:
+        """Return ``(X, y)`` for ``lookahead`` with incomplete rows dropped."""
+        if lookahead in self.lookaheads:
+            target = np.asarray(self.targets[:, self.lookaheads.index(lookahead)])
+        else:
+            target = forward_returns(self.close, [lookahead])[:, 0]
+        features = np.asarray(self.features)
+        mask = ~np.isnan(target)
+        if features.size:
+            mask &= ~np.isnan(features).any(axis=1)
+        index = pd.DatetimeIndex(self.timestamps[mask], name="timestamp")
+        X = pd.DataFrame(features[mask], index=index, columns=self.columns)
+        y = pd.Series(target[mask], index=index, name="target")
+        return X, y
+
+
+@dataclass
+class TrainingDatasetCache:
+    """Stores NumPy arrays per (symbol, interval, data watermark) and appends new bars.
+
+    Features are kept in the configured ``FEATURE_FLOAT_DTYPE`` so cached and direct training
+    see the same precision; a cache written under another dtype is rebuilt.
+    """
+
+    root: Path = field(default_factory=_cache_root)
+    keep_versions: int = 2
+
+    def _dataset_dir(self, symbol: str, interval: str) -> Path:
+        return Path(self.root) / _dataset_key(symbol, interval)
+
+    def _read_manifest(self, symbol: str, interval: str) -> Optional[Dict]:
+        path = self._dataset_dir(symbol, interval) / MANIFEST_NAME
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def load(self, symbol: str, interval: str) -> Optional[TrainingDataset]:
+        manifest = self._read_manifest(symbol, interval)
+        if not manifest:
+            return None
+        version_dir = self._dataset_dir(symbol, interval) / manifest["version"]
+        try:
+            arrays = {
+                name: np.load(version_dir / f"{name}.npy", mmap_mode="r")
+                for name in ("timestamps", "features", "close", "targets")
+            }
+        except (OSError, ValueError):
+            return None
+        return TrainingDataset(
+            symbol=symbol,
+            interval=interval,
+            columns=list(manifest["columns"]),
+            lookaheads=[int(value) for value in manifest["lookaheads"]],
+            watermark=manifest.get("watermark"),
+            path=version_dir,
+            **arrays,
+        )
+
+    def refresh(
+        self,
+        symbol: str,
+        interval: str,
+        lookaheads: Sequence[int],
+        *,
+        rebuild: bool = False,
+    ) -> TrainingDataset:
+        """Append bars newer than the cached watermark and return the current dataset.
+
+        The last ``REFRESH_OVERLAP_BARS`` cached bars are re-read and overwritten so a candle
+        cached while still open picks up its final close and features.
+        """
+        lookaheads = sorted({int(value) for value in lookaheads})
+        dtype = feature_dtype()
+        cached = None if rebuild else self.load(symbol, interval)
+        if cached is not None and cached.features.dtype != dtype:
+            cached = None
+        keep = 0
+        since = None
+        if cached is not None and len(cached):
+            keep = max(len(cached) - REFRESH_OVERLAP_BARS, 0)
+            # Bars are read with ``timestamp > since``, so anchor on the last bar that is kept.
+            since = pd.Timestamp(cached.timestamps[keep - 1]).to_pydatetime() if keep else None
+
+        feature_df = get_feature_df(symbol, interval, since=since)
+        price_df = get_ohlcv_df(symbol, interval, since=since)
+        if feature_df.empty or price_df.empty:
+            if cached is not None and len(cached):
+                if set(lookaheads) <= set(cached.lookaheads):
+                    return cached
+                return self._write(cached, cached.timestamps, cached.features, cached.close, cached.columns, lookaheads)
+            raise RuntimeError(
+                f"Missing data: features ({len(feature_df)}) or prices ({len(price_df)}) for {symbol} {interval}"
+            )
+
+        merged = feature_df.join(price_df["close"], how="inner").sort_index()
+        columns = [col for col in merged.columns if col not in {"close", "target"}]
+        if cached is not None and columns != cached.columns:
+            return self.refresh(symbol, interval, lookaheads, rebuild=True)
+
+        new_timestamps = pd.DatetimeIndex(merged.index).to_numpy(dtype="datetime64[ns]")
+        new_features = merged[columns].to_numpy(dtype=dtype)
+        new_close = merged["close"].to_numpy(dtype=np.float64)
+        if cached is not None:
+            if self._unchanged(cached, keep, new_timestamps, new_features, new_close):
+                if set(lookaheads) <= set(cached.lookaheads):
+                    return cached
+                return self._write(cached, cached.timestamps, cached.features, cached.close, cached.columns, lookaheads)
+            new_timestamps = np.concatenate([cached.timestamps[:keep], new_timestamps])
+            new_features = np.concatenate([cached.features[:keep], new_features])
+            new_close = np.concatenate([cached.close[:keep], new_close])
+        template = cached or TrainingDataset(
+            symbol=symbol,
+            interval=interval,
+            timestamps=new_timestamps,
+            features=new_features,
+            close=new_close,
+            targets=np.empty((0, 0), dtype=np.float32),
+            columns=columns,
+            lookaheads=lookaheads,
+        )
+        merged_lookaheads = sorted(set(lookaheads) | set(template.lookaheads))
+        return self._write(template, new_timestamps, new_features, new_close, columns, merged_lookaheads)
+
+    @staticmethod
+    def _unchanged(
+        cached: TrainingDataset,
+        keep: int,
+        timestamps: np.ndarray,
+        features: np.ndarray,
+        close: np.ndarray,
+    ) -> bool:
+        """Whether the re-read tail equals the cached one, i.e. there is nothing to rewrite."""
+        tail = slice(keep, None)
+        return (
+            len(timestamps) == len(cached) - keep
+            and np.array_equal(timestamps, cached.timestamps[tail])
+            and np.array_equal(features, cached.features[tail], equal_nan=True)
+            and np.array_equal(close, cached.close[tail])
+        )
+
+    def _write(
+        self,
+        template: TrainingDataset,
+        timestamps: np.ndarray,
+        features: np.ndarray,
+        close: np.ndarray,
+        columns: List[str],
+        lookaheads: List[int],
+    ) -> TrainingDataset:
+        dataset_dir = self._dataset_dir(template.symbol, template.interval)
+        watermark = pd.Timestamp(timestamps[-1]).to_pydatetime().isoformat()
+        version = f"v{pd.Timestamp(timestamps[-1]).strftime('%Y%m%d%H%M%S')}_{len(timestamps)}"
+        staging = dataset_dir / f".{version}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True, exist_ok=True)
+        np.save(staging / "timestamps.npy", np.asarray(timestamps, dtype="datetime64[ns]"))
+        np.save(staging / "features.npy", np.asarray(features, dtype=feature_dtype()))
+        np.save(staging / "close.npy", np.asarray(close, dtype=np.float64))
+        np.save(staging / "targets.npy", forward_returns(close, lookaheads))
+
+        version_dir = dataset_dir / version
+        shutil.rmtree(version_dir, ignore_errors=True)
+        staging.rename(version_dir)
+        manifest = {
+            "symbol": template.symbol,
+            "interval": template.interval,
+            "version": version,
+            "watermark": watermark,
+            "columns": columns,
+            "lookaheads": lookaheads,
+            "rows": int(len(timestamps)),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        manifest_tmp = dataset_dir / f"{MANIFEST_NAME}.tmp"
+        manifest_tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(manifest_tmp, dataset_dir / MANIFEST_NAME)
+        self._prune(dataset_dir, keep=version)
+
+        loaded = self.load(template.symbol, template.interval)
+        if loaded is None:  # pragma: no cover - only when the filesystem misbehaves
+            raise RuntimeError(f"Failed to reload cached dataset {dataset_dir / version}")
+        return loaded
+
+    def _prune(self, dataset_dir: Path, keep: str) -> None:
+        versions = sorted(
+            (path for path in dataset_dir.iterdir() if path.is_dir() and path.name.startswith("v")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        stale = [path for path in versions if path.name != keep][: max(len(versions) - self.keep_versions, 0)]
+        for path in stale:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def invalidate(self, symbol: str, interval: str) -> None:
+        shutil.rmtree(self._dataset_dir(symbol, interval), ignore_errors=True)
+
+
+TRAINING_DATASET_CACHE = TrainingDatasetCache()
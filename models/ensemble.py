@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 from db.client import get_feature_row
-from models import model_utils, registry
+from features.precision import cast_features, max_prediction_deviation
+from models import membership, model_utils, registry
 
 HORIZON_INTERVAL_MAP = {
     "1m": "1m",
@@ -25,6 +26,8 @@ class EnsembleError(RuntimeError):
 
 
 MODEL_CACHE: Dict[str, object] = {}
+# Active-set version last seen per (symbol, horizon), with the model ids it serves.
+_SERVING_SETS: Dict[Tuple[str, str], Tuple[str, FrozenSet[str]]] = {}
 
 
 def _load_model(model_id: str):
@@ -35,7 +38,12 @@ def _load_model(model_id: str):
     return model
 
 
-def _load_feature_vector(symbol: str, horizon: str, timestamp: datetime) -> pd.DataFrame:
+def _load_feature_vector(
+    symbol: str,
+    horizon: str,
+    timestamp: datetime,
+    dtype: Optional[np.dtype] = None,
+) -> pd.DataFrame:
     interval = HORIZON_INTERVAL_MAP.get(horizon)
     if not interval:
         raise EnsembleError(f"Unsupported horizon {horizon}")
@@ -45,13 +53,31 @@ def _load_feature_vector(symbol: str, horizon: str, timestamp: datetime) -> pd.D
         raise EnsembleError(f"No features found for {symbol} {interval} at or before {timestamp}")
 
     frame = pd.DataFrame([feature_row])
-    return frame.set_index("timestamp")
+    return cast_features(frame.set_index("timestamp"), dtype)
+
+
+def _sync_model_cache(symbol: str, horizon: str, models: List[Dict]) -> None:
+    """Evict cached models that no longer serve any (symbol, horizon).
+
+    Membership is recomputed by training jobs and workers, so each serving process notices
+    a new active set here, when it reads one, rather than being told.
+    """
+    model_ids = frozenset(str(doc["model_id"]) for doc in models if doc.get("model_id"))
+    version = membership.membership_version(model_ids)
+    previous = _SERVING_SETS.get((symbol, horizon))
+    if previous and previous[0] == version:
+        return
+    _SERVING_SETS[(symbol, horizon)] = (version, model_ids)
+    serving = frozenset().union(*(ids for _, ids in list(_SERVING_SETS.values())))
+    for model_id in [key for key in list(MODEL_CACHE) if key not in serving]:
+        MODEL_CACHE.pop(model_id, None)
 
 
 def _load_candidate_models(symbol: str, horizon: str) -> List[Dict]:
-    models = registry.list_models(symbol=symbol, horizon=horizon)
+    models = membership.active_members(symbol, horizon) or registry.active_models(symbol, horizon)
     if not models:
         raise EnsembleError(f"No models registered for {symbol} {horizon}")
+    _sync_model_cache(symbol, horizon, models)
     return models
 
 
@@ -125,3 +151,44 @@ def ensemble_predict(symbol: str, horizon: str, timestamp: datetime) -> Dict[str
         "models": breakdown,
     }
 
+
+
+def validate_float32_forecast(
+    symbol: str,
+    horizon: str,
+    timestamp: datetime,
+    tolerance: float = 1e-4,
+) -> Dict[str, object]:
+    """Compare float64 and float32 inference for every candidate model on one feature row."""
+    # Load at full precision whatever FEATURE_FLOAT_DTYPE says, or both sides would be float32.
+    feature_frame = _load_feature_vector(symbol, horizon, timestamp, np.float64)
+    models = _load_candidate_models(symbol, horizon)
+
+    checks: List[Dict[str, object]] = []
+    for doc in models:
+        model_id = doc.get("model_id")
+        if not model_id:
+            continue
+        try:
+            model = _load_model(model_id)
+        except FileNotFoundError:
+            continue
+        available_cols = [col for col in doc.get("feature_columns", []) if col in feature_frame.columns]
+        if not available_cols:
+            continue
+        deviation = max_prediction_deviation(model, feature_frame[available_cols].fillna(0))
+        checks.append({"model_id": model_id, "deviation": deviation, "within_tolerance": deviation <= tolerance})
+
+    if not checks:
+        raise EnsembleError(f"No usable models found for {symbol} {horizon}")
+
+    max_deviation = max(float(item["deviation"]) for item in checks)
+    return {
+        "symbol": symbol,
+        "horizon": horizon,
+        "timestamp": feature_frame.index[-1].to_pydatetime(),
+        "tolerance": tolerance,
+        "max_deviation": max_deviation,
+        "within_tolerance": max_deviation <= tolerance,
+        "models": checks,
+    }
@@ -0,0 +1,203 @@
+"""SHAP explainability jobs that run after a model has been registered."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from models import model_utils, registry
+from reports.evaluation_dashboard import generate_dashboard
+
+try:  # pragma: no cover - optional dependency
+    import shap  # type: ignore
+
+    HAS_SHAP = True
+except ImportError:  # pragma: no cover
+    HAS_SHAP = False
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_DIR = Path("reports/model_eval")
+DEFAULT_SAMPLE_SIZE = int(os.getenv("SHAP_SAMPLE_SIZE", "200"))
+DEFAULT_BACKGROUND_SIZE = int(os.getenv("SHAP_BACKGROUND_SIZE", "100"))
+# Rows per worker below which process fan-out costs more than it saves.
+MIN_ROWS_PER_CHUNK = 25
+PERTURBATION_MODES = {"tree_path_dependent", "interventional"}
+
+
+def _explainer(model: object, feature_perturbation: str, background: Optional[pd.DataFrame]):
+    if feature_perturbation == "interventional" and background is not None and not background.empty:
+        return shap.TreeExplainer(model, data=background, feature_perturbation="interventional")
+    return shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+
+
+def _shap_chunk(
+    model: object,
+    chunk: pd.DataFrame,
+    feature_perturbation: str,
+    background: Optional[pd.DataFrame],
+) -> np.ndarray:
+    explainer = _explainer(model, feature_perturbation, background)
+    shap_values = explainer.shap_values(chunk, check_additivity=False)
+    if isinstance(shap_values, list):
+        shap_array = np.asarray(shap_values[0])
+    else:
+        shap_array = np.asarray(shap_values)
+    if shap_array.ndim == 3:
+        shap_array = shap_array.mean(axis=0)
+    return shap_array
+
+
+def compute_shap_summary(
+    model: object,
+    sample: pd.DataFrame,
+    feature_columns: list[str],
+    *,
+    feature_perturbation: str = "tree_path_dependent",
+    background: Optional[pd.DataFrame] = None,
+    n_jobs: int = 1,
+) -> list[Dict[str, float]]:
+    if not HAS_SHAP or sample.empty:
+        return []
+    if feature_perturbation not in PERTURBATION_MODES:
+        raise ValueError(f"Unknown feature_perturbation {feature_perturbation}")
+
+    chunk_count = 1
+    if n_jobs != 1:
+        workers = (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+        chunk_count = max(1, min(workers, len(sample) // MIN_ROWS_PER_CHUNK))
+    # Errors propagate so ``run_shap_job`` records the job as failed rather than empty.
+    if chunk_count == 1:
+        shap_array = _shap_chunk(model, sample, feature_perturbation, background)
+    else:
+        bounds = np.array_split(np.arange(len(sample)), chunk_count)
+        parts = Parallel(n_jobs=chunk_count)(
+            delayed(_shap_chunk)(model, sample.iloc[idx], feature_perturbation, background) for idx in bounds
+        )
+        shap_array = np.concatenate(parts, axis=0)
+
+    if shap_array.ndim != 2 or shap_array.shape[1] != len(feature_columns):
+        raise ValueError(
+            f"SHAP values have shape {shap_array.shape}; expected (rows, {len(feature_columns)})"
+        )
+
+    mean_abs = np.mean(np.abs(shap_array), axis=0)
+    ranked_idx = np.argsort(mean_abs)[::-1]
+    top_idx = ranked_idx[: min(len(feature_columns), 20)]
+    return [
+        {"feature": feature_columns[idx], "importance": float(mean_abs[idx])}
+        for idx in top_idx
+    ]
+
+
+def shap_artifact_path(model_id: str) -> Path:
+    return OUTPUT_DIR / f"{model_id}_shap_summary.json"
+
+
+def load_cached_summary(model_id: str) -> Optional[List[Dict[str, float]]]:
+    path = shap_artifact_path(model_id)
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    features = payload.get("features")
+    return features if isinstance(features, list) else None
+
+
+def _explanation_rows(doc: Dict[str, Any], sample_size: int, background_size: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Imported lazily: train_horizon imports this module to schedule jobs.
+    from models.train_horizon import build_dataset
+
+    X, _ = build_dataset(doc["symbol"], doc["horizon"], None)
+    feature_columns = doc.get("feature_columns") or list(X.columns)
+    X = X[[col for col in feature_columns if col in X.columns]].fillna(0)
+    train_end = doc.get("train_end")
+    held_out = X.loc[X.index > pd.Timestamp(train_end)] if train_end else X
+    if held_out.empty:
+        held_out = X
+    seen = X.loc[X.index <= pd.Timestamp(train_end)] if train_end else X
+    sample = held_out.sample(n=sample_size, random_state=42) if len(held_out) > sample_size else held_out
+    background = seen.sample(n=background_size, random_state=7) if len(seen) > background_size else seen
+    return sample, background
+
+
+def run_shap_job(
+    model_identifier: str,
+    *,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    feature_perturbation: str = "tree_path_dependent",
+    background_size: int = DEFAULT_BACKGROUND_SIZE,
+    n_jobs: int = -1,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """Compute (or reuse) the SHAP summary for a registered model and attach it to the registry."""
+    doc = registry.get_model(model_identifier)
+    if not doc:
+        raise KeyError(f"Model {model_identifier} not found in registry")
+    model_id = doc["model_id"]
+
+    summary = None if force else load_cached_summary(model_id)
+    cached = summary is not None
+    if summary is None:
+        registry.update_model(model_id, {"explainability_status": "running"})
+        try:
+            model = model_utils.load_model(model_id)
+            sample, background = _explanation_rows(doc, sample_size, background_size)
+            summary = compute_shap_summary(
+                model,
+                sample,
+                list(sample.columns),
+                feature_perturbation=feature_perturbation,
+                background=background,
+                n_jobs=n_jobs,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("SHAP job failed for %s: %s", model_id, exc)
+            registry.update_model(model_id, {"explainability_status": "failed", "explainability_error": str(exc)})
+            return {"model_id": model_id, "status": "failed", "error": str(exc)}
+        if summary:
+            OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+            shap_artifact_path(model_id).write_text(json.dumps({"features": summary}, indent=2, default=float))
+
+    updates: Dict[str, Any] = {
+        "explainability_status": "completed" if summary else "empty",
+        "explainability_completed_at": datetime.utcnow(),
+        "explainability": {
+            "sample_size": sample_size,
+            "feature_perturbation": feature_perturbation,
+            "cached": cached,
+        },
+    }
+    if summary:
+        updates["shap_summary_artifact"] = str(shap_artifact_path(model_id))
+        updates["shap_summary_top_features"] = summary
+        if doc.get("evaluation_dashboard"):
+            dashboard_path = generate_dashboard(doc, doc.get("metrics", {}), summary, doc.get("evaluation_artifact"))
+            updates["evaluation_dashboard"] = str(dashboard_path)
+    registry.update_model(model_id, updates)
+    return {"model_id": model_id, "status": updates["explainability_status"], "cached": cached, "features": summary or []}
+
+
+def schedule_shap_job(model_id: str, *, sample_size: int = DEFAULT_SAMPLE_SIZE, feature_perturbation: str = "tree_path_dependent") -> bool:
+    """Queue the SHAP job on Celery; returns False when no broker is reachable."""
+    try:
+        from manager.tasks import compute_model_explainability
+
+        compute_model_explainability.delay(
+            model_id,
+            sample_size=sample_size,
+            feature_perturbation=feature_perturbation,
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not queue SHAP job for %s: %s", model_id, exc)
+        return False
+    return True
@@ -0,0 +1,286 @@
+"""Materialised ensemble forecasts, computed once per bar and served from a hot cache."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from redis import Redis
+from redis.exceptions import RedisError
+
+from db.client import get_database_name, get_feature_timestamp, mongo_client
+from models import membership
+from models.ensemble import HORIZON_INTERVAL_MAP, EnsembleError, ensemble_predict
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "forecasts"
+FORECAST_FIELDS = ("symbol", "horizon", "timestamp", "predicted_return", "confidence", "models", "version")
+# Unique index from before forecasts were keyed by active-set version.
+_LEGACY_INDEX = "symbol_1_horizon_1_timestamp_-1"
+# How long a process trusts its last read of an active-set version; bounds how long a
+# forecast from a superseded ensemble can still be served after membership changes.
+VERSION_TTL_SECONDS = 30.0
+
+_INDEXES_READY = False
+_ACTIVE_VERSIONS: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
+
+def _redis_url() -> str:
+    return os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def _ensure_indexes() -> None:
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        forecasts = db[COLLECTION_NAME]
+        if _LEGACY_INDEX in forecasts.index_information():
+            forecasts.drop_index(_LEGACY_INDEX)
+        forecasts.create_index(
+            [("symbol", ASCENDING), ("horizon", ASCENDING), ("timestamp", DESCENDING), ("version", ASCENDING)],
+            unique=True,
+        )
+    _INDEXES_READY = True
+
+
+def active_version(symbol: str, horizon: str) -> str:
+    """Current ensemble active-set version for ``(symbol, horizon)``, memoised briefly."""
+    key = (symbol, horizon)
+    now = time.monotonic()
+    cached = _ACTIVE_VERSIONS.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    version = membership.active_version(symbol, horizon)
+    _ACTIVE_VERSIONS[key] = (now + VERSION_TTL_SECONDS, version)
+    return version
+
+
+def _compact(result: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {key: result[key] for key in FORECAST_FIELDS if key in result}
+    payload["models"] = [
+        {"model_id": item.get("model_id"), "prediction": item.get("prediction"), "weight": item.get("weight")}
+        for item in result.get("models", [])
+    ]
+    return payload
+
+
+@dataclass
+class ForecastHotCache:
+    """Latest forecast per (symbol, horizon), in process memory and mirrored to Redis."""
+
+    namespace: str = "cryptotrader:forecasts"
+    ttl_seconds: int = 86_400
+    _local: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    _client: Optional[Redis] = None
+
+    def _client_or_none(self) -> Optional[Redis]:
+        if self._client is not None:
+            return self._client
+        try:
+            self._client = Redis.from_url(_redis_url(), decode_responses=False)
+        except RedisError:
+            self._client = None
+        return self._client
+
+    def _key(self, symbol: str, horizon: str) -> str:
+        return f"{self.namespace}:{symbol}:{horizon}"
+
+    def get(self, symbol: str, horizon: str) -> Optional[Dict[str, Any]]:
+        local = self._local.get((symbol, horizon))
+        if local is not None:
+            return local
+        client = self._client_or_none()
+        if client is None:
+            return None
+        try:
+            payload = client.get(self._key(symbol, horizon))
+        except RedisError:
+            return None
+        if not payload:
+            return None
+        try:
+            result = json.loads(payload)
+            result["timestamp"] = datetime.fromisoformat(result["timestamp"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        self._local[(symbol, horizon)] = result
+        return result
+
+    def set(self, result: Dict[str, Any]) -> None:
+        key = (result["symbol"], result["horizon"])
+        current = self._local.get(key)
+        if current is not None and current["timestamp"] > result["timestamp"]:
+            return
+        self._local[key] = result
+        client = self._client_or_none()
+        if client is None:
+            return
+        try:
+            payload = json.dumps({**result, "timestamp": result["timestamp"].isoformat()}, default=str)
+            client.set(self._key(*key), payload, ex=self.ttl_seconds)
+        except RedisError:
+            return
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+HOT_FORECASTS = ForecastHotCache()
+
+
+def store_forecasts(results: Iterable[Dict[str, Any]], version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Upsert ensemble results into ``forecasts`` with one ``bulk_write``.
+
+    Forecasts are keyed by the active-set ``version`` they were computed under (the current
+    one when omitted), so a membership change makes earlier ones unservable. Only the newest
+    result per ``(symbol, horizon)`` is pushed to the hot cache.
+    """
+    payloads: List[Dict[str, Any]] = []
+    for result in results:
+        payload = _compact(result)
+        payload["version"] = version or active_version(payload["symbol"], payload["horizon"])
+        payloads.append(payload)
+    if not payloads:
+        return []
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {
+                "symbol": payload["symbol"],
+                "horizon": payload["horizon"],
+                "timestamp": payload["timestamp"],
+                "version": payload["version"],
+            },
+            {"$set": {**payload, "computed_at": now}},
+            upsert=True,
+        )
+        for payload in payloads
+    ]
+    _ensure_indexes()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[COLLECTION_NAME].bulk_write(operations, ordered=False)
+    newest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for payload in payloads:
+        key = (payload["symbol"], payload["horizon"])
+        if key not in newest or payload["timestamp"] > newest[key]["timestamp"]:
+            newest[key] = payload
+    for payload in newest.values():
+        HOT_FORECASTS.set(payload)
+    return payloads
+
+
+def store_forecast(result: Dict[str, Any], version: Optional[str] = None) -> Dict[str, Any]:
+    """Upsert one ensemble result into ``forecasts`` and the hot cache."""
+    return store_forecasts([result], version)[0]
+
+
+def _stored_forecast(symbol: str, horizon: str, bar_timestamp: datetime, version: str) -> Optional[Dict[str, Any]]:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db[COLLECTION_NAME].find_one(
+            {"symbol": symbol, "horizon": horizon, "timestamp": bar_timestamp, "version": version},
+            {"_id": 0, "computed_at": 0},
+        )
+    return doc
+
+
+def load_forecasts(
+    symbol: str,
+    horizon: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    version: Optional[str] = None,
+) -> Dict[datetime, Dict[str, Any]]:
+    """Stored forecasts in ``[start, end]`` keyed by bar timestamp, fetched in one query.
+
+    Only forecasts of the given (default: current) active-set version are returned.
+    """
+    query: Dict[str, Any] = {
+        "symbol": symbol,
+        "horizon": horizon,
+        "version": version or active_version(symbol, horizon),
+    }
+    window: Dict[str, datetime] = {}
+    if start is not None:
+        window["$gte"] = start
+    if end is not None:
+        window["$lte"] = end
+    if window:
+        query["timestamp"] = window
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        cursor = db[COLLECTION_NAME].find(query, {"_id": 0, "timestamp": 1, "predicted_return": 1, "confidence": 1})
+        return {doc["timestamp"]: doc for doc in cursor}
+
+
+def horizons_for_interval(interval: str) -> List[str]:
+    return [horizon for horizon, mapped in HORIZON_INTERVAL_MAP.items() if mapped == interval]
+
+
+def materialise_forecasts(
+    symbol: str,
+    interval: str,
+    horizons: Optional[Iterable[str]] = None,
+    *,
+    force: bool = False,
+) -> List[Dict[str, Any]]:
+    """Compute and store forecasts for the latest ``interval`` bar of ``symbol``.
+
+    Horizons whose forecast for that bar already exists under the current ensemble version
+    are skipped unless ``force`` is set.
+    """
+    bar_timestamp = get_feature_timestamp(symbol, interval)
+    if bar_timestamp is None:
+        return []
+    stored: List[Dict[str, Any]] = []
+    for horizon in horizons or horizons_for_interval(interval):
+        version = active_version(symbol, horizon)
+        if not force:
+            hot = HOT_FORECASTS.get(symbol, horizon)
+            if hot is not None and hot["timestamp"] == bar_timestamp and hot.get("version") == version:
+                continue
+        try:
+            result = ensemble_predict(symbol, horizon, bar_timestamp)
+        except EnsembleError as exc:
+            logger.info("No forecast materialised for %s %s: %s", symbol, horizon, exc)
+            continue
+        stored.append(store_forecast(result, version))
+    return stored
+
+
+def get_forecast(symbol: str, horizon: str, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """Forecast for the bar at or before ``timestamp`` (latest bar when omitted).
+
+    Served from the hot cache or the ``forecasts`` collection when computed under the current
+    ensemble version; anything else (historical bars never materialised, or forecasts from
+    before a membership change) is computed on demand and written through. The version is
+    resolved once per call, and a lookup for exactly the hot bar issues no queries at all.
+    """
+    interval = HORIZON_INTERVAL_MAP.get(horizon)
+    if not interval:
+        raise EnsembleError(f"Unsupported horizon {horizon}")
+
+    version = active_version(symbol, horizon)
+    hot = HOT_FORECASTS.get(symbol, horizon)
+    hot_current = hot is not None and hot.get("version") == version
+    if hot_current and timestamp is not None and hot["timestamp"] == timestamp:
+        return hot
+    bar_timestamp = get_feature_timestamp(symbol, interval, timestamp)
+    if bar_timestamp is None:
+        raise EnsembleError(f"No features found for {symbol} {interval} at or before {timestamp}")
+    if hot_current and hot["timestamp"] == bar_timestamp:
+        return hot
+    stored = _stored_forecast(symbol, horizon, bar_timestamp, version)
+    if stored:
+        HOT_FORECASTS.set(stored)
+        return stored
+    return store_forecast(ensemble_predict(symbol, horizon, bar_timestamp), version)
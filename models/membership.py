@@ -0,0 +1,205 @@
+"""Explicit ensemble membership per (symbol, horizon) so serving cost stays bounded."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.client import get_database_name, get_feature_df, mongo_client
+from features.precision import cast_features
+from models import model_utils, registry
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "models.ensembles"
+DEFAULT_MAX_MEMBERS = 5
+# Recent registry entries considered for membership; older ones are retired implicitly
+# unless they are in production.
+DEFAULT_POOL_SIZE = 20
+# Candidates whose validation predictions correlate above this with a member add nothing.
+DEFAULT_MAX_CORRELATION = 0.98
+# Number of newer models after which a model's recency weight halves.
+DEFAULT_RECENCY_HALF_LIFE = 5.0
+DEFAULT_VALIDATION_ROWS = 200
+
+_POOL_PROJECTION = {**registry.SERVING_PROJECTION, "train_end": 1}
+
+
+def _membership_id(symbol: str, horizon: str) -> str:
+    return f"{symbol}|{horizon}"
+
+
+def membership_version(member_ids: Sequence[str]) -> str:
+    """Order-independent identifier of an active set."""
+    return ",".join(sorted(member_ids)) or "none"
+
+
+def _rmse(doc: Mapping[str, Any]) -> Optional[float]:
+    value = ((doc.get("metrics") or {}).get("test") or {}).get("rmse")
+    return float(value) if value is not None and value > 0 else None
+
+
+def select_members(
+    docs: Sequence[Dict[str, Any]],
+    predictions: Mapping[str, np.ndarray],
+    *,
+    max_members: int = DEFAULT_MAX_MEMBERS,
+    max_correlation: float = DEFAULT_MAX_CORRELATION,
+    recency_half_life: float = DEFAULT_RECENCY_HALF_LIFE,
+) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """Rank ``docs`` (newest first) by rmse and recency and greedily keep diverse models.
+
+    Production models take the first of the ``max_members`` slots; the others are admitted
+    in score order unless their validation predictions nearly duplicate a model already
+    selected.
+    """
+    rmses = [value for value in (_rmse(doc) for doc in docs) if value is not None]
+    best_rmse = min(rmses) if rmses else None
+    scores: Dict[str, float] = {}
+    for rank, doc in enumerate(docs):
+        rmse = _rmse(doc)
+        accuracy = best_rmse / rmse if best_rmse and rmse else 0.5
+        scores[doc["model_id"]] = float(accuracy * 0.5 ** (rank / recency_half_life))
+
+    ordered = sorted(
+        docs,
+        key=lambda doc: (doc.get("status") != "production", -scores[doc["model_id"]]),
+    )
+    members: List[Dict[str, Any]] = []
+    for doc in ordered:
+        if len(members) >= max_members:
+            break
+        preds = predictions.get(doc["model_id"])
+        if doc.get("status") != "production" and preds is not None and np.std(preds) > 0:
+            redundant = False
+            for member in members:
+                other = predictions.get(member["model_id"])
+                if other is None or np.std(other) == 0:
+                    continue
+                if abs(float(np.corrcoef(preds, other)[0, 1])) > max_correlation:
+                    redundant = True
+                    break
+            if redundant:
+                continue
+        members.append(doc)
+    return members, scores
+
+
+def _validation_frame(symbol: str, horizon: str, docs: Sequence[Dict[str, Any]], rows: int) -> pd.DataFrame:
+    # Imported lazily: the ensemble module reads membership at serving time.
+    from models.ensemble import HORIZON_INTERVAL_MAP
+
+    interval = HORIZON_INTERVAL_MAP.get(horizon)
+    train_ends = [pd.Timestamp(doc["train_end"]) for doc in docs if doc.get("train_end")]
+    if not interval or not train_ends:
+        return pd.DataFrame()
+    # Bars after the newest training cut-off are out of sample for every candidate.
+    since = max(train_ends).to_pydatetime()
+    return cast_features(get_feature_df(symbol, interval, limit=rows, since=since))
+
+
+def _validation_predictions(docs: Sequence[Dict[str, Any]], frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    predictions: Dict[str, np.ndarray] = {}
+    if frame.empty:
+        return predictions
+    for doc in docs:
+        columns = doc.get("feature_columns") or []
+        if not columns or any(col not in frame.columns for col in columns):
+            continue
+        try:
+            model = model_utils.load_model(doc["model_id"])
+            predictions[doc["model_id"]] = np.asarray(model.predict(frame[columns].fillna(0)), dtype=np.float64)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Skipping validation predictions for %s: %s", doc["model_id"], exc)
+    return predictions
+
+
+def recompute_members(
+    symbol: str,
+    horizon: str,
+    *,
+    max_members: int = DEFAULT_MAX_MEMBERS,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_correlation: float = DEFAULT_MAX_CORRELATION,
+    validation_rows: int = DEFAULT_VALIDATION_ROWS,
+) -> Dict[str, Any]:
+    """Re-select the active set for ``(symbol, horizon)`` and persist it.
+
+    The pool is the ``pool_size`` most recent models plus every production model, however old.
+    Serving processes evict retired models from their caches when they next read the set.
+    """
+    recent = registry.list_models(symbol, horizon, limit=pool_size, projection=_POOL_PROJECTION)
+    production = registry.list_models(
+        symbol, horizon, limit=pool_size, status="production", projection=_POOL_PROJECTION
+    )
+    seen = {doc.get("model_id") for doc in recent}
+    docs = [
+        doc
+        for doc in recent + [doc for doc in production if doc.get("model_id") not in seen]
+        if doc.get("model_id") and doc.get("status") != "archived"
+    ]
+    try:
+        frame = _validation_frame(symbol, horizon, docs, validation_rows)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Validation window unavailable for %s %s: %s", symbol, horizon, exc)
+        frame = pd.DataFrame()
+    predictions = _validation_predictions(docs, frame)
+    members, scores = select_members(docs, predictions, max_members=max_members, max_correlation=max_correlation)
+
+    previous = get_membership(symbol, horizon) or {}
+    member_ids = [doc["model_id"] for doc in members]
+    retired = [model_id for model_id in previous.get("member_ids", []) if model_id not in member_ids]
+    document = {
+        "symbol": symbol,
+        "horizon": horizon,
+        "member_ids": member_ids,
+        "version": membership_version(member_ids),
+        "members": [
+            {key: value for key, value in doc.items() if key not in {"_id", "train_end"}} for doc in members
+        ],
+        "scores": {model_id: scores[model_id] for model_id in member_ids},
+        "retired": retired,
+        "validation_rows": int(len(frame)),
+        "updated_at": datetime.utcnow(),
+    }
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[COLLECTION_NAME].update_one(
+            {"_id": _membership_id(symbol, horizon)},
+            {"$set": document},
+            upsert=True,
+        )
+    return document
+
+
+def get_membership(symbol: str, horizon: str) -> Optional[Dict[str, Any]]:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        return db[COLLECTION_NAME].find_one({"_id": _membership_id(symbol, horizon)})
+
+
+def active_members(symbol: str, horizon: str) -> List[Dict[str, Any]]:
+    """Serving documents for the current active set, or ``[]`` when none was computed yet."""
+    doc = get_membership(symbol, horizon)
+    return list(doc.get("members") or []) if doc else []
+
+
+def active_version(symbol: str, horizon: str) -> str:
+    """Version of the set ``ensemble_predict`` serves: the membership, else the registry fallback."""
+    doc = get_membership(symbol, horizon)
+    if doc and doc.get("members"):
+        return doc.get("version") or membership_version(doc.get("member_ids") or [])
+    return membership_version([str(model["model_id"]) for model in registry.active_models(symbol, horizon)])
+
+
+def refresh_after_change(symbol: Optional[str], horizon: Optional[str]) -> None:
+    """Registry hook: recompute membership but never fail the registry write that triggered it."""
+    if not symbol or not horizon:
+        return
+    try:
+        recompute_members(symbol, horizon)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Ensemble membership refresh failed for %s %s: %s", symbol, horizon, exc)
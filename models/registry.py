@@ -5,57 +5,126 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
 from db.client import get_database_name, mongo_client
 
 COLLECTION_NAME = "models.registry"
+DEFAULT_ACTIVE_TOP_N = 5
+# Fields forecast serving needs; leaves out feature importance, SHAP summaries and lineage.
+SERVING_PROJECTION: Dict[str, int] = {
+    "model_id": 1,
+    "symbol": 1,
+    "horizon": 1,
+    "status": 1,
+    "algorithm": 1,
+    "trained_at": 1,
+    "feature_columns": 1,
+    "metrics.test.rmse": 1,
+}
+
+_INDEXES_READY = False
+
+
+def _ensure_indexes() -> None:
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        registry = db[COLLECTION_NAME]
+        registry.create_index(
+            [("symbol", ASCENDING), ("horizon", ASCENDING), ("status", ASCENDING), ("trained_at", DESCENDING)]
+        )
+        registry.create_index([("symbol", ASCENDING), ("horizon", ASCENDING), ("trained_at", DESCENDING)])
+        registry.create_index("model_id")
+    _INDEXES_READY = True
+
+
+def _refresh_membership(symbol: Optional[str], horizon: Optional[str]) -> None:
+    # Imported lazily: membership reads the registry through this module.
+    from models.membership import refresh_after_change
+
+    refresh_after_change(symbol, horizon)
 
 
-def record_model(entry: Dict[str, Any]) -> Dict[str, Any]:
-    """Insert a new model registry document and return the stored record."""
+def record_model(entry: Dict[str, Any], *, refresh_ensemble: bool = True) -> Dict[str, Any]:
+    """Insert a new model registry document and return the stored record.
+
+    The ensemble active set for the model's symbol/horizon is recomputed afterwards unless
+    ``refresh_ensemble`` is false.
+    """
     payload = entry.copy()
     payload.setdefault("trained_at", datetime.utcnow())
     payload.setdefault("status", "candidate")
 
+    _ensure_indexes()
     with mongo_client() as client:
         db = client[get_database_name()]
         inserted_id = db[COLLECTION_NAME].insert_one(payload).inserted_id
         payload["_id"] = inserted_id
-        return payload
+    if refresh_ensemble:
+        _refresh_membership(payload.get("symbol"), payload.get("horizon"))
+    return payload
 
 
 def list_models(
     symbol: Optional[str] = None,
     horizon: Optional[str] = None,
     limit: int = 100,
+    status: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
 ) -> List[Dict[str, Any]]:
     query: Dict[str, Any] = {}
     if symbol:
         query["symbol"] = symbol
     if horizon:
         query["horizon"] = horizon
+    if status:
+        query["status"] = status
 
+    _ensure_indexes()
     with mongo_client() as client:
         db = client[get_database_name()]
         cursor = (
             db[COLLECTION_NAME]
-            .find(query)
+            .find(query, projection)
             .sort("trained_at", -1)
             .limit(limit)
         )
         return list(cursor)
 
 
-def latest_model(symbol: str, horizon: str, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def latest_model(
+    symbol: str,
+    horizon: str,
+    status: Optional[str] = None,
+    algorithm: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
     query: Dict[str, Any] = {"symbol": symbol, "horizon": horizon}
     if status:
         query["status"] = status
+    if algorithm:
+        query["algorithm"] = algorithm
 
+    _ensure_indexes()
     with mongo_client() as client:
         db = client[get_database_name()]
         doc = db[COLLECTION_NAME].find_one(query, sort=[("trained_at", -1)])
         return doc
 
 
+def active_models(symbol: str, horizon: str, top_n: int = DEFAULT_ACTIVE_TOP_N) -> List[Dict[str, Any]]:
+    """Serving set for a horizon: production models, else the ``top_n`` most recent candidates.
+
+    Documents carry only ``SERVING_PROJECTION`` fields.
+    """
+    production = list_models(symbol, horizon, limit=top_n, status="production", projection=SERVING_PROJECTION)
+    if production:
+        return production
+    return list_models(symbol, horizon, limit=top_n, projection=SERVING_PROJECTION)
+
+
 def get_model(model_identifier) -> Optional[Dict[str, Any]]:
     with mongo_client() as client:
         db = client[get_database_name()]
@@ -67,9 +136,72 @@ def get_model(model_identifier) -> Optional[Dict[str, Any]]:
         return doc
 
 
-def update_model_status(model_id, status: str) -> None:
+def update_model(model_identifier, updates: Dict[str, Any]) -> None:
+    """Set ``updates`` on the registry document matched by ObjectId or model_id."""
+    if ObjectId.is_valid(str(model_identifier)):
+        query: Dict[str, Any] = {"_id": ObjectId(str(model_identifier))}
+    else:
+        query = {"model_id": model_identifier}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[COLLECTION_NAME].update_one(query, {"$set": updates})
+
+
+def update_model_status(model_id, status: str, *, refresh_ensemble: bool = True) -> None:
     oid = model_id if isinstance(model_id, ObjectId) else ObjectId(str(model_id))
     with mongo_client() as client:
         db = client[get_database_name()]
-        db[COLLECTION_NAME].update_one({"_id": oid}, {"$set": {"status": status}})
+        doc = db[COLLECTION_NAME].find_one_and_update(
+            {"_id": oid},
+            {"$set": {"status": status}},
+            projection={"symbol": 1, "horizon": 1},
+        )
+    if doc and refresh_ensemble:
+        _refresh_membership(doc.get("symbol"), doc.get("horizon"))
+
+
+def promote_model(model_id, *, refresh_ensemble: bool = True) -> List[str]:
+    """Make ``model_id`` the production model for its symbol, horizon and algorithm.
 
+    The production model it replaces goes back to ``candidate`` so production entries do not
+    pile up in the ensemble pool. Returns the demoted model ids.
+    """
+    oid = model_id if isinstance(model_id, ObjectId) else ObjectId(str(model_id))
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        registry = db[COLLECTION_NAME]
+        doc = registry.find_one_and_update(
+            {"_id": oid},
+            {"$set": {"status": "production"}},
+            projection={"symbol": 1, "horizon": 1, "algorithm": 1},
+        )
+        if not doc:
+            return []
+        previous = {
+            "_id": {"$ne": oid},
+            "symbol": doc.get("symbol"),
+            "horizon": doc.get("horizon"),
+            "algorithm": doc.get("algorithm"),
+            "status": "production",
+        }
+        demoted = [item["model_id"] for item in registry.find(previous, {"model_id": 1})]
+        registry.update_many(previous, {"$set": {"status": "candidate", "demoted_at": datetime.utcnow()}})
+    if refresh_ensemble:
+        _refresh_membership(doc.get("symbol"), doc.get("horizon"))
+    return demoted
+
+
+def model_lineage(model_identifier) -> List[Dict[str, Any]]:
+    """Return the chain of registry documents a warm-started model was built from, oldest first."""
+    doc = get_model(model_identifier)
+    if not doc:
+        return []
+    ancestor_ids = list(doc.get("lineage") or [])
+    if not ancestor_ids:
+        return [doc]
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        ancestors = {item["model_id"]: item for item in db[COLLECTION_NAME].find({"model_id": {"$in": ancestor_ids}})}
+    chain = [ancestors[model_id] for model_id in ancestor_ids if model_id in ancestors]
+    chain.append(doc)
+    return chain
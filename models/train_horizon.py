@@ -5,15 +5,19 @@ import argparse
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
 from db.client import get_feature_df, get_ohlcv_df
+from features.precision import cast_features
 from models import model_utils, registry
+from models.dataset_cache import TRAINING_DATASET_CACHE
+from models.explainability import DEFAULT_SAMPLE_SIZE, run_shap_job, schedule_shap_job
 from reports.evaluation_dashboard import generate_dashboard
 
 try:
@@ -23,12 +27,6 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     HAS_LIGHTGBM = False
 
-try:  # pragma: no cover - optional dependency
-    import shap  # type: ignore
-
-    HAS_SHAP = True
-except ImportError:  # pragma: no cover
-    HAS_SHAP = False
 
 
 DEFAULT_CONFIG: Dict[str, Dict[str, int | str]] = {
@@ -40,8 +38,39 @@ DEFAULT_CONFIG: Dict[str, Dict[str, int | str]] = {
     "1d": {"lookahead": 1, "interval": "1d"},
 }
 
+ALGORITHM_NAMES = {"rf": "RandomForestRegressor", "lgbm": "LightGBMRegressor"}
+
+RF_PARAMS: Dict[str, Any] = {
+    "n_estimators": 400,
+    "max_depth": 12,
+    "min_samples_leaf": 4,
+    "random_state": 42,
+    "n_jobs": -1,
+}
+
+# Incremental runs keep at most this many trees, dropping the oldest, so model size and
+# inference latency stay bounded however many increments a forest goes through.
+MAX_WARM_START_TREES = 1000
+
+LGBM_PARAMS: Dict[str, Any] = {
+    "objective": "regression",
+    "metric": "rmse",
+    "learning_rate": 0.03,
+    "num_leaves": 64,
+    "feature_fraction": 0.8,
+    "bagging_fraction": 0.8,
+    "bagging_freq": 5,
+    "verbose": -1,
+}
+
 
-def build_dataset(symbol: str, horizon: str, train_window_days: int | None) -> Tuple[pd.DataFrame, pd.Series]:
+def build_dataset(
+    symbol: str,
+    horizon: str,
+    train_window_days: int | None,
+    *,
+    use_cache: bool = True,
+) -> Tuple[pd.DataFrame, pd.Series]:
     if horizon not in DEFAULT_CONFIG:
         raise KeyError(f"Unsupported horizon {horizon}. Known horizons: {', '.join(DEFAULT_CONFIG.keys())}")
 
@@ -49,24 +78,33 @@ def build_dataset(symbol: str, horizon: str, train_window_days: int | None) -> T
     interval = cfg["interval"]
     lookahead = int(cfg["lookahead"])
 
-    feature_df = get_feature_df(symbol, interval)
-    price_df = get_ohlcv_df(symbol, interval)
+    if use_cache:
+        # Materialise every lookahead for the interval at once so sibling horizons reuse the same files.
+        lookaheads = [int(item["lookahead"]) for item in DEFAULT_CONFIG.values() if item["interval"] == interval]
+        dataset = TRAINING_DATASET_CACHE.refresh(symbol, interval, lookaheads)
+        X, y = dataset.frame(lookahead)
+    else:
+        feature_df = get_feature_df(symbol, interval)
+        price_df = get_ohlcv_df(symbol, interval)
+
+        if feature_df.empty or price_df.empty:
+            raise RuntimeError(f"Missing data: features ({len(feature_df)}) or prices ({len(price_df)}) for {symbol} {interval}")
 
-    if feature_df.empty or price_df.empty:
-        raise RuntimeError(f"Missing data: features ({len(feature_df)}) or prices ({len(price_df)}) for {symbol} {interval}")
+        merged = feature_df.join(price_df["close"], how="inner")
+        merged.sort_index(inplace=True)
+        merged["target"] = (merged["close"].shift(-lookahead) / merged["close"]) - 1.0
+        merged.dropna(inplace=True)
 
-    merged = feature_df.join(price_df["close"], how="inner")
-    merged.sort_index(inplace=True)
-    merged["target"] = (merged["close"].shift(-lookahead) / merged["close"]) - 1.0
-    merged.dropna(inplace=True)
+        feature_cols = [col for col in merged.columns if col not in {"close", "target"}]
+        X = cast_features(merged[feature_cols])
+        y = merged["target"]
 
-    if train_window_days:
-        cutoff = merged.index.max() - pd.Timedelta(days=train_window_days)
-        merged = merged.loc[merged.index >= cutoff]
+    if train_window_days and not X.empty:
+        cutoff = X.index.max() - pd.Timedelta(days=train_window_days)
+        keep = X.index >= cutoff
+        X = X.loc[keep]
+        y = y.loc[keep]
 
-    feature_cols = [col for col in merged.columns if col not in {"close", "target"}]
-    X = merged[feature_cols]
-    y = merged["target"]
     return X, y
 
 
@@ -106,7 +144,7 @@ def time_based_split(X: pd.DataFrame, y: pd.Series, val_ratio: float = 0.1, test
 
 
 def evaluate_predictions(y_true: pd.Series, y_pred: np.ndarray) -> Dict[str, float]:
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
+    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     mae = mean_absolute_error(y_true, y_pred)
     true_direction = np.asarray(y_true) >= 0
     pred_direction = np.asarray(y_pred) >= 0
@@ -124,14 +162,9 @@ def train_random_forest(
     X_val: pd.DataFrame,
     y_val: pd.Series,
     X_test: pd.DataFrame,
+    params: Optional[Dict[str, Any]] = None,
 ) -> Tuple[RandomForestRegressor, Dict[str, float], np.ndarray]:
-    model = RandomForestRegressor(
-        n_estimators=400,
-        max_depth=12,
-        min_samples_leaf=4,
-        random_state=42,
-        n_jobs=-1,
-    )
+    model = RandomForestRegressor(**{**RF_PARAMS, **(params or {})})
     model.fit(X_train, y_train)
     val_preds = model.predict(X_val)
     val_metrics = evaluate_predictions(y_val, val_preds)
@@ -145,29 +178,19 @@ def train_lightgbm(
     X_val: pd.DataFrame,
     y_val: pd.Series,
     X_test: pd.DataFrame,
+    params: Optional[Dict[str, Any]] = None,
 ) -> Tuple[object, Dict[str, float], np.ndarray]:
     if not HAS_LIGHTGBM:  # pragma: no cover
         raise RuntimeError("LightGBM not installed. Install lightgbm or choose --algorithm rf.")
 
     train_dataset = lgb.Dataset(X_train, label=y_train)
     valid_dataset = lgb.Dataset(X_val, label=y_val, reference=train_dataset)
-    params = {
-        "objective": "regression",
-        "metric": "rmse",
-        "learning_rate": 0.03,
-        "num_leaves": 64,
-        "feature_fraction": 0.8,
-        "bagging_fraction": 0.8,
-        "bagging_freq": 5,
-        "verbose": -1,
-    }
     booster = lgb.train(
-        params,
+        {**LGBM_PARAMS, **(params or {})},
         train_dataset,
         num_boost_round=1000,
         valid_sets=[valid_dataset],
-        early_stopping_rounds=50,
-        verbose_eval=False,
+        callbacks=[lgb.early_stopping(50, verbose=False)],
     )
     val_preds = booster.predict(X_val)
     val_metrics = evaluate_predictions(y_val, val_preds)
@@ -175,6 +198,143 @@ def train_lightgbm(
     return booster, val_metrics, test_preds
 
 
+def warm_start_random_forest(
+    model: RandomForestRegressor,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_val: pd.DataFrame,
+    y_val: pd.Series,
+    X_test: pd.DataFrame,
+    additional_trees: int = 100,
+    n_jobs: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    max_trees: int = MAX_WARM_START_TREES,
+) -> Tuple[RandomForestRegressor, Dict[str, float], np.ndarray]:
+    """Grow an existing forest with trees fitted on the newly arrived segment only.
+
+    ``params`` (e.g. tuned hyperparameters) apply to the new trees. Once the forest exceeds
+    ``max_trees`` the oldest trees are dropped. Pass ``n_jobs=1`` when the caller already
+    parallelises across folds.
+    """
+    tree_params = {key: value for key, value in (params or {}).items() if key not in {"n_estimators", "warm_start"}}
+    if n_jobs is not None:
+        tree_params["n_jobs"] = n_jobs
+    if tree_params:
+        model.set_params(**tree_params)
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + max(additional_trees, 1))
+    model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
+    if len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(n_estimators=max_trees)
+    val_preds = model.predict(X_val)
+    val_metrics = evaluate_predictions(y_val, val_preds)
+    test_preds = model.predict(X_test)
+    return model, val_metrics, test_preds
+
+
+def warm_start_lightgbm(
+    booster: object,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_val: pd.DataFrame,
+    y_val: pd.Series,
+    X_test: pd.DataFrame,
+    num_boost_round: int = 200,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[object, Dict[str, float], np.ndarray]:
+    """Continue boosting from a previous booster on the newly arrived segment."""
+    if not HAS_LIGHTGBM:  # pragma: no cover
+        raise RuntimeError("LightGBM not installed. Install lightgbm or choose --algorithm rf.")
+
+    train_dataset = lgb.Dataset(X_train, label=y_train)
+    valid_dataset = lgb.Dataset(X_val, label=y_val, reference=train_dataset)
+    updated = lgb.train(
+        {**LGBM_PARAMS, **(params or {})},
+        train_dataset,
+        num_boost_round=num_boost_round,
+        valid_sets=[valid_dataset],
+        init_model=booster,
+        callbacks=[lgb.early_stopping(25, verbose=False)],
+    )
+    val_preds = updated.predict(X_val)
+    val_metrics = evaluate_predictions(y_val, val_preds)
+    test_preds = updated.predict(X_test)
+    return updated, val_metrics, test_preds
+
+
+def rolling_origin_folds(n_rows: int, n_folds: int = 4, min_train_ratio: float = 0.5) -> List[Tuple[int, int]]:
+    """Return ``(train_end, test_end)`` row offsets for expanding-window evaluation folds."""
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    initial = int(n_rows * min_train_ratio)
+    fold_size = (n_rows - initial) // n_folds
+    if initial < 50 or fold_size < 10:
+        raise RuntimeError(f"Dataset too small for {n_folds} rolling-origin folds: {n_rows} rows")
+    folds: List[Tuple[int, int]] = []
+    for idx in range(n_folds):
+        train_end = initial + idx * fold_size
+        test_end = n_rows if idx == n_folds - 1 else train_end + fold_size
+        folds.append((train_end, test_end))
+    return folds
+
+
+def _fit_fold(
+    algorithm: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    train_end: int,
+    test_end: int,
+    val_ratio: float = 0.1,
+    params: Optional[Dict[str, Any]] = None,
+    inner_jobs: Optional[int] = None,
+) -> Dict[str, float]:
+    val_size = max(int(train_end * val_ratio), 1)
+    fit_end = train_end - val_size
+    trainer = train_random_forest if algorithm == "rf" else train_lightgbm
+    fold_params = dict(params or {})
+    if inner_jobs is not None:
+        fold_params["n_jobs" if algorithm == "rf" else "num_threads"] = inner_jobs
+    _, _, test_preds = trainer(
+        X.iloc[:fit_end],
+        y.iloc[:fit_end],
+        X.iloc[fit_end:train_end],
+        y.iloc[fit_end:train_end],
+        X.iloc[train_end:test_end],
+        params=fold_params,
+    )
+    metrics = evaluate_predictions(y.iloc[train_end:test_end], test_preds)
+    metrics["train_rows"] = int(train_end)
+    metrics["test_rows"] = int(test_end - train_end)
+    return metrics
+
+
+def evaluate_rolling_origin(
+    algorithm: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_folds: int = 4,
+    n_jobs: int = -1,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Score ``algorithm`` on expanding-window folds, fitting the folds in parallel.
+
+    Each fold's model is single-threaded while folds run concurrently, so the
+    outer pool does not oversubscribe cores with nested ``n_jobs=-1`` fits.
+    """
+    folds = rolling_origin_folds(len(X), n_folds)
+    inner_jobs = 1 if n_jobs != 1 and len(folds) > 1 else None
+    fold_metrics = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(algorithm, X, y, train_end, test_end, params=params, inner_jobs=inner_jobs)
+        for train_end, test_end in folds
+    )
+    summary = {
+        key: float(np.mean([fold[key] for fold in fold_metrics]))
+        for key in ("rmse", "mae", "directional_accuracy")
+    }
+    return {"folds": fold_metrics, "mean": summary}
+
+
 def compute_feature_importance(model: object, feature_columns: list[str]) -> list[Dict[str, float]]:
     if hasattr(model, "feature_importances_"):
         importances = getattr(model, "feature_importances_")
@@ -190,35 +350,6 @@ def compute_feature_importance(model: object, feature_columns: list[str]) -> lis
     return []
 
 
-def compute_shap_summary(model: object, sample: pd.DataFrame, feature_columns: list[str]) -> list[Dict[str, float]]:
-    if not HAS_SHAP or sample.empty:
-        return []
-    try:  # pragma: no cover - shap can fail in CI
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(sample)
-    except Exception:
-        return []
-
-    if isinstance(shap_values, list):
-        shap_array = np.asarray(shap_values[0])
-    else:
-        shap_array = np.asarray(shap_values)
-
-    if shap_array.ndim == 3:
-        shap_array = shap_array.mean(axis=0)
-
-    if shap_array.ndim != 2 or shap_array.shape[1] != len(feature_columns):
-        return []
-
-    mean_abs = np.mean(np.abs(shap_array), axis=0)
-    ranked_idx = np.argsort(mean_abs)[::-1]
-    top_idx = ranked_idx[: min(len(feature_columns), 20)]
-    return [
-        {"feature": feature_columns[idx], "importance": float(mean_abs[idx])}
-        for idx in top_idx
-    ]
-
-
 def save_json_artifact(model_id: str, suffix: str, payload: Dict) -> Path:
     output_dir = Path("reports/model_eval")
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -236,6 +367,34 @@ def save_test_predictions(model_id: str, timestamps: pd.Index, y_true: pd.Series
     return path
 
 
+def _incremental_parent(symbol: str, horizon: str, algorithm: str) -> Optional[Dict[str, Any]]:
+    """Latest same-algorithm model to extend, preferring production over candidates."""
+    name = ALGORITHM_NAMES[algorithm]
+    parent = registry.latest_model(symbol, horizon, status="production", algorithm=name) or registry.latest_model(
+        symbol, horizon, algorithm=name
+    )
+    if not parent:
+        return None
+    if not parent.get("model_id") or not parent.get("train_end"):
+        return None
+    return parent
+
+
+def _incremental_segment(
+    parent: Dict[str, Any],
+    X: pd.DataFrame,
+    y: pd.Series,
+) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+    """Rows the parent never trained on, restricted to the parent's feature columns."""
+    feature_columns = parent.get("feature_columns") or list(X.columns)
+    if any(col not in X.columns for col in feature_columns):
+        return None
+    mask = X.index > pd.Timestamp(parent["train_end"])
+    if int(mask.sum()) < 100:
+        return None
+    return X.loc[mask, feature_columns], y.loc[mask]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Train a forecasting model for a specific horizon.")
     parser.add_argument("--symbol", required=True, help="Trading pair symbol, e.g., BTC/USDT")
@@ -252,35 +411,156 @@ def main() -> None:
         action="store_true",
         help="Mark the resulting model as production in the registry",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Warm-start from the latest registered model and train only on bars it has not seen",
+    )
+    parser.add_argument(
+        "--warm-start-trees",
+        type=int,
+        default=100,
+        help="Trees added to a RandomForest parent during incremental training",
+    )
+    parser.add_argument(
+        "--max-trees",
+        type=int,
+        default=MAX_WARM_START_TREES,
+        help="Cap on RandomForest size across incremental runs; the oldest trees are dropped",
+    )
+    parser.add_argument(
+        "--warm-start-rounds",
+        type=int,
+        default=200,
+        help="Maximum boosting rounds appended to a LightGBM parent during incremental training",
+    )
+    parser.add_argument(
+        "--cv-folds",
+        type=int,
+        default=0,
+        help="Number of rolling-origin evaluation folds (0 disables)",
+    )
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="Run an Optuna search over rolling-origin folds and store the best params for future retrains",
+    )
+    parser.add_argument("--tune-trials", type=int, default=50, help="Trials this worker adds to the shared study")
+    parser.add_argument("--tune-jobs", type=int, default=1, help="Parallel trials within this worker")
+    parser.add_argument(
+        "--default-params",
+        action="store_true",
+        help="Ignore tuned hyperparameters stored in settings and use the built-in defaults",
+    )
+    parser.add_argument(
+        "--no-dataset-cache",
+        action="store_true",
+        help="Read features and prices straight from Mongo instead of the on-disk training cache",
+    )
+    parser.add_argument(
+        "--shap-mode",
+        choices=["async", "sync", "skip"],
+        default="async",
+        help="Queue SHAP on Celery (async), compute it after registration (sync), or skip it",
+    )
+    parser.add_argument(
+        "--shap-sample-size",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help="Held-out rows explained by the SHAP job",
+    )
     args = parser.parse_args()
 
-    X, y = build_dataset(args.symbol, args.horizon, args.train_window)
-    splits = time_based_split(X, y)
+    X, y = build_dataset(args.symbol, args.horizon, args.train_window, use_cache=not args.no_dataset_cache)
 
     algorithm = args.algorithm
+    # Imported lazily: models.tuning builds on the trainers defined in this module.
+    from models.tuning import get_tuned_params, tune_hyperparameters
+
+    params: Optional[Dict[str, Any]] = None
+    if args.tune:
+        # Keep the final test slice out of the search so reported test metrics stay honest.
+        holdout = max(int(len(X) * 0.1), 1)
+        tuning = tune_hyperparameters(
+            args.symbol,
+            args.horizon,
+            algorithm,
+            X.iloc[:-holdout],
+            y.iloc[:-holdout],
+            n_trials=args.tune_trials,
+            n_jobs=args.tune_jobs,
+        )
+        params = tuning["params"]
+    elif not args.default_params:
+        params = get_tuned_params(args.symbol, args.horizon, algorithm)
+
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     model_id = f"{algorithm}_{args.horizon}_{timestamp}"
 
-    if algorithm == "rf":
-        model, val_metrics, test_preds = train_random_forest(
-            splits["X_train"], splits["y_train"], splits["X_val"], splits["y_val"], splits["X_test"]
-        )
+    parent = _incremental_parent(args.symbol, args.horizon, algorithm) if args.incremental else None
+    segment = _incremental_segment(parent, X, y) if parent else None
+    if args.incremental and segment is None:
+        print("No usable parent model or too little new data; falling back to a full retrain.")
+        parent = None
+
+    if parent and segment:
+        X_new, y_new = segment
+        splits = time_based_split(X_new, y_new)
+        base_model = model_utils.load_model(parent["model_id"])
+        if algorithm == "rf":
+            model, val_metrics, test_preds = warm_start_random_forest(
+                base_model,
+                splits["X_train"],
+                splits["y_train"],
+                splits["X_val"],
+                splits["y_val"],
+                splits["X_test"],
+                additional_trees=args.warm_start_trees,
+                params=params,
+                max_trees=args.max_trees,
+            )
+        else:
+            model, val_metrics, test_preds = warm_start_lightgbm(
+                base_model,
+                splits["X_train"],
+                splits["y_train"],
+                splits["X_val"],
+                splits["y_val"],
+                splits["X_test"],
+                num_boost_round=args.warm_start_rounds,
+                params=params,
+            )
     else:
-        model, val_metrics, test_preds = train_lightgbm(
-            splits["X_train"], splits["y_train"], splits["X_val"], splits["y_val"], splits["X_test"]
-        )
+        splits = time_based_split(X, y)
+        if algorithm == "rf":
+            model, val_metrics, test_preds = train_random_forest(
+                splits["X_train"], splits["y_train"], splits["X_val"], splits["y_val"], splits["X_test"], params=params
+            )
+        else:
+            model, val_metrics, test_preds = train_lightgbm(
+                splits["X_train"], splits["y_train"], splits["X_val"], splits["y_val"], splits["X_test"], params=params
+            )
 
     test_metrics = evaluate_predictions(splits["y_test"], test_preds)
     metrics = {
         "val": val_metrics,
         "test": test_metrics,
     }
+    if args.cv_folds > 0:
+        eval_X = segment[0] if segment else X
+        eval_y = segment[1] if segment else y
+        try:
+            metrics["rolling_origin"] = evaluate_rolling_origin(
+                algorithm, eval_X, eval_y, n_folds=args.cv_folds, params=params
+            )
+        except RuntimeError as exc:
+            print(f"Skipping rolling-origin evaluation: {exc}")
 
     metadata = {
         "model_id": model_id,
         "symbol": args.symbol,
         "horizon": args.horizon,
-        "algorithm": "RandomForestRegressor" if algorithm == "rf" else "LightGBMRegressor",
+        "algorithm": ALGORITHM_NAMES[algorithm],
         "trained_at": datetime.utcnow(),
         "train_start": splits["X_train"].index.min().isoformat(),
         "train_end": splits["X_train"].index.max().isoformat(),
@@ -288,7 +568,15 @@ def main() -> None:
         "metrics": metrics,
         "artifact_path": "",
         "status": "production" if args.promote else "candidate",
+        "training_mode": "incremental" if parent else "full",
+        "hyperparameters": params or {},
+        "hyperparameter_source": "tuned" if params else "default",
     }
+    if parent:
+        metadata["train_start"] = parent.get("train_start", metadata["train_start"])
+        metadata["parent_model_id"] = parent["model_id"]
+        metadata["lineage"] = [*parent.get("lineage", []), parent["model_id"]]
+        metadata["increment_rows"] = int(len(splits["X_train"]))
 
     artifact_path = model_utils.save_model(model, model_id, metadata={"metrics": metrics})
     metadata["artifact_path"] = str(artifact_path)
@@ -298,26 +586,25 @@ def main() -> None:
     if feature_importance:
         metadata["feature_importance"] = feature_importance
 
-    sample = splits["X_test"].fillna(0)
-    if len(sample) > 200:
-        sample = sample.sample(n=200, random_state=42)
-    shap_artifact_path: Path | None = None
-    shap_summary = compute_shap_summary(model, sample, feature_columns)
-    if shap_summary:
-        shap_artifact_path = save_json_artifact(model_id, "shap_summary", {"features": shap_summary})
-        metadata["shap_summary_artifact"] = str(shap_artifact_path)
-        metadata["shap_summary_top_features"] = shap_summary
+    metadata["explainability_status"] = "skipped" if args.shap_mode == "skip" else "pending"
 
     test_report_path = save_test_predictions(model_id, splits["y_test"].index, splits["y_test"], test_preds)
     metadata["evaluation_artifact"] = str(test_report_path)
 
-    dashboard_path = generate_dashboard(metadata, metrics, shap_summary, str(test_report_path))
+    dashboard_path = generate_dashboard(metadata, metrics, None, str(test_report_path))
     metadata["evaluation_dashboard"] = str(dashboard_path)
 
-    registry_record = registry.record_model(metadata)
+    # Promotion below refreshes ensemble membership itself, so skip the first recompute.
+    registry_record = registry.record_model(metadata, refresh_ensemble=not args.promote)
 
     if args.promote:
-        registry.update_model_status(registry_record["_id"], "production")
+        registry.promote_model(registry_record["_id"])
+
+    # SHAP runs only after the model is registered (and promoted) so it never delays serving.
+    if args.shap_mode == "async" and not schedule_shap_job(model_id, sample_size=args.shap_sample_size):
+        args.shap_mode = "sync"
+    if args.shap_mode == "sync":
+        run_shap_job(model_id, sample_size=args.shap_sample_size)
 
     summary = {
         "model_id": model_id,
@@ -325,8 +612,10 @@ def main() -> None:
         "metrics": metrics,
         "evaluation_artifact": str(test_report_path),
         "feature_importance": feature_importance,
-        "shap_summary_artifact": str(shap_artifact_path) if shap_artifact_path else None,
+        "explainability": args.shap_mode,
         "registry_id": str(registry_record["_id"]),
+        "training_mode": metadata["training_mode"],
+        "parent_model_id": metadata.get("parent_model_id"),
     }
     print(json.dumps(summary, indent=2, default=str))
 
@@ -0,0 +1,177 @@
+"""Optuna hyperparameter search for horizon models, persisted to settings for later retrains."""
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import optuna
+import pandas as pd
+
+from db.client import get_database_name, mongo_client
+from models.model_utils import MODEL_DIR
+from models.train_horizon import (
+    evaluate_predictions,
+    rolling_origin_folds,
+    train_lightgbm,
+    train_random_forest,
+)
+
+SETTINGS_COLLECTION = "settings"
+DOCUMENT_ID = "model_hyperparameters"
+DEFAULT_STORAGE = f"sqlite:///{MODEL_DIR / 'optuna.db'}"
+
+
+def _storage_url(storage: Optional[str] = None) -> str:
+    return storage or os.getenv("OPTUNA_STORAGE", DEFAULT_STORAGE)
+
+
+def _symbol_key(symbol: str) -> str:
+    # Mongo treats "." as a path separator and "/" reads poorly in keys.
+    return symbol.replace("/", "-").replace(".", "_")
+
+
+def study_name(symbol: str, horizon: str, algorithm: str) -> str:
+    return f"{algorithm}_{horizon}_{_symbol_key(symbol)}"
+
+
+def _suggest_rf(trial: optuna.Trial) -> Dict[str, Any]:
+    return {
+        "n_estimators": trial.suggest_int("n_estimators", 100, 800, step=50),
+        "max_depth": trial.suggest_int("max_depth", 4, 24),
+        "min_samples_leaf": trial.suggest_int("min_samples_leaf", 1, 32, log=True),
+        "max_features": trial.suggest_float("max_features", 0.2, 1.0),
+    }
+
+
+def _suggest_lgbm(trial: optuna.Trial) -> Dict[str, Any]:
+    return {
+        "learning_rate": trial.suggest_float("learning_rate", 0.005, 0.2, log=True),
+        "num_leaves": trial.suggest_int("num_leaves", 8, 256, log=True),
+        "min_data_in_leaf": trial.suggest_int("min_data_in_leaf", 5, 200, log=True),
+        "feature_fraction": trial.suggest_float("feature_fraction", 0.4, 1.0),
+        "bagging_fraction": trial.suggest_float("bagging_fraction", 0.4, 1.0),
+        "lambda_l2": trial.suggest_float("lambda_l2", 1e-8, 10.0, log=True),
+    }
+
+
+SEARCH_SPACES = {"rf": _suggest_rf, "lgbm": _suggest_lgbm}
+
+
+def _objective(
+    algorithm: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_folds: int,
+    val_ratio: float = 0.1,
+    inner_jobs: Optional[int] = None,
+):
+    folds = rolling_origin_folds(len(X), n_folds)
+    trainer = train_random_forest if algorithm == "rf" else train_lightgbm
+
+    def objective(trial: optuna.Trial) -> float:
+        params = SEARCH_SPACES[algorithm](trial)
+        if inner_jobs is not None:
+            params["n_jobs" if algorithm == "rf" else "num_threads"] = inner_jobs
+        scores = []
+        for step, (train_end, test_end) in enumerate(folds):
+            val_size = max(int(train_end * val_ratio), 1)
+            fit_end = train_end - val_size
+            # LightGBM stops early on the fold's validation slice inside train_lightgbm.
+            _, _, test_preds = trainer(
+                X.iloc[:fit_end],
+                y.iloc[:fit_end],
+                X.iloc[fit_end:train_end],
+                y.iloc[fit_end:train_end],
+                X.iloc[train_end:test_end],
+                params=params,
+            )
+            scores.append(evaluate_predictions(y.iloc[train_end:test_end], test_preds)["rmse"])
+            trial.report(float(np.mean(scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return float(np.mean(scores))
+
+    return objective
+
+
+def tune_hyperparameters(
+    symbol: str,
+    horizon: str,
+    algorithm: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    *,
+    n_trials: int = 50,
+    n_folds: int = 3,
+    n_jobs: int = 1,
+    timeout: Optional[float] = None,
+    storage: Optional[str] = None,
+    persist: bool = True,
+) -> Dict[str, Any]:
+    """Run (or resume) the shared study for ``(symbol, horizon, algorithm)`` and store the best params.
+
+    Several workers can call this concurrently: the study lives in ``OPTUNA_STORAGE`` and is
+    reopened with ``load_if_exists`` so trials from every process count toward the same search.
+    """
+    if algorithm not in SEARCH_SPACES:
+        raise ValueError(f"Unsupported algorithm {algorithm}")
+    storage_url = _storage_url(storage)
+    if storage_url.startswith("sqlite:///"):
+        MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    study = optuna.create_study(
+        study_name=study_name(symbol, horizon, algorithm),
+        storage=storage_url,
+        direction="minimize",
+        load_if_exists=True,
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1),
+    )
+    # Parallel trials each fit single-threaded so the study does not oversubscribe cores.
+    inner_jobs = 1 if n_jobs != 1 else None
+    study.optimize(
+        _objective(algorithm, X, y, n_folds, inner_jobs=inner_jobs),
+        n_trials=n_trials,
+        n_jobs=n_jobs,
+        timeout=timeout,
+        show_progress_bar=False,
+    )
+
+    completed = [trial for trial in study.trials if trial.state == optuna.trial.TrialState.COMPLETE]
+    if not completed:
+        raise RuntimeError(f"No completed tuning trials for {symbol} {horizon} {algorithm}")
+    result = {
+        "params": dict(study.best_params),
+        "cv_rmse": float(study.best_value),
+        "n_trials": len(study.trials),
+        "n_pruned": sum(trial.state == optuna.trial.TrialState.PRUNED for trial in study.trials),
+        "n_folds": n_folds,
+        "rows": int(len(X)),
+        "study_name": study.study_name,
+        "tuned_at": datetime.utcnow(),
+    }
+    if persist:
+        save_tuned_params(symbol, horizon, algorithm, result)
+    return result
+
+
+def save_tuned_params(symbol: str, horizon: str, algorithm: str, result: Dict[str, Any]) -> None:
+    path = f"{algorithm}.{horizon}.{_symbol_key(symbol)}"
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[SETTINGS_COLLECTION].update_one(
+            {"_id": DOCUMENT_ID},
+            {"$set": {path: result, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+
+def get_tuned_params(symbol: str, horizon: str, algorithm: str) -> Optional[Dict[str, Any]]:
+    """Return the stored best params for a model, or ``None`` when it was never tuned."""
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db[SETTINGS_COLLECTION].find_one({"_id": DOCUMENT_ID}, {algorithm: 1})
+    entry = ((doc or {}).get(algorithm) or {}).get(horizon, {}).get(_symbol_key(symbol))
+    if not entry or not isinstance(entry.get("params"), dict):
+        return None
+    return dict(entry["params"])
@@ -3,8 +3,9 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 try:
-    from prometheus_client import Gauge, Histogram
+    from prometheus_client import Counter, Gauge, Histogram
 except ImportError:  # pragma: no cover - optional dependency
+    Counter = None
     Gauge = None
     Histogram = None
 
@@ -45,6 +46,15 @@ else:  # pragma: no cover - fallback
     INTRADAY_BANKROLL_UTIL = None
     INTRADAY_ALERT_COUNT = None
 
+if Counter:
+    FITNESS_CACHE_LOOKUPS = Counter(
+        "genome_fitness_cache_lookups_total",
+        "Genome fitness cache lookups by outcome",
+        ["outcome"],
+    )
+else:  # pragma: no cover - fallback
+    FITNESS_CACHE_LOOKUPS = None
+
 
 def _record_histogram(metric: Histogram | None, *, labels: Dict[str, str], value: float) -> None:
     if metric is None:
@@ -76,3 +86,9 @@ def record_intraday_cohort_metrics(
 
 def observe_cohort_api_latency(*, route: str, latency_seconds: float) -> None:
     _record_histogram(COHORT_API_LATENCY, labels={"route": route}, value=max(latency_seconds, 0.0))
+
+
+def record_fitness_cache_lookup(hit: bool) -> None:
+    if FITNESS_CACHE_LOOKUPS is None:
+        return
+    FITNESS_CACHE_LOOKUPS.labels(outcome="hit" if hit else "miss").inc()
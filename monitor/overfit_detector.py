@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional, Sequence
 import numpy as np
 
 from db.client import get_database_name, mongo_client
+from simulator.run_store import RESULTS_PROJECTION
 from strategy_genome.repository import list_genomes
 
 
@@ -28,7 +29,7 @@ def _load_runs(strategy_id: str, limit: int) -> List[Dict[str, Any]]:
         db = client[get_database_name()]
         cursor = (
             db["sim_runs"]
-            .find({"strategy": strategy_id})
+            .find({"strategy": strategy_id}, RESULTS_PROJECTION)
             .sort("created_at", -1)
             .limit(limit)
         )
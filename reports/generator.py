@@ -17,7 +17,7 @@ def _latest_runs(limit: int = 5) -> List[Dict]:
         db = client[get_database_name()]
         cursor = (
             db["sim_runs"]
-            .find({}, {"_id": 0})
+            .find({}, {"_id": 0, "strategy": 1, "results": 1})
             .sort("created_at", -1)
             .limit(limit)
         )
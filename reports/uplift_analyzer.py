@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Dict, Optional
 
 from db.client import get_database_name, mongo_client
+from simulator.run_store import RESULTS_PROJECTION
 
 
 @dataclass
@@ -24,7 +25,7 @@ def _latest_run(strategy: str, symbol: Optional[str] = None, horizon: Optional[s
         query["horizon"] = horizon
     with mongo_client() as client:
         db = client[get_database_name()]
-        doc = db["sim_runs"].find_one(query, sort=[("created_at", -1)])
+        doc = db["sim_runs"].find_one(query, RESULTS_PROJECTION, sort=[("created_at", -1)])
     if not doc:
         return None
     results = doc.get("results", {}) or {}
@@ -32,6 +32,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--symbols", default="BTC/USDT", help="Comma-separated list of symbols to retrain")
     parser.add_argument("--algorithm", choices=["rf", "lgbm"], default="rf", help="Algorithm to train")
     parser.add_argument("--promote", action="store_true", help="Promote trained models to production")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Warm-start each horizon from its latest model instead of retraining from scratch",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Print the commands without executing them")
     return parser.parse_args()
 
@@ -66,6 +71,8 @@ def run() -> None:
                 cmd.extend(["--train-window", str(train_window)])
             if args.promote:
                 cmd.append("--promote")
+            if args.incremental:
+                cmd.append("--incremental")
 
             cmd_str = " ".join(cmd)
             print(f"Running retrain job: {cmd_str}")
@@ -0,0 +1,43 @@
+"""Check that float32 feature inference matches float64 forecasts before enabling FEATURE_FLOAT_DTYPE=float32."""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+
+from models.ensemble import EnsembleError, validate_float32_forecast
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare float32 and float64 ensemble inputs for recent forecasts.")
+    parser.add_argument("--symbols", default="BTC/USDT", help="Comma-separated list of symbols to check")
+    parser.add_argument("--horizons", default="1m,1h,1d", help="Comma-separated list of horizons to check")
+    parser.add_argument("--timestamp", help="ISO timestamp to validate (defaults to now)")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Maximum allowed absolute prediction gap")
+    return parser.parse_args()
+
+
+def run() -> None:
+    args = parse_args()
+    timestamp = datetime.fromisoformat(args.timestamp) if args.timestamp else datetime.utcnow()
+    symbols = [sym.strip() for sym in args.symbols.split(",") if sym.strip()]
+    horizons = [hz.strip() for hz in args.horizons.split(",") if hz.strip()]
+
+    failures = 0
+    for symbol in symbols:
+        for horizon in horizons:
+            try:
+                result = validate_float32_forecast(symbol, horizon, timestamp, tolerance=args.tolerance)
+            except EnsembleError as exc:
+                print(f"{symbol} {horizon}: skipped ({exc})")
+                continue
+            status = "ok" if result["within_tolerance"] else "FAILED"
+            print(f"{symbol} {horizon}: max deviation {result['max_deviation']:.3e} [{status}]")
+            failures += 0 if result["within_tolerance"] else 1
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,520 @@
+"""Event-driven replay of recorded trade/quote streams against the execution layer.
+
+Market data is loaded from local files into sorted arrays and walked in time order.
+Scheduled events (order arrivals after latency, cancellations, strategy timers) sit in a
+heap and are interleaved with the market stream. ``ReplayClock`` jumps straight to each
+event's timestamp and is installed as the ``exec`` clock while the replay runs, so
+``OrderManager``/``RiskManager`` stamp fills with simulated time and nothing sleeps.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from exec import clock as exec_clock
+from exec.connector import ConnectorError, ExchangeConnector, OrderPayload
+
+PathLike = Union[str, Path]
+
+TRADE, QUOTE = 0, 1
+# Scheduled event kinds; market data at the same timestamp is processed first.
+ORDER_ARRIVAL, CANCEL, TIMER = "order_arrival", "cancel", "timer"
+
+NS_PER_MS = 1_000_000
+
+
+class TradeTick(NamedTuple):
+    timestamp: int
+    price: float
+    size: float
+
+
+class QuoteTick(NamedTuple):
+    timestamp: int
+    bid: float
+    ask: float
+    bid_size: float
+    ask_size: float
+
+
+@dataclass
+class MarketData:
+    """Time-ordered trades and quotes for one symbol; timestamps are int64 nanoseconds."""
+
+    symbol: str
+    timestamp: np.ndarray
+    kind: np.ndarray
+    price: np.ndarray
+    size: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+def _read_frame(path: PathLike) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix in {".parquet", ".pq"}:
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _timestamps_ns(column: pd.Series) -> np.ndarray:
+    # Integer timestamps follow the exchange convention of epoch milliseconds.
+    if pd.api.types.is_integer_dtype(column):
+        return column.to_numpy(dtype=np.int64) * NS_PER_MS
+    return pd.to_datetime(column, utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _column(frame: pd.DataFrame, *names: str) -> np.ndarray:
+    for name in names:
+        if name in frame.columns:
+            return frame[name].to_numpy(dtype=np.float64)
+    return np.full(len(frame), np.nan)
+
+
+def load_trades(path: PathLike) -> pd.DataFrame:
+    """Trade prints from CSV/Parquet with ``timestamp``, ``price`` and ``size`` (or ``quantity``/``amount``)."""
+    frame = _read_frame(path)
+    return pd.DataFrame(
+        {
+            "timestamp": _timestamps_ns(frame["timestamp"]),
+            "price": _column(frame, "price"),
+            "size": _column(frame, "size", "quantity", "amount"),
+        }
+    )
+
+
+def load_quotes(path: PathLike) -> pd.DataFrame:
+    """Top-of-book quotes from CSV/Parquet with ``timestamp``, ``bid``, ``ask`` and optional sizes."""
+    frame = _read_frame(path)
+    return pd.DataFrame(
+        {
+            "timestamp": _timestamps_ns(frame["timestamp"]),
+            "bid": _column(frame, "bid", "bid_price"),
+            "ask": _column(frame, "ask", "ask_price"),
+            "bid_size": _column(frame, "bid_size", "bid_qty"),
+            "ask_size": _column(frame, "ask_size", "ask_qty"),
+        }
+    )
+
+
+def merge_market_data(
+    symbol: str,
+    trades: Optional[pd.DataFrame] = None,
+    quotes: Optional[pd.DataFrame] = None,
+) -> MarketData:
+    """Merge trade and quote frames into one stream; quotes sort before trades on ties."""
+    parts = []
+    if trades is not None and len(trades):
+        parts.append(trades.assign(kind=TRADE))
+    if quotes is not None and len(quotes):
+        parts.append(quotes.assign(kind=QUOTE))
+    if not parts:
+        raise ValueError("No market data to replay.")
+    merged = pd.concat(parts, ignore_index=True, sort=False)
+    order = np.lexsort((1 - merged["kind"].to_numpy(), merged["timestamp"].to_numpy()))
+    merged = merged.iloc[order]
+    return MarketData(
+        symbol=symbol,
+        timestamp=merged["timestamp"].to_numpy(dtype=np.int64),
+        kind=merged["kind"].to_numpy(dtype=np.int8),
+        price=_column(merged, "price"),
+        size=_column(merged, "size"),
+        bid=_column(merged, "bid"),
+        ask=_column(merged, "ask"),
+        bid_size=_column(merged, "bid_size"),
+        ask_size=_column(merged, "ask_size"),
+    )
+
+
+def load_market_data(
+    symbol: str,
+    *,
+    trades_path: Optional[PathLike] = None,
+    quotes_path: Optional[PathLike] = None,
+) -> MarketData:
+    return merge_market_data(
+        symbol,
+        load_trades(trades_path) if trades_path else None,
+        load_quotes(quotes_path) if quotes_path else None,
+    )
+
+
+class ReplayClock:
+    """Simulated time in epoch nanoseconds, advanced only by the replay loop."""
+
+    def __init__(self, start_ns: int = 0) -> None:
+        self.now_ns = start_ns
+
+    def now_ms(self) -> int:
+        return self.now_ns // NS_PER_MS
+
+    def utcnow(self) -> datetime:
+        return datetime.fromtimestamp(self.now_ns / 1e9, tz=timezone.utc)
+
+
+@dataclass
+class ReplayStats:
+    market_events: int = 0
+    scheduled_events: int = 0
+    fills: int = 0
+    simulated_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def events(self) -> int:
+        return self.market_events + self.scheduled_events
+
+    @property
+    def events_per_minute(self) -> float:
+        return self.events / self.wall_seconds * 60 if self.wall_seconds else float("inf")
+
+    @property
+    def speedup(self) -> float:
+        return self.simulated_seconds / self.wall_seconds if self.wall_seconds else float("inf")
+
+
+@dataclass
+class ReplayOrder:
+    order_id: str
+    symbol: str
+    side: str
+    type: str
+    quantity: float
+    price: Optional[float]
+    submitted_ns: int
+    status: str = "pending"
+    filled: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def remaining(self) -> float:
+        return max(self.quantity - self.filled, 0.0)
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled else None
+
+
+class ReplayEngine:
+    """Walks a ``MarketData`` stream and a heap of scheduled events in timestamp order."""
+
+    def __init__(self, market: MarketData, *, clock: Optional[ReplayClock] = None) -> None:
+        self.market = market
+        self.clock = clock or ReplayClock(int(market.timestamp[0]) if len(market) else 0)
+        self.stats = ReplayStats()
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._trade_handlers: List[Callable[[TradeTick], None]] = []
+        self._quote_handlers: List[Callable[[QuoteTick], None]] = []
+        self._connectors: List["ReplayConnector"] = []
+        self.last_price: Optional[float] = None
+        self.bid: Optional[float] = None
+        self.ask: Optional[float] = None
+        self.bid_size: Optional[float] = None
+        self.ask_size: Optional[float] = None
+
+    def on_trade(self, handler: Callable[[TradeTick], None]) -> None:
+        self._trade_handlers.append(handler)
+
+    def on_quote(self, handler: Callable[[QuoteTick], None]) -> None:
+        self._quote_handlers.append(handler)
+
+    def attach(self, connector: "ReplayConnector") -> None:
+        self._connectors.append(connector)
+
+    def schedule(self, at_ns: int, kind: str, payload: Any) -> None:
+        heapq.heappush(self._heap, (int(at_ns), next(self._sequence), kind, payload))
+
+    def call_at(self, at_ns: int, callback: Callable[[], None]) -> None:
+        self.schedule(at_ns, TIMER, callback)
+
+    def call_later(self, delay_ms: float, callback: Callable[[], None]) -> None:
+        self.call_at(self.clock.now_ns + int(delay_ms * NS_PER_MS), callback)
+
+    def _dispatch(self, kind: str, payload: Any) -> None:
+        if kind == TIMER:
+            payload()
+            return
+        connector, order_id = payload
+        if kind == ORDER_ARRIVAL:
+            connector._on_arrival(order_id)
+        elif kind == CANCEL:
+            connector._on_cancel(order_id)
+
+    def _drain(self, until_ns: int, *, inclusive: bool) -> None:
+        heap = self._heap
+        while heap and (heap[0][0] < until_ns or (inclusive and heap[0][0] == until_ns)):
+            at_ns, _, kind, payload = heapq.heappop(heap)
+            self.clock.now_ns = max(self.clock.now_ns, at_ns)
+            self.stats.scheduled_events += 1
+            self._dispatch(kind, payload)
+
+    def run(self, until_ns: Optional[int] = None) -> ReplayStats:
+        """Replay every event up to ``until_ns`` inclusive (default: the last market event)."""
+        market = self.market
+        timestamps = market.timestamp.tolist()
+        kinds = market.kind.tolist()
+        prices, sizes = market.price.tolist(), market.size.tolist()
+        bids, asks = market.bid.tolist(), market.ask.tolist()
+        bid_sizes, ask_sizes = market.bid_size.tolist(), market.ask_size.tolist()
+        trade_handlers, quote_handlers = self._trade_handlers, self._quote_handlers
+        connectors = self._connectors
+        heap = self._heap
+        clock = self.clock
+        start_ns = clock.now_ns
+        started = time.perf_counter()
+        processed = 0
+
+        with exec_clock.use_clock(clock.utcnow):
+            for idx, ts in enumerate(timestamps):
+                if until_ns is not None and ts > until_ns:
+                    break
+                if heap and heap[0][0] < ts:
+                    self._drain(ts, inclusive=False)
+                clock.now_ns = ts
+                processed += 1
+                if kinds[idx] == TRADE:
+                    price = prices[idx]
+                    self.last_price = price
+                    for connector in connectors:
+                        if connector.working:
+                            connector._on_trade(price, sizes[idx])
+                    if trade_handlers:
+                        tick = TradeTick(ts, price, sizes[idx])
+                        for handler in trade_handlers:
+                            handler(tick)
+                else:
+                    self.bid, self.ask = bids[idx], asks[idx]
+                    self.bid_size, self.ask_size = bid_sizes[idx], ask_sizes[idx]
+                    for connector in connectors:
+                        if connector.working:
+                            connector._on_quote()
+                    if quote_handlers:
+                        tick = QuoteTick(ts, bids[idx], asks[idx], bid_sizes[idx], ask_sizes[idx])
+                        for handler in quote_handlers:
+                            handler(tick)
+            end_ns = until_ns if until_ns is not None else (timestamps[-1] if timestamps else clock.now_ns)
+            self._drain(end_ns, inclusive=True)
+            clock.now_ns = max(clock.now_ns, end_ns)
+
+        self.stats.market_events += processed
+        self.stats.simulated_seconds += (clock.now_ns - start_ns) / 1e9
+        self.stats.wall_seconds += time.perf_counter() - started
+        return self.stats
+
+
+def _known(value: Optional[float]) -> bool:
+    return value is not None and value == value and value > 0
+
+
+class ReplayConnector(ExchangeConnector):
+    """``ExchangeConnector`` that fills against the replayed market instead of a live venue.
+
+    Orders reach the book ``latency_ms`` after submission. Marketable orders take the touch
+    up to the quoted size (the rest keeps working); resting limits fill against trade prints
+    at or through the limit, up to the print size. Register it with
+    ``OrderManager.register_connector`` so fills flow through ``sync_order`` and the usual
+    settlement/risk bookkeeping.
+    """
+
+    def __init__(
+        self,
+        engine: ReplayEngine,
+        *,
+        latency_ms: float = 0.0,
+        cancel_latency_ms: Optional[float] = None,
+        fee_bps: float = 0.0,
+        starting_balance: float = 10_000.0,
+        mode: str = "paper",
+        on_fill: Optional[Callable[[ReplayOrder, Dict[str, Any]], None]] = None,
+    ) -> None:
+        super().__init__(name="replay", mode=mode)
+        self.engine = engine
+        self.latency_ns = int(latency_ms * NS_PER_MS)
+        self.cancel_latency_ns = self.latency_ns if cancel_latency_ms is None else int(cancel_latency_ms * NS_PER_MS)
+        self.fee_rate = fee_bps / 10_000
+        self.cash = starting_balance
+        self.positions: Dict[str, float] = {}
+        self.orders: Dict[str, ReplayOrder] = {}
+        self.working: Dict[str, ReplayOrder] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self._listeners: List[Callable[[ReplayOrder, Dict[str, Any]], None]] = [on_fill] if on_fill else []
+        self._ids = itertools.count(1)
+        engine.attach(self)
+
+    def add_fill_listener(self, listener: Callable[[ReplayOrder, Dict[str, Any]], None]) -> None:
+        self._listeners.append(listener)
+
+    # ExchangeConnector API ------------------------------------------------
+    def get_balance(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "total": self.cash, "free": self.cash, "used": 0.0}
+
+    def create_order(self, payload: OrderPayload) -> Dict[str, Any]:
+        if payload.type not in {"market", "limit"}:
+            raise ConnectorError(f"Replay does not support {payload.type} orders.")
+        if payload.type == "limit" and payload.price is None:
+            raise ConnectorError("Limit orders require a price.")
+        now_ns = self.engine.clock.now_ns
+        order = ReplayOrder(
+            order_id=payload.client_order_id or f"replay-{next(self._ids)}",
+            symbol=payload.symbol,
+            side=payload.side.lower(),
+            type=payload.type,
+            quantity=float(payload.quantity),
+            price=payload.price,
+            submitted_ns=now_ns,
+            raw={"latency_ms": self.latency_ns / NS_PER_MS},
+        )
+        self.orders[order.order_id] = order
+        self.engine.schedule(now_ns + self.latency_ns, ORDER_ARRIVAL, (self, order.order_id))
+        return self._normalise(order)
+
+    def fetch_order(self, order_id: str) -> Dict[str, Any]:
+        return self._normalise(self._order(order_id))
+
+    def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        order = self._order(order_id)
+        self.engine.schedule(self.engine.clock.now_ns + self.cancel_latency_ns, CANCEL, (self, order_id))
+        return self._normalise(order)
+
+    def get_orderbook(self, symbol: str, limit: int = 5) -> Dict[str, Any]:
+        engine = self.engine
+        bid = engine.bid if _known(engine.bid) else engine.last_price
+        ask = engine.ask if _known(engine.ask) else engine.last_price
+        return {
+            "symbol": symbol,
+            "bids": [[bid, engine.bid_size or 0.0]] if bid else [],
+            "asks": [[ask, engine.ask_size or 0.0]] if ask else [],
+            "timestamp": engine.clock.now_ms(),
+        }
+
+    # Matching -------------------------------------------------------------
+    def _order(self, order_id: str) -> ReplayOrder:
+        order = self.orders.get(order_id)
+        if order is None:
+            raise ConnectorError(f"Replay order {order_id} not found.")
+        return order
+
+    def _on_arrival(self, order_id: str) -> None:
+        order = self.orders[order_id]
+        if order.status != "pending":
+            return
+        order.status = "open"
+        self.working[order_id] = order
+        self._match_book(order)
+
+    def _on_cancel(self, order_id: str) -> None:
+        order = self.orders.get(order_id)
+        if order is None or order.status in {"closed", "canceled"}:
+            return
+        order.status = "canceled"
+        self.working.pop(order_id, None)
+
+    def _on_quote(self) -> None:
+        for order in list(self.working.values()):
+            self._match_book(order)
+
+    def _on_trade(self, price: float, size: float) -> None:
+        for order in list(self.working.values()):
+            if order.type == "limit" and order.price is not None:
+                crossed = price <= order.price if order.side == "buy" else price >= order.price
+                if not crossed:
+                    continue
+                available = size if _known(size) else order.remaining
+                self._fill(order, order.price, available)
+            elif order.type == "market":
+                self._fill(order, price, size if _known(size) else order.remaining)
+
+    def _match_book(self, order: ReplayOrder) -> None:
+        engine = self.engine
+        if order.side == "buy":
+            touch, depth = engine.ask, engine.ask_size
+        else:
+            touch, depth = engine.bid, engine.bid_size
+        if not _known(touch):
+            # No quotes recorded: market orders take the last print, limits wait for trades.
+            if order.type == "market" and _known(engine.last_price):
+                self._fill(order, engine.last_price, order.remaining)
+            return
+        if order.type == "limit":
+            marketable = touch <= order.price if order.side == "buy" else touch >= order.price
+            if not marketable:
+                return
+        self._fill(order, touch, depth if _known(depth) else order.remaining)
+
+    def _fill(self, order: ReplayOrder, price: float, available: float) -> None:
+        quantity = min(order.remaining, available)
+        if quantity <= 0:
+            return
+        notional = price * quantity
+        fee = notional * self.fee_rate
+        order.filled += quantity
+        order.cost += notional
+        order.fee += fee
+        sign = 1.0 if order.side == "buy" else -1.0
+        self.cash -= sign * notional + fee
+        self.positions[order.symbol] = self.positions.get(order.symbol, 0.0) + sign * quantity
+        if order.remaining <= 1e-12:
+            order.status = "closed"
+            self.working.pop(order.order_id, None)
+        fill = {
+            "order_id": order.order_id,
+            "symbol": order.symbol,
+            "side": order.side,
+            "quantity": quantity,
+            "price": price,
+            "fee": fee,
+            "timestamp": self.engine.clock.now_ns,
+        }
+        self.fills.append(fill)
+        self.engine.stats.fills += 1
+        for listener in self._listeners:
+            listener(order, fill)
+
+    def _normalise(self, order: ReplayOrder) -> Dict[str, Any]:
+        status = "open" if order.status == "pending" else order.status
+        if status == "open" and order.filled:
+            status = "partial"
+        return {
+            "id": order.order_id,
+            "client_order_id": order.order_id,
+            "status": status,
+            "symbol": order.symbol,
+            "type": order.type,
+            "side": order.side,
+            "price": order.price,
+            "quantity": order.quantity,
+            "filled": order.filled,
+            "remaining": order.remaining,
+            "average": order.average,
+            "cost": order.cost,
+            "time_in_force": None,
+            "timestamp": order.submitted_ns // NS_PER_MS,
+            "datetime": None,
+            "raw": order.raw,
+        }
+
+
+def connect_order_manager(order_manager: Any, connector: ReplayConnector) -> None:
+    """Send ``connector.mode`` orders through the replay and reconcile them as they fill.
+
+    Each fill triggers ``OrderManager.sync_order``, which records partial progress and, once
+    the order completes, runs settlement, risk and audit exactly as for a paper fill.
+    """
+    order_manager.register_connector(connector.mode, connector)
+    connector.add_fill_listener(lambda order, _fill: order_manager.sync_order(order.order_id))
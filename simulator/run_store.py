@@ -0,0 +1,138 @@
+"""Storage for simulation runs: slim ``sim_runs`` summaries plus heavy series in GridFS."""
+from __future__ import annotations
+
+import pickle
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import gridfs
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, DESCENDING
+
+from db.client import get_database_name, mongo_client
+
+RUNS_COLLECTION = "sim_runs"
+ARTIFACT_BUCKET = "sim_run_artifacts"
+HEAVY_FIELDS = ("trades", "equity_curve", "equity_full")
+
+# For readers that only need headline metrics.
+RESULTS_PROJECTION: Dict[str, int] = {
+    "_id": 0,
+    "run_id": 1,
+    "strategy": 1,
+    "symbol": 1,
+    "interval": 1,
+    "horizon": 1,
+    "results": 1,
+    "created_at": 1,
+}
+# Everything except the heavy series, which also covers legacy runs stored inline.
+SUMMARY_PROJECTION: Dict[str, int] = {field: 0 for field in HEAVY_FIELDS}
+
+_INDEXES_READY = False
+
+
+def _ensure_indexes(db) -> None:
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
+    runs = db[RUNS_COLLECTION]
+    runs.create_index("run_id", unique=True)
+    runs.create_index([("strategy", ASCENDING), ("created_at", DESCENDING)])
+    runs.create_index([("created_at", DESCENDING)])
+    _INDEXES_READY = True
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    return pickle.loads(zlib.decompress(blob))
+
+
+def save_run(document: Dict[str, Any]) -> str:
+    """Store a run, moving ``HEAVY_FIELDS`` into a compressed GridFS artifact keyed by run_id."""
+    run_id = document["run_id"]
+    heavy = {field: document[field] for field in HEAVY_FIELDS if field in document}
+    summary = {key: value for key, value in document.items() if key not in HEAVY_FIELDS}
+    summary["trade_count"] = len(heavy.get("trades") or [])
+    summary["equity_points"] = len(heavy.get("equity_curve") or [])
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        _ensure_indexes(db)
+        if heavy:
+            bucket = gridfs.GridFS(db, collection=ARTIFACT_BUCKET)
+            summary["artifact_id"] = bucket.put(
+                _encode(heavy),
+                _id=run_id,
+                filename=run_id,
+                metadata={"run_id": run_id, "fields": sorted(heavy), "encoding": "zlib-pickle"},
+            )
+        db[RUNS_COLLECTION].insert_one(summary)
+    return run_id
+
+
+def get_run_summary(run_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        return db[RUNS_COLLECTION].find_one({"run_id": run_id}, projection or SUMMARY_PROJECTION)
+
+
+def load_run_artifacts(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Heavy series for a run summary; legacy inline runs return their embedded fields."""
+    inline = {field: run[field] for field in HEAVY_FIELDS if field in run}
+    artifact_id = run.get("artifact_id")
+    if inline or artifact_id is None:
+        return inline
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        bucket = gridfs.GridFS(db, collection=ARTIFACT_BUCKET)
+        try:
+            return _decode(bucket.get(artifact_id).read())
+        except NoFile:
+            return {}
+
+
+def load_run(run_id: str, *, include_artifacts: bool = True) -> Optional[Dict[str, Any]]:
+    """Full run document as originally written, or just the summary when ``include_artifacts`` is false."""
+    summary = get_run_summary(run_id, {"_id": 0} if include_artifacts else None)
+    if not summary or not include_artifacts:
+        return summary
+    return {**summary, **load_run_artifacts(summary)}
+
+
+def list_run_summaries(
+    query: Optional[Dict[str, Any]] = None,
+    *,
+    projection: Optional[Dict[str, int]] = None,
+    limit: int = 0,
+    newest_first: bool = True,
+) -> List[Dict[str, Any]]:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        cursor = (
+            db[RUNS_COLLECTION]
+            .find(query or {}, projection or SUMMARY_PROJECTION)
+            .sort("created_at", -1 if newest_first else 1)
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+
+def trade_count(run: Dict[str, Any]) -> int:
+    if "trade_count" in run:
+        return int(run["trade_count"])
+    return len(run.get("trades") or [])
+
+
+def delete_runs(run_ids: Iterable[str]) -> int:
+    run_ids = list(run_ids)
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        bucket = gridfs.GridFS(db, collection=ARTIFACT_BUCKET)
+        for doc in db[RUNS_COLLECTION].find({"run_id": {"$in": run_ids}}, {"artifact_id": 1}):
+            if doc.get("artifact_id") is not None:
+                bucket.delete(doc["artifact_id"])
+        return db[RUNS_COLLECTION].delete_many({"run_id": {"$in": run_ids}}).deleted_count
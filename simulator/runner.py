@@ -2,23 +2,36 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Any, Dict, Optional
+import math
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 from uuid import uuid4
 
+import numpy as np
 import pandas as pd
+from bson import Binary
 
 from backtester.engine import Backtester
-from db.client import get_database_name, get_feature_df, get_ohlcv_df, mongo_client
+from backtester.execution_model import ExecutionConfig, ExecutionModel
+from backtester.population import PopulationParams, PopulationResult, simulate_population
+from backtester.portfolio import PortfolioBacktester
+from backtester.walk_forward import run_walk_forward, walk_forward_splits
+from db.client import get_feature_df, get_ohlcv_df
 from features.cache import GLOBAL_FEATURE_CACHE
 from features.features import generate_for_symbol
 from models.ensemble import EnsembleError, ensemble_predict
+from models.forecast_store import active_version, load_forecasts, store_forecasts
+from simulator.run_store import save_run
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 MIN_RET_THRESHOLDS = {"1m": 0.0005, "1h": 0.005, "1d": 0.01}
 MIN_CONF_THRESHOLDS = {"1m": 0.55, "1h": 0.6, "1d": 0.65}
+# Upper bound on equity points stored per run.
+MAX_EQUITY_POINTS = 2_000
 
 
 def _load_feature_frame(symbol: str, interval: str) -> pd.DataFrame:
@@ -32,13 +45,55 @@ def _load_feature_frame(symbol: str, interval: str) -> pd.DataFrame:
     price_df = get_ohlcv_df(symbol, interval)
     if feature_df.empty or price_df.empty:
         return pd.DataFrame()
-    merged = feature_df.join(price_df["close"], how="inner")
+    bar_columns = [column for column in ("close", "high", "low", "volume") if column in price_df.columns]
+    merged = feature_df.join(price_df[bar_columns], how="inner")
     merged.rename(columns={"close": "price"}, inplace=True)
     if interval in {"1m", "3m", "5m", "15m"} and not merged.empty:
         GLOBAL_FEATURE_CACHE.set_frame(symbol, interval, merged)
     return merged
 
 
+def load_bar_matrices(
+    symbols: Sequence[str],
+    interval: str,
+    columns: Sequence[str] = ("close",),
+    *,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Dict[str, pd.DataFrame]:
+    """One ``bars x symbols`` frame per OHLCV column on the union of bar timestamps.
+
+    Each symbol's bars are read once and shared by every column.
+    """
+    series: Dict[str, Dict[str, pd.Series]] = {column: {} for column in columns}
+    # ``since`` is exclusive and Mongo stores millisecond datetimes, so step back one tick.
+    since = start_time - timedelta(milliseconds=1) if start_time else None
+    for symbol in symbols:
+        price_df = get_ohlcv_df(symbol, interval, since=since)
+        if price_df.empty:
+            continue
+        for column in columns:
+            if column in price_df.columns:
+                series[column][symbol] = price_df[column]
+    return {
+        column: _filter_window(pd.DataFrame(by_symbol).sort_index(), start_time=start_time, end_time=end_time)
+        for column, by_symbol in series.items()
+        if by_symbol
+    }
+
+
+def load_price_matrix(
+    symbols: Sequence[str],
+    interval: str,
+    *,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """Close prices as a ``bars x symbols`` frame on the union of bar timestamps."""
+    matrices = load_bar_matrices(symbols, interval, start_time=start_time, end_time=end_time)
+    return matrices.get("close", pd.DataFrame())
+
+
 def _strategy_param(strategy_config: dict[str, float], key: str, default: float) -> float:
     value = strategy_config.get(key, default)
     return float(value)
@@ -66,6 +121,61 @@ def _decide_signal(
     return "hold"
 
 
+def signal_codes(
+    predicted: np.ndarray,
+    confidence: np.ndarray,
+    horizon: str,
+    strategy_config: Mapping[str, Any],
+) -> np.ndarray:
+    """Vectorised ``_decide_signal``: +1 buy, -1 sell, 0 hold (also where a forecast is missing)."""
+    predicted = np.asarray(predicted, dtype=np.float64)
+    codes = np.zeros(predicted.shape, dtype=np.int8)
+    if not bool(strategy_config.get("uses_forecast", True)):
+        return codes
+    adjusted = predicted * float(strategy_config.get("forecast_weight", 1.0))
+    min_ret = float(strategy_config.get("min_return_threshold", MIN_RET_THRESHOLDS.get(horizon, 0.001)))
+    min_conf = float(strategy_config.get("min_confidence", MIN_CONF_THRESHOLDS.get(horizon, 0.55)))
+    confident = np.nan_to_num(np.asarray(confidence, dtype=np.float64), nan=-np.inf) >= min_conf
+    codes[confident & (adjusted > min_ret)] = 1
+    codes[confident & (adjusted < -min_ret)] = -1
+    return codes
+
+
+def execution_model_for(strategy_config: Mapping[str, Any]) -> ExecutionModel:
+    """Execution model from an optional ``execution`` mapping of ``ExecutionConfig`` fields."""
+    return ExecutionModel(ExecutionConfig(**dict(strategy_config.get("execution") or {})))
+
+
+def _bar_value(row: pd.Series, column: str) -> Optional[float]:
+    value = row.get(column)
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
+def _bar_arrays(features: pd.DataFrame) -> Dict[str, Optional[np.ndarray]]:
+    return {
+        f"{column}s": features[column].to_numpy(dtype=float) if column in features.columns else None
+        for column in ("volume", "high", "low")
+    }
+
+
+def encode_equity_series(values: np.ndarray, timestamps: np.ndarray) -> Dict[str, Any]:
+    """Pack a full-resolution equity curve as zlib-compressed float64/int64 buffers."""
+    return {
+        "encoding": "zlib",
+        "points": int(len(values)),
+        "equity": Binary(zlib.compress(np.asarray(values, dtype=np.float64).tobytes())),
+        "timestamps": Binary(zlib.compress(np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64).tobytes())),
+    }
+
+
+def decode_equity_series(payload: Dict[str, Any]) -> pd.Series:
+    values = np.frombuffer(zlib.decompress(payload["equity"]), dtype=np.float64)
+    stamps = np.frombuffer(zlib.decompress(payload["timestamps"]), dtype=np.int64).astype("datetime64[ns]")
+    return pd.Series(values, index=pd.DatetimeIndex(stamps, name="timestamp"), name="equity")
+
+
 def _filter_window(features: pd.DataFrame, *, start_time: Optional[datetime], end_time: Optional[datetime]) -> pd.DataFrame:
     if features.empty:
         return features
@@ -88,7 +198,14 @@ def run_simulation(
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
     context: Optional[Dict[str, Any]] = None,
+    full_equity: bool = False,
 ) -> str:
+    """Backtest one strategy and store the run via ``simulator.run_store.save_run``.
+
+    The stored ``equity_curve`` is downsampled to at most ``MAX_EQUITY_POINTS`` points;
+    ``full_equity`` also stores every bar as a compressed array under ``equity_full``.
+    Trades and equity series live in the run's artifact, not the ``sim_runs`` summary.
+    """
     horizon = horizon or interval
     strategy_config = strategy_config or {}
     feature_count = generate_for_symbol(symbol, interval)
@@ -111,47 +228,348 @@ def run_simulation(
         position_size_pct=min(max(strategy_config.get("risk_pct", 0.1), 0.01), 0.99),
         take_profit_pct=strategy_config.get("take_profit_pct"),
         stop_loss_pct=strategy_config.get("stop_loss_pct"),
+        execution_model=execution_model_for(strategy_config),
+        equity_sample_every=max(math.ceil(len(features) / MAX_EQUITY_POINTS), 1),
+        record_full_equity=full_equity,
     )
 
-    for ts, row in features.iterrows():
+    predicted, confidences = precompute_forecasts(symbol, horizon, features.index)
+    for idx, (ts, row) in enumerate(features.iterrows()):
         price = float(row["price"])
-        try:
-            forecast = ensemble_predict(symbol, horizon, ts.to_pydatetime())
-            predicted_return = forecast["predicted_return"]
-            confidence = forecast["confidence"]
-        except EnsembleError as exc:
-            logger.debug("Forecast unavailable for %s %s: %s", symbol, ts, exc)
-            predicted_return = None
-            confidence = None
+        predicted_return = None if np.isnan(predicted[idx]) else float(predicted[idx])
+        confidence = None if np.isnan(confidences[idx]) else float(confidences[idx])
 
         signal = _decide_signal(predicted_return, confidence, horizon, strategy_config)
-        backtester.on_signal(ts, price, signal, predicted_return, confidence)
+        backtester.on_signal(
+            ts,
+            price,
+            signal,
+            predicted_return,
+            confidence,
+            volume=_bar_value(row, "volume"),
+            high=_bar_value(row, "high"),
+            low=_bar_value(row, "low"),
+        )
 
     result = backtester.finalize()
     run_id = f"run-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
-    with mongo_client() as client:
-        db = client[get_database_name()]
-        db["sim_runs"].insert_one(
-            {
-                "run_id": run_id,
-                "strategy": strategy_name,
-                "symbol": symbol,
-                "interval": interval,
-                "horizon": horizon,
-                "results": result.metrics,
-                "trades": [trade.__dict__ for trade in result.trades],
-                "equity_curve": result.equity_curve,
-                "created_at": datetime.utcnow(),
-                "strategy_config": strategy_config,
-                "genome": genome,
-                "window": {"start": start_time, "end": end_time},
-                "context": context or {},
-            }
-        )
+    document: Dict[str, Any] = {
+        "run_id": run_id,
+        "strategy": strategy_name,
+        "symbol": symbol,
+        "interval": interval,
+        "horizon": horizon,
+        "results": result.metrics,
+        "trades": [trade.__dict__ for trade in result.trades],
+        "equity_curve": result.equity_curve,
+        "created_at": datetime.utcnow(),
+        "strategy_config": strategy_config,
+        "genome": genome,
+        "window": {"start": start_time, "end": end_time},
+        "context": context or {},
+        "equity_sample_every": backtester.equity_sample_every,
+    }
+    if result.full_equity is not None:
+        document["equity_full"] = encode_equity_series(result.full_equity, result.full_timestamps)
+    save_run(document)
     logger.info("Completed simulation %s", run_id)
     return run_id
 
 
+def precompute_forecasts(symbol: str, horizon: str, timestamps: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicted return and confidence per bar (NaN when unavailable).
+
+    Stored forecasts are read in one query under an active-set version resolved once; only
+    missing bars hit the ensemble, and they are written back in a single ``bulk_write`` after
+    the loop so later runs over the same window reuse them.
+    """
+    predicted = np.full(len(timestamps), np.nan)
+    confidence = np.full(len(timestamps), np.nan)
+    if len(timestamps) == 0:
+        return predicted, confidence
+    version = active_version(symbol, horizon)
+    stored = load_forecasts(
+        symbol,
+        horizon,
+        pd.Timestamp(timestamps[0]).to_pydatetime(),
+        pd.Timestamp(timestamps[-1]).to_pydatetime(),
+        version=version,
+    )
+    computed: List[Dict[str, Any]] = []
+    for idx, ts in enumerate(timestamps):
+        bar = pd.Timestamp(ts).to_pydatetime()
+        forecast = stored.get(bar)
+        if forecast is None:
+            try:
+                forecast = ensemble_predict(symbol, horizon, bar)
+            except EnsembleError as exc:
+                logger.debug("Forecast unavailable for %s %s: %s", symbol, ts, exc)
+                continue
+            computed.append(forecast)
+        predicted[idx] = forecast["predicted_return"]
+        confidence[idx] = forecast["confidence"]
+    if computed:
+        store_forecasts(computed, version)
+    return predicted, confidence
+
+
+@dataclass
+class PopulationInputs:
+    """Price path, forecasts and bar fields shared by every genome of a population backtest."""
+
+    prices: np.ndarray
+    predicted: np.ndarray
+    confidence: np.ndarray
+    bar_fields: Dict[str, Optional[np.ndarray]]
+    timestamps: pd.DatetimeIndex
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def load_population_inputs(
+    symbol: str,
+    interval: str,
+    horizon: str | None = None,
+    *,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Optional[PopulationInputs]:
+    """Load features and forecasts once for repeated ``simulate_population`` calls."""
+    horizon = horizon or interval
+    features = _filter_window(_load_feature_frame(symbol, interval), start_time=start_time, end_time=end_time)
+    if features.empty:
+        logger.warning("No features available for %s %s", symbol, interval)
+        return None
+    predicted, confidence = precompute_forecasts(symbol, horizon, features.index)
+    return PopulationInputs(
+        prices=features["price"].to_numpy(dtype=float),
+        predicted=predicted,
+        confidence=confidence,
+        bar_fields=_bar_arrays(features),
+        timestamps=pd.DatetimeIndex(features.index),
+    )
+
+
+def population_params(configs: Sequence[Mapping[str, Any]], horizon: str) -> PopulationParams:
+    """Translate strategy configs into arrays using the same defaults as ``run_simulation``."""
+
+    def _optional(config: Mapping[str, Any], key: str) -> float:
+        value = config.get(key)
+        return float(value) if value is not None else np.nan
+
+    return PopulationParams.build(
+        len(configs),
+        min_return_threshold=[
+            float(cfg.get("min_return_threshold", MIN_RET_THRESHOLDS.get(horizon, 0.001))) for cfg in configs
+        ],
+        min_confidence=[float(cfg.get("min_confidence", MIN_CONF_THRESHOLDS.get(horizon, 0.55))) for cfg in configs],
+        forecast_weight=[float(cfg.get("forecast_weight", 1.0)) for cfg in configs],
+        position_size_pct=[min(max(cfg.get("risk_pct", 0.1), 0.01), 0.99) for cfg in configs],
+        take_profit_pct=[_optional(cfg, "take_profit_pct") for cfg in configs],
+        stop_loss_pct=[_optional(cfg, "stop_loss_pct") for cfg in configs],
+        uses_forecast=[bool(cfg.get("uses_forecast", True)) for cfg in configs],
+        initial_capital=[float(cfg.get("initial_capital", 10_000.0)) for cfg in configs],
+    )
+
+
+def run_population_simulation(
+    symbol: str,
+    interval: str,
+    strategy_configs: Sequence[Mapping[str, Any]],
+    horizon: str | None = None,
+    *,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    execution_model: Optional[ExecutionModel] = None,
+) -> List[Dict[str, float]]:
+    """Score many strategy configs over one shared price path and forecast series.
+
+    Returns one metrics dict per config, in order, shaped like ``BacktestResult.metrics``.
+    Nothing is written to ``sim_runs``; callers persist the candidates they keep. All
+    configs share ``execution_model`` (per-config ``execution`` settings are not applied).
+    """
+    horizon = horizon or interval
+    if not strategy_configs:
+        return []
+    inputs = load_population_inputs(symbol, interval, horizon, start_time=start_time, end_time=end_time)
+    if inputs is None:
+        return []
+    result: PopulationResult = simulate_population(
+        inputs.prices,
+        inputs.predicted,
+        inputs.confidence,
+        population_params(strategy_configs, horizon),
+        execution_model,
+        **inputs.bar_fields,
+    )
+    records = result.to_records()
+    for record, trades in zip(records, result.trade_counts):
+        record["trades"] = int(trades)
+    return records
+
+
+def run_walk_forward_simulation(
+    symbol: str,
+    interval: str,
+    strategy_name: str,
+    horizon: str | None = None,
+    strategy_config: dict[str, float] | None = None,
+    genome: dict | None = None,
+    *,
+    n_folds: int = 4,
+    anchored: bool = False,
+    n_jobs: int = -1,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Walk-forward backtest of one strategy, stored in ``sim_runs`` like ``run_simulation``.
+
+    ``results`` holds the fold aggregate (mean test metrics, worst-fold drawdown,
+    ``positive_fold_ratio``, ``roi_std``); per-fold train/test metrics go under
+    ``walk_forward.folds``. Forecasts are precomputed once for the whole window.
+    """
+    horizon = horizon or interval
+    strategy_config = strategy_config or {}
+    if generate_for_symbol(symbol, interval) == 0:
+        logger.warning("No features generated. Aborting walk-forward simulation.")
+        return ""
+    features = _filter_window(_load_feature_frame(symbol, interval), start_time=start_time, end_time=end_time)
+    if features.empty:
+        logger.warning("No features available for %s %s", symbol, interval)
+        return ""
+    try:
+        folds = walk_forward_splits(len(features), n_folds, anchored=anchored)
+    except ValueError as exc:
+        logger.warning("Walk-forward split failed for %s %s: %s", symbol, interval, exc)
+        return ""
+
+    predicted, confidence = precompute_forecasts(symbol, horizon, features.index)
+    result = run_walk_forward(
+        features["price"].to_numpy(dtype=float),
+        predicted,
+        confidence,
+        population_params([strategy_config], horizon),
+        folds,
+        execution_model_for(strategy_config),
+        bar_fields=_bar_arrays(features),
+        n_jobs=n_jobs,
+    )
+    timestamps = [ts.to_pydatetime() for ts in pd.DatetimeIndex(features.index)]
+    run_id = f"run-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
+    save_run(
+        {
+            "run_id": run_id,
+            "strategy": strategy_name,
+            "symbol": symbol,
+            "interval": interval,
+            "horizon": horizon,
+            "mode": "walk_forward",
+            "results": result.summary(),
+            "walk_forward": {
+                "n_folds": n_folds,
+                "anchored": anchored,
+                "folds": result.fold_records(timestamps=timestamps),
+            },
+            "created_at": datetime.utcnow(),
+            "strategy_config": strategy_config,
+            "genome": genome,
+            "window": {"start": start_time, "end": end_time},
+            "context": context or {},
+        }
+    )
+    logger.info("Completed walk-forward simulation %s (%d folds)", run_id, n_folds)
+    return run_id
+
+
+def run_portfolio_simulation(
+    symbols: Sequence[str],
+    interval: str,
+    strategy_name: str,
+    horizon: str | None = None,
+    strategy_config: dict[str, float] | None = None,
+    genome: dict | None = None,
+    *,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Backtest one strategy across ``symbols`` with shared cash and store it like ``run_simulation``.
+
+    Bars for every symbol are loaded once into ``bars x symbols`` matrices, forecasts come
+    from the stored forecasts per symbol, and ``PortfolioBacktester`` steps them in one pass.
+    ``results`` holds portfolio metrics; ``symbol_results`` each symbol's contribution.
+    """
+    horizon = horizon or interval
+    strategy_config = strategy_config or {}
+    for symbol in symbols:
+        generate_for_symbol(symbol, interval)
+    bars = load_bar_matrices(
+        symbols, interval, ("close", "high", "low", "volume"), start_time=start_time, end_time=end_time
+    )
+    prices = bars.get("close")
+    if prices is None or prices.empty:
+        logger.warning("No prices available for %s %s", ", ".join(symbols), interval)
+        return ""
+
+    predicted = np.full(prices.shape, np.nan)
+    confidence = np.full(prices.shape, np.nan)
+    for col, symbol in enumerate(prices.columns):
+        listed = prices[symbol].notna().to_numpy()
+        predicted[listed, col], confidence[listed, col] = precompute_forecasts(symbol, horizon, prices.index[listed])
+    predicted_frame = pd.DataFrame(predicted, index=prices.index, columns=prices.columns)
+    confidence_frame = pd.DataFrame(confidence, index=prices.index, columns=prices.columns)
+    signals = pd.DataFrame(
+        signal_codes(predicted, confidence, horizon, strategy_config), index=prices.index, columns=prices.columns
+    )
+
+    backtester = PortfolioBacktester(
+        initial_capital=strategy_config.get("initial_capital", 10_000.0),
+        position_size_pct=min(max(strategy_config.get("risk_pct", 0.1), 0.01), 0.99),
+        execution_model=execution_model_for(strategy_config),
+        take_profit_pct=strategy_config.get("take_profit_pct"),
+        stop_loss_pct=strategy_config.get("stop_loss_pct"),
+    )
+    result = backtester.run(
+        prices,
+        signals,
+        predicted_frame,
+        confidence_frame,
+        volumes=bars.get("volume"),
+        highs=bars.get("high"),
+        lows=bars.get("low"),
+    )
+    sample_every = max(math.ceil(len(result.equity) / MAX_EQUITY_POINTS), 1)
+    sampled = result.equity.iloc[list(range(0, len(result.equity), sample_every))]
+    if len(result.equity) and sampled.index[-1] != result.equity.index[-1]:
+        sampled = pd.concat([sampled, result.equity.iloc[[-1]]])
+    run_id = f"run-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
+    save_run(
+        {
+            "run_id": run_id,
+            "strategy": strategy_name,
+            "symbol": ",".join(prices.columns),
+            "symbols": list(prices.columns),
+            "interval": interval,
+            "horizon": horizon,
+            "mode": "portfolio",
+            "results": result.metrics,
+            "symbol_results": result.symbol_metrics,
+            "trades": [trade.__dict__ for trade in result.trades],
+            "equity_curve": [{"timestamp": ts, "equity": float(value)} for ts, value in sampled.items()],
+            "created_at": datetime.utcnow(),
+            "strategy_config": strategy_config,
+            "genome": genome,
+            "window": {"start": start_time, "end": end_time},
+            "context": context or {},
+            "equity_sample_every": sample_every,
+        }
+    )
+    logger.info("Completed portfolio simulation %s over %d symbols", run_id, len(prices.columns))
+    return run_id
+
+
 def main() -> None:
     symbol = "BTC/USDT"
     interval = "1m"
@@ -2,6 +2,7 @@
 
 from .encoding import StrategyGenome, StrategyFitness, create_genome_from_dict, default_genome_document
 from .evolver import crossover, mutate, spawn_variants
+from .population import Population
 
 __all__ = [
     "StrategyGenome",
@@ -11,5 +12,6 @@ __all__ = [
     "mutate",
     "crossover",
     "spawn_variants",
+    "Population",
 ]
 
@@ -4,7 +4,10 @@ from __future__ import annotations
 import random
 from typing import List, Sequence
 
+import numpy as np
+
 from .encoding import StrategyGenome, normalize_params
+from .population import Population
 
 
 def mutate(
@@ -84,22 +87,8 @@ def spawn_variants(
     *,
     seed: int | None = None,
 ) -> List[StrategyGenome]:
-    rng = random.Random(seed)
-    variants: List[StrategyGenome] = []
-    for genome in genomes:
-        for _ in range(mutations_per_parent):
-            variants.append(mutate(genome, seed=rng.randint(0, 1_000_000)))
-
-    if len(genomes) >= 2:
-        for idx in range(len(genomes) - 1):
-            parent_a = genomes[idx]
-            parent_b = genomes[idx + 1]
-            variants.append(
-                crossover(
-                    parent_a,
-                    parent_b,
-                    seed=rng.randint(0, 1_000_000),
-                )
-            )
-    return variants
-
+    """Mutants of every genome plus adjacent-pair crossovers, generated as one array population."""
+    if not genomes:
+        return []
+    rng = np.random.default_rng(seed)
+    return Population.from_genomes(genomes).spawn(rng, mutations_per_parent).to_genomes()
@@ -0,0 +1,206 @@
+"""Memoised genome fitness keyed by a canonical fingerprint of everything a backtest depends on."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+from pymongo import DESCENDING
+
+from db.client import get_database_name, get_ohlcv_timestamp, mongo_client
+from models import membership, registry
+from monitor.metrics import record_fitness_cache_lookup
+from strategy_genome.encoding import normalize_params
+
+COLLECTION_NAME = "fitness_cache"
+# Params are rounded to this many significant digits so float noise from clamping and
+# Optuna proposals maps onto the same key.
+PARAM_SIGNIFICANT_DIGITS = 8
+# Strategy config keys that describe evaluation context rather than genome params.
+CONTEXT_KEYS = {"features", "horizon", "model_type"}
+
+_INDEXES_READY = False
+
+
+@dataclass
+class FitnessCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+STATS = FitnessCacheStats()
+_STATS_LOCK = threading.Lock()
+
+
+def _ensure_indexes() -> None:
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[COLLECTION_NAME].create_index([("created_at", DESCENDING)])
+        db[COLLECTION_NAME].create_index([("key.symbol", 1), ("key.horizon", 1)])
+    _INDEXES_READY = True
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(f"{float(value):.{PARAM_SIGNIFICANT_DIGITS}g}")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Mapping):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_canonical(item) for item in value]
+    return str(value)
+
+
+def model_set_version(symbol: str, horizon: str) -> str:
+    """Identifier of the forecast models a backtest would read for ``(symbol, horizon)``."""
+    doc = membership.get_membership(symbol, horizon)
+    model_ids = list(doc.get("member_ids") or []) if doc else []
+    if not model_ids:
+        model_ids = [str(model.get("model_id")) for model in registry.active_models(symbol, horizon)]
+    return ",".join(sorted(model_ids)) or "none"
+
+
+def fitness_key(
+    strategy_config: Mapping[str, Any],
+    *,
+    symbol: str,
+    interval: str,
+    horizon: str,
+    features: Optional[Sequence[str]] = None,
+    window: Optional[Mapping[str, Any]] = None,
+    mode: str = "single",
+    model_version: Optional[str] = None,
+    data_end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Everything that determines a genome's backtest result, in canonical form.
+
+    Numeric params go through ``normalize_params`` (so clamped mutations coincide) and are
+    rounded; ``features`` is order-insensitive. ``data_end`` defaults to the latest stored
+    OHLCV bar, so newly ingested candles invalidate earlier entries even while the
+    feature job is still catching up.
+    """
+    numeric = {
+        key: value
+        for key, value in strategy_config.items()
+        if key not in CONTEXT_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    flags = {
+        key: value
+        for key, value in strategy_config.items()
+        if key not in CONTEXT_KEYS and key not in numeric
+    }
+    if features is None:
+        features = strategy_config.get("features") or []
+    window = dict(window or {})
+    if data_end is None:
+        data_end = get_ohlcv_timestamp(symbol, interval, window.get("end"))
+    return _canonical(
+        {
+            "params": dict(sorted(normalize_params(numeric).items())),
+            "flags": dict(sorted(flags.items())),
+            "features": sorted(features),
+            "symbol": symbol,
+            "interval": interval,
+            "horizon": horizon,
+            "model_type": strategy_config.get("model_type"),
+            "window": {"start": window.get("start"), "end": window.get("end"), "data_end": data_end},
+            "mode": mode,
+            "model_version": model_version if model_version is not None else model_set_version(symbol, horizon),
+        }
+    )
+
+
+def fingerprint(key: Mapping[str, Any]) -> str:
+    payload = json.dumps(key, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(hit: bool) -> None:
+    with _STATS_LOCK:
+        if hit:
+            STATS.hits += 1
+        else:
+            STATS.misses += 1
+    record_fitness_cache_lookup(hit)
+
+
+def lookup(key_hash: str) -> Optional[Dict[str, Any]]:
+    """Cached ``{"metrics", "run_id", ...}`` for ``key_hash``; counts the hit or miss."""
+    _ensure_indexes()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db[COLLECTION_NAME].find_one_and_update(
+            {"_id": key_hash},
+            {"$inc": {"hits": 1}, "$set": {"last_hit_at": datetime.utcnow()}},
+            projection={"key": 0},
+        )
+    _count(doc is not None)
+    return doc
+
+
+def store(key_hash: str, key: Mapping[str, Any], metrics: Mapping[str, Any], *, run_id: Optional[str]) -> None:
+    if not metrics:
+        return
+    _ensure_indexes()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        db[COLLECTION_NAME].update_one(
+            {"_id": key_hash},
+            {
+                "$set": {"key": dict(key), "metrics": dict(metrics), "run_id": run_id, "created_at": datetime.utcnow()},
+                "$setOnInsert": {"hits": 0},
+            },
+            upsert=True,
+        )
+
+
+def cached_evaluation(
+    key: Mapping[str, Any],
+    evaluate: Callable[[], Tuple[Optional[str], Dict[str, Any]]],
+) -> Tuple[Optional[str], Dict[str, Any], bool]:
+    """Return ``(run_id, metrics, hit)``, calling ``evaluate`` only when ``key`` is not cached."""
+    key_hash = fingerprint(key)
+    cached = lookup(key_hash)
+    if cached:
+        return cached.get("run_id"), dict(cached.get("metrics") or {}), True
+    run_id, metrics = evaluate()
+    store(key_hash, key, metrics, run_id=run_id)
+    return run_id, metrics, False
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Process-local hit/miss counters plus stored entry and lifetime hit totals."""
+    _ensure_indexes()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        collection = db[COLLECTION_NAME]
+        entries = collection.count_documents({})
+        totals = list(collection.aggregate([{"$group": {"_id": None, "hits": {"$sum": "$hits"}}}]))
+    lifetime_hits = int(totals[0]["hits"]) if totals else 0
+    with _STATS_LOCK:
+        process = STATS.to_dict()
+    return {"entries": entries, "lifetime_hits": lifetime_hits, "process": process}
+
+
+def clear(query: Optional[Dict[str, Any]] = None) -> int:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        result = db[COLLECTION_NAME].delete_many(query or {})
+    return result.deleted_count
@@ -0,0 +1,189 @@
+"""Materialised lineage index: one slim node per genome carrying its full ancestor list.
+
+Nodes live in ``strategy_lineage`` keyed by ``strategy_id``. ``ancestors`` is a multikey-
+indexed array, so "descendants of X" is an index scan on ``ancestors == X`` and subtree
+fitness is a single ``$group`` over it; ``parents`` is indexed for ``$graphLookup``. The
+repository keeps nodes current on ``save_genome`` and on fitness or status changes.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.database import Database
+
+from db.client import get_database_name, mongo_client
+
+LINEAGE_COLLECTION = "strategy_lineage"
+NODE_PROJECTION = {"parents": 1, "ancestors": 1, "family": 1, "generation": 1, "status": 1, "composite": 1}
+
+
+def create_indexes(db: Database) -> None:
+    lineage = db[LINEAGE_COLLECTION]
+    lineage.create_index("ancestors")
+    lineage.create_index("parents")
+    lineage.create_index([("family", ASCENDING), ("generation", ASCENDING)])
+    lineage.create_index([("composite", DESCENDING)])
+
+
+def _parents(genome: Mapping[str, Any]) -> List[str]:
+    parent = genome.get("mutation_parent")
+    return [parent] if parent and parent != genome.get("strategy_id") else []
+
+
+def _node_fields(genome: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "family": genome.get("family"),
+        "generation": int(genome.get("generation") or 0),
+        "status": genome.get("status"),
+        "composite": float((genome.get("fitness") or {}).get("composite") or 0.0),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _merge_ancestors(parents: List[str], parent_nodes: Iterable[Mapping[str, Any]]) -> List[str]:
+    ancestors = dict.fromkeys(parents)
+    for node in parent_nodes:
+        ancestors.update(dict.fromkeys(node.get("ancestors") or []))
+    return list(ancestors)
+
+
+def index_genome(db: Database, genome: Mapping[str, Any]) -> None:
+    """Upsert the node for ``genome``; nodes saved before their parent inherit its ancestry."""
+    strategy_id = genome["strategy_id"]
+    lineage = db[LINEAGE_COLLECTION]
+    parents = _parents(genome)
+    parent_nodes = list(lineage.find({"_id": {"$in": parents}}, {"ancestors": 1})) if parents else []
+    ancestors = _merge_ancestors(parents, parent_nodes)
+    lineage.update_one(
+        {"_id": strategy_id},
+        {"$set": {"parents": parents, "ancestors": ancestors, **_node_fields(genome)}},
+        upsert=True,
+    )
+    if ancestors:
+        lineage.update_many({"ancestors": strategy_id}, {"$addToSet": {"ancestors": {"$each": ancestors}}})
+
+
+def sync_node(db: Database, genome: Mapping[str, Any]) -> None:
+    """Refresh a node's status and composite after a fitness or status change."""
+    db[LINEAGE_COLLECTION].update_one({"_id": genome["strategy_id"]}, {"$set": _node_fields(genome)})
+
+
+def sync_nodes(db: Database, genomes: Iterable[Mapping[str, Any]], *, session: Any = None) -> int:
+    """Bulk ``sync_node`` for batch status changes; returns how many nodes were updated."""
+    operations = [UpdateOne({"_id": genome["strategy_id"]}, {"$set": _node_fields(genome)}) for genome in genomes]
+    if operations:
+        db[LINEAGE_COLLECTION].bulk_write(operations, ordered=False, session=session)
+    return len(operations)
+
+
+def build_nodes(genomes: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Nodes for a full set of genomes, resolving ancestry in memory whatever the input order."""
+    genomes = {genome["strategy_id"]: genome for genome in genomes}
+    nodes: Dict[str, Dict[str, Any]] = {}
+
+    def _resolve(strategy_id: str) -> None:
+        # Iterative DFS so deep chains cannot exhaust the recursion limit.
+        stack = [strategy_id]
+        while stack:
+            current = stack[-1]
+            if current in nodes:
+                stack.pop()
+                continue
+            parents = _parents(genomes[current])
+            pending = [parent for parent in parents if parent in genomes and parent not in nodes and parent not in stack]
+            if pending:
+                stack.extend(pending)
+                continue
+            nodes[current] = {
+                "_id": current,
+                "parents": parents,
+                "ancestors": _merge_ancestors(parents, (nodes[parent] for parent in parents if parent in nodes)),
+                **_node_fields(genomes[current]),
+            }
+            stack.pop()
+
+    for strategy_id in genomes:
+        _resolve(strategy_id)
+    return nodes
+
+
+def write_nodes(nodes: Mapping[str, Dict[str, Any]], *, batch_size: int = 5_000) -> int:
+    """Upsert prebuilt nodes with ``bulk_write`` in batches; returns how many were written."""
+    operations = [
+        UpdateOne({"_id": strategy_id}, {"$set": {key: value for key, value in node.items() if key != "_id"}}, upsert=True)
+        for strategy_id, node in nodes.items()
+    ]
+    with mongo_client() as client:
+        lineage = client[get_database_name()][LINEAGE_COLLECTION]
+        for start in range(0, len(operations), batch_size):
+            lineage.bulk_write(operations[start : start + batch_size], ordered=False)
+    return len(operations)
+
+
+def get_node(strategy_id: str) -> Optional[Dict[str, Any]]:
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        return db[LINEAGE_COLLECTION].find_one({"_id": strategy_id}, NODE_PROJECTION)
+
+
+def get_nodes(strategy_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    ids = list(dict.fromkeys(strategy_ids))
+    if not ids:
+        return {}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        return {node["_id"]: node for node in db[LINEAGE_COLLECTION].find({"_id": {"$in": ids}}, NODE_PROJECTION)}
+
+
+def ancestors(strategy_id: str) -> List[Dict[str, Any]]:
+    """Every ancestor node, nearest generation first; ``[]`` for unknown or root genomes."""
+    node = get_node(strategy_id)
+    if not node or not node.get("ancestors"):
+        return []
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        cursor = db[LINEAGE_COLLECTION].find({"_id": {"$in": node["ancestors"]}}, NODE_PROJECTION)
+        return list(cursor.sort("generation", DESCENDING))
+
+
+def descendants(strategy_id: str, *, limit: int = 500, max_generation: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Descendant nodes ordered by generation, via the multikey ``ancestors`` index."""
+    query: Dict[str, Any] = {"ancestors": strategy_id}
+    if max_generation is not None:
+        query["generation"] = {"$lte": max_generation}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        cursor = db[LINEAGE_COLLECTION].find(query, NODE_PROJECTION).sort("generation", ASCENDING).limit(limit)
+        return list(cursor)
+
+
+def subtree_fitness(strategy_id: str) -> Optional[Dict[str, Any]]:
+    """Size and composite-fitness summary of ``strategy_id`` and all its descendants."""
+    match = {"$or": [{"_id": strategy_id}, {"ancestors": strategy_id}]}
+    pipeline = [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": None,
+                "size": {"$sum": 1},
+                "best_composite": {"$max": "$composite"},
+                "mean_composite": {"$avg": "$composite"},
+                "max_generation": {"$max": "$generation"},
+                "champions": {"$sum": {"$cond": [{"$eq": ["$status", "champion"]}, 1, 0]}},
+            }
+        },
+    ]
+    with mongo_client() as client:
+        lineage = client[get_database_name()][LINEAGE_COLLECTION]
+        rows = list(lineage.aggregate(pipeline))
+        if not rows or not rows[0]["size"]:
+            return None
+        best = lineage.find_one(match, {"_id": 1}, sort=[("composite", DESCENDING)])
+    summary = rows[0]
+    summary.pop("_id", None)
+    summary["strategy_id"] = strategy_id
+    summary["best_strategy_id"] = best["_id"] if best else None
+    return summary
+
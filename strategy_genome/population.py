@@ -0,0 +1,230 @@
+"""Array-backed genome populations: mutation, crossover and clamping as NumPy column ops.
+
+A :class:`Population` keeps one float64 column per ``DEFAULT_PARAM_BOUNDS`` key in a
+structured array (``NaN`` marks a param the genome does not carry). ``StrategyGenome``
+objects are only built by :meth:`Population.to_genomes` when candidates are persisted.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .encoding import DEFAULT_PARAM_BOUNDS, StrategyFitness, StrategyGenome
+
+PARAM_NAMES = tuple(DEFAULT_PARAM_BOUNDS)
+PARAM_DTYPE = np.dtype([(name, np.float64) for name in PARAM_NAMES])
+LOWER = np.array([DEFAULT_PARAM_BOUNDS[name][0] for name in PARAM_NAMES])
+UPPER = np.array([DEFAULT_PARAM_BOUNDS[name][1] for name in PARAM_NAMES])
+_SHORT = PARAM_NAMES.index("ema_short")
+_LONG = PARAM_NAMES.index("ema_long")
+_FORECAST_WEIGHT = PARAM_NAMES.index("forecast_weight")
+# Random id suffix width; 40 bits keeps collisions negligible for populations in the 10^4-10^5 range.
+_ID_HEX_DIGITS = 10
+# Per-genome array fields of ``Population`` (everything except ``templates``).
+_COLUMNS = (
+    "params",
+    "strategy_ids",
+    "families",
+    "generation",
+    "parent_ids",
+    "uses_forecast",
+    "forecast_weight",
+    "origin",
+    "mate",
+    "operator",
+)
+
+
+def as_matrix(params: np.ndarray) -> np.ndarray:
+    """``N x len(PARAM_NAMES)`` float view of a ``PARAM_DTYPE`` array (writes go through)."""
+    return params.view(np.float64).reshape(len(params), len(PARAM_NAMES))
+
+
+def normalize_matrix(matrix: np.ndarray) -> np.ndarray:
+    """Vectorised ``normalize_params``: clamp to bounds and order ``ema_short < ema_long`` in place."""
+    np.clip(matrix, LOWER, UPPER, out=matrix)
+    short = matrix[:, _SHORT].copy()
+    long_ = matrix[:, _LONG]
+    swap = short >= long_
+    matrix[swap, _SHORT] = long_[swap]
+    matrix[swap, _LONG] = short[swap]
+    return matrix
+
+
+def _strategy_ids(families: np.ndarray, generation: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    suffix = np.char.mod(f"%0{_ID_HEX_DIGITS}x", rng.integers(0, 16**_ID_HEX_DIGITS, size=len(families)))
+    prefix = np.char.add(np.char.add(families.astype(str), "-gen"), generation.astype(str))
+    return np.char.add(np.char.add(prefix, "-"), suffix).astype(object)
+
+
+@dataclass
+class Population:
+    """N genomes as parallel arrays; ``origin``/``mate`` index into ``templates`` for tags and metadata."""
+
+    params: np.ndarray
+    strategy_ids: np.ndarray
+    families: np.ndarray
+    generation: np.ndarray
+    parent_ids: np.ndarray
+    uses_forecast: np.ndarray
+    forecast_weight: np.ndarray
+    origin: np.ndarray
+    mate: np.ndarray
+    operator: np.ndarray
+    templates: List[StrategyGenome] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return as_matrix(self.params)
+
+    @classmethod
+    def from_genomes(cls, genomes: Sequence[StrategyGenome]) -> "Population":
+        size = len(genomes)
+        params = np.full(size, np.nan, dtype=PARAM_DTYPE)
+        for name in PARAM_NAMES:
+            params[name] = [float(genome.params.get(name, np.nan)) for genome in genomes]
+        return cls(
+            params=params,
+            strategy_ids=np.array([genome.strategy_id for genome in genomes], dtype=object),
+            families=np.array([genome.family for genome in genomes], dtype=object),
+            generation=np.array([genome.generation for genome in genomes], dtype=np.int32),
+            parent_ids=np.array([genome.mutation_parent for genome in genomes], dtype=object),
+            uses_forecast=np.array([genome.uses_forecast for genome in genomes], dtype=bool),
+            forecast_weight=np.array([genome.forecast_weight for genome in genomes], dtype=np.float64),
+            origin=np.arange(size),
+            mate=np.full(size, -1),
+            operator=np.full(size, "", dtype=object),
+            templates=list(genomes),
+        )
+
+    def take(self, indices: np.ndarray) -> "Population":
+        indices = np.asarray(indices, dtype=np.intp)
+        return replace(self, **{name: getattr(self, name)[indices] for name in _COLUMNS})
+
+    def _children(
+        self,
+        params: np.ndarray,
+        parents: np.ndarray,
+        generation: np.ndarray,
+        operator: str,
+        rng: np.random.Generator,
+        *,
+        mates: Optional[np.ndarray] = None,
+    ) -> "Population":
+        families = self.families[parents]
+        matrix = as_matrix(params)
+        weight = matrix[:, _FORECAST_WEIGHT]
+        fallback = self.forecast_weight[parents]
+        uses_forecast = self.uses_forecast[parents]
+        mate_origin = np.full(len(parents), -1)
+        if mates is not None:
+            fallback = (fallback + self.forecast_weight[mates]) / 2
+            uses_forecast = uses_forecast | self.uses_forecast[mates]
+            mate_origin = self.origin[mates]
+        return Population(
+            params=params,
+            strategy_ids=_strategy_ids(families, generation, rng),
+            families=families,
+            generation=generation.astype(np.int32),
+            parent_ids=self.strategy_ids[parents],
+            uses_forecast=uses_forecast,
+            forecast_weight=np.where(np.isnan(weight), fallback, weight),
+            origin=self.origin[parents],
+            mate=mate_origin,
+            operator=np.full(len(parents), operator, dtype=object),
+            templates=self.templates,
+        )
+
+    def mutate(
+        self,
+        rng: np.random.Generator,
+        mutation_rate: float = 0.3,
+        mutation_scale: float = 0.2,
+        parents: Optional[np.ndarray] = None,
+    ) -> "Population":
+        """One child per entry of ``parents`` (default: every genome), jittering each param with
+        probability ``mutation_rate`` by a factor in ``1 +/- mutation_scale``."""
+        parents = np.arange(len(self)) if parents is None else np.asarray(parents, dtype=np.intp)
+        params = self.params[parents].copy()
+        matrix = as_matrix(params)
+        mask = rng.random(matrix.shape) <= mutation_rate
+        jitter = 1.0 + rng.uniform(-mutation_scale, mutation_scale, size=matrix.shape)
+        np.multiply(matrix, jitter, out=matrix, where=mask)
+        normalize_matrix(matrix)
+        generation = np.maximum(self.generation[parents] + 1, 1)
+        return self._children(params, parents, generation, "mutation", rng)
+
+    def crossover(self, rng: np.random.Generator, parents_a: np.ndarray, parents_b: np.ndarray) -> "Population":
+        """Blend pairs with an independent uniform weight per param; a param only one parent
+        carries is inherited as is."""
+        parents_a = np.asarray(parents_a, dtype=np.intp)
+        parents_b = np.asarray(parents_b, dtype=np.intp)
+        a = as_matrix(self.params[parents_a])
+        b = as_matrix(self.params[parents_b])
+        weight = rng.random(a.shape)
+        blended = a * weight + b * (1.0 - weight)
+        blended = np.where(np.isnan(a), b, np.where(np.isnan(b), a, blended))
+        params = np.empty(len(parents_a), dtype=PARAM_DTYPE)
+        as_matrix(params)[:] = normalize_matrix(blended)
+        generation = np.maximum(self.generation[parents_a], self.generation[parents_b]) + 1
+        return self._children(params, parents_a, generation, "crossover", rng, mates=parents_b)
+
+    def spawn(self, rng: np.random.Generator, mutations_per_parent: int = 5) -> "Population":
+        """Array form of ``spawn_variants``: mutants of every genome plus adjacent-pair crossovers."""
+        children = [self.mutate(rng, parents=np.repeat(np.arange(len(self)), mutations_per_parent))]
+        if len(self) >= 2:
+            children.append(self.crossover(rng, np.arange(len(self) - 1), np.arange(1, len(self))))
+        return concat(children)
+
+    def to_genomes(self) -> List[StrategyGenome]:
+        """Materialise ``StrategyGenome`` objects; params a genome never carried are dropped."""
+        matrix = self.matrix
+        present = ~np.isnan(matrix)
+        genomes: List[StrategyGenome] = []
+        for row in range(len(self)):
+            template = self.templates[self.origin[row]]
+            params: Dict[str, float] = {
+                name: float(value) for name, value, keep in zip(PARAM_NAMES, matrix[row], present[row]) if keep
+            }
+            operator = self.operator[row]
+            if not operator:
+                genomes.append(replace(template, params=params))
+                continue
+            tags = {*template.tags, operator}
+            metadata = {**template.metadata}
+            mate = self.mate[row]
+            if mate >= 0:
+                tags.update(self.templates[mate].tags)
+                metadata.update(self.templates[mate].metadata)
+            genomes.append(
+                StrategyGenome(
+                    strategy_id=str(self.strategy_ids[row]),
+                    family=str(self.families[row]),
+                    params=params,
+                    uses_forecast=bool(self.uses_forecast[row]),
+                    forecast_weight=float(self.forecast_weight[row]),
+                    mutation_parent=self.parent_ids[row],
+                    generation=int(self.generation[row]),
+                    status="candidate",
+                    fitness=StrategyFitness(),
+                    tags=list(tags),
+                    metadata=metadata,
+                )
+            )
+        return genomes
+
+
+def concat(populations: Sequence[Population]) -> Population:
+    """Stack populations that share ``templates`` (e.g. children of one parent population)."""
+    first = populations[0]
+    if any(population.templates is not first.templates for population in populations[1:]):
+        raise ValueError("Populations must share templates to be concatenated")
+    return replace(
+        first,
+        **{name: np.concatenate([getattr(population, name) for population in populations]) for name in _COLUMNS},
+    )
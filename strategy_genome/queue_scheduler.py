@@ -0,0 +1,213 @@
+"""Experiment queue scheduling: priority classes, family quotas, shortest-job-first and backpressure.
+
+Pending items share one ``priority`` order that workers claim from: priority class first,
+then items pinned by a manual reorder, then a round-robin over ``(family, symbol)`` groups
+where each round takes every group's cheapest remaining job. Costs are the median wall-clock
+time of recently completed items of the same family and symbol.
+"""
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from statistics import median
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from strategy_genome.encoding import StrategyGenome
+from strategy_genome.repository import (
+    bulk_update_queue_items,
+    fetch_queue,
+    get_experiment_settings,
+    queue_status_counts,
+    recent_queue_durations,
+    record_queue_items,
+)
+
+# Highest first. Manual runs come from the UI, scheduled ones from the nightly cycle and
+# background ones from optimisers that can always wait.
+PRIORITY_CLASSES = ("manual", "scheduled", "background")
+DEFAULT_PRIORITY_CLASS = "scheduled"
+# Runtime assumed for a family/symbol with no completed history.
+DEFAULT_COST_SECONDS = 60.0
+COST_HISTORY_LIMIT = 500
+
+
+@dataclass
+class QueuePolicy:
+    max_queue: int = 50
+    manual_headroom: int = 10
+    max_pending_per_family: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "QueuePolicy":
+        return cls(
+            max_queue=int(settings.get("max_queue") or cls.max_queue),
+            manual_headroom=int(settings.get("manual_headroom", cls.manual_headroom) or 0),
+            max_pending_per_family=int(settings.get("max_pending_per_family", 0) or 0),
+        )
+
+    def capacity(self, priority_class: str) -> int:
+        return self.max_queue + (self.manual_headroom if priority_class == "manual" else 0)
+
+
+@dataclass
+class QueueAdmission:
+    queued: List[Dict[str, Any]] = field(default_factory=list)
+    rejected: int = 0
+    reason: Optional[str] = None
+    retry_after: Optional[int] = None
+
+
+def _class_rank(item: Mapping[str, Any]) -> int:
+    name = item.get("priority_class") or DEFAULT_PRIORITY_CLASS
+    return PRIORITY_CLASSES.index(name) if name in PRIORITY_CLASSES else len(PRIORITY_CLASSES)
+
+
+def _cost(item: Mapping[str, Any]) -> float:
+    value = item.get("estimated_cost")
+    return float(value) if value is not None else DEFAULT_COST_SECONDS
+
+
+def estimate_costs(keys: Iterable[Tuple[str, Optional[str]]]) -> Dict[Tuple[str, Optional[str]], float]:
+    """Median runtime per ``(family, symbol)``, falling back to the family, then all history."""
+    by_group: Dict[Tuple[str, Optional[str]], List[float]] = defaultdict(list)
+    by_family: Dict[str, List[float]] = defaultdict(list)
+    overall: List[float] = []
+    for row in recent_queue_durations(COST_HISTORY_LIMIT):
+        by_group[(row["family"], row["symbol"])].append(row["seconds"])
+        by_family[row["family"]].append(row["seconds"])
+        overall.append(row["seconds"])
+    fallback = median(overall) if overall else DEFAULT_COST_SECONDS
+    costs: Dict[Tuple[str, Optional[str]], float] = {}
+    for family, symbol in set(keys):
+        samples = by_group.get((family, symbol)) or by_family.get(family)
+        costs[(family, symbol)] = median(samples) if samples else fallback
+    return costs
+
+
+def order_pending(items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Claim order for pending items (see the module docstring)."""
+    pinned = [item for item in items if item.get("pinned_rank") is not None]
+    groups: Dict[Tuple[int, Any, Any], List[Dict[str, Any]]] = defaultdict(list)
+    for item in items:
+        if item.get("pinned_rank") is None:
+            groups[(_class_rank(item), item.get("family"), item.get("symbol"))].append(item)
+
+    def _created(item: Mapping[str, Any]) -> datetime:
+        return item.get("created_at") or datetime.min
+
+    keyed: List[Tuple[Tuple[Any, ...], Dict[str, Any]]] = [
+        ((_class_rank(item), 0, item["pinned_rank"], 0.0, _created(item)), item) for item in pinned
+    ]
+    for (rank, _, _), members in groups.items():
+        members.sort(key=lambda item: (_cost(item), _created(item)))
+        keyed.extend(((rank, 1, turn, _cost(item), _created(item)), item) for turn, item in enumerate(members))
+    keyed.sort(key=lambda pair: pair[0])
+    return [item for _, item in keyed]
+
+
+def rebalance_queue(pinned: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """Rewrite every pending item's ``priority`` in claim order with one ``bulk_write``.
+
+    ``pinned`` ids move to the front of their priority class in the given order and stay
+    there across later rebalances.
+    """
+    items = fetch_queue(status="pending")
+    pins = {queue_id: rank for rank, queue_id in enumerate(pinned, start=1)}
+    if pins:
+        # A new manual order replaces the previous one.
+        for item in items:
+            item["pinned_rank"] = pins.get(item["_id"])
+    updates: Dict[str, Dict[str, Any]] = {}
+    ordered = order_pending(items)
+    for priority, item in enumerate(ordered, start=1):
+        if item.get("priority") != priority or pins:
+            updates[item["_id"]] = {"priority": priority, "pinned_rank": item.get("pinned_rank")}
+        item["priority"] = priority
+    bulk_update_queue_items(updates)
+    return ordered
+
+
+def reprioritize(queue_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Pin ``queue_ids`` in the given order and return the whole queue by priority."""
+    rebalance_queue(pinned=queue_ids)
+    return fetch_queue()
+
+
+def queue_pressure(policy: Optional[QueuePolicy] = None) -> Dict[str, Any]:
+    """Active load against capacity; ``retry_after`` estimates seconds until a slot frees up."""
+    policy = policy or QueuePolicy.from_settings(get_experiment_settings())
+    rows = queue_status_counts()
+    pending = sum(row["count"] for row in rows if row["status"] == "pending")
+    running = sum(row["count"] for row in rows if row["status"] == "running")
+    pending_cost = sum(row["estimated_cost"] for row in rows if row["status"] == "pending")
+    families: Dict[str, int] = defaultdict(int)
+    classes: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        families[row.get("family") or "unknown"] += row["count"]
+        classes[row.get("priority_class") or DEFAULT_PRIORITY_CLASS] += row["count"]
+    active = pending + running
+    return {
+        "active": active,
+        "pending": pending,
+        "running": running,
+        "capacity": policy.max_queue,
+        "utilisation": active / policy.max_queue if policy.max_queue else 0.0,
+        "accepting": {name: active < policy.capacity(name) for name in PRIORITY_CLASSES},
+        "families": dict(families),
+        "classes": dict(classes),
+        "retry_after": max(1, math.ceil(pending_cost / max(running, 1))) if pending else 1,
+    }
+
+
+def enqueue(
+    genomes: Sequence[StrategyGenome],
+    *,
+    priority_class: str = DEFAULT_PRIORITY_CLASS,
+    context: Optional[Mapping[str, Any]] = None,
+    policy: Optional[QueuePolicy] = None,
+) -> QueueAdmission:
+    """Admit genomes under the class capacity and family quota, then rebalance the queue.
+
+    ``context`` (symbol, interval, horizon) is stored on each item so any worker can run it.
+    Genomes that do not fit are counted in ``rejected`` with a ``retry_after`` hint.
+    """
+    if priority_class not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class '{priority_class}'")
+    policy = policy or QueuePolicy.from_settings(get_experiment_settings())
+    pressure = queue_pressure(policy)
+    room = max(policy.capacity(priority_class) - pressure["active"], 0)
+    family_load = defaultdict(int, pressure["families"])
+    selected: List[StrategyGenome] = []
+    reason: Optional[str] = None
+    for genome in genomes:
+        if len(selected) >= room:
+            reason = "queue_full"
+            break
+        if policy.max_pending_per_family and family_load[genome.family] >= policy.max_pending_per_family:
+            reason = reason or "family_quota"
+            continue
+        family_load[genome.family] += 1
+        selected.append(genome)
+    rejected = len(genomes) - len(selected)
+    if not selected:
+        return QueueAdmission(rejected=rejected, reason=reason, retry_after=pressure["retry_after"])
+
+    context = dict(context or {})
+    symbol = context.get("symbol")
+    costs = estimate_costs((genome.family, symbol) for genome in selected)
+    queued = record_queue_items(
+        selected,
+        fields={"priority_class": priority_class, **context},
+        estimated_costs=[costs[(genome.family, symbol)] for genome in selected],
+    )
+    priorities = {item["_id"]: item["priority"] for item in rebalance_queue()}
+    for item in queued:
+        item["priority"] = priorities.get(item["_id"], item["priority"])
+    return QueueAdmission(
+        queued=queued,
+        rejected=rejected,
+        reason=reason if rejected else None,
+        retry_after=pressure["retry_after"] if rejected else None,
+    )
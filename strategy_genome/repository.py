@@ -2,14 +2,15 @@
 from __future__ import annotations
 
 from dataclasses import asdict
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 
 from db.client import get_database_name, mongo_client
+from strategy_genome import lineage
 from strategy_genome.encoding import (
     StrategyFitness,
     StrategyGenome,
@@ -22,6 +23,8 @@ EXPERIMENT_QUEUE_COLLECTION = "experiments_queue"
 LEADERBOARD_COLLECTION = "leaderboards"
 SETTINGS_COLLECTION = "settings"
 EXPERIMENT_SETTINGS_ID = "experiment_settings"
+# Claimed queue items must heartbeat within this window or another worker may take them over.
+DEFAULT_LEASE_SECONDS = 300
 
 DEFAULT_EXPERIMENT_SETTINGS = {
     "symbol": "BTC/USDT",
@@ -34,7 +37,13 @@ DEFAULT_EXPERIMENT_SETTINGS = {
     "min_confidence": 0.6,
     "min_return": 0.001,
     "max_queue": 50,
+    # Extra pending slots only manual (UI) runs may use once the queue is at ``max_queue``.
+    "manual_headroom": 10,
+    # Cap on active queue items per strategy family; 0 disables the quota.
+    "max_pending_per_family": 0,
 }
+# Active items count towards queue capacity; finished ones do not.
+ACTIVE_QUEUE_STATUSES = ("pending", "running")
 
 
 def _ensure_indexes() -> None:
@@ -48,7 +57,11 @@ def _ensure_indexes() -> None:
 
         queue = db[EXPERIMENT_QUEUE_COLLECTION]
         queue.create_index([("status", ASCENDING), ("priority", ASCENDING)])
+        queue.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
         queue.create_index("strategy_id")
+        queue.create_index([("status", ASCENDING), ("finished_at", DESCENDING)])
+
+        lineage.create_indexes(db)
 
 
 def ensure_seed_genomes(families: Sequence[str] | None = None) -> List[Dict[str, Any]]:
@@ -68,6 +81,7 @@ def ensure_seed_genomes(families: Sequence[str] | None = None) -> List[Dict[str,
             seed["_id"] = seed["strategy_id"]
             seed["updated_at"] = datetime.utcnow()
             collection.insert_one(seed)
+            lineage.index_genome(db, seed)
             inserted.append(seed)
     return inserted
 
@@ -107,6 +121,19 @@ def get_genome(strategy_id: str) -> Optional[Dict[str, Any]]:
     return doc
 
 
+def get_genomes(strategy_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Genomes keyed by strategy id, fetched with a single ``$in`` query."""
+    ids = sorted({strategy_id for strategy_id in strategy_ids if strategy_id})
+    if not ids:
+        return {}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        docs = list(db[STRATEGY_COLLECTION].find({"strategy_id": {"$in": ids}}))
+    for doc in docs:
+        doc["_id"] = str(doc.get("_id", doc["strategy_id"]))
+    return {doc["strategy_id"]: doc for doc in docs}
+
+
 def save_genome(genome: StrategyGenome) -> Dict[str, Any]:
     payload = genome.document()
     payload["_id"] = payload["strategy_id"]
@@ -119,6 +146,7 @@ def save_genome(genome: StrategyGenome) -> Dict[str, Any]:
             upsert=True,
         )
         saved = db[STRATEGY_COLLECTION].find_one({"strategy_id": payload["strategy_id"]})
+        lineage.index_genome(db, saved or payload)
     if not saved:
         return payload
     saved["_id"] = str(saved.get("_id", payload["strategy_id"]))
@@ -142,6 +170,7 @@ def update_genome_fitness(
     metrics: Dict[str, Any],
     *,
     run_id: Optional[str] = None,
+    evaluation_mode: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     fitness = StrategyFitness(
         roi=float(metrics.get("roi", 0.0)),
@@ -153,6 +182,9 @@ def update_genome_fitness(
     )
     payload = asdict(fitness)
     payload["composite"] = fitness.composite
+    mode = evaluation_mode or metrics.get("evaluation_mode")
+    if mode:
+        payload["evaluation_mode"] = mode
     update_fields: Dict[str, Any] = {
         "fitness": payload,
         "updated_at": datetime.utcnow(),
@@ -168,6 +200,8 @@ def update_genome_fitness(
             {"$set": update_fields},
             return_document=ReturnDocument.AFTER,
         )
+        if result:
+            lineage.sync_node(db, result)
     if not result:
         return None
     result["_id"] = str(result.get("_id", strategy_id))
@@ -182,6 +216,8 @@ def promote_strategy(strategy_id: str) -> Optional[Dict[str, Any]]:
             {"$set": {"status": "champion", "updated_at": datetime.utcnow()}},
             return_document=ReturnDocument.AFTER,
         )
+        if updated:
+            lineage.sync_node(db, updated)
     if not updated:
         return None
     updated["_id"] = str(updated.get("_id", strategy_id))
@@ -196,38 +232,72 @@ def archive_strategy(strategy_id: str) -> Optional[Dict[str, Any]]:
             {"$set": {"status": "archived", "updated_at": datetime.utcnow()}},
             return_document=ReturnDocument.AFTER,
         )
+        if updated:
+            lineage.sync_node(db, updated)
     if not updated:
         return None
     updated["_id"] = str(updated.get("_id", strategy_id))
     return updated
 
 
-def record_queue_items(genomes: Iterable[StrategyGenome], max_queue: Optional[int] = None) -> List[Dict[str, Any]]:
-    documents: List[Dict[str, Any]] = []
+def rebuild_lineage_index() -> int:
+    """Recompute every lineage node from ``strategies``; returns the number of nodes written."""
+    _ensure_indexes()
+    projection = {
+        "_id": 0,
+        "strategy_id": 1,
+        "mutation_parent": 1,
+        "family": 1,
+        "generation": 1,
+        "status": 1,
+        "fitness.composite": 1,
+    }
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        nodes = lineage.build_nodes(db[STRATEGY_COLLECTION].find({}, projection))
+    return lineage.write_nodes(nodes)
+
+
+def record_queue_items(
+    genomes: Iterable[StrategyGenome],
+    max_queue: Optional[int] = None,
+    *,
+    fields: Optional[Mapping[str, Any]] = None,
+    estimated_costs: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """Insert pending queue items, appended after the active ones.
+
+    ``max_queue`` caps active (pending or running) items. ``fields`` is stored on every item
+    (priority class, run context) and ``estimated_costs`` gives each item's expected runtime.
+    """
     now = datetime.utcnow()
     genomes_list = list(genomes)
     with mongo_client() as client:
         db = client[get_database_name()]
         queue = db[EXPERIMENT_QUEUE_COLLECTION]
-        existing_count = queue.count_documents({})
+        existing_count = queue.count_documents({"status": {"$in": list(ACTIVE_QUEUE_STATUSES)}})
         available = max_queue - existing_count if max_queue else None
         if available is not None and available < 0:
             available = 0
         selected = genomes_list if available is None else genomes_list[:available]
-        for priority, genome in enumerate(selected, start=existing_count + 1):
+        documents: List[Dict[str, Any]] = []
+        for offset, genome in enumerate(selected):
             document = genome.document()
+            document.update(dict(fields or {}))
+            if estimated_costs is not None:
+                document["estimated_cost"] = float(estimated_costs[offset])
             document.update(
                 {
                     "_id": ObjectId(),
-                    "priority": priority,
+                    "priority": existing_count + offset + 1,
                     "status": "pending",
                     "created_at": now,
                 }
             )
-            inserted_id = queue.insert_one(document).inserted_id
-            document["_id"] = inserted_id
-            documents.append({**document, "_id": str(inserted_id)})
-    return documents
+            documents.append(document)
+        if documents:
+            queue.insert_many(documents)
+    return [{**document, "_id": str(document["_id"])} for document in documents]
 
 
 def fetch_queue(status: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -261,21 +331,187 @@ def update_queue_item(queue_id: str, updates: Dict[str, Any]) -> Optional[Dict[s
     return updated
 
 
-def reprioritize_queue(queue_ids: Sequence[str]) -> List[Dict[str, Any]]:
+def _claimable(now: datetime) -> Dict[str, Any]:
+    return {
+        "$or": [
+            {"status": "pending"},
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+        ]
+    }
+
+
+def claim_queue_item(
+    worker_id: str,
+    queue_id: Optional[str] = None,
+    *,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    steal: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Atomically lease one queue item to ``worker_id``.
+
+    ``queue_id`` is tried first; when it is already taken (or finished) and ``steal`` is set,
+    the highest-priority claimable item is leased instead. Items whose worker stopped
+    heartbeating (``lease_expires_at`` in the past) count as claimable. Returns ``None``
+    when nothing is left to claim.
+    """
+    now = datetime.utcnow()
+    update = {
+        "$set": {
+            "status": "running",
+            "worker_id": worker_id,
+            "claimed_at": now,
+            "heartbeat_at": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "updated_at": now,
+        },
+        "$inc": {"attempts": 1},
+    }
+    filters: List[Dict[str, Any]] = []
+    if queue_id:
+        filters.append({"_id": ObjectId(queue_id), **_claimable(now)})
+    if steal or not queue_id:
+        filters.append(_claimable(now))
     with mongo_client() as client:
         db = client[get_database_name()]
         queue = db[EXPERIMENT_QUEUE_COLLECTION]
-        for index, queue_id in enumerate(queue_ids, start=1):
-            queue.update_one(
-                {"_id": ObjectId(queue_id)},
-                {"$set": {"priority": index, "updated_at": datetime.utcnow()}},
+        for query in filters:
+            claimed = queue.find_one_and_update(
+                query,
+                update,
+                sort=[("priority", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
             )
-        items = list(
-            queue.find({}).sort("priority", ASCENDING)
+            if claimed:
+                claimed["_id"] = str(claimed["_id"])
+                return claimed
+    return None
+
+
+def heartbeat_queue_item(queue_id: str, worker_id: str, *, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> bool:
+    """Extend the lease; ``False`` means the item was taken over by another worker."""
+    now = datetime.utcnow()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        result = db[EXPERIMENT_QUEUE_COLLECTION].update_one(
+            {"_id": ObjectId(queue_id), "worker_id": worker_id, "status": "running"},
+            {"$set": {"heartbeat_at": now, "lease_expires_at": now + timedelta(seconds=lease_seconds)}},
         )
-    for item in items:
-        item["_id"] = str(item["_id"])
-    return items
+    return result.matched_count == 1
+
+
+def finish_queue_item(queue_id: str, worker_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Record a final status, but only while ``worker_id`` still holds the lease."""
+    now = datetime.utcnow()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        updated = db[EXPERIMENT_QUEUE_COLLECTION].find_one_and_update(
+            {"_id": ObjectId(queue_id), "worker_id": worker_id, "status": "running"},
+            {
+                "$set": {**updates, "updated_at": now, "finished_at": now},
+                "$unset": {"lease_expires_at": ""},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+    if not updated:
+        return None
+    updated["_id"] = str(updated["_id"])
+    return updated
+
+
+def lease_seconds_remaining(queue_id: str) -> Optional[float]:
+    """Seconds left on a running item's live lease; ``None`` when the item is claimable or finished."""
+    now = datetime.utcnow()
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        doc = db[EXPERIMENT_QUEUE_COLLECTION].find_one(
+            {"_id": ObjectId(queue_id), "status": "running", "lease_expires_at": {"$gte": now}},
+            {"lease_expires_at": 1},
+        )
+    if not doc:
+        return None
+    return (doc["lease_expires_at"] - now).total_seconds()
+
+
+def release_expired_queue_items() -> List[str]:
+    """Put items held by dead workers back to ``pending``; returns the released ids."""
+    now = datetime.utcnow()
+    expired = {"status": "running", "lease_expires_at": {"$lt": now}}
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        queue = db[EXPERIMENT_QUEUE_COLLECTION]
+        ids = [doc["_id"] for doc in queue.find(expired, {"_id": 1})]
+        if not ids:
+            return []
+        # Re-check expiry so an item reclaimed between the read and the write keeps its new lease.
+        queue.update_many(
+            {"_id": {"$in": ids}, **expired},
+            {"$set": {"status": "pending", "updated_at": now}, "$unset": {"worker_id": "", "lease_expires_at": ""}},
+        )
+        released = [doc["_id"] for doc in queue.find({"_id": {"$in": ids}, "status": "pending"}, {"_id": 1})]
+    return [str(queue_id) for queue_id in released]
+
+
+def release_expired_leases() -> int:
+    """Put items held by dead workers back to ``pending``; returns how many were released."""
+    return len(release_expired_queue_items())
+
+
+def bulk_update_queue_items(updates: Mapping[str, Dict[str, Any]]) -> int:
+    """``$set`` many queue items in one ``bulk_write``; returns the match count."""
+    if not updates:
+        return 0
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({"_id": ObjectId(queue_id)}, {"$set": {**fields, "updated_at": now}})
+        for queue_id, fields in updates.items()
+    ]
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        result = db[EXPERIMENT_QUEUE_COLLECTION].bulk_write(operations, ordered=False)
+    return result.matched_count
+
+
+def queue_status_counts() -> List[Dict[str, Any]]:
+    """Active item counts grouped by ``status``, ``priority_class`` and ``family``."""
+    pipeline = [
+        {"$match": {"status": {"$in": list(ACTIVE_QUEUE_STATUSES)}}},
+        {
+            "$group": {
+                "_id": {"status": "$status", "priority_class": "$priority_class", "family": "$family"},
+                "count": {"$sum": 1},
+                "estimated_cost": {"$sum": "$estimated_cost"},
+            }
+        },
+    ]
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        rows = list(db[EXPERIMENT_QUEUE_COLLECTION].aggregate(pipeline))
+    return [{**row["_id"], "count": row["count"], "estimated_cost": float(row.get("estimated_cost") or 0.0)} for row in rows]
+
+
+def recent_queue_durations(limit: int = 500) -> List[Dict[str, Any]]:
+    """``family``, ``symbol`` and wall-clock ``seconds`` of the latest completed queue items."""
+    with mongo_client() as client:
+        db = client[get_database_name()]
+        cursor = (
+            db[EXPERIMENT_QUEUE_COLLECTION]
+            .find(
+                {"status": "completed", "started_at": {"$ne": None}, "finished_at": {"$ne": None}},
+                {"family": 1, "symbol": 1, "started_at": 1, "finished_at": 1},
+            )
+            .sort("finished_at", DESCENDING)
+            .limit(limit)
+        )
+        items = list(cursor)
+    return [
+        {
+            "family": item.get("family"),
+            "symbol": item.get("symbol"),
+            "seconds": (item["finished_at"] - item["started_at"]).total_seconds(),
+        }
+        for item in items
+        if item.get("started_at") and item.get("finished_at")
+    ]
 
 
 def record_leaderboard(payload: Dict[str, Any]) -> None:
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester.engine import Backtester
+from backtester.portfolio import PortfolioBacktester
+
+
+def _prices(columns: list[str], bars: int = 60, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+    steps = rng.normal(0, 0.01, size=(bars, len(columns)))
+    return pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), index=index, columns=columns)
+
+
+def _signals(prices: pd.DataFrame) -> pd.DataFrame:
+    pattern = np.array(["hold", "buy", "hold", "hold", "sell", "hold", "buy", "sell"])
+    cells = np.resize(pattern, prices.shape[0])
+    return pd.DataFrame({col: np.roll(cells, shift) for shift, col in enumerate(prices.columns)}, index=prices.index)
+
+
+def test_portfolio_single_symbol_matches_backtester() -> None:
+    prices = _prices(["BTC/USDT"])
+    signals = _signals(prices)
+
+    engine = Backtester(initial_capital=1_000.0, position_size_pct=0.5, take_profit_pct=0.01, stop_loss_pct=0.01)
+    for ts in prices.index:
+        engine.on_signal(ts, float(prices.at[ts, "BTC/USDT"]), signals.at[ts, "BTC/USDT"])
+    expected = engine.finalize()
+
+    result = PortfolioBacktester(
+        initial_capital=1_000.0, position_size_pct=0.5, take_profit_pct=0.01, stop_loss_pct=0.01
+    ).run(prices, signals)
+
+    np.testing.assert_allclose(result.equity.to_numpy(), [point["equity"] for point in expected.equity_curve])
+    assert len(result.trades) == len(expected.trades)
+    assert result.metrics["roi"] == pytest.approx(expected.metrics["roi"])
+
+
+def test_portfolio_shares_cash_and_symbol_curves_sum_to_equity() -> None:
+    prices = _prices(["BTC/USDT", "ETH/USDT", "SOL/USDT"])
+    prices.iloc[10:15, 2] = np.nan
+    signals = _signals(prices)
+
+    result = PortfolioBacktester(initial_capital=1_000.0, position_size_pct=0.4).run(prices, signals)
+
+    reconstructed = result.symbol_equity.sum(axis=1) + 1_000.0
+    np.testing.assert_allclose(result.equity.to_numpy(), reconstructed.to_numpy())
+    assert {trade.symbol for trade in result.trades} == {"BTC/USDT", "ETH/USDT", "SOL/USDT"}
+    assert not any(trade.entry_ts in prices.index[10:15] for trade in result.trades if trade.symbol == "SOL/USDT")
+    assert set(result.symbol_metrics) == set(prices.columns)
+
+
+def test_run_portfolio_simulation_loads_bars_once_per_symbol(monkeypatch: pytest.MonkeyPatch) -> None:
+    from simulator import runner
+
+    prices = _prices(["BTC/USDT", "ETH/USDT"])
+    reads: list[str] = []
+    saved: dict = {}
+
+    def fake_ohlcv_df(symbol, interval, limit=None, since=None):
+        reads.append(symbol)
+        close = prices[symbol]
+        return pd.DataFrame({"close": close, "high": close * 1.001, "low": close * 0.999, "volume": 1e6})
+
+    def fake_forecasts(symbol, horizon, timestamps):
+        wave = np.sin(np.arange(len(timestamps)) + (0 if symbol == "BTC/USDT" else 2)) * 0.02
+        return wave, np.full(len(timestamps), 0.9)
+
+    monkeypatch.setattr(runner, "get_ohlcv_df", fake_ohlcv_df)
+    monkeypatch.setattr(runner, "generate_for_symbol", lambda symbol, interval: 1)
+    monkeypatch.setattr(runner, "precompute_forecasts", fake_forecasts)
+    monkeypatch.setattr(runner, "save_run", lambda document: saved.update(document) or document["run_id"])
+
+    run_id = runner.run_portfolio_simulation(["BTC/USDT", "ETH/USDT"], "1h", "portfolio-test")
+
+    assert run_id and saved["run_id"] == run_id and saved["mode"] == "portfolio"
+    assert reads == ["BTC/USDT", "ETH/USDT"]
+    assert {trade["symbol"] for trade in saved["trades"]} == {"BTC/USDT", "ETH/USDT"}
+    assert set(saved["symbol_results"]) == {"BTC/USDT", "ETH/USDT"}
+    assert saved["equity_curve"][-1]["timestamp"] == prices.index[-1]
+
+
+def test_run_simulation_reads_precomputed_forecasts(monkeypatch: pytest.MonkeyPatch) -> None:
+    from simulator import runner
+
+    index = pd.date_range("2024-01-01", periods=60, freq="1h")
+    close = pd.Series(100 * np.exp(np.cumsum(np.full(60, 0.002))), index=index)
+    features = pd.DataFrame({"price": close, "high": close * 1.001, "low": close * 0.999, "volume": 1e6})
+    requested: list = []
+    saved: dict = {}
+
+    def fake_forecasts(symbol, horizon, timestamps):
+        requested.append(len(timestamps))
+        predicted = np.full(len(timestamps), 0.02)
+        predicted[::5] = np.nan
+        return predicted, np.full(len(timestamps), 0.9)
+
+    def no_ensemble(*args, **kwargs):
+        raise AssertionError("run_simulation must not call the ensemble per bar")
+
+    monkeypatch.setattr(runner, "generate_for_symbol", lambda symbol, interval: 1)
+    monkeypatch.setattr(runner, "_load_feature_frame", lambda symbol, interval: features)
+    monkeypatch.setattr(runner, "precompute_forecasts", fake_forecasts)
+    monkeypatch.setattr(runner, "ensemble_predict", no_ensemble)
+    monkeypatch.setattr(runner, "save_run", lambda document: saved.update(document) or document["run_id"])
+
+    run_id = runner.run_simulation("BTC/USDT", "1h", "single-test", strategy_config={"forecast_weight": 0.5})
+
+    assert run_id and saved["run_id"] == run_id and requested == [60]
+    assert saved["trades"]
+
+
+def test_signal_codes_match_decide_signal() -> None:
+    from simulator.runner import _decide_signal, signal_codes
+
+    config = {"forecast_weight": 0.5, "min_confidence": 0.6}
+    predicted = np.array([0.1, -0.1, 0.1, 0.0001, np.nan])
+    confidence = np.array([0.9, 0.9, 0.5, 0.9, 0.9])
+    codes = signal_codes(predicted, confidence, "1h", config)
+    expected = [
+        _decide_signal(None if np.isnan(p) else p, c, "1h", config) for p, c in zip(predicted, confidence)
+    ]
+    assert [{1: "buy", -1: "sell", 0: "hold"}[int(code)] for code in codes] == expected
+
+
+def test_population_matches_event_driven_backtester() -> None:
+    from simulator.runner import _decide_signal, population_params
+    from backtester.population import simulate_population
+
+    rng = np.random.default_rng(11)
+    bars = 300
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=bars)))
+    predicted = rng.normal(0, 0.01, size=bars)
+    confidence = rng.uniform(0.4, 1.0, size=bars)
+    predicted[::17] = np.nan
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+
+    configs = [{"uses_forecast": False}, {}]
+    for _ in range(30):
+        configs.append(
+            {
+                "min_return_threshold": float(rng.uniform(0.0, 0.01)),
+                "min_confidence": float(rng.uniform(0.4, 0.8)),
+                "forecast_weight": float(rng.uniform(0.5, 1.5)),
+                "risk_pct": float(rng.uniform(0.05, 0.9)),
+                "take_profit_pct": float(rng.uniform(0.005, 0.05)) if rng.random() > 0.3 else None,
+                "stop_loss_pct": float(rng.uniform(0.005, 0.05)) if rng.random() > 0.3 else None,
+            }
+        )
+
+    result = simulate_population(prices, predicted, confidence, population_params(configs, "1h"))
+
+    for idx, config in enumerate(configs):
+        engine = Backtester(
+            initial_capital=10_000.0,
+            position_size_pct=min(max(config.get("risk_pct", 0.1), 0.01), 0.99),
+            take_profit_pct=config.get("take_profit_pct"),
+            stop_loss_pct=config.get("stop_loss_pct"),
+        )
+        for t, ts in enumerate(index):
+            pred = None if np.isnan(predicted[t]) else float(predicted[t])
+            conf = None if pred is None else float(confidence[t])
+            engine.on_signal(ts, float(prices[t]), _decide_signal(pred, conf, "1h", config), pred, conf)
+        expected = engine.finalize()
+        for name, value in expected.metrics.items():
+            assert result.metrics[name][idx] == pytest.approx(value, rel=1e-6, abs=1e-9), (idx, name)
+        assert result.trade_counts[idx] == len(expected.trades)
+
+
+def test_streaming_metrics_match_batch_metrics_and_curve_is_sampled() -> None:
+    from evaluation.metrics import compute_experiment_metrics
+    from simulator.runner import decode_equity_series, encode_equity_series
+
+    prices = _prices(["BTC/USDT"], bars=100)
+    signals = _signals(prices)
+    engine = Backtester(initial_capital=1_000.0, position_size_pct=0.5, equity_sample_every=7, record_full_equity=True)
+    for ts in prices.index:
+        engine.on_signal(ts, float(prices.at[ts, "BTC/USDT"]), signals.at[ts, "BTC/USDT"], 0.01, 0.7)
+    result = engine.finalize()
+
+    expected = compute_experiment_metrics(pd.Series(result.full_equity), result.trades, 1_000.0)
+    for name, value in expected.items():
+        assert result.metrics[name] == pytest.approx(value, rel=1e-9, abs=1e-12), name
+    assert len(result.equity_curve) == 16
+    assert result.equity_curve[-1]["equity"] == result.full_equity[-1]
+
+    decoded = decode_equity_series(encode_equity_series(result.full_equity, result.full_timestamps))
+    np.testing.assert_array_equal(decoded.to_numpy(), result.full_equity)
+    assert decoded.index.equals(pd.DatetimeIndex(prices.index, name="timestamp"))
+
+
+def test_bar_aware_execution_matches_across_backtesters() -> None:
+    from backtester.execution_model import ExecutionConfig, ExecutionModel
+    from backtester.population import PopulationParams, simulate_population
+
+    default = ExecutionModel()
+    batch = default.estimate_costs(np.array([100.0, 200.0]), np.array(["buy", "sell"]))
+    np.testing.assert_array_equal(batch.price, [default.apply_slippage(100.0, "buy"), default.apply_slippage(200.0, "sell")])
+
+    model = ExecutionModel(
+        ExecutionConfig(range_spread_factor=0.5, impact_bps=50.0, max_participation=0.2, latency_bars=2)
+    )
+    rng = np.random.default_rng(3)
+    bars = 200
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=bars)))
+    highs = prices * (1 + rng.uniform(0, 0.01, size=bars))
+    lows = prices * (1 - rng.uniform(0, 0.01, size=bars))
+    volumes = rng.uniform(5, 80, size=bars)
+    predicted = rng.normal(0, 0.01, size=bars)
+    confidence = rng.uniform(0.5, 1.0, size=bars)
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+
+    fill = model.estimate_costs(prices[:3], 1, np.array([1.0, 50.0, 1_000.0]), volume=volumes[:3], high=highs[:3], low=lows[:3])
+    assert (fill.price > prices[:3] * 1.0005).all()
+    assert fill.fill_ratio[0] == 1.0 and fill.fill_ratio[2] < 1.0
+
+    params = PopulationParams.build(2, min_return_threshold=0.002, min_confidence=0.6, position_size_pct=[0.5, 0.9])
+    result = simulate_population(
+        prices, predicted, confidence, params, model, volumes=volumes, highs=highs, lows=lows
+    )
+    for idx, size in enumerate([0.5, 0.9]):
+        engine = Backtester(initial_capital=10_000.0, position_size_pct=size, execution_model=model)
+        for t, ts in enumerate(index):
+            signal = "hold"
+            if confidence[t] >= 0.6 and predicted[t] > 0.002:
+                signal = "buy"
+            elif confidence[t] >= 0.6 and predicted[t] < -0.002:
+                signal = "sell"
+            engine.on_signal(
+                ts, float(prices[t]), signal, float(predicted[t]), float(confidence[t]),
+                volume=float(volumes[t]), high=float(highs[t]), low=float(lows[t]),
+            )
+        expected = engine.finalize()
+        assert result.final_equity[idx] == pytest.approx(expected.equity_curve[-1]["equity"], rel=1e-9)
+        for name, value in expected.metrics.items():
+            assert result.metrics[name][idx] == pytest.approx(value, rel=1e-6, abs=1e-9), (idx, name)
+        assert result.trade_counts[idx] == len(expected.trades)
+    assert result.trade_counts.min() > 0
+
+
+def test_walk_forward_folds_are_out_of_sample_and_aggregate() -> None:
+    from backtester.population import PopulationParams, simulate_population
+    from backtester.walk_forward import run_walk_forward, walk_forward_splits
+    from evolution.schemas import PromotionPolicy
+
+    rolling = walk_forward_splits(100, 4)
+    assert [(f.train_start, f.test_start, f.test_end) for f in rolling] == [
+        (0, 20, 40), (20, 40, 60), (40, 60, 80), (60, 80, 100)
+    ]
+    assert all(f.train_end == f.test_start for f in rolling)
+    assert walk_forward_splits(100, 4, anchored=True)[-1].train_start == 0
+    with pytest.raises(ValueError):
+        walk_forward_splits(3, 4)
+
+    rng = np.random.default_rng(8)
+    bars = 250
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=bars)))
+    predicted = rng.normal(0, 0.01, size=bars)
+    confidence = rng.uniform(0.5, 1.0, size=bars)
+    params = PopulationParams.build(2, min_return_threshold=0.002, min_confidence=0.6, position_size_pct=[0.3, 0.8])
+    folds = walk_forward_splits(bars, 4)
+
+    result = run_walk_forward(prices, predicted, confidence, params, folds, n_jobs=2)
+
+    window = slice(folds[2].test_start, folds[2].test_end)
+    expected = simulate_population(prices[window], predicted[window], confidence[window], params)
+    np.testing.assert_allclose(result.test[2].metrics["roi"], expected.metrics["roi"])
+    rois = np.vstack([fold.metrics["roi"] for fold in result.test])
+    np.testing.assert_allclose(result.metrics["roi"], rois.mean(axis=0))
+    np.testing.assert_allclose(result.metrics["positive_fold_ratio"], (rois > 0).mean(axis=0))
+    assert len(result.fold_records(1)) == 4
+
+    policy = PromotionPolicy(min_roi=-1.0, min_sharpe=-100.0, max_drawdown=1.0, require_parent_score=False)
+    summary = {**result.summary(0), "positive_fold_ratio": 0.25}
+    assert not policy.passes(summary, None)
+    assert policy.passes({**summary, "positive_fold_ratio": 0.75}, None)
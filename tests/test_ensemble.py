@@ -22,6 +22,7 @@ class StubModel:
 @pytest.fixture(autouse=True)
 def clear_model_cache() -> None:
     ensemble.MODEL_CACHE.clear()
+    ensemble._SERVING_SETS.clear()
 
 
 def test_ensemble_predict_weighted_average(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -68,3 +69,194 @@ def test_ensemble_predict_weighted_average(monkeypatch: pytest.MonkeyPatch) -> N
     assert result["symbol"] == "BTC/USDT"
     assert result["horizon"] == "1h"
 
+
+def test_float32_feature_cast_and_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+    from sklearn.linear_model import LinearRegression
+
+    from features.precision import cast_features
+
+    monkeypatch.setenv("FEATURE_FLOAT_DTYPE", "float32")
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=80, freq="1h", name="timestamp")
+    frame = pd.DataFrame({"feat_a": rng.normal(size=80), "feat_b": rng.normal(size=80), "close": 100.0}, index=index)
+    cast = cast_features(frame)
+    assert cast["feat_a"].dtype == np.float32
+    assert cast["close"].dtype == np.float64
+
+    # A linear model computes in float64, so float32 rounding of its inputs shows up in the output.
+    features = frame[["feat_a", "feat_b"]]
+    model = LinearRegression().fit(features, features @ np.array([3.0, -2.0]) + rng.normal(size=80))
+    requested = {}
+
+    def fake_feature_vector(symbol, horizon, ts, dtype=None):
+        requested["dtype"] = dtype
+        return cast_features(frame.iloc[[-1]], dtype)
+
+    monkeypatch.setattr(ensemble, "_load_feature_vector", fake_feature_vector)
+    monkeypatch.setattr(
+        ensemble,
+        "_load_candidate_models",
+        lambda symbol, horizon: [{"model_id": "m1", "feature_columns": ["feat_a", "feat_b"]}],
+    )
+    monkeypatch.setattr(ensemble, "_load_model", lambda model_id: model)
+
+    result = ensemble.validate_float32_forecast("BTC/USDT", "1h", index[-1].to_pydatetime())
+    assert requested["dtype"] == np.float64
+    assert 0.0 < result["max_deviation"] < 1e-4
+    assert result["within_tolerance"]
+
+
+def test_active_models_prefers_production_with_slim_projection(monkeypatch: pytest.MonkeyPatch) -> None:
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from models import registry
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(registry, "mongo_client", _mongo_client)
+    monkeypatch.setattr(registry, "_INDEXES_READY", False)
+    for idx, status in enumerate(["candidate", "production", "candidate", "candidate"]):
+        registry.record_model(
+            {
+                "model_id": f"m{idx}",
+                "symbol": "BTC/USDT",
+                "horizon": "1h",
+                "status": status,
+                "trained_at": datetime(2024, 1, 1 + idx),
+                "feature_columns": ["feat_a"],
+                "metrics": {"test": {"rmse": 0.1, "mae": 0.05}},
+                "shap_summary_top_features": [{"feature": "feat_a", "importance": 1.0}],
+            },
+            refresh_ensemble=False,
+        )
+
+    active = registry.active_models("BTC/USDT", "1h")
+    assert [doc["model_id"] for doc in active] == ["m1"]
+    assert "shap_summary_top_features" not in active[0]
+    assert active[0]["metrics"] == {"test": {"rmse": 0.1}}
+
+    registry.update_model("m1", {"status": "archived"})
+    assert [doc["model_id"] for doc in registry.active_models("BTC/USDT", "1h", top_n=2)] == ["m3", "m2"]
+
+
+def test_select_members_keeps_production_and_drops_redundant_models() -> None:
+    from models.membership import select_members
+
+    docs = [
+        {"model_id": "new", "status": "candidate", "metrics": {"test": {"rmse": 1.0}}},
+        {"model_id": "clone", "status": "candidate", "metrics": {"test": {"rmse": 1.0}}},
+        {"model_id": "diverse", "status": "candidate", "metrics": {"test": {"rmse": 1.2}}},
+        {"model_id": "prod", "status": "production", "metrics": {"test": {"rmse": 3.0}}},
+        {"model_id": "stale", "status": "candidate", "metrics": {"test": {"rmse": 1.1}}},
+    ]
+    base = np.linspace(-1, 1, 50)
+    predictions = {
+        "new": base,
+        "clone": base * 1.01,
+        "diverse": np.sin(base * 7),
+        "prod": np.cos(base * 3),
+        "stale": base**3,
+    }
+
+    members, scores = select_members(docs, predictions, max_members=3)
+
+    assert [doc["model_id"] for doc in members] == ["prod", "new", "diverse"]
+    assert scores["new"] > scores["stale"]
+
+    # Production models count against the cap instead of growing the serving set.
+    extra = [{"model_id": f"prod{idx}", "status": "production", "metrics": {"test": {"rmse": 3.0}}} for idx in range(3)]
+    capped, _ = select_members(extra + docs, predictions, max_members=3)
+    assert len(capped) == 3 and all(doc["status"] == "production" for doc in capped)
+
+
+def test_serving_cache_evicts_models_retired_elsewhere(monkeypatch: pytest.MonkeyPatch) -> None:
+    members = {("BTC/USDT", "1h"): ["m1", "m2"], ("ETH/USDT", "1h"): ["m9"]}
+    monkeypatch.setattr(
+        ensemble.membership,
+        "active_members",
+        lambda symbol, horizon: [{"model_id": model_id} for model_id in members[(symbol, horizon)]],
+    )
+    monkeypatch.setattr(ensemble.model_utils, "load_model", lambda model_id: StubModel(0.0))
+    for symbol in ("BTC/USDT", "ETH/USDT"):
+        for doc in ensemble._load_candidate_models(symbol, "1h"):
+            ensemble._load_model(doc["model_id"])
+    assert set(ensemble.MODEL_CACHE) == {"m1", "m2", "m9"}
+
+    # Another process recomputed membership: m1 was demoted in favour of m3.
+    members[("BTC/USDT", "1h")] = ["m3", "m2"]
+    ensemble._load_candidate_models("BTC/USDT", "1h")
+    assert set(ensemble.MODEL_CACHE) == {"m2", "m9"}
+
+
+def test_recompute_members_keeps_old_production_models(monkeypatch: pytest.MonkeyPatch) -> None:
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from models import membership, registry
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(registry, "mongo_client", _mongo_client)
+    monkeypatch.setattr(membership, "mongo_client", _mongo_client)
+    monkeypatch.setattr(registry, "_INDEXES_READY", False)
+    monkeypatch.setattr(membership, "_validation_frame", lambda *args: pd.DataFrame())
+    for idx in range(4):
+        registry.record_model(
+            {
+                "model_id": f"m{idx}",
+                "symbol": "BTC/USDT",
+                "horizon": "1h",
+                "status": "production" if idx == 0 else "candidate",
+                "trained_at": datetime(2024, 1, 1 + idx),
+                "metrics": {"test": {"rmse": 0.1}},
+            },
+            refresh_ensemble=False,
+        )
+
+    document = membership.recompute_members("BTC/USDT", "1h", max_members=2, pool_size=2)
+    assert document["member_ids"] == ["m0", "m3"]
+    assert document["version"] == "m0,m3"
+
+
+def test_promote_model_demotes_previous_production_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from models import registry
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(registry, "mongo_client", _mongo_client)
+    monkeypatch.setattr(registry, "_INDEXES_READY", False)
+    records = {}
+    for model_id, algorithm, status in [
+        ("rf_old", "RandomForestRegressor", "production"),
+        ("lgbm_old", "LightGBMRegressor", "production"),
+        ("rf_new", "RandomForestRegressor", "candidate"),
+    ]:
+        records[model_id] = registry.record_model(
+            {"model_id": model_id, "symbol": "BTC/USDT", "horizon": "1h", "algorithm": algorithm, "status": status},
+            refresh_ensemble=False,
+        )
+
+    assert registry.promote_model(records["rf_new"]["_id"], refresh_ensemble=False) == ["rf_old"]
+
+    production = registry.list_models("BTC/USDT", "1h", status="production")
+    assert sorted(doc["model_id"] for doc in production) == ["lgbm_old", "rf_new"]
+    assert registry.get_model("rf_old")["status"] == "candidate"
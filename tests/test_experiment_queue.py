@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from strategy_genome import lineage, repository
+from strategy_genome.encoding import create_genome_from_dict
+
+
+@pytest.fixture()
+def client(monkeypatch: pytest.MonkeyPatch) -> mongomock.MongoClient:
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    return client
+
+
+def _queue(count: int) -> list[dict]:
+    genomes = [create_genome_from_dict({"strategy_id": f"s{idx}", "family": "ema-cross"}) for idx in range(count)]
+    return repository.record_queue_items(genomes)
+
+
+def test_claims_are_exclusive_and_steal_by_priority(client: mongomock.MongoClient) -> None:
+    items = _queue(3)
+
+    first = repository.claim_queue_item("w1", items[1]["_id"])
+    assert first["_id"] == items[1]["_id"] and first["worker_id"] == "w1" and first["attempts"] == 1
+
+    # w2 was asked for the same item; it is taken, so w2 steals the highest-priority pending one.
+    stolen = repository.claim_queue_item("w2", items[1]["_id"])
+    assert stolen["_id"] == items[0]["_id"]
+    assert repository.claim_queue_item("w3", items[1]["_id"], steal=False) is None
+
+    assert repository.heartbeat_queue_item(items[1]["_id"], "w1")
+    assert not repository.heartbeat_queue_item(items[1]["_id"], "w2")
+    assert repository.finish_queue_item(items[1]["_id"], "w2", {"status": "completed"}) is None
+    done = repository.finish_queue_item(items[1]["_id"], "w1", {"status": "completed", "run_id": "run-1"})
+    assert done["status"] == "completed" and "lease_expires_at" not in done
+
+    assert repository.claim_queue_item("w3")["_id"] == items[2]["_id"]
+    assert repository.claim_queue_item("w3") is None
+
+
+def test_expired_leases_are_reclaimed(client: mongomock.MongoClient) -> None:
+    items = _queue(2)
+    repository.claim_queue_item("dead", items[0]["_id"])
+    repository.claim_queue_item("alive", items[1]["_id"])
+    queue = client[repository.get_database_name()][repository.EXPERIMENT_QUEUE_COLLECTION]
+    queue.update_many({"worker_id": "dead"}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+    reclaimed = repository.claim_queue_item("w2", steal=True)
+    assert reclaimed["_id"] == items[0]["_id"] and reclaimed["attempts"] == 2
+    assert not repository.heartbeat_queue_item(items[0]["_id"], "dead")
+
+    remaining = repository.lease_seconds_remaining(items[0]["_id"])
+    assert 0 < remaining <= repository.DEFAULT_LEASE_SECONDS
+
+    queue.update_many({}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert repository.lease_seconds_remaining(items[0]["_id"]) is None
+    assert sorted(repository.release_expired_queue_items()) == sorted(item["_id"] for item in items)
+    assert {item["status"] for item in repository.fetch_queue()} == {"pending"}
+    assert repository.release_expired_leases() == 0
+
+
+def test_queue_item_task_waits_for_its_own_lease(monkeypatch: pytest.MonkeyPatch) -> None:
+    from celery.exceptions import Retry
+
+    from manager import tasks
+
+    claims = []
+
+    def fake_run(request, worker_id, queue_id=None, *, steal=True):
+        claims.append((queue_id, steal))
+        return None
+
+    leases = {"q1": 120.0}
+    monkeypatch.setattr(tasks, "run_claimed_experiment", fake_run)
+    monkeypatch.setattr(tasks, "lease_seconds_remaining", lambda queue_id: leases.get(queue_id))
+
+    # A redelivered task whose crashed worker still holds the lease retries instead of stealing.
+    with pytest.raises(Retry):
+        tasks.run_queue_item_task("q1", {})
+    assert claims == [("q1", False)]
+
+    leases.clear()
+    assert tasks.run_queue_item_task("q1", {}) is None
+
+
+def test_finalizer_redispatches_released_items(monkeypatch: pytest.MonkeyPatch) -> None:
+    from manager import tasks
+
+    dispatched = []
+    monkeypatch.setattr(tasks, "release_expired_queue_items", lambda: ["q1", "q2"])
+    monkeypatch.setattr(tasks, "generate_leaderboard", lambda limit: None)
+    monkeypatch.setattr(tasks.run_queue_item_task, "apply_async", lambda args: dispatched.append(args))
+
+    summary = tasks.finalize_experiment_cycle_task([{"run_id": "r1"}, None], {"symbol": "BTC/USDT"})
+
+    assert dispatched == [("q1", {"symbol": "BTC/USDT"}), ("q2", {"symbol": "BTC/USDT"})]
+    assert summary == {"queued": 2, "completed": [{"run_id": "r1"}], "released": 2}
+
+
+@pytest.fixture()
+def scheduler(client: mongomock.MongoClient, monkeypatch: pytest.MonkeyPatch):
+    from bson import ObjectId
+
+    from strategy_genome import queue_scheduler
+
+    queue = client[repository.get_database_name()][repository.EXPERIMENT_QUEUE_COLLECTION]
+
+    # mongomock's bulk_write does not accept the UpdateOne arguments of current pymongo.
+    def _bulk_update(updates):
+        for queue_id, fields in updates.items():
+            queue.update_one({"_id": ObjectId(queue_id)}, {"$set": fields})
+        return len(updates)
+
+    monkeypatch.setattr(queue_scheduler, "bulk_update_queue_items", _bulk_update)
+    return queue_scheduler
+
+
+def _genomes(family: str, count: int) -> list:
+    return [create_genome_from_dict({"strategy_id": f"{family}-{idx}", "family": family}) for idx in range(count)]
+
+
+def test_order_pending_interleaves_groups_shortest_first(scheduler) -> None:
+    now = datetime.utcnow()
+    items = [
+        {"_id": "a-slow", "family": "a", "estimated_cost": 90.0, "created_at": now},
+        {"_id": "a-fast", "family": "a", "estimated_cost": 10.0, "created_at": now},
+        {"_id": "a-mid", "family": "a", "estimated_cost": 50.0, "created_at": now},
+        {"_id": "b-only", "family": "b", "estimated_cost": 30.0, "created_at": now},
+        {"_id": "bg", "family": "c", "estimated_cost": 1.0, "priority_class": "background", "created_at": now},
+        {"_id": "manual", "family": "a", "estimated_cost": 500.0, "priority_class": "manual", "created_at": now},
+        {"_id": "pinned", "family": "a", "estimated_cost": 999.0, "pinned_rank": 1, "created_at": now},
+    ]
+    order = [item["_id"] for item in scheduler.order_pending(items)]
+    assert order == ["manual", "pinned", "a-fast", "b-only", "a-mid", "a-slow", "bg"]
+
+
+def test_enqueue_applies_capacity_headroom_and_quotas(scheduler, client: mongomock.MongoClient) -> None:
+    policy = scheduler.QueuePolicy(max_queue=4, manual_headroom=2, max_pending_per_family=2)
+    nightly = scheduler.enqueue(_genomes("a", 2) + _genomes("b", 3), context={"symbol": "BTC/USDT"}, policy=policy)
+    assert len(nightly.queued) == 4 and nightly.rejected == 1 and nightly.reason == "queue_full"
+    assert nightly.retry_after >= 1
+    assert all(item["symbol"] == "BTC/USDT" and item["estimated_cost"] > 0 for item in nightly.queued)
+
+    assert scheduler.enqueue(_genomes("c", 1), policy=policy).reason == "queue_full"
+    assert not scheduler.queue_pressure(policy)["accepting"]["scheduled"]
+
+    # Manual runs use the headroom and jump to the front; family "b" is already at its quota.
+    manual = scheduler.enqueue(_genomes("b", 1) + _genomes("m", 2), priority_class="manual", policy=policy)
+    assert [item["family"] for item in manual.queued] == ["m", "m"] and manual.reason == "family_quota"
+    queue = repository.fetch_queue(status="pending")
+    assert [item["priority_class"] for item in queue[:2]] == ["manual", "manual"]
+    assert [item["priority"] for item in queue] == list(range(1, 7))
+    assert repository.claim_queue_item("w1")["priority_class"] == "manual"
+
+    tail = [item["_id"] for item in queue[2:]][::-1]
+    reordered = [item["_id"] for item in scheduler.reprioritize(tail) if item["status"] == "pending"]
+    assert reordered[1:] == tail
+
+
+def test_lineage_index_tracks_ancestry(client: mongomock.MongoClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(lineage, "mongo_client", repository.mongo_client)
+
+    def _genome(strategy_id: str, parent: str | None, generation: int) -> dict:
+        return {"strategy_id": strategy_id, "family": "ema-cross", "mutation_parent": parent, "generation": generation}
+
+    # The grandchild is saved before its parent and must still inherit the root.
+    for doc in (_genome("root", None, 0), _genome("grandchild", "child", 2), _genome("child", "root", 1)):
+        repository.save_genome(create_genome_from_dict(doc))
+    repository.update_genome_fitness("grandchild", {"composite": 3.0})
+    repository.promote_strategy("child")
+
+    assert [node["_id"] for node in lineage.ancestors("grandchild")] == ["child", "root"]
+    assert [node["_id"] for node in lineage.descendants("root")] == ["child", "grandchild"]
+    assert [node["_id"] for node in lineage.descendants("root", max_generation=1)] == ["child"]
+
+    summary = lineage.subtree_fitness("root")
+    assert summary["size"] == 3 and summary["champions"] == 1 and summary["max_generation"] == 2
+    assert summary["best_strategy_id"] == "grandchild" and summary["best_composite"] == 3.0
+    assert lineage.subtree_fitness("missing") is None
+
+    rebuilt = lineage.build_nodes(reversed([_genome("a", None, 0), _genome("b", "a", 1), _genome("c", "b", 2)]))
+    assert rebuilt["c"]["ancestors"] == ["b", "a"] and rebuilt["a"]["ancestors"] == []
+
+
+def test_cycle_task_status_follows_the_chord(monkeypatch: pytest.MonkeyPatch) -> None:
+    from api.routes import experiments
+
+    states = {
+        "cycle": ("SUCCESS", {"queued": 2, "queue_ids": ["q1", "q2"], "chord_id": "chord"}),
+        "chord": ("PENDING", None),
+    }
+
+    class _Result:
+        def __init__(self, task_id: str, app=None) -> None:
+            self.status, self.result = states[task_id]
+
+        def successful(self) -> bool:
+            return self.status == "SUCCESS"
+
+        def failed(self) -> bool:
+            return self.status == "FAILURE"
+
+    monkeypatch.setattr(experiments, "AsyncResult", _Result)
+
+    running = experiments.get_experiment_task("cycle")
+    assert running["status"] == "started" and "result" not in running
+    assert running["dispatch"]["queued"] == 2
+
+    states["chord"] = ("SUCCESS", {"queued": 2, "completed": [{"run_id": "r1"}], "released": 0})
+    done = experiments.get_experiment_task("cycle")
+    assert done["status"] == "success" and done["result"]["completed"] == [{"run_id": "r1"}]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from strategy_genome import fitness_cache
+
+
+@pytest.fixture()
+def client(monkeypatch: pytest.MonkeyPatch) -> mongomock.MongoClient:
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(fitness_cache, "mongo_client", _mongo_client)
+    monkeypatch.setattr(fitness_cache, "_INDEXES_READY", False)
+    monkeypatch.setattr(fitness_cache, "STATS", fitness_cache.FitnessCacheStats())
+    return client
+
+
+def _key(config: dict, **overrides) -> dict:
+    kwargs = {
+        "symbol": "BTC/USDT",
+        "interval": "1m",
+        "horizon": "1m",
+        "model_version": "m1,m2",
+        "data_end": datetime(2024, 1, 1),
+    }
+    kwargs.update(overrides)
+    return fitness_cache.fitness_key(config, **kwargs)
+
+
+def test_equivalent_genomes_share_a_fingerprint() -> None:
+    base = {"ema_short": 12, "ema_long": 21, "risk_pct": 0.1, "uses_forecast": True, "features": ["a", "b"]}
+    # Swapped EMAs and an out-of-bounds risk are normalised; float noise and feature order are ignored.
+    noisy = {"ema_short": 21.0, "ema_long": 12.0, "risk_pct": 0.1 + 1e-12, "uses_forecast": True, "features": ["b", "a"]}
+    assert fitness_cache.fingerprint(_key(base)) == fitness_cache.fingerprint(_key(noisy))
+    assert fitness_cache.fingerprint(_key({**base, "risk_pct": 0.9})) == fitness_cache.fingerprint(
+        _key({**base, "risk_pct": 0.5})
+    )
+
+    distinct = [
+        _key({**base, "risk_pct": 0.2}),
+        _key({**base, "uses_forecast": False}),
+        _key(base, horizon="5m"),
+        _key(base, model_version="m3"),
+        _key(base, data_end=datetime(2024, 1, 2)),
+        _key(base, mode="walk_forward:4"),
+    ]
+    hashes = {fitness_cache.fingerprint(key) for key in distinct} | {fitness_cache.fingerprint(_key(base))}
+    assert len(hashes) == len(distinct) + 1
+
+
+def test_data_end_follows_latest_ohlcv_bar(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_ohlcv_timestamp(symbol, interval, timestamp=None):
+        calls.append((symbol, interval, timestamp))
+        return datetime(2024, 1, 3)
+
+    monkeypatch.setattr(fitness_cache, "get_ohlcv_timestamp", fake_ohlcv_timestamp)
+    key = fitness_cache.fitness_key(
+        {"ema_short": 9},
+        symbol="BTC/USDT",
+        interval="1m",
+        horizon="1m",
+        model_version="m1",
+        window={"end": datetime(2024, 1, 5)},
+    )
+
+    assert key["window"]["data_end"] == datetime(2024, 1, 3).isoformat()
+    assert calls == [("BTC/USDT", "1m", datetime(2024, 1, 5))]
+
+
+def test_cached_evaluation_skips_duplicate_simulations(client: mongomock.MongoClient) -> None:
+    calls = []
+
+    def _simulate():
+        calls.append(1)
+        return "run-1", {"roi": 0.05, "sharpe": 1.2}
+
+    key = _key({"ema_short": 9, "ema_long": 21})
+    assert fitness_cache.cached_evaluation(key, _simulate) == ("run-1", {"roi": 0.05, "sharpe": 1.2}, False)
+    assert fitness_cache.cached_evaluation(key, _simulate) == ("run-1", {"roi": 0.05, "sharpe": 1.2}, True)
+    assert len(calls) == 1
+
+    stats = fitness_cache.cache_stats()
+    assert stats["entries"] == 1 and stats["lifetime_hits"] == 1
+    assert stats["process"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import mongomock
+import pytest
+
+from models import forecast_store
+from models.forecast_store import ForecastHotCache
+
+BARS = [datetime(2024, 1, 1, hour) for hour in range(3)]
+
+
+@pytest.fixture()
+def versions() -> Dict[str, str]:
+    return {"current": "m1"}
+
+
+@pytest.fixture()
+def store(monkeypatch: pytest.MonkeyPatch, versions: Dict[str, str]) -> List[Dict[str, Any]]:
+    client = mongomock.MongoClient()
+    calls: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    def fake_feature_timestamp(symbol: str, interval: str, timestamp: Optional[datetime] = None):
+        eligible = [bar for bar in BARS if timestamp is None or bar <= timestamp]
+        return eligible[-1] if eligible else None
+
+    def fake_ensemble_predict(symbol: str, horizon: str, timestamp: datetime) -> Dict[str, Any]:
+        calls.append({"horizon": horizon, "timestamp": timestamp})
+        return {
+            "symbol": symbol,
+            "horizon": horizon,
+            "timestamp": timestamp,
+            "predicted_return": 0.01 * timestamp.hour,
+            "confidence": 0.5,
+            "models": [{"model_id": "m1", "prediction": 0.01, "weight": 1.0, "rmse": 0.2}],
+        }
+
+    # mongomock's bulk_write does not accept the UpdateOne arguments of current pymongo.
+    def _bulk_write(self, requests, ordered=True, session=None):
+        for request in requests:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+    cache = ForecastHotCache()
+    monkeypatch.setattr(cache, "_client_or_none", lambda: None)
+    monkeypatch.setattr(forecast_store, "HOT_FORECASTS", cache)
+    monkeypatch.setattr(forecast_store, "mongo_client", _mongo_client)
+    monkeypatch.setattr(forecast_store, "_INDEXES_READY", False)
+    monkeypatch.setattr(forecast_store, "get_feature_timestamp", fake_feature_timestamp)
+    monkeypatch.setattr(forecast_store, "ensemble_predict", fake_ensemble_predict)
+    monkeypatch.setattr(forecast_store.membership, "active_version", lambda symbol, horizon: versions["current"])
+    monkeypatch.setattr(forecast_store, "_ACTIVE_VERSIONS", {})
+    monkeypatch.setattr(forecast_store, "VERSION_TTL_SECONDS", 0.0)
+    return calls
+
+
+def test_materialise_once_per_bar_and_serve_lookup(store: List[Dict[str, Any]]) -> None:
+    stored = forecast_store.materialise_forecasts("BTC/USDT", "1h")
+    assert {item["horizon"] for item in stored} == {"1h", "4h"}
+    assert forecast_store.materialise_forecasts("BTC/USDT", "1h") == []
+
+    calls_before = len(store)
+    latest = forecast_store.get_forecast("BTC/USDT", "1h")
+    assert latest["timestamp"] == BARS[-1]
+    assert "rmse" not in latest["models"][0]
+    assert len(store) == calls_before
+
+
+def test_lookup_of_the_hot_bar_skips_queries(store: List[Dict[str, Any]], monkeypatch: pytest.MonkeyPatch) -> None:
+    forecast_store.materialise_forecasts("BTC/USDT", "1h", ["1h"])
+
+    def _no_query(*args, **kwargs):
+        raise AssertionError("hot bar lookups must not query Mongo")
+
+    monkeypatch.setattr(forecast_store, "get_feature_timestamp", _no_query)
+    monkeypatch.setattr(forecast_store, "_stored_forecast", _no_query)
+    assert forecast_store.get_forecast("BTC/USDT", "1h", BARS[-1])["timestamp"] == BARS[-1]
+
+
+def test_precompute_forecasts_batches_missing_bars(store: List[Dict[str, Any]], monkeypatch: pytest.MonkeyPatch) -> None:
+    import pandas as pd
+
+    from simulator import runner
+
+    forecast_store.materialise_forecasts("BTC/USDT", "1h", ["1h"])
+    calls_before = len(store)
+    writes: List[List[datetime]] = []
+    version_lookups: List[str] = []
+
+    def _store_forecasts(results, version=None):
+        writes.append([result["timestamp"] for result in results])
+        return forecast_store.store_forecasts(results, version)
+
+    def _active_version(symbol: str, horizon: str) -> str:
+        version_lookups.append(horizon)
+        return forecast_store.active_version(symbol, horizon)
+
+    monkeypatch.setattr(runner, "ensemble_predict", forecast_store.ensemble_predict)
+    monkeypatch.setattr(runner, "store_forecasts", _store_forecasts)
+    monkeypatch.setattr(runner, "active_version", _active_version)
+
+    predicted, confidence = runner.precompute_forecasts("BTC/USDT", "1h", pd.DatetimeIndex(BARS))
+
+    assert list(predicted) == [0.0, 0.01, 0.02] and list(confidence) == [0.5] * 3
+    # Only the two bars never materialised hit the ensemble, and they are written in one batch.
+    assert [call["timestamp"] for call in store[calls_before:]] == BARS[:2]
+    assert writes == [BARS[:2]] and version_lookups == ["1h"]
+
+    runner.precompute_forecasts("BTC/USDT", "1h", pd.DatetimeIndex(BARS))
+    assert len(store) == calls_before + 2 and len(writes) == 1
+
+
+def test_historical_forecast_falls_back_and_writes_through(store: List[Dict[str, Any]]) -> None:
+    forecast_store.materialise_forecasts("BTC/USDT", "1h", ["1h"])
+    forecast_store.HOT_FORECASTS.clear()
+
+    historical = forecast_store.get_forecast("BTC/USDT", "1h", datetime(2024, 1, 1, 1, 30))
+    assert historical["timestamp"] == BARS[1]
+    assert store[-1]["timestamp"] == BARS[1]
+
+    calls_before = len(store)
+    again = forecast_store.get_forecast("BTC/USDT", "1h", datetime(2024, 1, 1, 1, 45))
+    assert again["predicted_return"] == historical["predicted_return"]
+    assert len(store) == calls_before
+
+
+def test_membership_change_invalidates_stored_forecasts(store: List[Dict[str, Any]], versions: Dict[str, str]) -> None:
+    forecast_store.materialise_forecasts("BTC/USDT", "1h", ["1h"])
+    historical = forecast_store.get_forecast("BTC/USDT", "1h", BARS[0])
+    assert historical["version"] == "m1"
+    calls_before = len(store)
+
+    versions["current"] = "m1,m2"
+    latest = forecast_store.get_forecast("BTC/USDT", "1h")
+    assert latest["version"] == "m1,m2" and len(store) == calls_before + 1
+    assert forecast_store.get_forecast("BTC/USDT", "1h", BARS[0])["version"] == "m1,m2"
+    assert forecast_store.materialise_forecasts("BTC/USDT", "1h", ["1h"]) == []
+    assert set(forecast_store.load_forecasts("BTC/USDT", "1h")) == {BARS[0], BARS[-1]}
+    assert set(forecast_store.load_forecasts("BTC/USDT", "1h", version="m1")) == {BARS[0], BARS[-1]}
@@ -61,3 +61,33 @@ def test_experiment_request_serialization_roundtrip() -> None:
     assert restored == request
 
 
+
+
+def test_population_operators_match_normalize_params() -> None:
+    import numpy as np
+
+    from strategy_genome.encoding import create_genome_from_dict, default_genome_document, normalize_params
+    from strategy_genome.evolver import spawn_variants
+    from strategy_genome.population import PARAM_NAMES, Population, normalize_matrix
+
+    rng = np.random.default_rng(4)
+    raw = rng.uniform(-50, 250, size=(500, len(PARAM_NAMES)))
+    normalised = normalize_matrix(raw.copy())
+    for row, values in zip(normalised, raw):
+        expected = normalize_params(dict(zip(PARAM_NAMES, values)))
+        assert dict(zip(PARAM_NAMES, row)) == expected
+
+    seeds = [create_genome_from_dict(default_genome_document(family)) for family in ("ema-cross", "breakout", "ema-cross")]
+    seeds[1].params.pop("forecast_weight")
+    population = Population.from_genomes(seeds)
+    children = population.spawn(rng, mutations_per_parent=4)
+    assert len(children) == 3 * 4 + 2
+    genomes = children.to_genomes()
+    assert [genome.mutation_parent for genome in genomes[:4]] == [seeds[0].strategy_id] * 4
+    assert all("forecast_weight" not in genome.params for genome in genomes[4:8])
+    assert genomes[-1].generation == 1 and "crossover" in genomes[-1].tags
+    assert len({genome.strategy_id for genome in genomes}) == len(genomes)
+    for genome in genomes:
+        assert genome.params == normalize_params(genome.params)
+
+    assert len(spawn_variants(seeds, mutations_per_parent=2, seed=1)) == 3 * 2 + 2
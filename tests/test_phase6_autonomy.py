@@ -26,3 +26,457 @@ def test_hypothesis_agent_deterministic_summary():
     assert report.winners
     assert isinstance(report.winners, list)
 
+
+
+def test_nsga2_search_keeps_a_non_dominated_front():
+    import numpy as np
+    import pandas as pd
+
+    from evolution.schemas import SearchConfig
+    from evolution.search import crowding_distance, non_dominated_sort, run_search
+    from simulator.runner import PopulationInputs
+
+    objectives = np.array([[3.0, 1.0], [1.0, 3.0], [2.0, 2.0], [1.0, 1.0], [0.5, 0.5], [-np.inf, -np.inf]])
+    ranks = non_dominated_sort(objectives)
+    assert ranks.tolist() == [0, 0, 0, 1, 2, 3]
+    crowding = crowding_distance(objectives, ranks)
+    assert np.isinf(crowding[[0, 1]]).all() and np.isfinite(crowding[2])
+
+    rng = np.random.default_rng(2)
+    bars = 400
+    inputs = PopulationInputs(
+        prices=100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=bars))),
+        predicted=rng.normal(0, 0.01, size=bars),
+        confidence=rng.uniform(0.5, 1.0, size=bars),
+        bar_fields={},
+        timestamps=pd.date_range("2024-01-01", periods=bars, freq="1h"),
+    )
+    seed = create_genome_from_dict(default_genome_document())
+    result = run_search([seed], inputs, SearchConfig(population_size=40, generations=5, seed=1, min_trades=1))
+
+    assert len(result.population) == 40 and result.evaluations == 40 * 6
+    assert len(result.history) == 5
+    front = result.front
+    assert len(front) > 0
+    # No front member is dominated by any survivor.
+    objs = np.column_stack([result.metrics["roi"], result.metrics["sharpe"], -result.metrics["max_drawdown"]])
+    for idx in front:
+        dominated = (objs >= objs[idx]).all(axis=1) & (objs > objs[idx]).any(axis=1)
+        assert not dominated.any()
+    ancestry = result.ancestry(str(result.population.strategy_ids[front[0]]))
+    assert seed.strategy_id in {parent for parents in ancestry.values() for parent in parents}
+
+
+def test_persist_front_parents_genomes_on_their_seed(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+    import numpy as np
+
+    from evolution import repository, search
+    from evolution.schemas import SearchConfig
+    from strategy_genome import lineage
+    from strategy_genome import repository as genome_repository
+    from strategy_genome.population import Population
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    for module in (repository, genome_repository, lineage):
+        monkeypatch.setattr(module, "mongo_client", _mongo_client, raising=False)
+
+    seed = create_genome_from_dict({**default_genome_document(), "strategy_id": "seed", "status": "champion"})
+    genome_repository.save_genome(seed)
+    child = create_genome_from_dict({**default_genome_document(), "strategy_id": "child", "mutation_parent": "mid"})
+    result = search.SearchResult(
+        population=Population.from_genomes([child]),
+        metrics={"roi": np.array([0.1]), "sharpe": np.array([1.0]), "max_drawdown": np.array([0.05])},
+        trade_counts=np.array([12]),
+        ranks=np.array([0]),
+        lineage={"child": ["mid"], "mid": ["seed"]},
+    )
+
+    document = search.persist_front(result, SearchConfig())
+
+    stored = genome_repository.get_genome("child")
+    assert stored["mutation_parent"] == "seed" and stored["metadata"]["search_parent"] == "mid"
+    assert document["front"][0]["root_id"] == "seed"
+    assert document["lineage"] == {"child": ["mid"], "mid": ["seed"]}
+    # The lineage index only references genomes that exist.
+    assert [node["_id"] for node in lineage.ancestors("child")] == ["seed"]
+
+
+def test_run_search_rescores_front_out_of_sample(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from evolution import engine, repository
+    from evolution.schemas import EvaluationConfig, SearchConfig
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    seed = create_genome_from_dict({"strategy_id": "champion", "family": "ema-cross", "status": "champion"})
+    child = create_genome_from_dict({"strategy_id": "child", "family": "ema-cross", "mutation_parent": "champion"})
+    in_sample = {"roi": 0.5, "sharpe": 3.0, "max_drawdown": 0.01, "trades": 40}
+    front = {
+        "search_id": "search-1",
+        "generations": 3,
+        "evaluations": 60,
+        "front": [{"strategy_id": "child", "genome": child.document(), "metrics": in_sample, "root_id": "champion"}],
+    }
+    monkeypatch.setattr(engine, "load_population_inputs", lambda *args, **kwargs: object())
+    monkeypatch.setattr(engine, "run_search", lambda parents, inputs, config: None)
+    monkeypatch.setattr(engine, "persist_front", lambda result, config: front)
+
+    seen = {}
+
+    def _evaluate_batch(ids, config):
+        seen["status"] = [repository.load_experiment(experiment_id)["status"] for experiment_id in ids]
+        seen["config"] = config
+        return []
+
+    monkeypatch.setattr(engine, "evaluate_batch", _evaluate_batch)
+
+    def _decide_promotions(ids, policy, config):
+        seen["promotion_config"] = config
+        return []
+
+    monkeypatch.setattr(engine, "decide_promotions", _decide_promotions)
+    monkeypatch.setattr(engine, "apply_decisions", lambda decisions: {})
+
+    evolution = engine.EvolutionEngine(evaluation_config=EvaluationConfig(walk_forward_folds=0, successive_halving=True))
+    monkeypatch.setattr(evolution, "_select_parents", lambda limit: [seed])
+    summary = evolution.run_search(SearchConfig(symbol="ETH/USDT", interval="1h"))
+
+    # The in-sample front is never trusted: it is queued pending and re-scored walk-forward.
+    assert seen["status"] == ["pending"]
+    assert seen["config"].walk_forward_folds > 0 and not seen["config"].successive_halving
+    assert seen["config"].symbol == "ETH/USDT"
+    # Parents are re-scored under the same walk-forward config as the front.
+    assert seen["promotion_config"] is seen["config"]
+    stored = repository.load_experiment(summary["experiment_ids"][0])
+    assert stored["metrics"] == {}
+    assert stored["candidate"]["metadata"]["search_metrics"] == in_sample
+
+
+def test_experiment_repository_bulk_operations(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from evolution import repository
+    from evolution.schemas import EvolutionCandidate
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    monkeypatch.setattr(repository, "_INDEXES_READY", False)
+
+    genomes = [create_genome_from_dict({"strategy_id": f"s{idx}", "family": "ema-cross"}) for idx in range(3)]
+    created = repository.create_experiments(EvolutionCandidate(genome=genome, parent_id=None) for genome in genomes)
+    ids = [doc["experiment_id"] for doc in created]
+    assert len(set(ids)) == 3 and repository._INDEXES_READY
+
+    assert repository.set_experiments_status(ids[:2], "running", score=1.5) == 2
+    loaded = repository.load_experiments(ids + ["exp-missing"])
+    assert set(loaded) == set(ids)
+    assert [loaded[i]["status"] for i in ids] == ["running", "running", "pending"]
+    assert loaded[ids[0]]["score"] == 1.5
+
+    listed = repository.list_experiments(limit=10)
+    assert len(listed) == 3
+    assert "params" not in listed[0]["candidate"]["genome"] and "insights" not in listed[0]
+    assert listed[0]["candidate"]["genome"]["strategy_id"]
+    assert "params" in repository.list_experiments(limit=1, projection=None)[0]["candidate"]["genome"]
+
+
+def test_evaluate_batch_persists_each_outcome(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+    import pytest
+
+    from evolution import evaluator, repository
+    from evolution.schemas import EvaluationConfig, EvaluationResult, EvolutionCandidate
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    genomes = [create_genome_from_dict({"strategy_id": f"s{idx}", "family": "ema-cross"}) for idx in range(3)]
+    ids = [doc["experiment_id"] for doc in repository.create_experiments(EvolutionCandidate(g, None) for g in genomes)]
+
+    def _evaluate(experiment, config):
+        if experiment["experiment_id"] == ids[1]:
+            raise KeyboardInterrupt  # the worker is killed mid-batch
+        result = EvaluationResult(experiment_id=experiment["experiment_id"], strategy_id="s", metrics={}, score=1.0)
+        return result, {"status": "completed", "score": 1.0}
+
+    monkeypatch.setattr(evaluator, "_evaluate", _evaluate)
+    with pytest.raises(KeyboardInterrupt):
+        evaluator.evaluate_batch(ids, EvaluationConfig())
+
+    loaded = repository.load_experiments(ids)
+    assert [loaded[i]["status"] for i in ids] == ["completed", "running", "running"]
+
+
+def test_decide_promotions_batches_parent_lookup(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from evolution import promoter, repository
+    from evolution.schemas import EvolutionCandidate, PromotionPolicy
+    from strategy_genome import repository as genome_repository
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    monkeypatch.setattr(genome_repository, "mongo_client", _mongo_client)
+
+    parent = create_genome_from_dict({"strategy_id": "parent", "family": "ema-cross"})
+    genome_repository.save_genome(parent)
+    genome_repository.update_genome_fitness("parent", {"composite": 2.0})
+    children = [create_genome_from_dict({"strategy_id": f"child{idx}", "family": "ema-cross"}) for idx in range(3)]
+    created = repository.create_experiments(
+        [
+            EvolutionCandidate(genome=children[0], parent_id="parent"),
+            EvolutionCandidate(genome=children[1], parent_id=None),
+            EvolutionCandidate(genome=children[2], parent_id="parent"),
+        ]
+    )
+    ids = [doc["experiment_id"] for doc in created]
+    metrics = {"roi": 0.1, "sharpe": 1.0, "max_drawdown": 0.05, "composite": 1.0}
+    repository.set_experiments_status(ids[:2], "completed", metrics=metrics)
+
+    decisions = promoter.decide_promotions(ids + ["exp-missing"], PromotionPolicy(min_roi=0.0, min_sharpe=0.0))
+    assert [d.strategy_id for d in decisions] == ["child0", "child1", "child2"]
+    # child0 trails its parent's composite, child1 has no parent to beat, child2 never completed.
+    assert [(d.approved, d.reason) for d in decisions] == [
+        (False, "threshold_not_met"),
+        (True, "threshold_met"),
+        (False, "experiment_not_completed"),
+    ]
+    assert decisions[0].metadata["parent_metrics"]["composite"] == 2.0
+
+
+def test_promotion_policy_holds_candidates_against_parents_scored_differently():
+    from evolution.schemas import PromotionPolicy, evaluation_mode
+
+    policy = PromotionPolicy(min_roi=0.0, min_sharpe=0.0)
+    candidate = {"roi": 0.1, "sharpe": 1.0, "max_drawdown": 0.05, "composite": 1.0, "evaluation_mode": "walk_forward:4"}
+    single_parent = {"composite": 2.0, "evaluation_mode": "single"}
+    walk_forward_parent = {"composite": 2.0, "evaluation_mode": "walk_forward:4"}
+
+    assert evaluation_mode({"composite": 2.0}) == "single"
+    assert evaluation_mode({"positive_fold_ratio": 0.5}) == "walk_forward"
+    # A single-window parent score is not a bar for a walk-forward candidate, and the
+    # candidate is held rather than promoted past a parent it was never compared with.
+    assert not policy.comparable(candidate, single_parent)
+    assert not policy.passes(candidate, single_parent)
+    assert policy.comparable(candidate, walk_forward_parent)
+    assert not policy.passes(candidate, walk_forward_parent)
+    assert policy.passes({**candidate, "composite": 2.5}, walk_forward_parent)
+
+
+def test_decide_promotions_rescores_parents_in_the_candidate_mode(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from evolution import promoter, repository
+    from evolution.schemas import EvaluationConfig, EvolutionCandidate, PromotionPolicy
+    from strategy_genome import repository as genome_repository
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(repository, "mongo_client", _mongo_client)
+    monkeypatch.setattr(genome_repository, "mongo_client", _mongo_client)
+
+    genome_repository.save_genome(create_genome_from_dict({"strategy_id": "parent", "family": "ema-cross"}))
+    genome_repository.update_genome_fitness("parent", {"composite": 5.0}, evaluation_mode="single")
+    children = [create_genome_from_dict({"strategy_id": f"child{idx}", "family": "ema-cross"}) for idx in range(2)]
+    created = repository.create_experiments(
+        [EvolutionCandidate(genome=child, parent_id="parent", metadata={"horizon": "1h"}) for child in children]
+    )
+    ids = [doc["experiment_id"] for doc in created]
+    metrics = {"roi": 0.1, "sharpe": 1.0, "max_drawdown": 0.05, "composite": 1.0, "evaluation_mode": "walk_forward:4"}
+    repository.set_experiments_status(ids, "completed", metrics=metrics)
+    policy = PromotionPolicy(min_roi=0.0, min_sharpe=0.0)
+
+    # Without a config to re-score with, the single-window parent cannot be compared: hold.
+    held = promoter.decide_promotions(ids, policy)
+    assert [(d.approved, d.reason) for d in held] == [(False, "parent_not_comparable")] * 2
+
+    calls = []
+
+    def _rescore(parent, mode, config, metadata):
+        calls.append((parent["strategy_id"], mode, metadata.get("horizon")))
+        return {"composite": 0.5, "evaluation_mode": mode}
+
+    monkeypatch.setattr(promoter, "rescore_genome", _rescore)
+    decisions = promoter.decide_promotions(ids, policy, EvaluationConfig())
+
+    # Both siblings share one re-score of their parent, which they now beat out of sample.
+    assert calls == [("parent", "walk_forward:4", "1h")]
+    assert [(d.approved, d.reason) for d in decisions] == [(True, "threshold_met")] * 2
+    assert decisions[0].metadata["parent_metrics"]["evaluation_mode"] == "walk_forward:4"
+
+
+def test_apply_decisions_updates_lineage_nodes(monkeypatch):
+    from contextlib import contextmanager
+
+    import mongomock
+
+    from evolution import promoter, repository
+    from evolution.schemas import EvolutionCandidate, PromotionDecision
+    from strategy_genome import lineage
+    from strategy_genome import repository as genome_repository
+
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    # mongomock's bulk_write does not accept the UpdateOne arguments of current pymongo.
+    def _bulk_write(self, requests, ordered=True, session=None):
+        for request in requests:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+    for module in (repository, genome_repository, promoter, lineage):
+        monkeypatch.setattr(module, "mongo_client", _mongo_client, raising=False)
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+
+    genome_repository.save_genome(create_genome_from_dict({"strategy_id": "parent", "family": "ema-cross"}))
+    child = create_genome_from_dict({"strategy_id": "child", "family": "ema-cross", "mutation_parent": "parent"})
+    genome_repository.save_genome(child)
+    created = repository.create_experiments([EvolutionCandidate(genome=child, parent_id="parent")])
+    experiment_id = created[0]["experiment_id"]
+
+    decision = PromotionDecision(
+        strategy_id="child",
+        parent_id="parent",
+        approved=True,
+        reason="threshold_met",
+        metadata={"experiment_id": experiment_id},
+    )
+    updates = promoter.apply_decisions([decision])
+
+    assert updates[experiment_id]["candidate.genome"]["status"] == "champion"
+    assert lineage.get_node("child")["status"] == "champion"
+    assert lineage.get_node("parent")["status"] == "archived"
+    assert lineage.subtree_fitness("parent")["champions"] == 1
+
+
+def test_successive_halving_prunes_to_max_concurrent(monkeypatch):
+    import numpy as np
+    import pandas as pd
+
+    from evolution import evaluator
+    from evolution.schemas import EvaluationConfig
+    from simulator.runner import PopulationInputs
+
+    rng = np.random.default_rng(4)
+    bars = 600
+    inputs = PopulationInputs(
+        prices=100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=bars))),
+        predicted=rng.normal(0, 0.01, size=bars),
+        confidence=rng.uniform(0.5, 1.0, size=bars),
+        bar_fields={},
+        timestamps=pd.date_range("2024-01-01", periods=bars, freq="1h"),
+    )
+    monkeypatch.setattr(evaluator, "load_population_inputs", lambda *args, **kwargs: inputs)
+
+    experiments = {
+        f"exp-{idx}": {
+            "experiment_id": f"exp-{idx}",
+            "candidate": {
+                "genome": {"strategy_id": f"s{idx}", "params": {"min_confidence": 0.5 + idx * 0.01, "risk_pct": 0.1}},
+                "metadata": {"horizon": "1h"},
+            },
+        }
+        for idx in range(30)
+    }
+    experiments["exp-bare"] = {"experiment_id": "exp-bare", "candidate": {}}
+    config = EvaluationConfig(successive_halving=True, max_concurrent=4, halving_min_fraction=0.1, halving_eta=3)
+
+    survivors, pruned = evaluator.successive_halving(experiments, config)
+
+    # Candidates without a genome are left for the regular path to fail.
+    assert "exp-bare" in survivors and "exp-bare" not in pruned
+    assert len(survivors) == 5 and len(pruned) == 26
+    assert set(survivors).isdisjoint(pruned)
+    rungs = {update["insights"]["pruned_at_rung"] for update in pruned.values()}
+    assert rungs == {0, 1}
+    update = next(iter(pruned.values()))
+    assert update["status"] == "pruned" and "roi" in update["metrics"]
+    assert 0 < update["insights"]["window_fraction"] < 1
+
+
+def test_prescreen_scores_candidates_in_one_batch():
+    import numpy as np
+    import pytest
+    from sklearn.ensemble import RandomForestRegressor
+
+    from evolution.prescreen import expected_improvement, prescreen_candidates
+    from evolution.schemas import PrescreenConfig
+    from learning.meta_model import MetaModelBundle, feature_matrix, predict_roi_distribution
+
+    parents = [create_genome_from_dict(default_genome_document()) for _ in range(2)]
+    parents[1].strategy_id = "parent-b"
+    parents[0].fitness.roi = 0.05
+    generations = generate_mutations(parents, MutationConfig(variants_per_parent=4), seed=3)
+    candidates = [candidate for generation in generations for candidate in generation.produced]
+
+    columns = ["param_ema_short", "param_ema_long", "prev_roi"]
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 50, size=(200, 3))
+    model = RandomForestRegressor(n_estimators=20, random_state=0).fit(X, X[:, 0] / 1000 - 0.01)
+    bundle = MetaModelBundle(model=model, feature_columns=columns, metadata={"model_id": "meta-test"})
+
+    genomes = [candidate.genome.document() for candidate in candidates]
+    mean, std = predict_roi_distribution(genomes, bundle=bundle)
+    assert np.allclose(mean, model.predict(feature_matrix(genomes, feature_columns=columns)))
+    assert (std >= 0).all()
+
+    assert expected_improvement(np.array([0.1]), np.array([0.0]), np.array([0.05]))[0] == pytest.approx(0.05)
+    assert expected_improvement(np.array([0.0]), np.array([0.1]), np.array([0.0]))[0] > 0
+    # With mean == best the gain term vanishes and EI is std * pdf(0).
+    assert expected_improvement(np.array([0.0]), np.array([1.0]), np.array([0.0]))[0] == pytest.approx(
+        1.0 / np.sqrt(2.0 * np.pi)
+    )
+    assert expected_improvement(np.array([1.0]), np.array([1.0]), np.array([0.0]))[0] == pytest.approx(1.0833154705876864)
+
+    result = prescreen_candidates(generations, parents, PrescreenConfig(min_expected_improvement=1.0, min_keep=2), bundle=bundle)
+    assert result.kept == 2 and result.dropped == len(candidates) - 2
+    assert sum(len(generation.produced) for generation in result.generations) == 2
+    kept = [c for generation in result.generations for c in generation.produced]
+    assert all(c.metadata["prescreen"]["model_id"] == "meta-test" for c in kept)
+
+    passthrough = prescreen_candidates(generations, parents, PrescreenConfig(enabled=False), bundle=bundle)
+    assert passthrough.kept == len(candidates) and passthrough.skipped_reason == "disabled"
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from exec import clock as exec_clock
+from exec.connector import OrderPayload
+from simulator.replay import (
+    ReplayConnector,
+    ReplayEngine,
+    connect_order_manager,
+    load_market_data,
+    merge_market_data,
+)
+
+T0 = 1_700_000_000_000  # epoch ms
+
+
+def _write_streams(tmp_path):
+    trades = pd.DataFrame(
+        {
+            "timestamp": [T0 + 1, T0 + 20, T0 + 30, T0 + 40],
+            "price": [100.0, 100.6, 99.4, 99.0],
+            "size": [1.0, 2.0, 0.5, 3.0],
+        }
+    )
+    quotes = pd.DataFrame(
+        {
+            "timestamp": [T0, T0 + 10, T0 + 25],
+            "bid": [99.9, 100.4, 99.5],
+            "ask": [100.1, 100.5, 99.7],
+            "bid_size": [5.0, 5.0, 5.0],
+            "ask_size": [5.0, 0.4, 5.0],
+        }
+    )
+    trades.to_csv(tmp_path / "trades.csv", index=False)
+    quotes.to_csv(tmp_path / "quotes.csv", index=False)
+    return load_market_data("BTC/USDT", trades_path=tmp_path / "trades.csv", quotes_path=tmp_path / "quotes.csv")
+
+
+def test_replay_orders_respect_latency_depth_and_cancels(tmp_path) -> None:
+    market = _write_streams(tmp_path)
+    assert market.kind.tolist() == [1, 0, 1, 0, 1, 0, 0]
+
+    engine = ReplayEngine(market)
+    connector = ReplayConnector(engine, latency_ms=5)
+    seen = {}
+
+    def on_first_quote(tick):
+        if "market" in seen:
+            return
+        seen["market"] = connector.create_order(OrderPayload("BTC/USDT", "buy", "market", 1.0, client_order_id="m1"))
+        connector.create_order(OrderPayload("BTC/USDT", "buy", "limit", 0.5, price=99.5, client_order_id="l1"))
+        connector.create_order(OrderPayload("BTC/USDT", "sell", "limit", 1.0, price=101.0, client_order_id="l2"))
+        engine.call_later(12, lambda: connector.cancel_order("l2"))
+        seen["stamp"] = exec_clock.utcnow()
+
+    engine.on_quote(on_first_quote)
+    stats = engine.run()
+
+    assert seen["market"]["status"] == "open" and seen["market"]["filled"] == 0.0
+    assert seen["stamp"] == datetime.fromtimestamp(T0 / 1000, tz=timezone.utc)
+    # Arrives at T0+5 after the first trade moved nothing; takes the 100.1 ask in full.
+    assert connector.fetch_order("m1")["average"] == 100.1
+    # Resting bid at 99.5 fills when the book crosses at T0+25.
+    assert connector.fetch_order("l1")["status"] == "closed"
+    assert connector.fetch_order("l1")["average"] == 99.5
+    assert connector.fetch_order("l2")["status"] == "canceled"
+    assert connector.positions["BTC/USDT"] == 1.5
+    assert stats.market_events == 7 and stats.fills == 2
+    assert exec_clock.utcnow().year >= 2024  # system clock restored after the run
+
+
+def test_partial_fills_keep_working_and_sync_order_manager() -> None:
+    trades = pd.DataFrame({"timestamp": [30], "price": [100.5], "size": [0.3]}).assign(
+        timestamp=lambda df: df["timestamp"] * 1_000_000
+    )
+    quotes = pd.DataFrame(
+        {"timestamp": [0, 10], "bid": [100.3, 100.3], "ask": [100.5, 100.6], "bid_size": [1.0, 1.0], "ask_size": [0.4, 0.2]}
+    ).assign(timestamp=lambda df: df["timestamp"] * 1_000_000)
+    engine = ReplayEngine(merge_market_data("ETH/USDT", trades, quotes))
+    connector = ReplayConnector(engine)
+
+    class _Manager:
+        def __init__(self):
+            self.connectors, self.synced = {}, []
+
+        def register_connector(self, mode, connector):
+            self.connectors[mode] = connector
+
+        def sync_order(self, order_id):
+            self.synced.append(connector.fetch_order(order_id)["status"])
+
+    manager = _Manager()
+    connect_order_manager(manager, connector)
+    engine.call_at(0, lambda: connector.create_order(OrderPayload("ETH/USDT", "buy", "market", 0.8, client_order_id="m")))
+    engine.run()
+
+    assert manager.connectors["paper"] is connector
+    np.testing.assert_allclose([fill["quantity"] for fill in connector.fills], [0.4, 0.2, 0.2])
+    assert manager.synced == ["partial", "partial", "closed"]
+    assert np.isclose(connector.fetch_order("m")["average"], (0.4 * 100.5 + 0.2 * 100.6 + 0.2 * 100.5) / 0.8)
+
+
+def test_replay_throughput() -> None:
+    n = 200_000
+    stamps = np.arange(n, dtype=np.int64) * 1_000_000
+    trades = pd.DataFrame({"timestamp": stamps[::2], "price": 100.0, "size": 1.0})
+    quotes = pd.DataFrame({"timestamp": stamps[1::2], "bid": 99.9, "ask": 100.1, "bid_size": 1.0, "ask_size": 1.0})
+    engine = ReplayEngine(merge_market_data("BTC/USDT", trades, quotes))
+    ReplayConnector(engine)
+    engine.on_trade(lambda tick: None)
+    stats = engine.run()
+    assert stats.market_events == n
+    assert stats.events_per_minute > 5_000_000
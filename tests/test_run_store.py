@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import mongomock
+import mongomock.gridfs
+import pytest
+
+from simulator import run_store
+
+mongomock.gridfs.enable_gridfs_integration()
+
+
+@pytest.fixture()
+def client(monkeypatch: pytest.MonkeyPatch) -> mongomock.MongoClient:
+    client = mongomock.MongoClient()
+
+    @contextmanager
+    def _mongo_client():
+        yield client
+
+    monkeypatch.setattr(run_store, "mongo_client", _mongo_client)
+    monkeypatch.setattr(run_store, "_INDEXES_READY", False)
+    return client
+
+
+def test_heavy_fields_are_offloaded_and_loaded_lazily(client: mongomock.MongoClient) -> None:
+    trades = [{"entry_price": 100.0 + idx, "exit_price": 101.0 + idx} for idx in range(50)]
+    equity = [{"timestamp": datetime(2024, 1, 1), "equity": 10_000.0 + idx} for idx in range(20)]
+    run_store.save_run(
+        {
+            "run_id": "run-1",
+            "strategy": "s1",
+            "results": {"roi": 0.1},
+            "trades": trades,
+            "equity_curve": equity,
+            "created_at": datetime(2024, 1, 2),
+        }
+    )
+
+    stored = client[run_store.get_database_name()][run_store.RUNS_COLLECTION].find_one({"run_id": "run-1"})
+    assert "trades" not in stored and "equity_curve" not in stored
+    assert stored["trade_count"] == 50 and stored["equity_points"] == 20
+
+    summary = run_store.load_run("run-1", include_artifacts=False)
+    assert summary["results"] == {"roi": 0.1}
+    assert run_store.trade_count(summary) == 50
+
+    full = run_store.load_run("run-1")
+    assert full["trades"] == trades
+    assert full["equity_curve"] == equity
+
+
+def test_legacy_inline_runs_still_load(client: mongomock.MongoClient) -> None:
+    db = client[run_store.get_database_name()]
+    db[run_store.RUNS_COLLECTION].insert_one(
+        {"run_id": "legacy", "results": {"roi": 0.0}, "trades": [{"pnl": 1.0}], "equity_curve": []}
+    )
+
+    assert run_store.load_run("legacy")["trades"] == [{"pnl": 1.0}]
+    summary = run_store.load_run("legacy", include_artifacts=False)
+    assert "trades" not in summary
+    assert run_store.trade_count(run_store.load_run("legacy")) == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import dataset_cache, train_horizon
+from models.dataset_cache import TrainingDatasetCache
+
+
+def _frames(rows: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    index = pd.date_range("2024-01-01", periods=rows, freq="1h", name="timestamp")
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(size=rows))
+    features = pd.DataFrame({"ema_9": close * 0.99, "rsi_14": rng.uniform(0, 100, size=rows)}, index=index)
+    features.iloc[0, 1] = np.nan
+    prices = pd.DataFrame({"close": close, "volume": rng.uniform(1, 2, size=rows)}, index=index)
+    return features, prices
+
+
+@pytest.fixture()
+def source(monkeypatch: pytest.MonkeyPatch) -> dict:
+    state = {"rows": 150, "calls": [], "last_close": None}
+
+    def fake_feature_df(symbol: str, interval: str, limit: Optional[int] = None, since: Optional[datetime] = None):
+        features, _ = _frames(state["rows"])
+        state["calls"].append(since)
+        return features if since is None else features.loc[features.index > since]
+
+    def fake_ohlcv_df(symbol: str, interval: str, limit: Optional[int] = None, since: Optional[datetime] = None):
+        _, prices = _frames(state["rows"])
+        if state["last_close"] is not None:
+            prices.iloc[-1, prices.columns.get_loc("close")] = state["last_close"]
+        return prices if since is None else prices.loc[prices.index > since]
+
+    monkeypatch.setattr(dataset_cache, "get_feature_df", fake_feature_df)
+    monkeypatch.setattr(dataset_cache, "get_ohlcv_df", fake_ohlcv_df)
+    monkeypatch.setattr(train_horizon, "get_feature_df", fake_feature_df)
+    monkeypatch.setattr(train_horizon, "get_ohlcv_df", fake_ohlcv_df)
+    return state
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_cached_dataset_matches_direct_build(tmp_path, monkeypatch: pytest.MonkeyPatch, source: dict, dtype: str) -> None:
+    monkeypatch.setenv("FEATURE_FLOAT_DTYPE", dtype)
+    monkeypatch.setattr(train_horizon, "TRAINING_DATASET_CACHE", TrainingDatasetCache(root=tmp_path))
+
+    X_cached, y_cached = train_horizon.build_dataset("BTC/USDT", "4h", None)
+    X_direct, y_direct = train_horizon.build_dataset("BTC/USDT", "4h", None, use_cache=False)
+
+    assert list(X_cached.columns) == list(X_direct.columns)
+    assert X_cached.index.equals(X_direct.index)
+    assert X_cached.dtypes.unique().tolist() == X_direct.dtypes.unique().tolist() == [np.dtype(dtype)]
+    np.testing.assert_allclose(y_cached.to_numpy(), y_direct.to_numpy(), rtol=1e-5)
+
+
+def test_refresh_appends_only_new_bars(tmp_path, source: dict) -> None:
+    cache = TrainingDatasetCache(root=tmp_path)
+    first = cache.refresh("BTC/USDT", "1h", [1, 4])
+    assert len(first) == 150
+
+    source["rows"] = 160
+    second = cache.refresh("BTC/USDT", "1h", [1, 4])
+
+    assert len(second) == 160
+    assert source["calls"][-1] == pd.Timestamp(first.timestamps[-1 - dataset_cache.REFRESH_OVERLAP_BARS]).to_pydatetime()
+    assert np.isnan(second.targets[-1]).all()
+    assert not np.isnan(second.targets[-5, 1])
+    assert isinstance(cache.load("BTC/USDT", "1h").features, np.memmap)
+
+
+def test_refresh_overwrites_the_open_candle(tmp_path, source: dict) -> None:
+    cache = TrainingDatasetCache(root=tmp_path)
+    source["last_close"] = 1.0  # partial close of a candle that was still open when cached
+    first = cache.refresh("BTC/USDT", "1h", [1])
+    assert first.close[-1] == 1.0
+
+    source["last_close"] = None
+    second = cache.refresh("BTC/USDT", "1h", [1])
+    _, prices = _frames(150)
+    np.testing.assert_array_equal(second.close, prices["close"].to_numpy())
+    assert second.targets[-2, 0] == pytest.approx(prices["close"].iloc[-1] / prices["close"].iloc[-2] - 1.0, rel=1e-6)
+
+    # Nothing changed since: the cached version is returned as is.
+    assert cache.refresh("BTC/USDT", "1h", [1]).path == second.path
+
+
+def test_dtype_change_rebuilds_the_cache(tmp_path, monkeypatch: pytest.MonkeyPatch, source: dict) -> None:
+    cache = TrainingDatasetCache(root=tmp_path)
+    monkeypatch.setenv("FEATURE_FLOAT_DTYPE", "float32")
+    assert cache.refresh("BTC/USDT", "1h", [1]).features.dtype == np.float32
+
+    monkeypatch.setenv("FEATURE_FLOAT_DTYPE", "float64")
+    rebuilt = cache.refresh("BTC/USDT", "1h", [1])
+    assert rebuilt.features.dtype == np.float64 and len(rebuilt) == 150
+    assert source["calls"][-1] is None
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import pytest
+from sklearn.ensemble import RandomForestRegressor
 
-from models.train_horizon import evaluate_predictions, time_based_split
+from models.train_horizon import (
+    evaluate_predictions,
+    rolling_origin_folds,
+    time_based_split,
+    warm_start_random_forest,
+)
 
 
 def test_time_based_split_shapes() -> None:
@@ -28,3 +35,189 @@ def test_evaluate_predictions_directional_accuracy() -> None:
     assert metrics["mae"] > 0
     assert pytest.approx(metrics["directional_accuracy"], rel=1e-6) == 0.75
 
+
+
+def test_rolling_origin_folds_expand_and_cover_tail() -> None:
+    folds = rolling_origin_folds(200, n_folds=4, min_train_ratio=0.5)
+
+    assert folds[0] == (100, 125)
+    assert [train_end for train_end, _ in folds] == [100, 125, 150, 175]
+    assert folds[-1][1] == 200
+
+
+def test_warm_start_random_forest_appends_trees() -> None:
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame({"a": rng.normal(size=300), "b": rng.normal(size=300)})
+    y = pd.Series(X["a"] * 0.5 + rng.normal(scale=0.01, size=300))
+    model = RandomForestRegressor(n_estimators=10, max_depth=4, random_state=0).fit(X.iloc[:200], y.iloc[:200])
+
+    updated, val_metrics, test_preds = warm_start_random_forest(
+        model, X.iloc[200:260], y.iloc[200:260], X.iloc[260:280], y.iloc[260:280], X.iloc[280:], additional_trees=5, n_jobs=1
+    )
+
+    assert len(updated.estimators_) == 15
+    assert updated.n_jobs == 1
+    assert updated.warm_start is False
+    assert len(test_preds) == 20
+    assert val_metrics["rmse"] >= 0
+
+
+def test_warm_start_random_forest_caps_trees_and_applies_params() -> None:
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame({"a": rng.normal(size=300), "b": rng.normal(size=300)})
+    y = pd.Series(X["a"] * 0.5 + rng.normal(scale=0.01, size=300))
+    model = RandomForestRegressor(n_estimators=10, max_depth=4, random_state=0).fit(X.iloc[:200], y.iloc[:200])
+    oldest = model.estimators_[0]
+
+    updated, _, test_preds = warm_start_random_forest(
+        model,
+        X.iloc[200:260],
+        y.iloc[200:260],
+        X.iloc[260:280],
+        y.iloc[260:280],
+        X.iloc[280:],
+        additional_trees=8,
+        params={"max_depth": 2, "n_estimators": 999},
+        max_trees=12,
+    )
+
+    assert len(updated.estimators_) == 12 and updated.n_estimators == 12
+    assert oldest not in updated.estimators_
+    assert updated.estimators_[-1].get_depth() <= 2
+    assert len(test_preds) == 20
+
+
+def test_evaluate_rolling_origin_single_threads_parallel_folds(monkeypatch: pytest.MonkeyPatch) -> None:
+    from models import train_horizon
+
+    seen: list = []
+
+    def fake_trainer(X_train, y_train, X_val, y_val, X_test, params=None):
+        seen.append(params)
+        return None, {}, np.zeros(len(X_test))
+
+    monkeypatch.setattr(train_horizon, "train_random_forest", fake_trainer)
+    X = pd.DataFrame({"a": np.arange(200, dtype=float)})
+    y = pd.Series(np.linspace(-1.0, 1.0, 200))
+
+    train_horizon.evaluate_rolling_origin("rf", X, y, n_folds=3, n_jobs=1, params={"max_depth": 3})
+    assert len(seen) == 3
+    assert all(params == {"max_depth": 3} for params in seen)
+
+    class SequentialParallel:
+        def __init__(self, n_jobs: int) -> None:
+            self.n_jobs = n_jobs
+
+        def __call__(self, tasks):
+            return [func(*args, **kwargs) for func, args, kwargs in tasks]
+
+    seen.clear()
+    monkeypatch.setattr(train_horizon, "Parallel", SequentialParallel)
+    train_horizon.evaluate_rolling_origin("rf", X, y, n_folds=3, n_jobs=-1, params={"max_depth": 3})
+    assert len(seen) == 3
+    assert all(params == {"max_depth": 3, "n_jobs": 1} for params in seen)
+
+
+def test_incremental_parent_filters_by_algorithm(monkeypatch: pytest.MonkeyPatch) -> None:
+    from models import train_horizon
+
+    docs = [
+        {"model_id": "lgbm_new", "algorithm": "LightGBMRegressor", "status": "production", "train_end": "2024-02-01"},
+        {"model_id": "rf_old", "algorithm": "RandomForestRegressor", "status": "candidate", "train_end": "2024-01-01"},
+    ]
+
+    def latest_model(symbol, horizon, status=None, algorithm=None):
+        matches = [
+            doc for doc in docs if (not status or doc["status"] == status) and (not algorithm or doc["algorithm"] == algorithm)
+        ]
+        return matches[0] if matches else None
+
+    monkeypatch.setattr(train_horizon.registry, "latest_model", latest_model)
+
+    assert train_horizon._incremental_parent("BTC/USDT", "1h", "rf")["model_id"] == "rf_old"
+    assert train_horizon._incremental_parent("BTC/USDT", "1h", "lgbm")["model_id"] == "lgbm_new"
+
+
+def test_run_shap_job_reuses_cached_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    from models import explainability
+
+    updates: list = []
+    cached = [{"feature": "feat", "importance": 0.5}]
+    monkeypatch.setattr(explainability.registry, "get_model", lambda _: {"model_id": "rf_1h_x", "symbol": "BTC/USDT"})
+    monkeypatch.setattr(explainability.registry, "update_model", lambda model_id, payload: updates.append(payload))
+    monkeypatch.setattr(explainability, "load_cached_summary", lambda _: cached)
+
+    def fail_load(_: str) -> None:
+        raise AssertionError("cached summaries must not reload the model")
+
+    monkeypatch.setattr(explainability.model_utils, "load_model", fail_load)
+
+    result = explainability.run_shap_job("rf_1h_x")
+
+    assert result["cached"] is True
+    assert updates[-1]["shap_summary_top_features"] == cached
+    assert updates[-1]["explainability_status"] == "completed"
+
+
+def test_run_shap_job_records_explainer_errors_as_failed(monkeypatch: pytest.MonkeyPatch) -> None:
+    from models import explainability
+
+    updates: list = []
+    sample = pd.DataFrame({"feat": [0.1, 0.2]})
+    monkeypatch.setattr(explainability.registry, "get_model", lambda _: {"model_id": "rf_1h_x", "symbol": "BTC/USDT"})
+    monkeypatch.setattr(explainability.registry, "update_model", lambda model_id, payload: updates.append(payload))
+    monkeypatch.setattr(explainability, "load_cached_summary", lambda _: None)
+    monkeypatch.setattr(explainability.model_utils, "load_model", lambda _: object())
+    monkeypatch.setattr(explainability, "_explanation_rows", lambda doc, size, background: (sample, sample))
+    monkeypatch.setattr(explainability, "HAS_SHAP", True)
+
+    def broken_chunk(*args, **kwargs):
+        raise RuntimeError("explainer crashed")
+
+    monkeypatch.setattr(explainability, "_shap_chunk", broken_chunk)
+
+    result = explainability.run_shap_job("rf_1h_x", n_jobs=1)
+
+    assert result["status"] == "failed" and "explainer crashed" in result["error"]
+    assert updates[-1]["explainability_status"] == "failed"
+
+
+def test_tune_hyperparameters_resumes_shared_study(tmp_path) -> None:
+    from models import tuning
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame({"feat_a": rng.normal(size=200), "feat_b": rng.normal(size=200)})
+    y = pd.Series(X["feat_a"] * 0.5 + rng.normal(scale=0.1, size=200))
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+
+    first = tuning.tune_hyperparameters("BTC/USDT", "1h", "rf", X, y, n_trials=2, storage=storage, persist=False)
+    second = tuning.tune_hyperparameters("BTC/USDT", "1h", "rf", X, y, n_trials=1, storage=storage, persist=False)
+
+    assert first["study_name"] == "rf_1h_BTC-USDT"
+    assert second["n_trials"] == 3
+    assert set(second["params"]) == {"n_estimators", "max_depth", "min_samples_leaf", "max_features"}
+
+
+def test_tune_hyperparameters_single_threads_parallel_trials(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    from models import tuning
+
+    seen: list = []
+
+    def fake_trainer(X_train, y_train, X_val, y_val, X_test, params=None):
+        seen.append(dict(params))
+        return None, {}, np.zeros(len(X_test))
+
+    monkeypatch.setattr(tuning, "train_random_forest", fake_trainer)
+    X = pd.DataFrame({"a": np.arange(200, dtype=float)})
+    y = pd.Series(np.linspace(-1.0, 1.0, 200))
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+
+    tuning.tune_hyperparameters("BTC/USDT", "1h", "rf", X, y, n_trials=1, n_folds=2, storage=storage, persist=False)
+    assert seen and all("n_jobs" not in params for params in seen)
+
+    seen.clear()
+    result = tuning.tune_hyperparameters(
+        "BTC/USDT", "1h", "rf", X, y, n_trials=2, n_folds=2, n_jobs=2, storage=storage, persist=False
+    )
+    assert seen and all(params["n_jobs"] == 1 for params in seen)
+    assert "n_jobs" not in result["params"]
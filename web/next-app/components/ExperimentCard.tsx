@@ -34,6 +34,7 @@ const STATUS_COLORS: Record<string, BadgeVariant> = {
   pending: "outline",
   running: "default",
   completed: "secondary",
+  pruned: "outline",
   promoted: "default",
   rejected: "destructive",
   failed: "destructive",
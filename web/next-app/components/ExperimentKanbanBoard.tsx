@@ -22,6 +22,7 @@ const COLUMNS = [
   { key: "pending", title: "Pending" },
   { key: "running", title: "Running" },
   { key: "completed", title: "Completed" },
+  { key: "pruned", title: "Pruned" },
   { key: "promoted", title: "Promoted" },
   { key: "rejected", title: "Rejected" },
 ];
@@ -23,6 +23,8 @@ type ExperimentSettings = {
   min_confidence: number;
   min_return: number;
   max_queue: number;
+  manual_headroom: number;
+  max_pending_per_family: number;
   updated_at?: string | null;
 };
 
@@ -37,6 +39,8 @@ const DEFAULT_SETTINGS: ExperimentSettings = {
   min_confidence: 0.6,
   min_return: 0.001,
   max_queue: 50,
+  manual_headroom: 10,
+  max_pending_per_family: 0,
 };
 
 export default function ExperimentsTab(): JSX.Element {
@@ -175,6 +179,24 @@ export default function ExperimentsTab(): JSX.Element {
             onChange={(value) => updateField("max_queue", Number(value))}
             explanation="The maximum number of strategy candidates that can wait in the testing queue. This prevents the queue from growing too large when experiments run faster than evaluations."
           />
+          <Field
+            type="number"
+            label="Manual run headroom"
+            value={form.manual_headroom}
+            min={0}
+            max={200}
+            onChange={(value) => updateField("manual_headroom", Number(value))}
+            explanation="Extra queue slots reserved for runs started from this UI. Manual runs are scheduled ahead of the nightly backlog and can still be queued when the queue is full up to this many extra items."
+          />
+          <Field
+            type="number"
+            label="Max queued per family"
+            value={form.max_pending_per_family}
+            min={0}
+            max={500}
+            onChange={(value) => updateField("max_pending_per_family", Number(value))}
+            explanation="Caps how many candidates of one strategy family can wait or run at once so a single family cannot crowd out the others. Set to 0 for no limit."
+          />
 
           <div className="md:col-span-2 lg:col-span-3 space-y-2">
             <Label htmlFor="families">
@@ -237,6 +259,8 @@ export default function ExperimentsTab(): JSX.Element {
           <Snapshot label="Min confidence" value={form.min_confidence.toFixed(2)} />
           <Snapshot label="Min return" value={form.min_return.toFixed(4)} />
           <Snapshot label="Max queue" value={String(form.max_queue)} />
+          <Snapshot label="Manual headroom" value={String(form.manual_headroom)} />
+          <Snapshot label="Family quota" value={form.max_pending_per_family ? String(form.max_pending_per_family) : "None"} />
         </CardContent>
       </Card>
     </div>